@@ -0,0 +1,292 @@
+"""Benchmark `ghtriage pull` against the local fake GitHub server.
+
+Runs a full pull at each requested scale, then optionally an incremental pull after the
+dataset grows, and reports wall time, requests, rows per second and peak RSS for each
+phase of the pull. The server runs in its own process, so its CPU and memory are not
+counted against the pull.
+
+    python benchmarks/pull.py --comments 10000 100000 --workers 4 --latency 0.02
+
+Pass `--profile default fast` to repeat each run under several pull profiles,
+`--fields default all` to compare the kept fields, and `--batch-pages N` to load in
+batches of N pages per resource. Each run reports the database's size on disk.
+Pass `--output results.jsonl` to append one JSON line per pull, so results can be
+compared across commits.
+"""
+
+import argparse
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+import json
+import multiprocessing
+from pathlib import Path
+import subprocess
+import sys
+import tempfile
+import threading
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "tests"))
+
+from fake_github import REPO, Dataset, FakeGitHub, FakeGitHubServer  # noqa: E402
+
+from ghtriage.client import RateLimitScheduler, RequestStats  # noqa: E402
+from ghtriage.config import get_db_path  # noqa: E402
+from ghtriage.fields import FIELD_SETS  # noqa: E402
+from ghtriage.pipeline import PULL_PROFILES, create_pipeline, run_pull  # noqa: E402
+from ghtriage.stats import PullMonitor  # noqa: E402
+
+
+@dataclass
+class PhaseResult:
+    phase: str
+    seconds: float
+    requests: int
+    rows: int
+    peak_rss_mb: float | None
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+class PhaseRecorder:
+    """The `phase` hook for `run_pull`: a `PullMonitor` measuring each phase's own memory
+    peak, that also counts the rows each normalize produced, read back from the
+    pipeline's trace in `cwd`.
+    """
+
+    def __init__(self, stats: RequestStats, cwd: Path) -> None:
+        self.monitor = PullMonitor(stats, live=False, phase_rss=True)
+        self.cwd = cwd
+        self.rows = 0
+
+    @contextmanager
+    def __call__(self, name: str):
+        with self.monitor(name):
+            yield
+        if name == "normalize":
+            self.rows += _rows_normalized(self.cwd)
+
+    @property
+    def results(self) -> list[PhaseResult]:
+        return [
+            PhaseResult(
+                phase=name,
+                seconds=phase.seconds,
+                requests=phase.requests,
+                rows=self.rows,
+                peak_rss_mb=phase.peak_rss_mb,
+            )
+            for name, phase in self.monitor.phases.items()
+        ]
+
+
+def _serve(dataset: Dataset, latency: float, rate_limit: int | None, ready) -> None:
+    fake = FakeGitHub(dataset=dataset, latency=latency, rate_limit=rate_limit)
+    with FakeGitHubServer(fake) as server:
+        ready.put((server.api_url, server.spec_url))
+        # Serve until the parent terminates this process.
+        threading.Event().wait()
+
+
+@contextmanager
+def fake_server(dataset: Dataset, latency: float, rate_limit: int | None):
+    context = multiprocessing.get_context("spawn")
+    ready = context.Queue()
+    process = context.Process(
+        target=_serve, args=(dataset, latency, rate_limit, ready), daemon=True
+    )
+    process.start()
+    try:
+        yield ready.get(timeout=30)
+    finally:
+        process.terminate()
+        process.join()
+
+
+def _rows_normalized(cwd: Path) -> int:
+    trace = create_pipeline(cwd=cwd).last_trace
+    normalize_info = trace.last_normalize_info if trace is not None else None
+    if normalize_info is None:
+        return 0
+    return sum(
+        count for table, count in normalize_info.row_counts.items() if not table.startswith("_dlt")
+    )
+
+
+def bench_pull(
+    cwd: Path,
+    dataset: Dataset,
+    *,
+    full: bool,
+    workers: int,
+    profile: str,
+    fields: str,
+    batch_pages: int | None,
+    latency: float,
+    rate_limit: int | None,
+) -> list[PhaseResult]:
+    stats = RequestStats()
+    recorder = PhaseRecorder(stats, cwd)
+    with fake_server(dataset, latency, rate_limit) as (api_url, spec_url):
+        run_pull(
+            REPO,
+            "fake-token",
+            full=full,
+            workers=workers,
+            profile=PULL_PROFILES[profile],
+            batch_pages=batch_pages,
+            fields=FIELD_SETS[fields],
+            stats=stats,
+            scheduler=RateLimitScheduler(),
+            api_url=api_url,
+            spec_url=spec_url,
+            phase=recorder,
+            cwd=cwd,
+        )
+    return recorder.results
+
+
+def _grown(dataset: Dataset, growth: float) -> Dataset:
+    return Dataset(
+        items=dataset.items + max(int(dataset.items * growth), 1),
+        comments=dataset.comments + max(int(dataset.comments * growth), 1),
+        review_comments=dataset.review_comments + max(int(dataset.review_comments * growth), 1),
+        pr_every=dataset.pr_every,
+    )
+
+
+def _db_size_mb(cwd: Path) -> float:
+    db_path = get_db_path(cwd=cwd, create=False)
+    return db_path.stat().st_size / 1024 / 1024 if db_path.exists() else 0.0
+
+
+def _print_results(label: str, results: list[PhaseResult], db_size_mb: float) -> None:
+    print(f"\n{label}")
+    header = f"{'Phase':<10}  {'Seconds':>8}  {'Requests':>8}  {'Rows/s':>10}  {'Peak RSS':>10}"
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        rss = f"{result.peak_rss_mb:,.0f} MB" if result.peak_rss_mb is not None else "n/a"
+        print(
+            f"{result.phase:<10}  {result.seconds:>8.2f}  {result.requests:>8,}  "
+            f"{result.rows_per_second:>10,.0f}  {rss:>10}"
+        )
+    total = sum(result.seconds for result in results)
+    rows = results[0].rows if results else 0
+    print(
+        f"{'total':<10}  {total:>8.2f}  {sum(r.requests for r in results):>8,}  {rows:>10,} rows"
+    )
+    print(f"Database: {db_size_mb:,.1f} MB")
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--comments",
+        type=int,
+        nargs="+",
+        default=[10_000],
+        help="Conversation comments in the synthetic repository; one full pull per value",
+    )
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument(
+        "--profile",
+        nargs="+",
+        choices=tuple(PULL_PROFILES),
+        default=["default"],
+        help="Pull profiles to compare; each scale is pulled once per profile",
+    )
+    parser.add_argument(
+        "--fields",
+        nargs="+",
+        choices=tuple(FIELD_SETS),
+        default=["default"],
+        help="Field sets to compare; each scale is pulled once per field set and profile",
+    )
+    parser.add_argument(
+        "--batch-pages",
+        type=int,
+        default=None,
+        help="Load in batches of this many pages per resource (default: one load)",
+    )
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per request")
+    parser.add_argument("--rate-limit", type=int, default=None, help="Requests per hour")
+    parser.add_argument(
+        "--growth",
+        type=float,
+        default=0.01,
+        help="Grow the dataset by this fraction and time an incremental pull (0 to skip)",
+    )
+    parser.add_argument("--output", type=Path, help="Append results as JSON lines to this file")
+    args = parser.parse_args(argv)
+
+    revision = _git_revision()
+    for comments, profile, fields in [
+        (c, p, f) for c in args.comments for p in args.profile for f in args.fields
+    ]:
+        dataset = Dataset.for_comments(comments)
+        runs = [("full", dataset, True)]
+        if args.growth > 0:
+            runs.append(("incremental", _grown(dataset, args.growth), False))
+        with tempfile.TemporaryDirectory(prefix="ghtriage-bench-") as tmp:
+            for kind, run_dataset, full in runs:
+                results = bench_pull(
+                    Path(tmp),
+                    run_dataset,
+                    full=full,
+                    workers=args.workers,
+                    profile=profile,
+                    fields=fields,
+                    batch_pages=args.batch_pages,
+                    latency=args.latency,
+                    rate_limit=args.rate_limit,
+                )
+                db_size_mb = _db_size_mb(Path(tmp))
+                _print_results(
+                    f"{kind} pull: {run_dataset.comments:,} comments, "
+                    f"{run_dataset.items:,} items, workers={args.workers}, profile={profile}, "
+                    f"fields={fields}, batch_pages={args.batch_pages}",
+                    results,
+                    db_size_mb,
+                )
+                if args.output:
+                    record = {
+                        "recorded_at": datetime.now(timezone.utc).isoformat(),
+                        "revision": revision,
+                        "kind": kind,
+                        "dataset": asdict(run_dataset),
+                        "workers": args.workers,
+                        "profile": profile,
+                        "fields": fields,
+                        "batch_pages": args.batch_pages,
+                        "latency": args.latency,
+                        "rate_limit": args.rate_limit,
+                        "db_size_mb": db_size_mb,
+                        "phases": [
+                            {**asdict(result), "rows_per_second": result.rows_per_second}
+                            for result in results
+                        ],
+                    }
+                    with args.output.open("a", encoding="utf-8") as f:
+                        f.write(json.dumps(record) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
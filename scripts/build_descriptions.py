@@ -0,0 +1,44 @@
+"""Build the catalog of API descriptions shipped with ghtriage.
+
+Downloads GitHub's OpenAPI description, a file of several megabytes, and writes the
+descriptions of the tables ghtriage annotates, and of their columns, to
+`src/ghtriage/descriptions.json`. Pulls annotate from that catalog without the network;
+run this again before a release to pick up GitHub's changes.
+
+    python scripts/build_descriptions.py
+"""
+
+import argparse
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from ghtriage.annotations import (  # noqa: E402
+    CATALOG_PATH,
+    OPENAPI_SPEC_URL,
+    fetch_spec,
+    read_catalog,
+    write_catalog,
+)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--spec-url", default=OPENAPI_SPEC_URL, help="OpenAPI description")
+    parser.add_argument("--output", type=Path, default=CATALOG_PATH, help="Catalog to write")
+    args = parser.parse_args(argv)
+
+    write_catalog(fetch_spec(args.spec_url), args.spec_url, path=args.output)
+    tables, columns = read_catalog(args.output)
+    described = sum(len(descriptions) for descriptions in columns.values())
+    print(
+        f"Wrote {args.output}: {len(tables)} tables, {described} columns "
+        f"({args.output.stat().st_size:,} bytes)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,6 +1,7 @@
 import json
 from pathlib import Path
 import sys
+from typing import Mapping
 import urllib.error
 import urllib.request
 
@@ -8,6 +9,12 @@ import duckdb
 
 OPENAPI_SPEC_URL = "https://raw.githubusercontent.com/github/rest-api-description/main/descriptions/api.github.com/api.github.com.json"
 OPENAPI_FETCH_TIMEOUT_SECONDS = 30
+# Revalidating a cached copy gives up sooner: the cache is there to fall back on.
+OPENAPI_REVALIDATE_TIMEOUT_SECONDS = 10
+
+# The descriptions of the tables in TABLE_SCHEMAS, extracted from the spec ahead of time
+# by `scripts/build_descriptions.py` and shipped with the package.
+CATALOG_PATH = Path(__file__).with_name("descriptions.json")
 
 # Maps DuckDB table name → OpenAPI component schema name
 TABLE_SCHEMAS = {
@@ -15,18 +22,46 @@ TABLE_SCHEMAS = {
     "pull_requests": "pull-request-simple",
     "conversation_comments": "issue-comment",
     "review_comments": "pull-request-review-comment",
+    "reviews": "pull-request-review",
+    "users": "simple-user",
 }
 
 
-def fetch_spec(url: str, timeout_seconds: int = OPENAPI_FETCH_TIMEOUT_SECONDS) -> dict:
+def fetch_spec(url: str, timeout_seconds: float = OPENAPI_FETCH_TIMEOUT_SECONDS) -> dict:
     """Download and parse an OpenAPI spec from a URL."""
+    # Without validators the request is not conditional, so the spec always comes back.
+    spec, _ = fetch_spec_if_changed(url, {}, timeout_seconds)
+    return spec or {}
+
+
+def fetch_spec_if_changed(
+    url: str,
+    validators: Mapping[str, str],
+    timeout_seconds: float = OPENAPI_FETCH_TIMEOUT_SECONDS,
+) -> tuple[dict | None, dict[str, str]]:
+    """Download and parse an OpenAPI spec from a URL unless it still matches `validators`,
+    the `etag` and `last_modified` of a copy already held. Return the spec, or None when
+    it is unchanged, and the validators of the copy to keep."""
+    headers = {}
+    if etag := validators.get("etag"):
+        headers["If-None-Match"] = etag
+    if last_modified := validators.get("last_modified"):
+        headers["If-Modified-Since"] = last_modified
+    request = urllib.request.Request(url, headers=headers)
     try:
-        with urllib.request.urlopen(url, timeout=timeout_seconds) as response:
-            return json.loads(response.read())
+        with urllib.request.urlopen(request, timeout=timeout_seconds) as response:
+            spec = json.loads(response.read())
+            received = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
     except urllib.error.HTTPError as exc:
+        if exc.code == 304 and headers:
+            return None, dict(validators)
         raise RuntimeError(f"Failed to fetch OpenAPI spec: HTTP {exc.code} {exc.reason}") from exc
     except Exception as exc:
         raise RuntimeError(f"Failed to fetch OpenAPI spec: {exc}") from exc
+    return spec, {name: value for name, value in received.items() if value}
 
 
 def _resolve_ref(schema: dict, spec: dict) -> dict:
@@ -74,78 +109,148 @@ def _extract_descriptions(schema: dict, spec: dict, prefix: str = "") -> dict[st
 
 
 def build_column_descriptions(spec: dict) -> dict[str, dict[str, str]]:
-    """Return {table_name: {column_name: description}} for all tracked tables."""
+    """Return {table_name: {column_name: description}} for the tracked tables the spec
+    describes."""
     result = {}
+    schemas = spec["components"]["schemas"]
     for table_name, schema_name in TABLE_SCHEMAS.items():
-        schema = spec["components"]["schemas"][schema_name]
-        result[table_name] = _extract_descriptions(schema, spec)
+        if schema_name in schemas:
+            result[table_name] = _extract_descriptions(schemas[schema_name], spec)
     return result
 
 
 def build_table_descriptions(spec: dict) -> dict[str, str]:
     """Return {table_name: description} using the schema-level description for each table."""
     result = {}
+    schemas = spec["components"]["schemas"]
     for table_name, schema_name in TABLE_SCHEMAS.items():
-        schema = spec["components"]["schemas"][schema_name]
-        if desc := schema.get("description"):
+        if desc := schemas.get(schema_name, {}).get("description"):
             result[table_name] = desc
     return result
 
 
-def annotate_database(
-    db_path: Path,
+# A table's description, and its columns' descriptions, by table name.
+Descriptions = tuple[dict[str, str], dict[str, dict[str, str]]]
+
+
+def apply_descriptions(
+    conn: duckdb.DuckDBPyConnection,
     table_descs: dict[str, str],
     column_descs: dict[str, dict[str, str]],
 ) -> None:
     """
-    Apply COMMENT ON TABLE and COMMENT ON COLUMN for all known descriptions.
+    Apply COMMENT ON TABLE and COMMENT ON COLUMN for all known descriptions, on `conn`
+    and in whatever transaction it has open.
 
     Tables or columns absent from the database are silently skipped.
     Single quotes in descriptions are escaped as '' (DDL does not support bound parameters).
     """
-    with duckdb.connect(str(db_path)) as conn:
-        existing_tables = {
-            row[0]
-            for row in conn.execute(
-                "SELECT table_name FROM information_schema.tables WHERE table_schema = 'github'"
-            ).fetchall()
-        }
-
-        for table, desc in table_descs.items():
-            if table not in existing_tables:
+    existing_cols: dict[str, set[str]] = {}
+    for table, column in conn.execute(
+        "SELECT table_name, column_name FROM information_schema.columns "
+        "WHERE table_schema = 'github'"
+    ).fetchall():
+        existing_cols.setdefault(table, set()).add(column)
+
+    for table, desc in table_descs.items():
+        if table not in existing_cols:
+            continue
+        escaped = desc.replace("'", "''")
+        conn.execute(f"COMMENT ON TABLE github.{table} IS '{escaped}'")
+
+    for table, col_descriptions in column_descs.items():
+        if table not in existing_cols:
+            continue
+        for column, desc in col_descriptions.items():
+            if column not in existing_cols[table]:
                 continue
             escaped = desc.replace("'", "''")
-            conn.execute(f"COMMENT ON TABLE github.{table} IS '{escaped}'")
+            conn.execute(f"COMMENT ON COLUMN github.{table}.{column} IS '{escaped}'")
 
-        for table, col_descriptions in column_descs.items():
-            if table not in existing_tables:
-                continue
-            existing_cols = {
-                row[0]
-                for row in conn.execute(
-                    "SELECT column_name FROM information_schema.columns "
-                    "WHERE table_schema = 'github' AND table_name = ?",
-                    [table],
-                ).fetchall()
-            }
-            for column, desc in col_descriptions.items():
-                if column not in existing_cols:
-                    continue
-                escaped = desc.replace("'", "''")
-                conn.execute(f"COMMENT ON COLUMN github.{table}.{column} IS '{escaped}'")
 
+def write_catalog(spec: dict, spec_url: str, path: Path | None = None) -> None:
+    """Write the descriptions of `spec`, downloaded from `spec_url`, to the catalog at
+    `path`, by default the one shipped with the package, as compact JSON."""
+    catalog = {
+        "url": spec_url,
+        "tables": build_table_descriptions(spec),
+        "columns": build_column_descriptions(spec),
+    }
+    (path or CATALOG_PATH).write_text(
+        json.dumps(catalog, separators=(",", ":"), sort_keys=True) + "\n", encoding="utf-8"
+    )
 
-def fetch_and_annotate(db_path: Path) -> None:
+
+def read_catalog(path: Path | None = None) -> Descriptions | None:
+    """Return the descriptions in the catalog at `path`, by default the one shipped with
+    the package, or None if there is none."""
+    try:
+        catalog = json.loads((path or CATALOG_PATH).read_text(encoding="utf-8"))
+        return catalog["tables"], catalog["columns"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def local_descriptions(spec_url: str, cache_path: Path) -> Descriptions | None:
+    """Return the descriptions at hand without the network: those cached from the last
+    download of `spec_url`, which are the more recent, else the catalog's."""
+    cache = _read_cache(cache_path, spec_url)
+    if cache is not None:
+        return cache["tables"], cache["columns"]
+    return read_catalog()
+
+
+def _read_cache(cache_path: Path, spec_url: str) -> dict | None:
+    """Return the descriptions cached at `cache_path` from `spec_url`, if any."""
+    try:
+        cache = json.loads(cache_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cache, dict) or cache.get("url") != spec_url:
+        return None
+    return cache
+
+
+def fetch_descriptions(
+    spec_url: str = OPENAPI_SPEC_URL, cache_path: Path | None = None
+) -> Descriptions | None:
     """
-    Fetch the GitHub OpenAPI spec and annotate the database with field descriptions.
+    Fetch the GitHub OpenAPI spec and return its table and column descriptions.
 
-    This is best-effort: any failure prints a warning to stderr and returns without
-    raising, so annotation failures never cause the pull to fail.
+    With `cache_path`, the descriptions are kept there between pulls along with the
+    spec's ETag and Last-Modified, and the spec is only downloaded again once it changed.
+    When it cannot be fetched, the cached descriptions are used, with a note.
+
+    This is best-effort: any failure prints a warning to stderr and returns None, so
+    annotation failures never cause the pull to fail.
     """
+    cache = _read_cache(cache_path, spec_url) if cache_path is not None else None
+    validators = cache.get("validators", {}) if cache is not None else {}
+    timeout = (
+        OPENAPI_FETCH_TIMEOUT_SECONDS if cache is None else OPENAPI_REVALIDATE_TIMEOUT_SECONDS
+    )
+    try:
+        spec, validators = fetch_spec_if_changed(spec_url, validators, timeout)
+    except Exception as exc:
+        if cache is None:
+            print(f"Warning: schema annotation failed: {exc}", file=sys.stderr)
+            return None
+        print(f"Note: annotating from the cached API descriptions. {exc}", file=sys.stderr)
+        return cache["tables"], cache["columns"]
+    if spec is None:
+        return cache["tables"], cache["columns"]
     try:
-        spec = fetch_spec(OPENAPI_SPEC_URL)
-        table_descs = build_table_descriptions(spec)
-        column_descs = build_column_descriptions(spec)
-        annotate_database(db_path, table_descs, column_descs)
+        descriptions = build_table_descriptions(spec), build_column_descriptions(spec)
     except Exception as exc:
         print(f"Warning: schema annotation failed: {exc}", file=sys.stderr)
+        return None
+    if cache_path is not None:
+        tables, columns = descriptions
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(
+            json.dumps(
+                {"url": spec_url, "validators": validators, "tables": tables, "columns": columns}
+            ),
+            encoding="utf-8",
+        )
+    return descriptions
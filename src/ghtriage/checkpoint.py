@@ -0,0 +1,211 @@
+"""Page-level checkpoints, so an interrupted pull from scratch resumes where it stopped.
+
+A pull from scratch (`--full`, or the first pull into an empty database) stages every
+page it fetches on disk, keyed by URL, before dlt sees it. If the pull dies before its
+load completes, the next pull replays the staged pages from disk and only goes to the
+network from the first page that was never fetched. The page sequence is deterministic:
+the first URL is fixed and each next URL comes from the staged page's Link header, so
+the replay walks exactly the pages the interrupted pull walked.
+
+Replaying rather than resuming dlt mid-stream keeps its incremental cursors correct:
+the resumed pull still extracts every page, newest first, in one load. Records changed
+while the pull was interrupted are newer than the staged first page, so the next
+incremental pull picks them up.
+"""
+
+from dataclasses import dataclass, field
+import gzip
+import hashlib
+import json
+import os
+from pathlib import Path
+import shutil
+import threading
+from urllib.parse import quote, unquote
+
+from requests import PreparedRequest, Response
+from requests.structures import CaseInsensitiveDict
+
+from ghtriage.timestamps import utc_timestamp
+
+# Response headers worth replaying: the paginator follows Link, and the validators feed
+# conditional requests on the next pull.
+STAGED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Link")
+
+MANIFEST_NAME = "checkpoint.json"
+
+
+@dataclass
+class ResourceProgress:
+    pages: int = 0
+    records: int = 0
+    last_url: str | None = None
+
+
+@dataclass
+class CheckpointSummary:
+    repo: str
+    full: bool
+    started_at: str
+    # Where a recent-first pull's window starts, so its resumption asks for the same pages.
+    since: str | None = None
+    resources: dict[str, ResourceProgress] = field(default_factory=dict)
+
+    @property
+    def pages(self) -> int:
+        return sum(progress.pages for progress in self.resources.values())
+
+    @property
+    def records(self) -> int:
+        return sum(progress.records for progress in self.resources.values())
+
+
+def _page_name(url: str) -> str:
+    return hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json.gz"
+
+
+def _log_name(resource: str) -> str:
+    # Resource names of a multi-repository pull contain a slash.
+    return quote(resource, safe="") + ".jsonl"
+
+
+def _read_json(path: Path):
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _read_pages(path: Path) -> list[dict]:
+    """Read a resource's page log, skipping a line cut short by a crash."""
+    pages = []
+    try:
+        lines = path.read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return pages
+    for line in lines:
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(entry, dict) and isinstance(entry.get("url"), str):
+            pages.append(entry)
+    return pages
+
+
+def read_checkpoint(path: Path) -> CheckpointSummary | None:
+    """Summarize the checkpoint at `path`, or return None if there is none."""
+    manifest = _read_json(path / MANIFEST_NAME)
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("repo"), str):
+        return None
+    summary = CheckpointSummary(
+        repo=manifest["repo"],
+        full=bool(manifest.get("full")),
+        started_at=str(manifest.get("started_at", "")),
+        since=manifest["since"] if isinstance(manifest.get("since"), str) else None,
+    )
+    for log in sorted(path.glob("*.jsonl")):
+        pages = _read_pages(log)
+        summary.resources[unquote(log.stem)] = ResourceProgress(
+            pages=len(pages),
+            records=sum(int(page.get("records", 0)) for page in pages),
+            last_url=pages[-1]["url"] if pages else None,
+        )
+    return summary
+
+
+class PageCheckpoint:
+    """Stages fetched pages under `path` and replays them on a resumed pull.
+
+    Each resource has an append-only log of the pages it completed, one JSON line each,
+    and every page's body is written (gzipped) before its log line. A log line therefore
+    always has its page, and a line cut short by a crash is ignored.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._summary = read_checkpoint(path)
+        self._staged: dict[str, dict[str, dict]] = {}
+        if self._summary is not None:
+            for resource in self._summary.resources:
+                pages = _read_pages(path / _log_name(resource))
+                self._staged[resource] = {page["url"]: page for page in pages}
+        self._lock = threading.Lock()
+
+    @property
+    def summary(self) -> CheckpointSummary | None:
+        return self._summary
+
+    def resumes(self, repo: str) -> bool:
+        """Whether there is an interrupted pull of `repo` to resume."""
+        return self._summary is not None and self._summary.repo == repo
+
+    def start(self, repo: str, full: bool, since: str | None = None) -> None:
+        """Begin staging for a pull of `repo` from `since`, keeping pages staged by a pull
+        it resumes."""
+        if self.resumes(repo):
+            return
+        self.clear()
+        started_at = utc_timestamp()
+        self.path.mkdir(parents=True, exist_ok=True)
+        manifest = {"repo": repo, "full": full, "started_at": started_at, "since": since}
+        (self.path / MANIFEST_NAME).write_text(json.dumps(manifest), encoding="utf-8")
+        self._summary = CheckpointSummary(repo=repo, full=full, started_at=started_at, since=since)
+
+    def replay(self, resource: str, request: PreparedRequest) -> Response | None:
+        """Return the staged response for `request`, or None if the page was not staged."""
+        entry = self._staged.get(resource, {}).get(request.url)
+        if entry is None:
+            return None
+        try:
+            body = gzip.decompress((self.path / entry["file"]).read_bytes())
+        except (OSError, EOFError, KeyError):
+            return None
+        response = Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.url = request.url
+        response.request = request
+        response.headers = CaseInsensitiveDict(entry.get("headers", {}))
+        response.encoding = "utf-8"
+        response._content = body
+        return response
+
+    def has(self, resource: str, url: str) -> bool:
+        """Whether the page at `url` is staged, to be replayed rather than fetched."""
+        return url in self._staged.get(resource, {})
+
+    def stage(self, resource: str, url: str, response: Response) -> None:
+        """Write a fetched page to disk, then log it as completed."""
+        body = response.content
+        try:
+            records = json.loads(body)
+        except ValueError:
+            return
+        name = _page_name(url)
+        page_path = self.path / name
+        tmp_path = page_path.with_suffix(".tmp")
+        tmp_path.write_bytes(gzip.compress(body, compresslevel=1))
+        os.replace(tmp_path, page_path)
+
+        entry = {
+            "url": url,
+            "file": name,
+            "records": len(records) if isinstance(records, list) else 1,
+            "headers": {
+                header: response.headers[header]
+                for header in STAGED_HEADERS
+                if header in response.headers
+            },
+        }
+        with self._lock:
+            with (self.path / _log_name(resource)).open("a", encoding="utf-8") as log:
+                log.write(json.dumps(entry) + "\n")
+            self._staged.setdefault(resource, {})[url] = entry
+
+    def clear(self) -> None:
+        """Remove all staged pages; the pull they belong to is loaded or abandoned."""
+        if self.path.exists():
+            shutil.rmtree(self.path)
+        self._summary = None
+        self._staged = {}
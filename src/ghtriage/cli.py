@@ -3,10 +3,32 @@ import csv
 import json
 from pathlib import Path
 import sys
+import time
 from typing import Sequence
 
-from ghtriage.config import get_db_path, resolve_repo, resolve_token
-from ghtriage.pipeline import run_pull
+from ghtriage.checkpoint import CheckpointSummary, read_checkpoint
+from ghtriage.client import RateLimitScheduler, RequestStats, TokenPool
+from ghtriage.config import (
+    get_db_path,
+    get_lock_path,
+    resolve_fields,
+    resolve_repo,
+    resolve_repos,
+    resolve_token,
+    resolve_tokens,
+    resolve_webhook_secret,
+    validate_org,
+)
+from ghtriage.lock import PullLock, PullLockHeld
+from ghtriage.pipeline import (
+    BATCH_PUBLISH_INTERVAL_SECONDS,
+    PULL_PROFILES,
+    RESOURCE_PATHS,
+    check_profile,
+    get_checkpoint_path,
+    list_org_repos,
+    run_pull,
+)
 from ghtriage.query import (
     execute_query,
     get_status_data,
@@ -14,6 +36,41 @@ from ghtriage.query import (
     get_table_descriptions,
     get_tables,
 )
+from ghtriage.repair import repair
+from ghtriage.stats import PullMonitor, format_bytes, peak_rss_mb
+from ghtriage.timestamps import utc_timestamp
+from ghtriage.watch import parse_interval, watch
+from ghtriage.webhooks import WebhookServer, WebhookWriter
+
+# Drifted issues `repair` lists by name; the rest are counted.
+REPAIR_LISTED = 20
+
+
+def _positive_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got: {value}") from None
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got: {value}")
+    return number
+
+
+def _interval(value: str) -> float:
+    try:
+        return parse_interval(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from None
+
+
+def _resource_list(value: str) -> list[str]:
+    resources = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in resources if name not in RESOURCE_PATHS]
+    if unknown or not resources:
+        raise argparse.ArgumentTypeError(
+            f"expected a comma-separated list of {', '.join(RESOURCE_PATHS)}, got: {value}"
+        )
+    return resources
 
 
 def _build_parser() -> argparse.ArgumentParser:
@@ -24,11 +81,151 @@ def _build_parser() -> argparse.ArgumentParser:
     subparsers = parser.add_subparsers(dest="command", required=True)
 
     pull_parser = subparsers.add_parser("pull", help="Pull GitHub data into local DuckDB")
-    pull_parser.add_argument("--repo", help="GitHub repository in OWNER/REPO format")
+    target = pull_parser.add_mutually_exclusive_group()
+    target.add_argument("--repo", help="GitHub repository in OWNER/REPO format")
+    target.add_argument(
+        "--org",
+        help="Pull every repository of this GitHub organization that is not archived",
+    )
     pull_parser.add_argument(
         "--full",
         action="store_true",
-        help="Delete local DB and pipeline state before pulling",
+        help=(
+            "Rebuild from scratch, discarding the pipeline state; the current database "
+            "stays queryable until the rebuild replaces it"
+        ),
+    )
+    pull_parser.add_argument(
+        "--only",
+        type=_resource_list,
+        metavar="RESOURCES",
+        help="Pull only these comma-separated resources, e.g. issues,conversation_comments",
+    )
+    pull_parser.add_argument(
+        "--reset",
+        type=_resource_list,
+        metavar="RESOURCES",
+        default=[],
+        help="Drop these resources' tables and pull state, then pull them from scratch",
+    )
+    pull_parser.add_argument(
+        "--workers",
+        type=_positive_int,
+        default=1,
+        help=(
+            "Number of resources to fetch concurrently, across all repositories "
+            "(default: 1, sequential)"
+        ),
+    )
+    pull_parser.add_argument(
+        "--profile",
+        choices=tuple(PULL_PROFILES),
+        default="default",
+        help=(
+            "How fetched data is loaded: 'fast' stages Parquet files and normalizes in "
+            "parallel, and needs the ghtriage[fast] extra (default: default)"
+        ),
+    )
+    pull_parser.add_argument(
+        "--batch-pages",
+        type=_positive_int,
+        metavar="N",
+        help=(
+            "Load every N pages per resource as they arrive, keeping memory flat; what "
+            f"is loaded is published every {BATCH_PUBLISH_INTERVAL_SECONDS} seconds, "
+            "except with --full"
+        ),
+    )
+    pull_parser.add_argument(
+        "--since",
+        type=_interval,
+        metavar="AGE",
+        help=(
+            "On a repository's first pull, fetch only what changed in this window, e.g. "
+            "90d, plus every open item; `--backfill` fetches the rest later"
+        ),
+    )
+    pull_parser.add_argument(
+        "--backfill",
+        action="store_true",
+        help="Also fetch the history a `--since` pull left out",
+    )
+    pull_parser.add_argument(
+        "--refresh-descriptions",
+        action="store_true",
+        help=(
+            "Download GitHub's current OpenAPI description for the column documentation, "
+            "instead of using the copy at hand"
+        ),
+    )
+    pull_parser.add_argument(
+        "--stats",
+        choices=("text", "json"),
+        default="text",
+        help=(
+            "Summary printed when the pull finishes: 'json' prints one JSON object with "
+            "per-resource and per-phase numbers (default: text)"
+        ),
+    )
+
+    watch_parser = subparsers.add_parser(
+        "watch", help="Keep the local DuckDB fresh with incremental pulls on a schedule"
+    )
+    watch_target = watch_parser.add_mutually_exclusive_group()
+    watch_target.add_argument("--repo", help="GitHub repository in OWNER/REPO format")
+    watch_target.add_argument(
+        "--org",
+        help="Watch every repository of this GitHub organization that is not archived",
+    )
+    watch_parser.add_argument(
+        "--interval",
+        type=_interval,
+        default="5m",
+        help="Time between pulls, e.g. 30s, 5m or 1h, give or take 10%% (default: 5m)",
+    )
+    watch_parser.add_argument(
+        "--workers",
+        type=_positive_int,
+        default=1,
+        help="Number of resources to fetch concurrently (default: 1, sequential)",
+    )
+    watch_parser.add_argument(
+        "--profile",
+        choices=tuple(PULL_PROFILES),
+        default="default",
+        help="How fetched data is loaded; see `pull --profile` (default: default)",
+    )
+
+    repair_parser = subparsers.add_parser(
+        "repair",
+        help="Refetch the issues whose stored comments differ from GitHub's comment count",
+    )
+    repair_parser.add_argument(
+        "--repo", help="Only repair this repository (default: every one in the database)"
+    )
+    repair_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="List the issues that would be repaired, without fetching anything",
+    )
+
+    webhook_parser = subparsers.add_parser(
+        "webhook-serve", help="Apply GitHub webhook deliveries to the local DuckDB as they come"
+    )
+    webhook_parser.add_argument(
+        "--host", default="127.0.0.1", help="Address to listen on (default: 127.0.0.1)"
+    )
+    webhook_parser.add_argument(
+        "--port",
+        type=int,
+        default=8765,
+        help="Port to listen on; 0 picks a free one (default: 8765)",
+    )
+    webhook_parser.add_argument(
+        "--flush-interval",
+        type=_interval,
+        default="2s",
+        help="Time between writes of queued changes to the database (default: 2s)",
     )
 
     query_parser = subparsers.add_parser("query", help="Run SQL against local DuckDB")
@@ -49,19 +246,214 @@ def _build_parser() -> argparse.ArgumentParser:
 
 
 def _run_pull(args: argparse.Namespace) -> int:
-    repo = resolve_repo(cli_repo=args.repo)
-    token, _ = resolve_token()
-    if token is None:
+    org = validate_org(args.org) if args.org else None
+    repos = [] if org else resolve_repos(cli_repo=args.repo)
+    tokens, _ = resolve_tokens()
+    if not tokens:
         print(
             "Missing GitHub token. Set GITHUB_TOKEN or place a token in .ghtriage/token.",
             file=sys.stderr,
         )
         return 1
-    load_info, meta_error = run_pull(repo=repo, token=token, full=args.full)
+    token = tokens[0]
+    stats = RequestStats()
+    # One pool for the whole pull: every repository draws on the same tokens' budgets.
+    scheduler = TokenPool(tokens)
+    if org:
+        repos = list_org_repos(org, token, scheduler=scheduler)
+        if not repos:
+            print(f"No repositories to pull in organization {org}.", file=sys.stderr)
+            return 1
+    repo = ", ".join(repos)
+    # A pull in batches resumes from its last loaded batch, not from staged pages.
+    checkpoint = None if args.batch_pages else read_checkpoint(get_checkpoint_path(create=False))
+    if checkpoint is not None and checkpoint.repo == repo and (checkpoint.full or not args.full):
+        print(
+            f"Note: resuming the pull started {_format_pull_at(checkpoint.started_at)} "
+            f"({checkpoint.pages:,} pages already fetched).",
+            file=sys.stderr,
+        )
+    try:
+        with PullLock(get_lock_path()), PullMonitor(stats) as monitor:
+            load_info, meta_error = run_pull(
+                repo=repos,
+                token=token,
+                full=args.full,
+                only=args.only,
+                reset=args.reset,
+                workers=args.workers,
+                profile=PULL_PROFILES[args.profile],
+                batch_pages=args.batch_pages,
+                fields=resolve_fields(),
+                stats=stats,
+                scheduler=scheduler,
+                phase=monitor,
+                since=_since_timestamp(args.since) if args.since is not None else None,
+                backfill=args.backfill,
+                refresh_descriptions=args.refresh_descriptions,
+            )
+    except PullLockHeld as exc:
+        print(f"{exc}. Try again when it finishes.", file=sys.stderr)
+        return 1
+    if args.stats == "json":
+        print(json.dumps(monitor.report(repos, scheduler), indent=2))
+    else:
+        _print_pull_summary(repo, load_info, monitor, scheduler)
+    if meta_error is not None:
+        print(
+            f"Warning: could not record the pull, views and descriptions: {meta_error}",
+            file=sys.stderr,
+        )
+    return 0
+
+
+def _print_pull_summary(
+    repo: str, load_info, monitor: PullMonitor, scheduler: RateLimitScheduler | TokenPool
+) -> None:
+    stats = monitor.stats
     print(f"Pull completed for {repo}")
     print(load_info)
-    if meta_error is not None:
-        print(f"Warning: metadata write failed: {meta_error}", file=sys.stderr)
+    print(f"Requests: {stats.requests:,} ({stats.not_modified:,} answered 304 Not Modified)")
+    if stats.replayed:
+        print(f"Resumed: {stats.replayed:,} pages replayed from the interrupted pull")
+    if scheduler.remaining is not None:
+        print(f"Rate limit: {stats.budget_used:,} used, {scheduler.remaining:,} remaining")
+    print(
+        f"Fetched: {stats.pages:,} pages ({format_bytes(stats.bytes)}), {stats.rows:,} rows "
+        f"({stats.rows_inserted:,} new, {stats.rows_updated:,} updated)"
+    )
+    phases = ", ".join(f"{name} {phase.seconds:.1f}s" for name, phase in monitor.phases.items())
+    print(f"Time: {monitor.seconds:.1f}s ({phases})")
+    if (peak_rss := peak_rss_mb()) is not None:
+        print(f"Peak memory: {peak_rss:,.0f} MB")
+
+
+def _run_watch(args: argparse.Namespace) -> int:
+    org = validate_org(args.org) if args.org else None
+    repos = [] if org else resolve_repos(cli_repo=args.repo)
+    tokens, _ = resolve_tokens()
+    if not tokens:
+        print(
+            "Missing GitHub token. Set GITHUB_TOKEN or place a token in .ghtriage/token.",
+            file=sys.stderr,
+        )
+        return 1
+    token = tokens[0]
+    fields = resolve_fields()
+    # One pool for the life of the process, so each cycle starts knowing the budgets.
+    scheduler = TokenPool(tokens)
+
+    def pull_once() -> str:
+        # An organization's repositories are listed again each cycle, to pick up new ones.
+        cycle_repos = list_org_repos(org, token, scheduler=scheduler) if org else repos
+        if not cycle_repos:
+            raise RuntimeError(f"No repositories to pull in organization {org}")
+        stats = RequestStats()
+        monitor = PullMonitor(stats, live=False)
+        _, meta_error = run_pull(
+            repo=cycle_repos,
+            token=token,
+            workers=args.workers,
+            profile=PULL_PROFILES[args.profile],
+            fields=fields,
+            stats=stats,
+            scheduler=scheduler,
+            phase=monitor,
+        )
+        if meta_error is not None:
+            print(
+                f"Warning: could not record the pull, views and descriptions: {meta_error}",
+                file=sys.stderr,
+            )
+        return (
+            f"{', '.join(cycle_repos)}: {stats.requests:,} requests, {stats.rows:,} rows "
+            f"({stats.rows_inserted:,} new) in {monitor.seconds:.1f}s"
+        )
+
+    target = f"organization {org}" if org else ", ".join(repos)
+    print(f"Watching {target}; Ctrl-C to stop.")
+    try:
+        watch(
+            pull_once,
+            interval=args.interval,
+            lock_path=get_lock_path(),
+            db_path=get_db_path(),
+            scheduler=scheduler,
+        )
+    except KeyboardInterrupt:
+        print("Stopped watching.")
+    return 0
+
+
+def _run_repair(args: argparse.Namespace) -> int:
+    repos = [resolve_repo(cli_repo=args.repo)] if args.repo else None
+    tokens, _ = resolve_tokens()
+    token = tokens[0] if tokens else None
+    if token is None and not args.dry_run:
+        print(
+            "Missing GitHub token. Set GITHUB_TOKEN or place a token in .ghtriage/token.",
+            file=sys.stderr,
+        )
+        return 1
+    try:
+        if args.dry_run:
+            result = repair(token or "", repos=repos, dry_run=True)
+        else:
+            with PullLock(get_lock_path()):
+                result = repair(
+                    token, repos=repos, scheduler=TokenPool(tokens), fields=resolve_fields()
+                )
+    except PullLockHeld as exc:
+        print(f"{exc}. Try again when it finishes.", file=sys.stderr)
+        return 1
+    except RuntimeError as exc:
+        print(f"Repair failed: {exc}", file=sys.stderr)
+        return 1
+
+    print(f"Checked {result.checked:,} issues; {len(result.drifted):,} have drifted.")
+    for drift in result.drifted[:REPAIR_LISTED]:
+        print(
+            f"  {drift.repo}#{drift.number}: {drift.comments} comments on GitHub, "
+            f"{drift.stored} stored"
+        )
+    if len(result.drifted) > REPAIR_LISTED:
+        print(f"  ... and {len(result.drifted) - REPAIR_LISTED:,} more")
+    if args.dry_run or not result.drifted:
+        return 0
+    print(
+        f"Repaired {len(result.drifted) - len(result.remaining):,} issues in "
+        f"{result.requests:,} requests: {result.comments_merged:,} comments merged, "
+        f"{result.comments_deleted:,} deleted."
+    )
+    if result.issues_deleted:
+        print(f"Removed {result.issues_deleted:,} issues deleted or transferred on GitHub.")
+    if result.remaining:
+        print(
+            f"Note: {len(result.remaining):,} issues still differ; they may have changed "
+            "during the repair. Run `ghtriage repair` again.",
+            file=sys.stderr,
+        )
+    return 0
+
+
+def _run_webhook_serve(args: argparse.Namespace) -> int:
+    secret, _ = resolve_webhook_secret()
+    if secret is None:
+        print(
+            "Missing webhook secret. Set GHTRIAGE_WEBHOOK_SECRET or place the secret in "
+            ".ghtriage/webhook_secret.",
+            file=sys.stderr,
+        )
+        return 1
+    with WebhookWriter(flush_interval=args.flush_interval, fields=resolve_fields()) as writer:
+        server = WebhookServer((args.host, args.port), secret, writer)
+        print(f"Listening for GitHub webhooks on {server.url}; Ctrl-C to stop.")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("Stopped listening.")
+        finally:
+            server.server_close()
     return 0
 
 
@@ -169,11 +561,39 @@ def _format_pull_at(iso_str: str) -> str:
     return iso_str.replace("T", " ").replace("Z", " UTC")
 
 
+def _since_timestamp(seconds: float) -> str:
+    return utc_timestamp(time.time() - seconds)
+
+
+def _format_budget(budget: dict) -> str:
+    if budget.get("revoked"):
+        return "revoked; remove it from the token list"
+    if budget.get("remaining") is None:
+        return "not used"
+    left = f"{budget['remaining']:,} of {budget.get('limit') or 0:,} left"
+    if budget.get("reset_at"):
+        left += f", resets {_format_pull_at(budget['reset_at'])}"
+    return left
+
+
+def _print_checkpoint(checkpoint: CheckpointSummary) -> None:
+    kind = "full pull" if checkpoint.full else "pull"
+    print(
+        f"Partial pull: {kind} of {checkpoint.repo} started "
+        f"{_format_pull_at(checkpoint.started_at)}, not finished"
+    )
+    print(
+        f"              {checkpoint.pages:,} pages ({checkpoint.records:,} records) fetched; "
+        f"`ghtriage pull` resumes it"
+    )
+
+
 def _run_status(args: argparse.Namespace) -> int:
     try:
-        config_repo: str | None = resolve_repo()
+        config_repos = resolve_repos()
     except Exception:
-        config_repo = None
+        config_repos = []
+    config_repo = ", ".join(config_repos)
 
     _, token_source = resolve_token()
 
@@ -185,9 +605,12 @@ def _run_status(args: argparse.Namespace) -> int:
 
     print(f"Config repo:  {config_repo or 'unknown'}")
     print(f"Token:        {token_source}")
+    checkpoint = read_checkpoint(get_checkpoint_path(create=False))
 
     if not db_path.exists():
         print(f"Database:     {display_db_path} (not yet pulled)")
+        if checkpoint is not None:
+            _print_checkpoint(checkpoint)
         return 0
 
     try:
@@ -197,14 +620,37 @@ def _run_status(args: argparse.Namespace) -> int:
         print(f"Error reading status: {exc}", file=sys.stderr)
         return 1
 
-    print(f"DB repo:      {status.db_repo or 'unknown'}")
+    print(f"DB repo:      {', '.join(status.db_repos) or 'unknown'}")
     print(f"Database:     {display_db_path} ({_format_size(status.db_size_bytes)})")
     print(
         f"Last pull:    "
         f"{_format_pull_at(status.last_pull_at) if status.last_pull_at else 'unknown'}"
     )
-
-    if config_repo and status.db_repo and config_repo != status.db_repo:
+    if len(status.repo_pulls) > 1:
+        width = max(len(repo) for repo in status.repo_pulls)
+        for repo, pulled_at in status.repo_pulls.items():
+            print(f"  {repo:<{width}}  {_format_pull_at(pulled_at)}")
+    if status.watch_last_cycle_at:
+        outcome = f"failed: {status.watch_last_error}" if status.watch_last_error else "ok"
+        print(f"Last watch:   {_format_pull_at(status.watch_last_cycle_at)} ({outcome})")
+        if status.watch_next_pull_at:
+            print(f"Next watch:   {_format_pull_at(status.watch_next_pull_at)}")
+    if status.webhook_last_applied_at:
+        print(f"Last webhook: {_format_pull_at(status.webhook_last_applied_at)}")
+    if status.history_since:
+        print("History:      open items, and all updated since")
+        width = max(len(repo) for repo in status.history_since)
+        for repo, since in status.history_since.items():
+            print(f"  {repo:<{width}}  {_format_pull_at(since)}")
+        print("              `ghtriage pull --backfill` fetches the rest")
+    if status.token_budgets:
+        print("Rate limit:   as the last pull left each token")
+        for label, budget in status.token_budgets.items():
+            print(f"  {label}  {_format_budget(budget)}")
+    if checkpoint is not None:
+        _print_checkpoint(checkpoint)
+
+    if config_repos and status.db_repos and set(config_repos) != set(status.db_repos):
         print()
         print(f"WARNING: Config repo does not match DB repo. Next pull will target {config_repo}.")
         print(f"         Run `ghtriage pull --full` to rebuild for {config_repo}.")
@@ -223,8 +669,25 @@ def run(argv: Sequence[str] | None = None) -> int:
     parser = _build_parser()
     args = parser.parse_args(argv)
 
+    if args.command in ("pull", "watch"):
+        try:
+            check_profile(PULL_PROFILES[args.profile])
+        except RuntimeError as exc:
+            parser.error(str(exc))
     if args.command == "pull":
+        if args.full and (args.only or args.reset):
+            parser.error(
+                "--full rebuilds everything; it cannot be combined with --only or --reset"
+            )
+        if args.batch_pages and (args.since is not None or args.backfill):
+            parser.error("--batch-pages cannot be combined with --since or --backfill")
         return _run_pull(args)
+    if args.command == "watch":
+        return _run_watch(args)
+    if args.command == "repair":
+        return _run_repair(args)
+    if args.command == "webhook-serve":
+        return _run_webhook_serve(args)
     if args.command == "query":
         return _run_query(args)
     if args.command == "schema":
@@ -0,0 +1,699 @@
+"""HTTP transport for pulls.
+
+Every request the dlt REST API source makes goes through the session built here. The
+work happens in a transport adapter rather than in dlt hooks: the adapter sits below
+dlt's retry wrapper, sees each attempt with its final URL, and is shared by all
+resources, including ones extracted on worker threads.
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+import json
+from pathlib import Path
+import re
+import sys
+import threading
+import time
+from typing import Callable, Collection, Mapping, Sequence
+from urllib.parse import parse_qs, urlsplit
+
+from dlt.sources.helpers.requests import Client
+from requests import PreparedRequest, Response, Session
+from requests.adapters import HTTPAdapter
+
+from ghtriage.checkpoint import PageCheckpoint
+from ghtriage.timestamps import utc_timestamp
+
+# Matches the pool dlt's own client mounts, so concurrent resources do not queue for sockets.
+MAX_CONNECTIONS = 50
+
+# GitHub's secondary limits punish bursts of concurrent requests on one token; this caps
+# in-flight requests per scheduler, however many resources or repositories share it.
+MAX_CONCURRENT_REQUESTS = 10
+# Pacing starts once this fraction of the primary budget is left, spreading the rest
+# evenly until the window resets. Above it, requests go out as fast as they can.
+PACING_THRESHOLD = 0.1
+# Keep back a few requests for a retry or a manual `gh` call while the window resets.
+BUDGET_RESERVE = 5
+# GitHub asks for at least a minute's wait after a secondary limit without Retry-After.
+SECONDARY_LIMIT_BACKOFF_SECONDS = 60
+MAX_RATE_LIMIT_RETRIES = 5
+# Pages of one resource requested ahead of the paginator, once the first page's Link
+# header numbers the last one. Requests still go through the scheduler, so this bounds
+# the window per resource, not the requests in flight per token.
+FETCH_AHEAD_PAGES = 8
+
+
+@dataclass
+class ResourceStats:
+    requests: int = 0
+    not_modified: int = 0
+    rate_limited: int = 0
+    # Pages served from an interrupted pull's checkpoint; not requests.
+    replayed: int = 0
+    # Pages of records handed to dlt, fetched or replayed, and their body size.
+    pages: int = 0
+    bytes: int = 0
+    # Whether the last of those pages links to a next one.
+    has_next: bool = False
+    # Rows extracted, and how many of them were new to the database rather than updates;
+    # counted by `run_pull`.
+    rows: int = 0
+    rows_inserted: int = 0
+    # `time.perf_counter()` when the first request went out and the last answer came in.
+    started_at: float | None = None
+    finished_at: float | None = None
+
+    @property
+    def budget_used(self) -> int:
+        """Requests charged to the primary rate limit; 304 answers are free."""
+        return self.requests - self.not_modified
+
+    @property
+    def rows_updated(self) -> int:
+        return max(self.rows - self.rows_inserted, 0)
+
+    @property
+    def seconds(self) -> float:
+        """Time from the resource's first request to its last answer."""
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+
+@dataclass
+class RequestStats:
+    """Per-resource counters, filled in by the adapter while a pull runs."""
+
+    resources: dict[str, ResourceStats] = field(default_factory=dict)
+
+    def for_resource(self, resource: str) -> ResourceStats:
+        return self.resources.setdefault(resource, ResourceStats())
+
+    @property
+    def requests(self) -> int:
+        return sum(stats.requests for stats in self.resources.values())
+
+    @property
+    def not_modified(self) -> int:
+        return sum(stats.not_modified for stats in self.resources.values())
+
+    @property
+    def budget_used(self) -> int:
+        return sum(stats.budget_used for stats in self.resources.values())
+
+    @property
+    def replayed(self) -> int:
+        return sum(stats.replayed for stats in self.resources.values())
+
+    @property
+    def pages(self) -> int:
+        return sum(stats.pages for stats in self.resources.values())
+
+    @property
+    def bytes(self) -> int:
+        return sum(stats.bytes for stats in self.resources.values())
+
+    @property
+    def rows(self) -> int:
+        return sum(stats.rows for stats in self.resources.values())
+
+    @property
+    def rows_inserted(self) -> int:
+        return sum(stats.rows_inserted for stats in self.resources.values())
+
+    @property
+    def rows_updated(self) -> int:
+        return sum(stats.rows_updated for stats in self.resources.values())
+
+
+class RateLimitScheduler:
+    """Paces requests against one token's rate limit, from the headers GitHub returns.
+
+    One scheduler per token: share it between adapters (concurrent resources, several
+    repositories) and they draw on the same budget and the same concurrency cap. Waiting
+    happens before a request is sent and a rate-limited answer is retried in place, so
+    the paginator never sees it and pages already yielded are kept.
+    """
+
+    def __init__(
+        self,
+        *,
+        token: str | None = None,
+        max_concurrent: int = MAX_CONCURRENT_REQUESTS,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        # Set when the scheduler belongs to a `TokenPool`, which sends each request with
+        # the token of the scheduler it picked.
+        self.token = token
+        self.revoked = False
+        self.limit: int | None = None
+        self.remaining: int | None = None
+        self.reset_at: float | None = None
+        self._paused_until = 0.0
+        self._next_slot = 0.0
+        self._secondary_strikes = 0
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+
+    def acquire(self) -> None:
+        """Take a concurrency slot, then wait until the budget allows another request."""
+        self._slots.acquire()
+        with self._lock:
+            now = self._clock()
+            if self.remaining is not None and self.reset_at is not None:
+                if self.remaining <= BUDGET_RESERVE and self.reset_at > now:
+                    # Out of budget: hold everything until the window resets.
+                    self._paused_until = max(self._paused_until, self.reset_at + 1)
+                # Counted down locally so concurrent requests do not all see the same
+                # budget; the next response's headers correct it.
+                self.remaining = max(self.remaining - 1, 0)
+            start = max(now, self._paused_until, self._next_slot)
+            self._next_slot = start + self._interval(start)
+        if start > now:
+            self._sleep(start - now)
+
+    def release(self) -> None:
+        self._slots.release()
+
+    def ready_at(self, now: float) -> float:
+        """When a request `acquire()`d now would go out, ignoring the concurrency cap."""
+        with self._lock:
+            ready_at = max(now, self._paused_until)
+            if self.remaining is not None and self.reset_at is not None:
+                if self.remaining <= BUDGET_RESERVE and self.reset_at > now:
+                    ready_at = max(ready_at, self.reset_at + 1)
+            return ready_at
+
+    def budget(self) -> dict:
+        """The token's budget as last seen, JSON-serializable, for `status`."""
+        return {
+            "remaining": self.remaining,
+            "limit": self.limit,
+            "reset_at": None if self.reset_at is None else utc_timestamp(self.reset_at),
+            "revoked": self.revoked,
+        }
+
+    def _interval(self, now: float) -> float:
+        if self.remaining is None or self.reset_at is None or self.limit is None:
+            return 0.0
+        if self.remaining > self.limit * PACING_THRESHOLD:
+            return 0.0
+        window = max(self.reset_at - now, 0.0)
+        return window / max(self.remaining - BUDGET_RESERVE, 1)
+
+    def observe(self, response: Response) -> float | None:
+        """Update the budget from `response`; return seconds to wait before a retry, if any."""
+        headers = response.headers
+        with self._lock:
+            if (limit := _int_header(headers, "X-RateLimit-Limit")) is not None:
+                self.limit = limit
+            if (remaining := _int_header(headers, "X-RateLimit-Remaining")) is not None:
+                self.remaining = remaining
+            if (reset_at := _int_header(headers, "X-RateLimit-Reset")) is not None:
+                self.reset_at = float(reset_at)
+
+            delay = self._retry_delay(response)
+            if delay is None:
+                if response.status_code < 400:
+                    self._secondary_strikes = 0
+                return None
+            self._paused_until = max(self._paused_until, self._clock() + delay)
+            return delay
+
+    def _retry_delay(self, response: Response) -> float | None:
+        if response.status_code not in (403, 429):
+            return None
+        if (retry_after := _int_header(response.headers, "Retry-After")) is not None:
+            return float(retry_after)
+        if _int_header(response.headers, "X-RateLimit-Remaining") == 0 and self.reset_at:
+            # Primary limit: the reset time is exact, plus a second for clock skew.
+            return max(self.reset_at - self._clock(), 0.0) + 1
+        if response.status_code == 429 or "rate limit" in response.text.lower():
+            # Secondary limit without Retry-After: back off exponentially from a minute.
+            self._secondary_strikes += 1
+            return SECONDARY_LIMIT_BACKOFF_SECONDS * 2 ** (self._secondary_strikes - 1)
+        # Any other 403 is a permission problem; retrying will not help.
+        return None
+
+
+def token_label(token: str, position: int) -> str:
+    """Name `token`, the `position`th in its list counting from 1, without showing it: the
+    position tells tokens apart, the last characters tell the user which one it is."""
+    return f"#{position} …{token[-4:]}"
+
+
+class TokenPool:
+    """Spreads requests over several tokens, each paced by its own `RateLimitScheduler`.
+
+    Each request goes out on the token that can send it soonest, and of those on the one
+    with the most budget left, so the tokens run down together rather than one after the
+    other. A token out of budget is passed over until its window resets, unless every
+    token is. A token GitHub answers 401 has been revoked or has expired, and is dropped
+    for the life of the pool. Share the pool as a single scheduler would be shared.
+    """
+
+    def __init__(
+        self,
+        tokens: Sequence[str],
+        *,
+        max_concurrent: int = MAX_CONCURRENT_REQUESTS,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if not tokens:
+            raise ValueError("A token pool needs at least one token")
+        self.schedulers = [
+            RateLimitScheduler(
+                token=token, max_concurrent=max_concurrent, clock=clock, sleep=sleep
+            )
+            for token in dict.fromkeys(tokens)
+        ]
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    @property
+    def live(self) -> list[RateLimitScheduler]:
+        return [scheduler for scheduler in self.schedulers if not scheduler.revoked]
+
+    def pick(self) -> RateLimitScheduler:
+        """Return the scheduler of the token the next request should use."""
+        with self._lock:
+            live = self.live
+            if not live:
+                raise RuntimeError(
+                    "Every GitHub token was rejected (HTTP 401). Replace the revoked tokens."
+                )
+            now = self._clock()
+            # A token not used yet has its whole budget, as far as the pool knows.
+            return min(
+                live,
+                key=lambda scheduler: (
+                    scheduler.ready_at(now),
+                    -(scheduler.remaining if scheduler.remaining is not None else float("inf")),
+                ),
+            )
+
+    def wait(self) -> float:
+        """Seconds until the next request can go out on one of the tokens."""
+        now = self._clock()
+        return max(self.pick().ready_at(now) - now, 0.0)
+
+    def drop(self, scheduler: RateLimitScheduler) -> bool:
+        """Stop using `scheduler`'s token; return whether another token is left."""
+        with self._lock:
+            if not scheduler.revoked:
+                scheduler.revoked = True
+                print(
+                    f"Warning: GitHub rejected token {self.label(scheduler)} "
+                    "(HTTP 401); no longer using it.",
+                    file=sys.stderr,
+                )
+            return bool(self.live)
+
+    def label(self, scheduler: RateLimitScheduler) -> str:
+        """The `token_label()` of `scheduler`'s token."""
+        return token_label(scheduler.token or "", self.schedulers.index(scheduler) + 1)
+
+    def budgets(self) -> dict[str, dict]:
+        """Each token's budget, by `label()`."""
+        return {self.label(scheduler): scheduler.budget() for scheduler in self.schedulers}
+
+    # The pool's budget as a whole, read where a single scheduler's would be: by `watch`
+    # to hold off a cycle, and by the pull summary.
+
+    @property
+    def limit(self) -> int | None:
+        limits = [s.limit for s in self.live if s.limit is not None]
+        return sum(limits) if limits else None
+
+    @property
+    def remaining(self) -> int | None:
+        remaining = [s.remaining for s in self.live if s.remaining is not None]
+        return sum(remaining) if remaining else None
+
+    @property
+    def reset_at(self) -> float | None:
+        """When the first token's window resets, bringing budget back."""
+        reset_at = [s.reset_at for s in self.live if s.reset_at is not None]
+        return min(reset_at) if reset_at else None
+
+
+def _int_header(headers, name: str) -> int | None:
+    try:
+        return int(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class ConditionalRequests:
+    """First-page validators (ETag / Last-Modified) per resource, kept between pulls.
+
+    A validator is only sent when the first-page URL matches the one it was recorded
+    for. The URL carries the resource's `since` cursor, so a moved cursor or a different
+    repository never reuses a stale validator. New validators are held back until
+    `save()`, which the caller runs only after the load succeeded: saving earlier would
+    let a failed pull's first page answer 304 next time and skip data never loaded.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._stored: dict[str, dict[str, str]] = self._read(path)
+        self._pending: dict[str, dict[str, str]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _read(path: Path) -> dict[str, dict[str, str]]:
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def headers_for(self, resource: str, url: str) -> dict[str, str]:
+        stored = self._stored.get(resource)
+        if not isinstance(stored, dict) or stored.get("url") != url:
+            return {}
+        headers = {}
+        if etag := stored.get("etag"):
+            headers["If-None-Match"] = etag
+        if last_modified := stored.get("last_modified"):
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def record(self, resource: str, url: str, response: Response) -> None:
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        entry = {"url": url}
+        if etag:
+            entry["etag"] = etag
+        if last_modified:
+            entry["last_modified"] = last_modified
+        with self._lock:
+            self._pending[resource] = entry
+
+    def forget(self, resource: str) -> None:
+        """Stop sending `resource`'s validator; it is dropped from the file on `save()`."""
+        with self._lock:
+            self._stored.pop(resource, None)
+            self._pending.pop(resource, None)
+
+    def rename(self, names: Mapping[str, str]) -> None:
+        """Keep the validators stored under each of `names` under the name it maps to; they
+        move in the file on `save()`."""
+        with self._lock:
+            for old, new in names.items():
+                if old in self._stored:
+                    self._stored.setdefault(new, self._stored.pop(old))
+
+    def save(self) -> None:
+        with self._lock:
+            self._stored.update(self._pending)
+            self._pending.clear()
+            stored = dict(self._stored)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(stored, indent=2, sort_keys=True), encoding="utf-8")
+
+
+def _is_first_page(url: str) -> bool:
+    # GitHub's Link headers page these endpoints with `page=`; the first request has none.
+    return "page" not in parse_qs(urlsplit(url).query)
+
+
+def _page_number(url: str | None) -> int | None:
+    if url is None:
+        return None
+    try:
+        return int(parse_qs(urlsplit(url).query)["page"][0])
+    except (KeyError, ValueError):
+        return None
+
+
+class _FetchAhead:
+    """The pages of one resource being fetched ahead of its paginator, by URL."""
+
+    def __init__(
+        self, request: PreparedRequest, template: str, last: int, args: tuple, kwargs: dict
+    ) -> None:
+        self.request = request.copy()
+        # The `next` link of the first page: every later page's URL is this one with its
+        # page number changed, exactly as the Link headers will give it.
+        self.template = template
+        self.last = last
+        self.args = args
+        self.kwargs = kwargs
+        self.next_page = 2
+        self.pages: dict[str, Future] = {}
+
+    def url_for(self, page: int) -> str:
+        return re.sub(r"([?&]page=)\d+", rf"\g<1>{page}", self.template, count=1)
+
+    def cancel(self) -> None:
+        for future in self.pages.values():
+            future.cancel()
+        self.pages.clear()
+
+
+class GitHubAdapter(HTTPAdapter):
+    """Transport adapter that attributes requests to resources, makes them conditional,
+    schedules them against the rate limit, stages pages for a resumable pull, and fetches
+    the pages of the `fetch_ahead` resources ahead of their paginator."""
+
+    def __init__(
+        self,
+        base_url: str,
+        resource_paths: dict[str, str],
+        *,
+        stats: RequestStats | None = None,
+        conditional: ConditionalRequests | None = None,
+        scheduler: RateLimitScheduler | TokenPool | None = None,
+        checkpoint: PageCheckpoint | None = None,
+        fetch_ahead: Collection[str] = (),
+    ) -> None:
+        super().__init__(pool_maxsize=MAX_CONNECTIONS)
+        self.base_url = base_url
+        self._resources_by_path = {
+            path: name for name, path in resource_paths.items() if "{" not in path
+        }
+        # Dependent resources' paths have a `{number}` per parent record. Each is fetched
+        # once, for a record that changed, so it is neither conditional nor staged.
+        self._dependent_paths = [
+            (re.compile("[^/]+".join(map(re.escape, re.split(r"\{\w+\}", path)))), name)
+            for name, path in resource_paths.items()
+            if "{" in path
+        ]
+        self.stats = stats if stats is not None else RequestStats()
+        self.conditional = conditional
+        self.scheduler = scheduler if scheduler is not None else RateLimitScheduler()
+        self.checkpoint = checkpoint
+        # Only resources whose every page is wanted: a paginator that stops early would
+        # leave the pages fetched ahead of it unread, their requests wasted.
+        self.fetch_ahead = set(fetch_ahead)
+        self._ahead: dict[str, _FetchAhead] = {}
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def resource_for(self, url: str) -> str | None:
+        path = urlsplit(url)._replace(query="", fragment="").geturl()
+        if not path.startswith(self.base_url):
+            return None
+        path = path[len(self.base_url) :].strip("/")
+        if path in self._resources_by_path:
+            return self._resources_by_path[path]
+        return next(
+            (name for pattern, name in self._dependent_paths if pattern.fullmatch(path)), None
+        )
+
+    def _is_dependent(self, resource: str | None) -> bool:
+        return any(name == resource for _, name in self._dependent_paths)
+
+    def send(self, request: PreparedRequest, *args, **kwargs) -> Response:
+        resource = self.resource_for(request.url)
+        staged_resource = None if self._is_dependent(resource) else resource
+        first_page = staged_resource is not None and _is_first_page(request.url)
+        if resource is not None:
+            with self._lock:
+                resource_stats = self.stats.for_resource(resource)
+                if resource_stats.started_at is None:
+                    resource_stats.started_at = time.perf_counter()
+        if staged_resource is not None and self.checkpoint is not None:
+            staged = self.checkpoint.replay(resource, request)
+            if staged is not None:
+                with self._lock:
+                    self.stats.for_resource(resource).replayed += 1
+                    self._count_page(resource, staged)
+                if first_page and self.conditional is not None:
+                    self.conditional.record(resource, request.url, staged)
+                if first_page:
+                    self._fetch_ahead(resource, request, staged, args, kwargs)
+                return staged
+        if first_page and self.conditional is not None:
+            request.headers.update(self.conditional.headers_for(resource, request.url))
+
+        ahead = self._take_ahead(staged_resource, request.url)
+        if ahead is not None:
+            response = ahead.result()
+        else:
+            response = self._send_paced(resource, request, *args, **kwargs)
+
+        if response.status_code == 200:
+            if resource is not None:
+                with self._lock:
+                    self._count_page(resource, response)
+            if first_page and self.conditional is not None:
+                self.conditional.record(resource, request.url, response)
+            if staged_resource is not None and self.checkpoint is not None:
+                self.checkpoint.stage(resource, request.url, response)
+            if first_page:
+                self._fetch_ahead(resource, request, response, args, kwargs)
+        return response
+
+    def _send_paced(
+        self, resource: str | None, request: PreparedRequest, *args, **kwargs
+    ) -> Response:
+        """Send `request` when the rate limit allows, retrying it while it is rate-limited."""
+        pool = self.scheduler if isinstance(self.scheduler, TokenPool) else None
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            scheduler = pool.pick() if pool is not None else self.scheduler
+            if scheduler.token is not None:
+                request.headers["Authorization"] = f"Bearer {scheduler.token}"
+            scheduler.acquire()
+            try:
+                response = super().send(request, *args, **kwargs)
+            finally:
+                scheduler.release()
+            delay = scheduler.observe(response)
+            self._count(resource, response, rate_limited=delay is not None)
+            if (
+                response.status_code == 401
+                and pool is not None
+                and pool.drop(scheduler)
+                and attempt < MAX_RATE_LIMIT_RETRIES
+            ):
+                # Sent again at once, on one of the tokens left.
+                response.close()
+                continue
+            if delay is None or attempt == MAX_RATE_LIMIT_RETRIES:
+                break
+            if pool is not None:
+                # The retry goes out on whichever token is ready first, maybe another one.
+                delay = pool.wait()
+            print(
+                f"Note: GitHub rate limit hit (HTTP {response.status_code}); "
+                f"retrying in {delay:.0f}s.",
+                file=sys.stderr,
+            )
+            response.close()
+        return response
+
+    def _fetch_ahead(
+        self,
+        resource: str | None,
+        request: PreparedRequest,
+        first: Response,
+        args: tuple,
+        kwargs: dict,
+    ) -> None:
+        """Start fetching the pages after `first`, if its resource is fetched ahead and its
+        Link header numbers the last page.
+
+        The paginator asks for one page at a time, each only once the one before it came
+        in; the URLs of the rest follow from the `last` link, so up to `FETCH_AHEAD_PAGES`
+        of them are already on their way when it does. Without a `last` link, the pages
+        are followed one by one, as the paginator asks for them.
+        """
+        if resource not in self.fetch_ahead:
+            return
+        template = first.links.get("next", {}).get("url")
+        last = _page_number(first.links.get("last", {}).get("url"))
+        if template is None or last is None or _page_number(template) is None:
+            return
+        ahead = _FetchAhead(request, template, last, args, kwargs)
+        with self._lock:
+            previous = self._ahead.pop(resource, None)
+            self._ahead[resource] = ahead
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=MAX_CONNECTIONS, thread_name_prefix="ghtriage-page"
+                )
+            for _ in range(FETCH_AHEAD_PAGES):
+                self._fetch_next(resource, ahead)
+        if previous is not None:
+            previous.cancel()
+
+    def _fetch_next(self, resource: str, ahead: "_FetchAhead") -> None:
+        # Called with the lock held.
+        while ahead.next_page <= ahead.last:
+            page_request = ahead.request.copy()
+            page_request.prepare_url(ahead.url_for(ahead.next_page), None)
+            ahead.next_page += 1
+            if self.checkpoint is not None and self.checkpoint.has(resource, page_request.url):
+                # Replayed from the checkpoint when the paginator asks for it.
+                continue
+            for header in ("If-None-Match", "If-Modified-Since"):
+                page_request.headers.pop(header, None)
+            ahead.pages[page_request.url] = self._executor.submit(
+                self._fetch_page, resource, page_request, ahead.args, ahead.kwargs
+            )
+            return
+
+    def _fetch_page(
+        self, resource: str, request: PreparedRequest, args: tuple, kwargs: dict
+    ) -> Response:
+        response = self._send_paced(resource, request, *args, **kwargs)
+        # Read here, on the worker, so the body downloads alongside the other pages.
+        response.content  # noqa: B018
+        return response
+
+    def _take_ahead(self, resource: str | None, url: str) -> Future | None:
+        """Return the fetch of `url` started ahead of time, and start one more page."""
+        if resource is None:
+            return None
+        with self._lock:
+            ahead = self._ahead.get(resource)
+            if ahead is None or url not in ahead.pages:
+                return None
+            self._fetch_next(resource, ahead)
+            return ahead.pages.pop(url)
+
+    def close(self) -> None:
+        with self._lock:
+            for ahead in self._ahead.values():
+                ahead.cancel()
+            self._ahead.clear()
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        super().close()
+
+    def _count(self, resource: str | None, response: Response, *, rate_limited: bool) -> None:
+        if resource is None:
+            return
+        with self._lock:
+            resource_stats = self.stats.for_resource(resource)
+            resource_stats.requests += 1
+            resource_stats.finished_at = time.perf_counter()
+            if response.status_code == 304:
+                resource_stats.not_modified += 1
+            if rate_limited:
+                resource_stats.rate_limited += 1
+
+    def _count_page(self, resource: str, response: Response) -> None:
+        resource_stats = self.stats.for_resource(resource)
+        resource_stats.pages += 1
+        resource_stats.bytes += len(response.content)
+        resource_stats.finished_at = time.perf_counter()
+        resource_stats.has_next = "next" in response.links
+
+
+def build_session(adapter: GitHubAdapter) -> Session:
+    """Return a dlt retrying session with `adapter` mounted in place of the default one."""
+    session = Client(raise_for_status=False).session
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
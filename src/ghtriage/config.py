@@ -3,6 +3,9 @@ from pathlib import Path
 import re
 import subprocess
 import textwrap
+from typing import Mapping
+
+from ghtriage.fields import FIELD_SETS, Projection, with_extra_fields
 
 try:
     import tomllib
@@ -10,6 +13,7 @@ except ModuleNotFoundError:  # pragma: no cover - exercised on Python <3.11
     import tomli as tomllib
 
 REPO_SLUG_PATTERN = re.compile(r"^[A-Za-z0-9_.-]+/[A-Za-z0-9_.-]+$")
+ORG_PATTERN = re.compile(r"^[A-Za-z0-9_.-]+$")
 LOCAL_GITIGNORE_CONTENT = textwrap.dedent(
     """\
     *
@@ -39,8 +43,20 @@ def get_db_path(cwd: str | Path | None = None, create: bool = True) -> Path:
     return get_ghtriage_dir(cwd=cwd, create=create) / "ghtriage.duckdb"
 
 
-def get_pipelines_dir(cwd: str | Path | None = None) -> Path:
-    return get_ghtriage_dir(cwd=cwd) / "pipelines"
+def get_staging_db_path(cwd: str | Path | None = None, create: bool = True) -> Path:
+    return get_ghtriage_dir(cwd=cwd, create=create) / "ghtriage.staging.duckdb"
+
+
+def get_pipelines_dir(cwd: str | Path | None = None, create: bool = True) -> Path:
+    return get_ghtriage_dir(cwd=cwd, create=create) / "pipelines"
+
+
+def get_lock_path(cwd: str | Path | None = None, create: bool = True) -> Path:
+    return get_ghtriage_dir(cwd=cwd, create=create) / "pull.lock"
+
+
+def get_descriptions_cache_path(cwd: str | Path | None = None, create: bool = True) -> Path:
+    return get_ghtriage_dir(cwd=cwd, create=create) / "descriptions.json"
 
 
 def parse_git_remote(remote_url: str) -> str:
@@ -74,35 +90,78 @@ def _read_token_file(path: Path) -> str | None:
     return token or None
 
 
+def _split_tokens(value: str) -> list[str]:
+    # Several tokens are separated by commas or whitespace, e.g. one per line of the file.
+    return list(dict.fromkeys(token for token in re.split(r"[\s,]+", value) if token))
+
+
+def resolve_tokens(
+    cwd: str | Path | None = None, env: dict[str, str] | None = None
+) -> tuple[list[str], str]:
+    """Return (tokens, source_label) without raising if there are none.
+
+    GITHUB_TOKEN, or else `.ghtriage/token`, may hold several tokens, for a pull to spread
+    its requests over; the first is the one used where a single token is needed.
+    """
+    env_data = env if env is not None else os.environ
+    tokens = _split_tokens(env_data.get("GITHUB_TOKEN", ""))
+    source = "GITHUB_TOKEN (env"
+    if not tokens:
+        ghtriage_dir = get_ghtriage_dir(cwd=cwd, create=False)
+        tokens = _split_tokens(_read_token_file(ghtriage_dir / "token") or "")
+        source = ".ghtriage/token (file"
+    if not tokens:
+        return [], "not configured"
+    count = f", {len(tokens)} tokens" if len(tokens) > 1 else ""
+    return tokens, f"{source}{count})"
+
+
 def resolve_token(
     cwd: str | Path | None = None, env: dict[str, str] | None = None
 ) -> tuple[str | None, str]:
     """Return (token, source_label) without raising if the token is missing."""
+    tokens, source = resolve_tokens(cwd=cwd, env=env)
+    return (tokens[0] if tokens else None), source
+
+
+def resolve_webhook_secret(
+    cwd: str | Path | None = None, env: dict[str, str] | None = None
+) -> tuple[str | None, str]:
+    """Return (secret, source_label) for verifying webhook deliveries, or (None, ...)."""
     env_data = env if env is not None else os.environ
-    token = env_data.get("GITHUB_TOKEN")
-    if token:
-        return token, "GITHUB_TOKEN (env)"
+    secret = env_data.get("GHTRIAGE_WEBHOOK_SECRET")
+    if secret:
+        return secret, "GHTRIAGE_WEBHOOK_SECRET (env)"
 
     ghtriage_dir = get_ghtriage_dir(cwd=cwd, create=False)
-    token = _read_token_file(ghtriage_dir / "token")
-    if token:
-        return token, ".ghtriage/token (file)"
+    secret = _read_token_file(ghtriage_dir / "webhook_secret")
+    if secret:
+        return secret, ".ghtriage/webhook_secret (file)"
 
     return None, "not configured"
 
 
-def _default_repo_from_config(config_path: Path) -> str | None:
+def _config_table(config_path: Path, name: str) -> dict:
+    """Return the `[name]` table of `config_path`, or an empty one."""
     if not config_path.exists():
-        return None
+        return {}
     try:
         with config_path.open("rb") as file_obj:
             config_data = tomllib.load(file_obj)
     except tomllib.TOMLDecodeError as exc:
         raise RuntimeError(f"Invalid TOML in {config_path}: {exc}") from exc
 
-    repo_data = config_data.get("repo")
-    if not isinstance(repo_data, dict):
-        return None
+    table = config_data.get(name)
+    return table if isinstance(table, dict) else {}
+
+
+def _repo_config(config_path: Path) -> dict:
+    """Return the `[repo]` table of `config_path`, or an empty one."""
+    return _config_table(config_path, "repo")
+
+
+def _default_repo_from_config(config_path: Path) -> str | None:
+    repo_data = _repo_config(config_path)
     default_repo = repo_data.get("default")
     if default_repo is None:
         return None
@@ -111,6 +170,15 @@ def _default_repo_from_config(config_path: Path) -> str | None:
     return default_repo.strip()
 
 
+def _repos_from_config(config_path: Path) -> list[str] | None:
+    repos = _repo_config(config_path).get("repos")
+    if repos is None:
+        return None
+    if not isinstance(repos, list) or not all(isinstance(repo, str) for repo in repos):
+        raise RuntimeError(f"Invalid [repo].repos in {config_path}: expected a list of strings")
+    return [repo.strip() for repo in repos]
+
+
 def _validate_repo_slug(repo: str) -> str:
     repo = repo.strip()
     if REPO_SLUG_PATTERN.fullmatch(repo):
@@ -118,6 +186,13 @@ def _validate_repo_slug(repo: str) -> str:
     raise ValueError(f"Repository must be in OWNER/REPO format, got: {repo}")
 
 
+def validate_org(org: str) -> str:
+    org = org.strip()
+    if ORG_PATTERN.fullmatch(org):
+        return org
+    raise ValueError(f"Invalid GitHub organization name: {org}")
+
+
 def get_git_remote_origin(cwd: str | Path | None = None) -> str:
     proc = subprocess.run(
         ["git", "remote", "get-url", "origin"],
@@ -147,3 +222,45 @@ def resolve_repo(cli_repo: str | None = None, cwd: str | Path | None = None) ->
 
     remote = get_git_remote_origin(cwd=cwd)
     return parse_git_remote(remote)
+
+
+def resolve_repos(cli_repo: str | None = None, cwd: str | Path | None = None) -> list[str]:
+    """Return the repositories to pull, in order, without duplicates.
+
+    `--repo` names one; otherwise `[repo].repos` in config.toml lists several, and without
+    it the single repository `resolve_repo` finds is used.
+    """
+    if not cli_repo:
+        config_repos = _repos_from_config(get_ghtriage_dir(cwd=cwd, create=False) / "config.toml")
+        if config_repos:
+            return list(dict.fromkeys(_validate_repo_slug(repo) for repo in config_repos))
+    return [resolve_repo(cli_repo=cli_repo, cwd=cwd)]
+
+
+def resolve_fields(cwd: str | Path | None = None) -> Mapping[str, Projection] | None:
+    """Return the projection pulled records are cut down to, from `[pull].fields` in
+    config.toml: "default" keeps the fields ghtriage queries, "all" every field.
+
+    `[pull.extra_fields]` adds to the default: it maps a resource to a list of its fields
+    to keep as well, each a name or a dotted path to a nested field.
+    """
+    config_path = get_ghtriage_dir(cwd=cwd, create=False) / "config.toml"
+    pull_config = _config_table(config_path, "pull")
+    name = pull_config.get("fields", "default")
+    if not isinstance(name, str) or name not in FIELD_SETS:
+        raise RuntimeError(
+            f"Invalid [pull].fields in {config_path}: expected one of "
+            f"{', '.join(repr(choice) for choice in FIELD_SETS)}"
+        )
+    extra = pull_config.get("extra_fields", {})
+    if not isinstance(extra, dict) or not all(isinstance(paths, list) for paths in extra.values()):
+        raise RuntimeError(
+            f"Invalid [pull.extra_fields] in {config_path}: expected a list of fields "
+            "for each resource"
+        )
+    if not extra or FIELD_SETS[name] is None:
+        return FIELD_SETS[name]
+    try:
+        return with_extra_fields(extra)
+    except ValueError as exc:
+        raise RuntimeError(f"Invalid [pull.extra_fields] in {config_path}: {exc}") from exc
@@ -0,0 +1,216 @@
+"""The fields of each GitHub record a pull keeps.
+
+dlt flattens every nested object into columns and turns every list into a child table,
+so a raw payload becomes dozens of API URLs, node ids, avatar links, and a snapshot of
+the head and base repositories on every pull request row. A projection names the fields
+worth querying, including every field the derived views, `repair` and the webhook merge
+read; everything else is dropped from the record before dlt sees it.
+
+With every field kept, user objects are taken out of the records instead: each is stored
+once in the `users` table, keyed by id, and the record keeps only the user's id and login.
+A projection already cuts each user down to its id, login and type, which a table of
+their own would not save space on.
+"""
+
+from typing import Any, Mapping, Sequence, Union
+
+from ghtriage.resources import validate_resources
+
+# A projection maps a field to None, to keep its value whole, or to the projection of its
+# value: the fields of an object, or of each object in a list.
+Projection = Mapping[str, Union["Projection", None]]
+
+# Every record carries the repository it came from, added by the pull.
+REPO = {"repo": None}
+USER = dict.fromkeys(["id", "login", "type"])
+LABEL = dict.fromkeys(["id", "name"])
+MILESTONE = dict.fromkeys(["number", "title", "state", "due_on"])
+REACTIONS = dict.fromkeys(
+    ["total_count", "+1", "-1", "laugh", "hooray", "confused", "heart", "rocket", "eyes"]
+)
+BRANCH = dict.fromkeys(["label", "ref", "sha"])
+
+DEFAULT_FIELDS: dict[str, Projection] = {
+    "issues": {
+        **REPO,
+        **dict.fromkeys(
+            [
+                "id",
+                "number",
+                "html_url",
+                "title",
+                "body",
+                "state",
+                "state_reason",
+                "locked",
+                "comments",
+                "created_at",
+                "updated_at",
+                "closed_at",
+                "author_association",
+            ]
+        ),
+        "user": USER,
+        "labels": LABEL,
+        "assignee": USER,
+        "assignees": USER,
+        "milestone": MILESTONE,
+        "reactions": REACTIONS,
+    },
+    "pull_requests": {
+        **REPO,
+        **dict.fromkeys(
+            [
+                "id",
+                "number",
+                "html_url",
+                "title",
+                "body",
+                "state",
+                "locked",
+                "draft",
+                "created_at",
+                "updated_at",
+                "closed_at",
+                "merged_at",
+                "merge_commit_sha",
+                "author_association",
+            ]
+        ),
+        "user": USER,
+        "labels": LABEL,
+        "assignee": USER,
+        "assignees": USER,
+        "requested_reviewers": USER,
+        "requested_teams": dict.fromkeys(["id", "name", "slug"]),
+        "milestone": MILESTONE,
+        "head": BRANCH,
+        "base": BRANCH,
+    },
+    "conversation_comments": {
+        **REPO,
+        **dict.fromkeys(
+            [
+                "id",
+                "issue_url",
+                "html_url",
+                "body",
+                "created_at",
+                "updated_at",
+                "author_association",
+            ]
+        ),
+        "user": USER,
+        "reactions": REACTIONS,
+    },
+    "review_comments": {
+        **REPO,
+        **dict.fromkeys(
+            [
+                "id",
+                "pull_request_review_id",
+                "pull_request_url",
+                "html_url",
+                "in_reply_to_id",
+                "path",
+                "line",
+                "start_line",
+                "side",
+                "subject_type",
+                "commit_id",
+                "body",
+                "created_at",
+                "updated_at",
+                "author_association",
+            ]
+        ),
+        "user": USER,
+        "reactions": REACTIONS,
+    },
+    "reviews": {
+        **REPO,
+        **dict.fromkeys(
+            [
+                "id",
+                "pull_request_url",
+                "html_url",
+                "state",
+                "body",
+                "commit_id",
+                "submitted_at",
+                "author_association",
+            ]
+        ),
+        "user": USER,
+    },
+}
+
+# Fields holding a user object, or a list of them, split out into the users table.
+USER_FIELDS = ("user", "assignee", "assignees", "requested_reviewers")
+# What a record keeps of each user it refers to.
+USER_KEY = ("id", "login")
+
+# The projections `[pull].fields` in config.toml can name; None keeps every field.
+FIELD_SETS: dict[str, Mapping[str, Projection] | None] = {
+    "default": DEFAULT_FIELDS,
+    "all": None,
+}
+
+
+def with_fields(projection: Projection, paths: Sequence[str]) -> Projection:
+    """Return `projection` also keeping `paths`, each a field or a dotted path to a nested
+    one, e.g. `closed_by.login`. A field the projection keeps whole stays whole."""
+    extended = dict(projection)
+    for path in paths:
+        name, _, rest = path.partition(".")
+        if name in extended and extended[name] is None:
+            continue
+        extended[name] = with_fields(extended.get(name) or {}, [rest]) if rest else None
+    return extended
+
+
+def with_extra_fields(extra: Mapping[str, Sequence[str]]) -> dict[str, Projection]:
+    """Return `DEFAULT_FIELDS` with the fields `extra` lists for each resource kind."""
+    validate_resources(extra)
+    for kind, paths in extra.items():
+        for path in paths:
+            if not isinstance(path, str) or not all(path.split(".")):
+                raise ValueError(f"Invalid field for {kind}: {path!r}")
+    return {
+        kind: with_fields(projection, extra.get(kind, ()))
+        for kind, projection in DEFAULT_FIELDS.items()
+    }
+
+
+def project(value: Any, projection: Projection) -> Any:
+    """Return `value` with only the fields `projection` names, projecting a list item by
+    item. Fields the value does not have are left out rather than added as nulls."""
+    if isinstance(value, list):
+        return [project(item, projection) for item in value]
+    if not isinstance(value, dict):
+        return value
+    return {
+        name: value[name] if nested is None else project(value[name], nested)
+        for name, nested in projection.items()
+        if name in value
+    }
+
+
+def split_users(record: dict) -> tuple[dict, list[dict]]:
+    """Return `record` with each user object in `USER_FIELDS` cut down to `USER_KEY`, and
+    the user objects taken out of it, whole."""
+    users: list[dict] = []
+
+    def key(user: Any) -> Any:
+        if not isinstance(user, dict) or user.get("id") is None:
+            return user
+        users.append(user)
+        return {name: user[name] for name in USER_KEY if name in user}
+
+    split = dict(record)
+    for name in USER_FIELDS:
+        if name not in record:
+            continue
+        value = record[name]
+        split[name] = [key(user) for user in value] if isinstance(value, list) else key(value)
+    return split, users
@@ -0,0 +1,84 @@
+"""A lock file, so only one pull at a time writes to the database.
+
+`ghtriage pull` and each cycle of `ghtriage watch` hold it while they pull. The lock is
+an OS-level lock on the open file, not the file's existence: it is released when the
+process exits, however it exits, so a crashed pull never leaves a stale lock behind.
+The file records the holder's process id, for the message the next pull shows.
+"""
+
+import os
+from pathlib import Path
+
+try:
+    import fcntl
+except ModuleNotFoundError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class PullLockHeld(RuntimeError):
+    """Another process holds the pull lock."""
+
+    def __init__(self, path: Path, pid: int | None) -> None:
+        holder = f"process {pid}" if pid is not None else "another process"
+        super().__init__(f"Another pull is running ({holder}, lock file {path})")
+        self.path = path
+        self.pid = pid
+
+
+def _try_lock(fd: int) -> bool:
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def _unlock(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+def _read_pid(fd: int) -> int | None:
+    try:
+        os.lseek(fd, 0, os.SEEK_SET)
+        return int(os.read(fd, 32).decode("ascii").strip())
+    except (OSError, ValueError):
+        return None
+
+
+class PullLock:
+    """Context manager holding the lock at `path`; raises `PullLockHeld` if it is taken."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._fd: int | None = None
+
+    def __enter__(self) -> "PullLock":
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if not _try_lock(fd):
+            pid = _read_pid(fd)
+            os.close(fd)
+            raise PullLockHeld(self.path, pid)
+        os.ftruncate(fd, 0)
+        os.lseek(fd, 0, os.SEEK_SET)
+        os.write(fd, f"{os.getpid()}\n".encode("ascii"))
+        self._fd = fd
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._fd is None:
+            return
+        try:
+            os.ftruncate(self._fd, 0)
+            _unlock(self._fd)
+        finally:
+            os.close(self._fd)
+            self._fd = None
@@ -0,0 +1,63 @@
+"""Paginators for GitHub's list endpoints, plugged into the dlt REST API source."""
+
+from typing import Any
+
+from dlt.sources.helpers.rest_client.paginators import HeaderLinkPaginator
+from requests import Response
+
+
+class UpdatedSincePaginator(HeaderLinkPaginator):
+    """Follow `Link: rel="next"` headers until a page reaches rows older than `since`.
+
+    For endpoints that sort by `updated` descending but take no `since` parameter, such as
+    `/pulls`. Once a page holds a row updated before the stored cursor, every later page
+    is older still, so paging stops there instead of walking the whole history only for
+    the incremental filter to discard it. The page that crosses the cursor is still
+    yielded; the incremental filter drops its older rows as usual.
+    """
+
+    def __init__(self, since: str | None = None, cursor_path: str = "updated_at") -> None:
+        super().__init__()
+        self.since = since
+        self.cursor_path = cursor_path
+
+    def update_state(self, response: Response, data: list[Any] | None = None) -> None:
+        super().update_state(response, data)
+        if self.since is None or not data:
+            return
+        # GitHub timestamps are fixed-width UTC ISO 8601, so they order as strings.
+        cursors = [row.get(self.cursor_path) for row in data if isinstance(row, dict)]
+        cursors = [cursor for cursor in cursors if cursor is not None]
+        if cursors and min(cursors) < self.since:
+            self._next_reference = None
+
+    def __str__(self) -> str:
+        return super().__str__() + f": since: {self.since}"
+
+
+class UpdatedBeforePaginator(HeaderLinkPaginator):
+    """Follow `Link: rel="next"` headers until a page reaches rows updated at or after
+    `until`.
+
+    For walking a resource sorted by `updated` ascending up to where a recent-first pull
+    began: GitHub takes a lower bound (`since`) on some endpoints but never an upper one.
+    The page that crosses `until` is still yielded; its newer rows are current versions
+    of rows already stored, and merge over them.
+    """
+
+    def __init__(self, until: str, cursor_path: str = "updated_at") -> None:
+        super().__init__()
+        self.until = until
+        self.cursor_path = cursor_path
+
+    def update_state(self, response: Response, data: list[Any] | None = None) -> None:
+        super().update_state(response, data)
+        if not data:
+            return
+        cursors = [row.get(self.cursor_path) for row in data if isinstance(row, dict)]
+        cursors = [cursor for cursor in cursors if cursor is not None]
+        if cursors and max(cursors) >= self.until:
+            self._next_reference = None
+
+    def __str__(self) -> str:
+        return super().__str__() + f": until: {self.until}"
@@ -1,15 +1,121 @@
-from datetime import datetime, timezone
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import dataclass
+from datetime import datetime
+import importlib.util
+import json
+import os
 from pathlib import Path
 import shutil
-from typing import Any
+import threading
+import time
+from typing import Any, Callable, Collection, Mapping, Sequence
 
 import dlt
+from dlt.sources.helpers.rest_client import RESTClient
+from dlt.sources.helpers.rest_client.auth import BearerTokenAuth
+from dlt.sources.helpers.rest_client.exceptions import IgnoreResponseException
+from dlt.sources.helpers.rest_client.paginators import HeaderLinkPaginator
 from dlt.sources.rest_api import rest_api_source
 import duckdb
+from requests import Response, Session
 
-from ghtriage.annotations import fetch_and_annotate
-from ghtriage.config import get_db_path, get_pipelines_dir
-from ghtriage.views import create_views
+from ghtriage.annotations import (
+    OPENAPI_SPEC_URL,
+    Descriptions,
+    apply_descriptions,
+    fetch_descriptions,
+    local_descriptions,
+)
+from ghtriage.checkpoint import PageCheckpoint
+from ghtriage.client import (
+    ConditionalRequests,
+    GitHubAdapter,
+    RateLimitScheduler,
+    RequestStats,
+    TokenPool,
+    build_session,
+)
+from ghtriage.config import (
+    get_db_path,
+    get_descriptions_cache_path,
+    get_pipelines_dir,
+    get_staging_db_path,
+)
+from ghtriage.fields import DEFAULT_FIELDS, Projection, project, split_users
+from ghtriage.paginators import UpdatedBeforePaginator, UpdatedSincePaginator
+from ghtriage.resources import RESOURCE_PATHS, validate_resources
+from ghtriage.snapshot import prepare_staging, publish, publish_copy
+from ghtriage.timestamps import utc_timestamp
+from ghtriage.views import create_views, replace_views
+
+GITHUB_API_URL = "https://api.github.com"
+GITHUB_HEADERS = {
+    "Accept": "application/vnd.github+json",
+    "X-GitHub-Api-Version": "2022-11-28",
+}
+
+# The name dlt gives a `rest_api_source`; its resources' state is kept under it.
+SOURCE_NAME = "rest_api"
+
+# Resources fetched once per record of another resource, mapped to that resource. Only the
+# records a pull yields, the ones updated since its cursor, get their subresource fetched,
+# so the two are always pulled, and reset, together.
+DEPENDENT_RESOURCES = {"reviews": "pull_requests"}
+# The extra passes of a recent-first pull, each over resources of its own, named
+# `PASS_resource`, that load into the same tables: `open` fetches the open items older
+# than the window of recent history, `history` backfills everything before the window.
+PULL_PASSES = {
+    "open": ("issues", "pull_requests", "reviews"),
+    "history": tuple(RESOURCE_PATHS),
+}
+# Subresource requests in flight at once for each page of parent records. The rate-limit
+# scheduler still caps requests across the whole pull, and paces them.
+DEPENDENT_WORKERS = 8
+
+# The steps of a pull, in order, as reported to `run_pull`'s `phase` hook.
+PULL_PHASES = ("extract", "normalize", "load", "spec", "finalize")
+# A pull in batches publishes what it loaded so far at most this often: each publish
+# copies the whole staging database.
+BATCH_PUBLISH_INTERVAL_SECONDS = 30
+
+
+@dataclass(frozen=True)
+class PullProfile:
+    """How a pull stages and loads what it fetched; what it fetches is the same for all.
+
+    `loader_file_format` is None for dlt's default for DuckDB, which normalizes to INSERT
+    statements. `normalize_workers` are processes, each normalizing whole files; dlt's
+    extract writes a file per table, so more workers than tables do not help.
+    """
+
+    loader_file_format: str | None = None
+    normalize_workers: int = 1
+    load_workers: int = 20
+
+
+PULL_PROFILES = {
+    "default": PullProfile(),
+    # DuckDB reads a Parquet file in one COPY, with the column types written in the file,
+    # instead of parsing batches of INSERT statements. Needs pyarrow.
+    "fast": PullProfile(
+        loader_file_format="parquet",
+        normalize_workers=min(os.cpu_count() or 1, 4),
+        load_workers=20,
+    ),
+}
+
+
+def check_profile(profile: PullProfile) -> None:
+    """Raise if `profile` cannot run here: ValueError if it is malformed, RuntimeError if
+    what it needs is not installed."""
+    if profile.normalize_workers < 1 or profile.load_workers < 1:
+        raise ValueError(f"Profile workers must be at least 1, got: {profile}")
+    if profile.loader_file_format == "parquet" and importlib.util.find_spec("pyarrow") is None:
+        raise RuntimeError(
+            "The fast profile needs pyarrow, which is not installed. Install it with "
+            "`pip install 'ghtriage[fast]'`, or pull with the default profile."
+        )
 
 
 def _split_repo(repo: str) -> tuple[str, str]:
@@ -17,124 +123,795 @@ def _split_repo(repo: str) -> tuple[str, str]:
     return owner, name
 
 
-def _is_issue(item: Any) -> bool:
+def is_issue(item: Any) -> bool:
+    """Whether a record of GitHub's issue list is an issue; the list has pull requests too."""
     return isinstance(item, dict) and item.get("pull_request") is None
 
 
-def build_rest_api_source(repo: str, token: str):
+def _with_repo(repo: str) -> Callable[[dict], dict]:
+    def add_repo(item: dict) -> dict:
+        item["repo"] = repo
+        return item
+
+    return add_repo
+
+
+def _keep_fields(fields: Mapping[str, Projection] | None, kind: str) -> Callable[[dict], dict]:
+    # A kind the projection does not name keeps all of its fields.
+    projection = None if fields is None else fields.get(kind)
+
+    def keep_fields(item: dict) -> dict:
+        return item if projection is None else project(item, projection)
+
+    return keep_fields
+
+
+class UserCollector:
+    """Takes the user objects out of records as they are extracted, leaving each user's id
+    and login, and keeps the latest version of every user for the `users` table. Safe to
+    share across the threads extracting resources."""
+
+    def __init__(self) -> None:
+        self._users: dict[int, dict] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    def split(self, record: dict) -> dict:
+        record, users = split_users(record)
+        with self._lock:
+            for user in users:
+                self._users[user["id"]] = user
+        return record
+
+    def resource(self):
+        """Return a resource merging the users collected so far, and start afresh."""
+        with self._lock:
+            users, self._users = list(self._users.values()), {}
+        return dlt.resource(
+            users,
+            name="users",
+            table_name="users",
+            write_disposition="merge",
+            primary_key="id",
+        )
+
+
+def _user_collector(fields: Mapping[str, Projection] | None) -> UserCollector | None:
+    """Return a collector for the users table when records keep every field. A projection
+    already cuts each user down to a few columns, which a table of their own would not
+    save space on: it made a pull's database larger, and the pull slower."""
+    return UserCollector() if fields is None else None
+
+
+def _users_source(users: UserCollector):
+    # Loaded as the pull's source, so the users table is in the pull's schema.
+    @dlt.source(name=SOURCE_NAME)
+    def collected():
+        yield users.resource()
+
+    return collected()
+
+
+def _api_root(api_url: str) -> str:
+    return f"{api_url.rstrip('/')}/"
+
+
+def resource_path(kind: str, repo: str) -> str:
+    """Endpoint of `repo`'s `kind` resource, relative to the API root. A dependent
+    resource's has a `{number}` for its parent record's."""
     owner, name = _split_repo(repo)
-    base_url = f"https://api.github.com/repos/{owner}/{name}/"
+    return f"repos/{owner}/{name}/{RESOURCE_PATHS[kind]}"
 
-    source_config = {
-        "client": {
-            "base_url": base_url,
-            "auth": {"token": token},
-            "headers": {
-                "Accept": "application/vnd.github+json",
-                "X-GitHub-Api-Version": "2022-11-28",
+
+def resource_names(repos: Sequence[str]) -> dict[str, tuple[str, str]]:
+    """Map each resource of a pull of `repos` to its (kind, repository), in pull order.
+
+    Each repository has its own resources, named `kind@OWNER/REPO`, each with its own
+    cursor, however many repositories the pull spans: adding a repository leaves the
+    others' state where it is.
+    """
+    return {f"{kind}@{repo}": (kind, repo) for repo in repos for kind in RESOURCE_PATHS}
+
+
+def _bare_resource_names(repo: str) -> dict[str, str]:
+    """Map the names a pull of `repo` alone gave its resources, before every name carried
+    its repository, to their names now."""
+    return {
+        f"{prefix}{kind}": f"{prefix}{kind}@{repo}"
+        for prefix in ["", *(f"{pull_pass}_" for pull_pass in PULL_PASSES)]
+        for kind in RESOURCE_PATHS
+    }
+
+
+def _qualify_bare_resources(pipeline, conditional: ConditionalRequests, repo: str) -> None:
+    """Carry the incremental state and first-page validators kept under the bare names of
+    `repo`'s resources over to their names now, so its next pull stays incremental."""
+    renames = _bare_resource_names(repo)
+    sources = pipeline.state.get("sources", {})
+    if renames.keys() & sources.get(SOURCE_NAME, {}).get("resources", {}).keys():
+        with pipeline.managed_state() as state:
+            resources = state["sources"][SOURCE_NAME]["resources"]
+            for old, new in renames.items():
+                if old in resources:
+                    resources.setdefault(new, resources.pop(old))
+    conditional.rename(renames)
+
+
+def pass_resource_names(repos: Sequence[str], pull_pass: str) -> dict[str, tuple[str, str]]:
+    """Map each resource of `pull_pass` over `repos` to its (kind, repository)."""
+    return {
+        f"{pull_pass}_{name}": (kind, repo)
+        for name, (kind, repo) in resource_names(repos).items()
+        if kind in PULL_PASSES[pull_pass]
+    }
+
+
+def _resource_config(
+    kind: str,
+    pull_requests_since: str | None,
+    *,
+    ascending: bool = False,
+    pull_requests_page: int = 1,
+    initial_value: str | None = None,
+) -> dict:
+    direction = "asc" if ascending else "desc"
+    # Walked oldest first, pull_requests has no cursor to stop at; it starts from a page.
+    pulls_ascending = ascending and pull_requests_since is None
+    config = {
+        "issues": {
+            "processing_steps": [{"filter": is_issue}],
+            "endpoint": {
+                "params": {
+                    "state": "all",
+                    "sort": "updated",
+                    "direction": direction,
+                },
+                "incremental": {
+                    "cursor_path": "updated_at",
+                    "start_param": "since",
+                },
             },
-            "paginator": "header_link",
         },
-        "resource_defaults": {
-            "primary_key": "id",
-            "write_disposition": "merge",
+        "pull_requests": {
             "endpoint": {
                 "params": {
-                    "per_page": 100,
-                }
+                    "state": "all",
+                    "sort": "updated",
+                    "direction": "asc" if pulls_ascending else "desc",
+                },
+                "incremental": {
+                    "cursor_path": "updated_at",
+                },
+                # /pulls has no `since`, so the cursor cannot be sent to the server;
+                # the paginator stops at the first page that crosses it instead.
+                "paginator": UpdatedSincePaginator(since=pull_requests_since),
             },
         },
-        "resources": [
-            {
-                "name": "issues",
-                "processing_steps": [{"filter": _is_issue}],
-                "endpoint": {
-                    "path": "issues",
-                    "params": {
-                        "state": "all",
-                        "sort": "updated",
-                        "direction": "desc",
-                    },
-                    "incremental": {
-                        "cursor_path": "updated_at",
-                        "start_param": "since",
-                    },
+        "conversation_comments": {
+            "endpoint": {
+                "params": {
+                    "sort": "updated",
+                    "direction": direction,
                 },
-            },
-            {
-                "name": "pull_requests",
-                "endpoint": {
-                    "path": "pulls",
-                    "params": {
-                        "state": "all",
-                        "sort": "updated",
-                        "direction": "desc",
-                    },
-                    "incremental": {
-                        "cursor_path": "updated_at",
-                    },
+                "incremental": {
+                    "cursor_path": "updated_at",
+                    "start_param": "since",
                 },
             },
-            {
-                "name": "conversation_comments",
-                "endpoint": {
-                    "path": "issues/comments",
-                    "params": {
-                        "sort": "updated",
-                        "direction": "desc",
-                    },
-                    "incremental": {
-                        "cursor_path": "updated_at",
-                        "start_param": "since",
-                    },
+        },
+        "review_comments": {
+            "endpoint": {
+                "params": {
+                    "sort": "updated",
+                    "direction": direction,
+                },
+                "incremental": {
+                    "cursor_path": "updated_at",
+                    "start_param": "since",
                 },
             },
-            {
-                "name": "review_comments",
-                "endpoint": {
-                    "path": "pulls/comments",
-                    "params": {
-                        "sort": "updated",
-                        "direction": "desc",
-                    },
-                    "incremental": {
-                        "cursor_path": "updated_at",
-                        "start_param": "since",
-                    },
+        },
+    }[kind]
+    if pulls_ascending and kind == "pull_requests" and pull_requests_page > 1:
+        config["endpoint"]["params"]["page"] = pull_requests_page
+    if initial_value is not None:
+        # Where the cursor starts when none is stored yet.
+        config["endpoint"]["incremental"]["initial_value"] = initial_value
+    return config
+
+
+def _pass_config(kind: str, pull_pass: str, until: str | None) -> dict:
+    """Configure `kind` for a pass of a recent-first pull; neither pass is incremental."""
+    params = {"sort": "updated"}
+    if kind in ("issues", "pull_requests"):
+        params["state"] = "open" if pull_pass == "open" else "all"
+    endpoint: dict[str, Any] = {"params": params}
+    if pull_pass == "history":
+        # Oldest first, up to where the window starts: GitHub takes no upper bound.
+        params["direction"] = "asc"
+        endpoint["paginator"] = UpdatedBeforePaginator(until=until)
+    else:
+        params["direction"] = "desc"
+    config: dict[str, Any] = {"endpoint": endpoint}
+    if kind == "issues":
+        config["processing_steps"] = [{"filter": is_issue}]
+    return config
+
+
+def _raise_unless_gone(response: Response, *args, **kwargs) -> None:
+    # The parent record was deleted or transferred since its page was fetched.
+    if response.status_code in (404, 410):
+        raise IgnoreResponseException
+    response.raise_for_status()
+
+
+def _dependent_resource(
+    name: str,
+    kind: str,
+    repo: str,
+    parent,
+    client: RESTClient,
+    fields: Mapping[str, Projection] | None = DEFAULT_FIELDS,
+    users: UserCollector | None = None,
+):
+    """Return a transformer fetching `kind` for each record `parent` yields, the records of
+    a page on up to `DEPENDENT_WORKERS` threads, cut down to `fields` and with their users
+    taken out into `users`."""
+    add_repo = _with_repo(repo)
+    keep_fields = _keep_fields(fields, kind)
+    split = users.split if users is not None else (lambda item: item)
+
+    def fetch(record: dict) -> list[dict]:
+        path = resource_path(kind, repo).format(number=record["number"])
+        fetched = []
+        for page in client.paginate(
+            path, params={"per_page": 100}, hooks={"response": [_raise_unless_gone]}
+        ):
+            fetched.extend(add_repo(split(keep_fields(item))) for item in page)
+        return fetched
+
+    def subresources(records: list[dict] | dict):
+        records = records if isinstance(records, list) else [records]
+        with ThreadPoolExecutor(max_workers=DEPENDENT_WORKERS) as pool:
+            for fetched in pool.map(fetch, records):
+                if fetched:
+                    yield fetched
+
+    return dlt.transformer(
+        subresources,
+        data_from=parent,
+        name=name,
+        table_name=kind,
+        write_disposition="merge",
+        primary_key="id",
+    )
+
+
+def build_rest_api_source(
+    repos: Sequence[str],
+    token: str,
+    *,
+    parallelized: bool = False,
+    pull_requests_since: Mapping[str, str | None] | None = None,
+    ascending: bool = False,
+    pull_requests_page: Mapping[str, int] | None = None,
+    session: Session | None = None,
+    api_url: str = GITHUB_API_URL,
+    fields: Mapping[str, Projection] | None = DEFAULT_FIELDS,
+    users: UserCollector | None = None,
+    initial_cursors: Mapping[str, str] | None = None,
+    pull_pass: str | None = None,
+    history_until: Mapping[str, str] | None = None,
+):
+    """Build the source pulling `repos`; `pull_requests_since` maps a repository to its
+    pull_requests cursor.
+
+    `ascending` walks each resource oldest first, as a pull in batches does. A repository's
+    pull_requests without a cursor then starts from its page in `pull_requests_page`.
+    Dependent resources are fed by their parent resource, after its incremental filter.
+    `fields` maps a resource kind to the projection its records are cut down to before
+    they are loaded; None keeps every field GitHub returns. With `users`, each record's
+    user objects are taken out into it, for the users table, leaving their id and login.
+    `initial_cursors` maps a repository to the cursor its resources start from when none
+    is stored, the start of a recent-first pull's window.
+
+    With `pull_pass`, the source is one of `PULL_PASSES` instead, its resources not
+    incremental; the `history` pass walks each resource up to its cursor in
+    `history_until`, which maps the resource's name, as `resource_names` gives it.
+    """
+    names = pass_resource_names(repos, pull_pass) if pull_pass else resource_names(repos)
+    resources = []
+    for name, (kind, repo) in names.items():
+        if kind in DEPENDENT_RESOURCES:
+            continue
+        if pull_pass:
+            until = (history_until or {}).get(name.removeprefix(f"{pull_pass}_"))
+            resource = _pass_config(kind, pull_pass, until)
+        else:
+            resource = _resource_config(
+                kind,
+                (pull_requests_since or {}).get(repo),
+                ascending=ascending,
+                pull_requests_page=(pull_requests_page or {}).get(repo, 1),
+                initial_value=(initial_cursors or {}).get(repo),
+            )
+        resource["name"] = name
+        resource["table_name"] = kind
+        resource["endpoint"]["path"] = resource_path(kind, repo)
+        # Every table carries its repository, so one database can hold several. The
+        # projection runs after the filter, which reads a field it may drop.
+        resource["processing_steps"] = [
+            *resource.get("processing_steps", []),
+            {"map": _keep_fields(fields, kind)},
+            # A closure, not the bound method: rest_api deep-copies its config.
+            *([{"map": lambda item: users.split(item)}] if users is not None else []),
+            {"map": _with_repo(repo)},
+        ]
+        resources.append(resource)
+    source_config = {
+        "client": {
+            "base_url": _api_root(api_url),
+            "auth": {"token": token},
+            "headers": dict(GITHUB_HEADERS),
+            "paginator": "header_link",
+        },
+        "resource_defaults": {
+            "primary_key": "id",
+            "write_disposition": "merge",
+            "endpoint": {
+                "params": {
+                    "per_page": 100,
                 },
+                # A conditional first page answered 304: nothing changed, skip the resource.
+                "response_actions": [{"status_code": 304, "action": "ignore"}],
             },
-        ],
+        },
+        "resources": resources,
     }
-    return rest_api_source(source_config)
+    # Parallelized resources are extracted on dlt's thread pool, one page at a time per
+    # resource. Each resource still owns its incremental cursor and filter, so the merged
+    # tables are the same as a sequential extraction.
+    if session is not None:
+        source_config["client"]["session"] = session
+    source = rest_api_source(source_config, parallelized=parallelized)
+    client = RESTClient(
+        base_url=_api_root(api_url),
+        headers=dict(GITHUB_HEADERS),
+        auth=BearerTokenAuth(token),
+        paginator=HeaderLinkPaginator(),
+        session=session,
+    )
+    by_kind = {(kind, repo): name for name, (kind, repo) in names.items()}
+    for name, (kind, repo) in names.items():
+        if kind in DEPENDENT_RESOURCES:
+            parent = source.resources[by_kind[DEPENDENT_RESOURCES[kind], repo]]
+            source.resources.add(
+                _dependent_resource(name, kind, repo, parent, client, fields=fields, users=users)
+            )
+    return source
 
 
-def _write_meta(db_path: Path, repo: str, full: bool) -> None:
-    now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
-    with duckdb.connect(str(db_path)) as conn:
-        conn.execute("CREATE SCHEMA IF NOT EXISTS github")
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS github._ghtriage_meta (
-                key   VARCHAR PRIMARY KEY,
-                value VARCHAR
+def _stored_cursor(pipeline, resource: str, cursor_path: str = "updated_at") -> str | None:
+    """Return the incremental cursor dlt last committed for `resource`, if any."""
+    sources = pipeline.state.get("sources", {})
+    resource_state = sources.get(SOURCE_NAME, {}).get("resources", {}).get(resource, {})
+    return resource_state.get("incremental", {}).get(cursor_path, {}).get("last_value")
+
+
+def _backfill_repo(conn: duckdb.DuckDBPyConnection, repo: str) -> None:
+    """Fill in `repo` on rows loaded before tables had the column; all came from `repo`."""
+    tables = conn.execute(
+        """
+        SELECT table_name FROM information_schema.columns
+        WHERE table_schema = 'github' AND column_name = 'repo'
+        """
+    ).fetchall()
+    for (table,) in tables:
+        if table in RESOURCE_PATHS:
+            conn.execute(
+                f"UPDATE github.{table} SET repo = ? WHERE repo IS NULL",  # noqa: S608
+                [repo],
             )
-        """)
-        for key, value in [
-            ("repo", repo),
-            ("last_pull_at", now),
-            ("last_full_pull", str(full).lower()),
-        ]:
+
+
+def _ensure_meta_table(conn: duckdb.DuckDBPyConnection) -> None:
+    conn.execute("CREATE SCHEMA IF NOT EXISTS github")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS github._ghtriage_meta (
+            key   VARCHAR PRIMARY KEY,
+            value VARCHAR
+        )
+    """)
+
+
+def _upsert_meta(conn: duckdb.DuckDBPyConnection, values: Mapping[str, str]) -> None:
+    for key, value in values.items():
+        conn.execute(
+            """
+            INSERT INTO github._ghtriage_meta (key, value)
+            VALUES (?, ?)
+            ON CONFLICT (key) DO UPDATE SET value = excluded.value
+            """,
+            [key, value],
+        )
+
+
+def _count_write(conn: duckdb.DuckDBPyConnection) -> None:
+    """Count a write to the database in place, as `generation` in `_ghtriage_meta`. A
+    staging database copied before it, at an older generation, is missing the write."""
+    _ensure_meta_table(conn)
+    row = conn.execute(
+        "SELECT value FROM github._ghtriage_meta WHERE key = 'generation'"
+    ).fetchone()
+    _upsert_meta(conn, {"generation": str(int(row[0]) + 1 if row is not None else 1)})
+
+
+def _generation(db_path: Path) -> str | None:
+    """Return how many times the database at `db_path` was written to in place, or None
+    if it never was."""
+    if not db_path.exists():
+        return None
+    try:
+        with duckdb.connect(str(db_path), read_only=True) as conn:
+            row = conn.execute(
+                "SELECT value FROM github._ghtriage_meta WHERE key = 'generation'"
+            ).fetchone()
+    except duckdb.Error:
+        return None
+    return row[0] if row is not None else None
+
+
+def write_meta_values(db_path: Path, values: Mapping[str, str]) -> None:
+    """Set keys of the database's `_ghtriage_meta` table."""
+    with duckdb.connect(str(db_path)) as conn:
+        _ensure_meta_table(conn)
+        _upsert_meta(conn, values)
+        _count_write(conn)
+
+
+def _write_meta(
+    conn: duckdb.DuckDBPyConnection,
+    repos: Sequence[str],
+    full: bool,
+    token_budgets: Mapping[str, dict] | None = None,
+    history_since: Mapping[str, str | None] | None = None,
+) -> None:
+    """Record the pull of `repos`. `repo` lists the repositories of the latest pull, and
+    `last_pull_at:OWNER/REPO` keeps each repository's freshness across pulls. With
+    `token_budgets`, `token_budget:LABEL` replaces what the last pull left of each token's
+    budget. `history_since` maps a resource to where its history starts, as
+    `history_since:KIND@OWNER/REPO`, or to None once it holds all of it."""
+    now = utc_timestamp()
+    _ensure_meta_table(conn)
+    previous = conn.execute(
+        "SELECT value FROM github._ghtriage_meta WHERE key = 'repo'"
+    ).fetchone()
+    if previous is not None and "," not in previous[0]:
+        _backfill_repo(conn, previous[0])
+    _upsert_meta(
+        conn,
+        {
+            "repo": ",".join(repos),
+            "last_pull_at": now,
+            "last_full_pull": str(full).lower(),
+            **{f"last_pull_at:{repo}": now for repo in repos},
+        },
+    )
+    if history_since:
+        rows = conn.execute(
+            "SELECT key, value FROM github._ghtriage_meta WHERE key LIKE 'history_since:%'"
+        ).fetchall()
+        cursors = {**_qualify_history_since(rows), **history_since}
+        conn.execute("DELETE FROM github._ghtriage_meta WHERE key LIKE 'history_since:%'")
+        _upsert_meta(
+            conn,
+            {f"history_since:{name}": since for name, since in cursors.items() if since},
+        )
+    if token_budgets is not None:
+        conn.execute("DELETE FROM github._ghtriage_meta WHERE key LIKE 'token_budget:%'")
+        _upsert_meta(
+            conn,
+            {f"token_budget:{label}": json.dumps(b) for label, b in token_budgets.items()},
+        )
+
+
+def _finalize(
+    db_path: Path,
+    *,
+    view_resources: Sequence[str] | None,
+    descriptions: Descriptions | None,
+    **meta: Any,
+) -> None:
+    """Record the pull with `meta`, as `_write_meta` takes it, recreate the views reading
+    `view_resources`, or all of them, and apply `descriptions`: on one connection, in one
+    transaction, so they land together or not at all."""
+    with duckdb.connect(str(db_path)) as conn:
+        conn.begin()
+        try:
+            _write_meta(conn, **meta)
+            replace_views(conn, resources=view_resources)
+            if descriptions is not None:
+                apply_descriptions(conn, *descriptions)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+
+def _last_pulled_repos(db_path: Path) -> list[str]:
+    """Return the repositories of the last pull recorded in the database at `db_path`."""
+    if not db_path.exists():
+        return []
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        try:
+            row = conn.execute(
+                "SELECT value FROM github._ghtriage_meta WHERE key = 'repo'"
+            ).fetchone()
+        except duckdb.CatalogException:
+            return []
+    return row[0].split(",") if row is not None else []
+
+
+def _qualify_history_since(rows: Sequence[tuple[str, str]]) -> dict[str, str]:
+    """Map the resources named by `history_since:` meta rows to their cursors. A row once
+    named a repository alone, covering each of its resources."""
+    cursors: dict[str, str] = {}
+    for key, value in rows:
+        name = key.removeprefix("history_since:")
+        if "@" in name:
+            cursors[name] = value
+        else:
+            for bare in resource_names([name]):
+                cursors.setdefault(bare, value)
+    return cursors
+
+
+def _history_since(db_path: Path) -> dict[str, str]:
+    """Map each resource a recent-first pull left without its older history to the
+    cursor its history starts from."""
+    if not db_path.exists():
+        return {}
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        try:
+            rows = conn.execute(
+                "SELECT key, value FROM github._ghtriage_meta WHERE key LIKE 'history_since:%'"
+            ).fetchall()
+        except duckdb.CatalogException:
+            return {}
+    return _qualify_history_since(rows)
+
+
+def _fetch_descriptions_in_background(spec_url: str, cache_path: Path) -> Future:
+    """Start `fetch_descriptions` on a thread of its own. The thread is a daemon, so a
+    pull that fails does not wait for the download at exit."""
+    future: Future = Future()
+
+    def fetch() -> None:
+        try:
+            future.set_result(fetch_descriptions(spec_url, cache_path=cache_path))
+        except BaseException as exc:
+            future.set_exception(exc)
+
+    threading.Thread(target=fetch, name="ghtriage-spec", daemon=True).start()
+    return future
+
+
+def _no_phase(name: str) -> AbstractContextManager:
+    return nullcontext()
+
+
+def _resource_row_counts(db_path: Path, names: Mapping[str, tuple[str, str]]) -> dict[str, int]:
+    """Return the rows in each resource's table, by resource name. Repositories pulled
+    together share their tables, so each of their resources counts its repository's rows."""
+    counts = dict.fromkeys(names, 0)
+    if not db_path.exists():
+        return counts
+    per_repo = len({repo for _, repo in names.values()}) > 1
+    with duckdb.connect(str(db_path)) as conn:
+        has_repo = dict(
             conn.execute(
                 """
-                INSERT INTO github._ghtriage_meta (key, value)
-                VALUES (?, ?)
-                ON CONFLICT (key) DO UPDATE SET value = excluded.value
-                """,
-                [key, value],
-            )
+                SELECT table_name, bool_or(column_name = 'repo')
+                FROM information_schema.columns
+                WHERE table_schema = 'github'
+                GROUP BY table_name
+                """
+            ).fetchall()
+        )
+        for name, (kind, repo) in names.items():
+            if kind not in has_repo:
+                continue
+            if per_repo and has_repo[kind]:
+                query, params = f"SELECT count(*) FROM github.{kind} WHERE repo = ?", [repo]
+            else:
+                query, params = f"SELECT count(*) FROM github.{kind}", []
+            (counts[name],) = conn.execute(query, params).fetchone()  # noqa: S608
+    return counts
 
 
-def create_pipeline(cwd: str | Path | None = None):
-    db_path = get_db_path(cwd=cwd)
+def _count_extracted(stats: RequestStats, names: Mapping[str, tuple[str, str]], info) -> None:
+    """Add the rows each resource extracted, from `pipeline.extract`'s `info`, to `stats`."""
+    for package_metrics in info.metrics.values():
+        for metrics in package_metrics:
+            for name, writer_metrics in metrics["resource_metrics"].items():
+                if name in names:
+                    stats.for_resource(name).rows += writer_metrics.items_count
+
+
+def _extract_users(
+    pipeline,
+    users: UserCollector | None,
+    profile: PullProfile,
+    phase: Callable[[str], AbstractContextManager],
+) -> None:
+    """Extract and normalize the users taken out of the records normalized so far, in a
+    package of their own, to load along with them. Extracted before the others were
+    normalized, it would carry a schema they then changed, which dlt warns about."""
+    if not users:
+        return
+    with phase("extract"):
+        pipeline.extract(_users_source(users), loader_file_format=profile.loader_file_format)
+    with phase("normalize"):
+        pipeline.normalize(workers=profile.normalize_workers)
+
+
+def _discard_loaded_packages(pipeline) -> None:
+    """Delete the load packages dlt keeps on disk after loading them."""
+    load_storage = pipeline._get_load_storage()
+    for load_id in pipeline.list_completed_load_packages():
+        load_storage.delete_loaded_package(load_id)
+
+
+def _load_in_batches(
+    pipeline,
+    source_for: Callable[..., Any],
+    names: Mapping[str, tuple[str, str]],
+    *,
+    reset: Sequence[str],
+    incremental: Sequence[str],
+    batch_pages: int,
+    stats: RequestStats,
+    users: UserCollector | None,
+    workers: int,
+    profile: PullProfile,
+    phase: Callable[[str], AbstractContextManager],
+    on_batch: Callable[[], None] | None = None,
+):
+    """Extract, normalize and load up to `batch_pages` pages per resource at a time, until
+    every resource reaches its last page, calling `on_batch` after each load. Return the
+    last batch's load info.
+
+    Each batch commits its rows and advances its resources' cursors, so an interrupted
+    pull resumes from the last batch.
+    Resources that take `since` are walked oldest first, resuming from their cursor.
+    /pulls has no `since`: pulled from scratch it is walked oldest first by page number,
+    each batch starting again at the previous batch's last page so that records pushed
+    back a page by a concurrent update are not skipped. With a cursor, it only has the
+    few pages newer than the cursor to fetch, newest first, in one go.
+    Dependent resources go along with their parent's batches, which `source_for` adds.
+    The users each batch's records refer to load with that batch.
+    """
+    pending = [
+        name
+        for name in names
+        if (name in reset or name in incremental) and names[name][0] not in DEPENDENT_RESOURCES
+    ]
+    refresh = set(reset)
+    # Resources fetched without a page limit: pull_requests with a cursor, and any whose
+    # cursor stopped moving, which resuming from it again would not get past.
+    unlimited = {
+        name
+        for name in pending
+        if names[name][0] == "pull_requests"
+        and name not in refresh
+        and _stored_cursor(pipeline, name) is not None
+    }
+    pull_requests_page = {
+        repo: 1 for name, (kind, repo) in names.items() if kind == "pull_requests"
+    }
+    load_info = None
+    while pending:
+        cursors = {name: _stored_cursor(pipeline, name) for name in pending}
+        pages = {name: stats.for_resource(name).pages for name in pending}
+        pull_requests_since = {
+            names[name][1]: cursors[name]
+            for name in pending
+            if name in unlimited and names[name][0] == "pull_requests"
+        }
+        with phase("extract"):
+            for selected, mode in (
+                ([name for name in pending if name in refresh], "drop_resources"),
+                ([name for name in pending if name not in refresh], None),
+            ):
+                if not selected:
+                    continue
+                source = source_for(
+                    selected,
+                    pull_requests_since,
+                    ascending=True,
+                    pull_requests_page=pull_requests_page,
+                )
+                for name in selected:
+                    if name not in unlimited:
+                        source.resources[name].add_limit(batch_pages)
+                info = pipeline.extract(
+                    source,
+                    workers=workers,
+                    refresh=mode,
+                    loader_file_format=profile.loader_file_format,
+                )
+                _count_extracted(stats, names, info)
+        with phase("normalize"):
+            pipeline.normalize(workers=profile.normalize_workers)
+        _extract_users(pipeline, users, profile, phase)
+        with phase("load"):
+            load_info = pipeline.load(workers=profile.load_workers)
+        # Loaded packages stay on disk by default; dropping them keeps staging flat.
+        _discard_loaded_packages(pipeline)
+        refresh.clear()
+        if on_batch is not None:
+            on_batch()
+
+        for name in list(pending):
+            fetched = stats.for_resource(name).pages - pages[name]
+            kind, repo = names[name]
+            if name in unlimited or fetched < batch_pages or not stats.for_resource(name).has_next:
+                pending.remove(name)
+            elif kind == "pull_requests":
+                # The last page again: what moved onto it since is picked up, and the
+                # merge drops the rest. A batch of one page has nothing to overlap.
+                pull_requests_page[repo] += fetched - 1 if batch_pages > 1 else fetched
+            elif _stored_cursor(pipeline, name) == cursors[name]:
+                # A full batch of records all updated at the cursor's second.
+                unlimited.add(name)
+    return load_info
+
+
+def get_conditional_requests_path(cwd: str | Path | None = None) -> Path:
+    return get_pipelines_dir(cwd=cwd) / "conditional_requests.json"
+
+
+def get_checkpoint_path(cwd: str | Path | None = None, create: bool = True) -> Path:
+    return get_pipelines_dir(cwd=cwd, create=create) / "checkpoint"
+
+
+def github_client(
+    token: str,
+    *,
+    scheduler: RateLimitScheduler | TokenPool | None = None,
+    api_url: str = GITHUB_API_URL,
+) -> RESTClient:
+    """Return a client for requests outside a pull's resources, paced by `scheduler`."""
+    return RESTClient(
+        base_url=_api_root(api_url),
+        headers=dict(GITHUB_HEADERS),
+        auth=BearerTokenAuth(token),
+        paginator=HeaderLinkPaginator(),
+        session=build_session(GitHubAdapter(_api_root(api_url), {}, scheduler=scheduler)),
+    )
+
+
+def list_org_repos(
+    org: str,
+    token: str,
+    *,
+    scheduler: RateLimitScheduler | TokenPool | None = None,
+    api_url: str = GITHUB_API_URL,
+) -> list[str]:
+    """Return the OWNER/REPO slugs of `org`'s repositories, sorted, skipping archived ones."""
+    client = github_client(token, scheduler=scheduler, api_url=api_url)
+    repos = []
+    for page in client.paginate(f"orgs/{org}/repos", params={"per_page": 100, "type": "all"}):
+        repos.extend(repo["full_name"] for repo in page if not repo.get("archived"))
+    return sorted(repos)
+
+
+def create_pipeline(cwd: str | Path | None = None, db_path: Path | None = None):
+    """Return the pipeline loading into `db_path`, by default the database itself."""
+    if db_path is None:
+        db_path = get_db_path(cwd=cwd)
     pipelines_dir = get_pipelines_dir(cwd=cwd)
     pipelines_dir.mkdir(parents=True, exist_ok=True)
 
@@ -147,29 +924,517 @@ def create_pipeline(cwd: str | Path | None = None):
 
 
 def run_pull(
-    repo: str,
+    repo: str | Sequence[str],
     token: str,
     *,
     full: bool = False,
+    only: Sequence[str] | None = None,
+    reset: Sequence[str] = (),
+    workers: int = 1,
+    profile: PullProfile = PULL_PROFILES["default"],
+    batch_pages: int | None = None,
+    fields: Mapping[str, Projection] | None = DEFAULT_FIELDS,
+    stats: RequestStats | None = None,
+    scheduler: RateLimitScheduler | TokenPool | None = None,
+    api_url: str = GITHUB_API_URL,
+    spec_url: str = OPENAPI_SPEC_URL,
+    phase: Callable[[str], AbstractContextManager] | None = None,
+    since: str | None = None,
+    backfill: bool = False,
+    refresh_descriptions: bool = False,
     cwd: str | Path | None = None,
 ):
-    db_path = get_db_path(cwd=cwd)
-    pipelines_dir = get_pipelines_dir(cwd=cwd)
+    """Pull `repo` into the local database, then rebuild views and annotations.
 
-    if full:
-        if db_path.exists():
-            db_path.unlink()
+    `repo` is one OWNER/REPO slug or several. Several are pulled as one source into the
+    same tables, their resources extracted concurrently on `workers` threads and sharing
+    `scheduler`'s rate budget.
+
+    `only` limits the pull to some resources. `reset` drops the named resources' tables
+    and incremental state and pulls them from scratch, leaving the others untouched; alone,
+    it pulls just those. Either way only the views reading a pulled resource are rebuilt.
+    `profile` sets how the fetched data is staged, normalized and loaded.
+    `batch_pages` loads in batches of at most that many pages per resource, each its own
+    load with the cursors advanced, so memory and staging disk stay flat however large the
+    repository. What the batches loaded is published every `BATCH_PUBLISH_INTERVAL_SECONDS`
+    for readers to query before the pull finishes, except in a `full` pull, which leaves
+    the database it rebuilds in place until the end.
+    `fields` maps a resource kind to the fields its rows keep, as in `DEFAULT_FIELDS`; None
+    keeps all of them. Columns a previous pull created stay until a full pull.
+    `since`, a timestamp, makes the first pull of a repository recent-first: it fetches
+    what was updated since then, and every open item, and records where the repository's
+    history starts. A later pull with `backfill` fetches the history before that.
+    The pull is built in a staging copy of the database and published over it only once
+    views and annotations are done, so readers never see a pull in progress.
+    The annotations come from the descriptions a previous pull cached in
+    `.ghtriage/descriptions.json`, or else from the catalog shipped with ghtriage. With
+    `refresh_descriptions`, or without either, the OpenAPI spec at `spec_url` is fetched
+    while the pull runs, if it changed since it was cached, and cached for later pulls;
+    if it cannot be, the descriptions at hand are used.
+    `api_url` and `spec_url` point the pull somewhere other than GitHub, such as the fake
+    server the benchmarks run against. `phase`, if given, is called with each name in
+    `PULL_PHASES` and must return a context manager, which wraps that step.
+    """
+    if workers < 1:
+        raise ValueError(f"workers must be at least 1, got: {workers}")
+    if batch_pages is not None and batch_pages < 1:
+        raise ValueError(f"batch_pages must be at least 1, got: {batch_pages}")
+    check_profile(profile)
+    validate_resources([*(only or ()), *reset])
+    if full and (only or reset):
+        raise ValueError("full cannot be combined with only or reset")
+    if batch_pages is not None and (since or backfill):
+        raise ValueError("batch_pages cannot be combined with since or backfill")
+    repos = list(dict.fromkeys([repo] if isinstance(repo, str) else repo))
+    if not repos:
+        raise ValueError("No repositories to pull")
+    selected = set(only or ()) | set(reset) if (only or reset) else set(RESOURCE_PATHS)
+    reset = set(reset)
+    for kinds in (selected, reset):
+        for dependent, parent in DEPENDENT_RESOURCES.items():
+            if kinds & {dependent, parent}:
+                kinds |= {dependent, parent}
+    # `only` and `reset` name kinds; with several repositories each covers all of them.
+    # Resetting one repository alone would drop the others' rows, which share its table.
+    names = resource_names(repos)
+    incremental = [name for name, (kind, _) in names.items() if kind in selected - set(reset)]
+    reset = [name for name, (kind, _) in names.items() if kind in reset]
+    checkpoint_key = ", ".join(repos)
+    # Annotation reads the descriptions at hand, and downloads the spec only when asked
+    # to or when there are none. The spec is large, and nothing in the pull depends on it
+    # until the end, so the download runs alongside.
+    descriptions_cache_path = get_descriptions_cache_path(cwd=cwd)
+    descriptions = (
+        None if refresh_descriptions else local_descriptions(spec_url, descriptions_cache_path)
+    )
+    descriptions_fetch = (
+        _fetch_descriptions_in_background(spec_url, descriptions_cache_path)
+        if descriptions is None
+        else None
+    )
+
+    published_path = get_db_path(cwd=cwd)
+    # Everything below writes to the staging database, published at the end.
+    db_path = get_staging_db_path(cwd=cwd)
+    pipelines_dir = get_pipelines_dir(cwd=cwd)
+    checkpoint = PageCheckpoint(get_checkpoint_path(cwd=cwd))
+    # A staging database left by a failed pull misses whatever was written to the
+    # database in place since, by webhooks, repair or watch.
+    stale = db_path.exists() and _generation(db_path) != _generation(published_path)
+    fresh = full
+    if checkpoint.resumes(checkpoint_key) and checkpoint.summary.full:
+        # The interrupted pull already started the staging database afresh; starting again
+        # would discard the checkpoint, and a resumed --full pull is still a full one. A
+        # stale one starts afresh again, and the checkpoint's pages refill it.
+        full, fresh = True, stale
+    elif full:
         if pipelines_dir.exists():
             shutil.rmtree(pipelines_dir)
+        checkpoint.clear()
+    prepare_staging(published_path, db_path, fresh=fresh, stale=stale)
 
-    pipeline = create_pipeline(cwd=cwd)
-    source = build_rest_api_source(repo=repo, token=token)
-    load_info = pipeline.run(source)
-    meta_error: Exception | None = None
+    pipeline = create_pipeline(cwd=cwd, db_path=db_path)
+    # Restore state from the destination up front, as run() would, so the stored cursors
+    # read below are current. Restoring after extracting would also discard the freshly
+    # extracted package when running the steps separately.
+    pipeline.sync_destination()
+    conditional = ConditionalRequests(get_conditional_requests_path(cwd=cwd))
+    # A database last pulled for one repository, or never recorded, may hold state under
+    # the bare names pulls of a single repository once gave their resources.
+    last_pulled = _last_pulled_repos(db_path) or repos
+    if len(last_pulled) == 1:
+        _qualify_bare_resources(pipeline, conditional, last_pulled[0])
+    # Only a pull from scratch is worth checkpointing: an incremental pull refetches
+    # little, and its staged pages would go stale as soon as the cursor moved. A pull in
+    # batches resumes from its last loaded batch instead.
+    if batch_pages is None and (
+        checkpoint.resumes(checkpoint_key) or not pipeline.state.get("sources")
+    ):
+        if since is not None and checkpoint.resumes(checkpoint_key) and checkpoint.summary.since:
+            # `since` is resolved from the time of each run; the interrupted pull's window
+            # keeps the first URLs, which carry it, matching the pages it staged.
+            since = checkpoint.summary.since
+        checkpoint.start(checkpoint_key, full, since=since)
+    else:
+        checkpoint.clear()
+        checkpoint = None
+    if stats is None:
+        stats = RequestStats()
+    for resource in reset:
+        # A 304 would skip the resource, leaving its freshly dropped table empty.
+        conditional.forget(resource)
+    # A recent-first pull starts the repositories it pulls for the first time, those with
+    # no cursor stored, from `since`; the others carry on from their cursors.
+    windowed = [
+        repo
+        for repo in repos
+        if since is not None
+        and all(
+            _stored_cursor(pipeline, name) is None
+            for name, (kind, name_repo) in names.items()
+            if name_repo == repo and name in incremental and kind not in DEPENDENT_RESOURCES
+        )
+    ]
+    initial_cursors = dict.fromkeys(windowed, since)
+    # The passes cover the resources the pull selects, no others.
+    open_names = [
+        name
+        for name in incremental
+        if names[name][1] in windowed and names[name][0] in PULL_PASSES["open"]
+    ]
+    backfilled = (
+        {name: cursor for name, cursor in _history_since(db_path).items() if name in incremental}
+        if backfill
+        else {}
+    )
+    stored_cursors = {
+        repo: _stored_cursor(pipeline, name) or initial_cursors.get(repo)
+        for name, (kind, repo) in names.items()
+        if kind == "pull_requests"
+    }
+
+    # Pages are fetched ahead only where every page is wanted: a pull in batches stops
+    # each resource at its page limit, and pull_requests with a cursor stops at the first
+    # page that crosses it.
+    fetch_ahead = (
+        []
+        if batch_pages is not None
+        else [
+            name
+            for name, (kind, repo) in names.items()
+            if kind not in DEPENDENT_RESOURCES
+            and (kind != "pull_requests" or name in reset or stored_cursors[repo] is None)
+        ]
+    )
+    adapter = GitHubAdapter(
+        _api_root(api_url),
+        {name: resource_path(kind, repo) for name, (kind, repo) in names.items()},
+        stats=stats,
+        conditional=conditional,
+        scheduler=scheduler,
+        checkpoint=checkpoint,
+        fetch_ahead=fetch_ahead,
+    )
+    session = build_session(adapter)
+    names_by_kind = {(kind, repo): name for name, (kind, repo) in names.items()}
+    users = _user_collector(fields)
+
+    def source_for(selected: list[str], pull_requests_since: Mapping[str, str | None], **options):
+        source = build_rest_api_source(
+            repos,
+            token=token,
+            parallelized=workers > 1,
+            pull_requests_since=pull_requests_since,
+            **options,
+            session=session,
+            api_url=api_url,
+            fields=fields,
+            users=users,
+        )
+        # A dependent resource goes wherever its parent does.
+        selected = [
+            name
+            for name, (kind, repo) in names.items()
+            if name in selected
+            or (
+                kind in DEPENDENT_RESOURCES
+                and names_by_kind[DEPENDENT_RESOURCES[kind], repo] in selected
+            )
+        ]
+        if selected == list(names):
+            return source
+        return source.with_resources(*selected)
+
+    def extract_package(source, package_names: Mapping[str, tuple[str, str]], **options):
+        info = pipeline.extract(
+            source, workers=workers, loader_file_format=profile.loader_file_format, **options
+        )
+        _count_extracted(stats, package_names, info)
+
+    def extract_pass(pull_pass: str, selected: Collection[str]) -> None:
+        pass_repos = list(dict.fromkeys(names[name][1] for name in selected))
+        pass_names = {
+            name: (kind, repo)
+            for name, (kind, repo) in pass_resource_names(pass_repos, pull_pass).items()
+            if name.removeprefix(f"{pull_pass}_") in selected
+        }
+        # An adapter of its own: its resources request the same paths as the pull's, which
+        # the pull's adapter would attribute, validate and stage as its own. The history
+        # pass stops each resource at the window, so its pages are not fetched ahead.
+        pass_adapter = GitHubAdapter(
+            _api_root(api_url),
+            {name: resource_path(kind, repo) for name, (kind, repo) in pass_names.items()},
+            stats=stats,
+            scheduler=adapter.scheduler,
+            fetch_ahead=[
+                name
+                for name, (kind, _) in pass_names.items()
+                if kind not in DEPENDENT_RESOURCES and pull_pass != "history"
+            ],
+        )
+        with build_session(pass_adapter) as pass_session:
+            source = build_rest_api_source(
+                pass_repos,
+                token=token,
+                parallelized=workers > 1,
+                session=pass_session,
+                api_url=api_url,
+                fields=fields,
+                users=users,
+                pull_pass=pull_pass,
+                history_until=backfilled,
+            )
+            if len(pass_names) < len(pass_resource_names(pass_repos, pull_pass)):
+                source = source.with_resources(*pass_names)
+            extract_package(source, pass_names)
+
+    # Rows merged on an existing id are updates; the rest are new. Reset tables start empty.
+    rows_before = _resource_row_counts(db_path, names)
+    for name in reset:
+        rows_before[name] = 0
+
+    if phase is None:
+        phase = _no_phase
+    last_published = time.monotonic()
+
+    def publish_batches() -> None:
+        nonlocal last_published
+        # A rebuild publishes nothing partial over the database it replaces.
+        if full or time.monotonic() - last_published < BATCH_PUBLISH_INTERVAL_SECONDS:
+            return
+        publish_copy(db_path, published_path)
+        last_published = time.monotonic()
+
+    # However the steps end, the page fetches still ahead of a paginator are stopped, and
+    # the adapter's threads with them.
     try:
-        _write_meta(db_path=db_path, repo=repo, full=full)
-    except Exception as exc:
-        meta_error = exc
-    create_views(db_path)
-    fetch_and_annotate(db_path)
+        if batch_pages is not None:
+            load_info = _load_in_batches(
+                pipeline,
+                source_for,
+                names,
+                reset=reset,
+                incremental=incremental,
+                batch_pages=batch_pages,
+                stats=stats,
+                users=users,
+                workers=workers,
+                profile=profile,
+                phase=phase,
+                on_batch=publish_batches,
+            )
+        else:
+            # The steps run one by one rather than through pipeline.run(): it takes no worker
+            # count, and it would sync with the destination again, between extract and load.
+            packages: list[Callable[[], None]] = []
+            if reset:
+                # dlt drops the tables and wipes the state of exactly the selected resources,
+                # and only when this package loads, so a failed pull leaves them as they were.
+                packages.append(
+                    lambda: extract_package(
+                        source_for(reset, pull_requests_since={}), names, refresh="drop_resources"
+                    )
+                )
+            if incremental:
+                packages.append(
+                    lambda: extract_package(
+                        source_for(incremental, stored_cursors, initial_cursors=initial_cursors),
+                        names,
+                    )
+                )
+            if open_names:
+                packages.append(lambda: extract_pass("open", open_names))
+            if backfilled:
+                packages.append(lambda: extract_pass("history", backfilled))
+            # Each package is normalized before the next is extracted. Extracted together, a
+            # later package would carry a schema that normalizing the earlier one changed,
+            # which dlt warns about.
+            for extract in packages:
+                with phase("extract"):
+                    extract()
+                with phase("normalize"):
+                    pipeline.normalize(workers=profile.normalize_workers)
+            _extract_users(pipeline, users, profile, phase)
+            with phase("load"):
+                load_info = pipeline.load(workers=profile.load_workers)
+    finally:
+        session.close()
+    rows_after = _resource_row_counts(db_path, names)
+    for name in [*reset, *incremental]:
+        stats.for_resource(name).rows_inserted = max(rows_after[name] - rows_before[name], 0)
+    # Only now: a validator saved before the load succeeded could skip unloaded data, and
+    # staged pages are what a failed load resumes from.
+    conditional.save()
+    if checkpoint is not None:
+        checkpoint.clear()
+    with phase("spec"):
+        if descriptions_fetch is not None:
+            # A download that failed with nothing cached still leaves the catalog.
+            descriptions = descriptions_fetch.result() or local_descriptions(
+                spec_url, descriptions_cache_path
+            )
+    # The kinds the pull and its passes loaded, whose views read changed tables.
+    pulled = {names[name][0] for name in [*reset, *incremental, *open_names, *backfilled]}
+    pulled_kinds = [kind for kind in RESOURCE_PATHS if kind in pulled]
+    meta_error: Exception | None = None
+    with phase("finalize"):
+        try:
+            _finalize(
+                db_path,
+                # Every resource carries users, so the users table changed along with it.
+                view_resources=(
+                    [*pulled_kinds, *(["users"] if users is not None else [])]
+                    if (only or reset)
+                    else None
+                ),
+                descriptions=descriptions,
+                repos=repos,
+                full=full,
+                token_budgets=scheduler.budgets() if isinstance(scheduler, TokenPool) else None,
+                # A full pull, a reset, or a backfill leaves a resource with all of its
+                # history; the window of a recent-first pull is where its history starts.
+                history_since={
+                    **dict.fromkeys(names if full else [*reset, *backfilled]),
+                    **{name: since for name in incremental if names[name][1] in windowed},
+                },
+            )
+        except Exception as exc:
+            meta_error = exc
+    if db_path.exists():
+        publish(db_path, published_path)
+    elif full:
+        # A rebuild that loaded nothing at all.
+        published_path.unlink(missing_ok=True)
     return load_info, meta_error
+
+
+def _parse_timestamp(value: str) -> datetime:
+    # fromisoformat() reads a trailing Z only from Python 3.11.
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _table_columns(conn: duckdb.DuckDBPyConnection) -> dict[str, set[str]]:
+    columns: dict[str, set[str]] = {}
+    for table, column in conn.execute(
+        "SELECT table_name, column_name FROM information_schema.columns "
+        "WHERE table_schema = 'github'"
+    ).fetchall():
+        columns.setdefault(table, set()).add(column)
+    return columns
+
+
+def _newer_records(
+    conn: duckdb.DuckDBPyConnection, kind: str, records: Sequence[dict]
+) -> list[dict]:
+    """Drop the records older than the row already stored under their id."""
+    stored = dict(
+        conn.execute(
+            f"SELECT id, updated_at FROM github.{kind} WHERE id IN (SELECT unnest(?))",  # noqa: S608
+            [[record["id"] for record in records]],
+        ).fetchall()
+    )
+    return [
+        record
+        for record in records
+        if stored.get(record["id"]) is None
+        or not record.get("updated_at")
+        or _parse_timestamp(record["updated_at"]) >= stored[record["id"]]
+    ]
+
+
+def merge_records(
+    records: Mapping[str, Sequence[dict]],
+    cwd: str | Path | None = None,
+    fields: Mapping[str, Projection] | None = DEFAULT_FIELDS,
+) -> dict:
+    """Merge records into the tables a pull writes, by id, in one load; `records` maps a
+    resource kind to its records, shaped as the REST API returns them, each with `repo`.
+    They keep the `fields` a pull would keep, their users going to the users table when
+    that keeps every field.
+
+    A record older than the row stored under its id, by `updated_at`, is skipped: a pull
+    may have stored a newer version since. Return the records merged, by kind. Views are
+    created for tables the load creates; existing views read the tables, and see the rows
+    once the load commits.
+    """
+    validate_resources(records)
+    db_path = get_db_path(cwd=cwd)
+    present: set[str] = set()
+    if db_path.exists():
+        with duckdb.connect(str(db_path)) as conn:
+            columns = _table_columns(conn)
+            present = set(columns)
+            records = {
+                kind: _newer_records(conn, kind, kind_records)
+                if "updated_at" in columns.get(kind, ())
+                else list(kind_records)
+                for kind, kind_records in records.items()
+            }
+    records = {kind: kind_records for kind, kind_records in records.items() if kind_records}
+    if not records:
+        return {}
+    users = _user_collector(fields)
+    split = users.split if users is not None else (lambda record: record)
+    records = {
+        kind: [split(record) for record in map(_keep_fields(fields, kind), kind_records)]
+        for kind, kind_records in records.items()
+    }
+
+    # Loaded as the pull's source, so the rows go through the pull's schema: a source
+    # of its own would keep a second schema, which the next pull would contend with.
+    @dlt.source(name=SOURCE_NAME)
+    def merged():
+        for kind, kind_records in records.items():
+            yield dlt.resource(
+                kind_records,
+                name=f"merge_{kind}",
+                table_name=kind,
+                write_disposition="merge",
+                primary_key="id",
+            )
+        if users:
+            yield users.resource()
+
+    pipeline = create_pipeline(cwd=cwd)
+    # The pull may have moved the state on since this process last loaded.
+    pipeline.sync_destination()
+    pipeline.extract(merged())
+    pipeline.normalize()
+    pipeline.load()
+    _discard_loaded_packages(pipeline)
+    with duckdb.connect(str(db_path)) as conn:
+        _count_write(conn)
+    created = ({*records, "users"} if users else set(records)) - present
+    if created:
+        create_views(db_path, resources=created)
+    return {kind: len(kind_records) for kind, kind_records in records.items()}
+
+
+def delete_records(ids: Mapping[str, Sequence[int]], cwd: str | Path | None = None) -> dict:
+    """Delete rows by id, with their child-table rows; `ids` maps a resource kind to ids.
+    Return the rows deleted, by kind."""
+    validate_resources(ids)
+    db_path = get_db_path(cwd=cwd)
+    deleted: dict[str, int] = {}
+    if not db_path.exists():
+        return deleted
+    with duckdb.connect(str(db_path)) as conn:
+        columns = _table_columns(conn)
+        conn.execute("BEGIN")
+        for kind, kind_ids in ids.items():
+            if kind not in columns or not kind_ids:
+                continue
+            rows = f"SELECT _dlt_id FROM github.{kind} WHERE id IN (SELECT unnest(?))"
+            for child in sorted(columns):
+                if child.startswith(f"{kind}__") and "_dlt_root_id" in columns[child]:
+                    conn.execute(
+                        f"DELETE FROM github.{child} WHERE _dlt_root_id IN ({rows})",  # noqa: S608
+                        [list(kind_ids)],
+                    )
+            (deleted[kind],) = conn.execute(
+                f"DELETE FROM github.{kind} WHERE id IN (SELECT unnest(?))",  # noqa: S608
+                [list(kind_ids)],
+            ).fetchone()
+        _count_write(conn)
+        conn.execute("COMMIT")
+    return deleted
@@ -1,4 +1,5 @@
 from dataclasses import dataclass, field
+import json
 from pathlib import Path
 
 import duckdb
@@ -108,6 +109,30 @@ class StatusData:
     last_pull_at: str | None
     last_full_pull: bool | None
     table_stats: list[tuple[str, int, str | None]] = field(default_factory=list)
+    # Last pull time of each repository ever pulled into the database.
+    repo_pulls: dict[str, str] = field(default_factory=dict)
+    # Written by `ghtriage watch` after each cycle; None if it never ran.
+    watch_last_cycle_at: str | None = None
+    watch_last_error: str | None = None
+    watch_next_pull_at: str | None = None
+    # Written by `ghtriage webhook-serve` after each batch it applies.
+    webhook_last_applied_at: str | None = None
+    # Each token's rate budget as the last pull left it, by token label: remaining,
+    # limit, reset_at and whether GitHub revoked it.
+    token_budgets: dict[str, dict] = field(default_factory=dict)
+    # Where each repository a recent-first pull left without its older history starts.
+    history_since: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def db_repos(self) -> list[str]:
+        """The repositories of the latest pull; `db_repo` lists them comma-separated."""
+        return self.db_repo.split(",") if self.db_repo else []
+
+
+def _token_order(item: tuple[str, str]) -> tuple[int, str]:
+    """Sort `token_budget:#N …abcd` keys by the token's position N, not as text."""
+    position = item[0].removeprefix("token_budget:#").split(" ", 1)[0]
+    return (int(position) if position.isdigit() else 0, item[0])
 
 
 def get_status_data(cwd: str | Path | None = None) -> StatusData:
@@ -118,6 +143,8 @@ def get_status_data(cwd: str | Path | None = None) -> StatusData:
         db_repo = None
         last_pull_at = None
         last_full_pull = None
+        repo_pulls = {}
+        meta = {}
         try:
             rows = conn.execute("SELECT key, value FROM github._ghtriage_meta").fetchall()
             meta = dict(rows)
@@ -125,6 +152,11 @@ def get_status_data(cwd: str | Path | None = None) -> StatusData:
             last_pull_at = meta.get("last_pull_at")
             if (raw := meta.get("last_full_pull")) is not None:
                 last_full_pull = raw == "true"
+            repo_pulls = {
+                key.removeprefix("last_pull_at:"): value
+                for key, value in sorted(meta.items())
+                if key.startswith("last_pull_at:")
+            }
         except duckdb.CatalogException:
             pass
 
@@ -147,4 +179,19 @@ def get_status_data(cwd: str | Path | None = None) -> StatusData:
         last_pull_at=last_pull_at,
         last_full_pull=last_full_pull,
         table_stats=table_stats,
+        repo_pulls=repo_pulls,
+        watch_last_cycle_at=meta.get("watch_last_cycle_at"),
+        watch_last_error=meta.get("watch_last_error") or None,
+        watch_next_pull_at=meta.get("watch_next_pull_at"),
+        webhook_last_applied_at=meta.get("webhook_last_applied_at"),
+        token_budgets={
+            key.removeprefix("token_budget:"): json.loads(value)
+            for key, value in sorted(meta.items(), key=_token_order)
+            if key.startswith("token_budget:")
+        },
+        history_since={
+            key.removeprefix("history_since:"): value
+            for key, value in sorted(meta.items())
+            if key.startswith("history_since:")
+        },
     )
@@ -0,0 +1,172 @@
+"""`ghtriage repair`: find the issues whose stored comments have drifted from GitHub, and
+refetch just those.
+
+An incremental pull fetches what changed since its cursor, so it never sees a deleted
+comment, and a page a failed pull skipped stays missing once the cursor moves past it.
+Either way, an issue's `comments` count, as GitHub last reported it, no longer matches
+the conversation_comments rows stored for it. Repair refetches each such issue and its
+comments through the per-issue endpoints, merges them, and deletes the stored comments
+GitHub no longer has: it costs a few requests per damaged issue, where `pull --full`
+costs the whole repository.
+
+Pull requests' conversation comments are not checked: the pull request list GitHub
+returns has no comment count to compare them with.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Mapping, Sequence
+
+import duckdb
+
+from ghtriage.client import RateLimitScheduler, TokenPool
+from ghtriage.config import get_db_path
+from ghtriage.fields import DEFAULT_FIELDS, Projection
+from ghtriage.pipeline import GITHUB_API_URL, delete_records, github_client, merge_records
+
+# The issue number a comment belongs to, from the end of its `issue_url`, as the views
+# derive it.
+COMMENT_ISSUE_NUMBER = r"TRY_CAST(regexp_extract(issue_url, '/(\d+)$', 1) AS BIGINT)"
+
+DRIFT_SQL = f"""
+WITH stored AS (
+    SELECT repo, {COMMENT_ISSUE_NUMBER} AS number, count(*) AS stored
+    FROM github.conversation_comments
+    GROUP BY ALL
+)
+SELECT i.repo, i.number, i.id, i.comments, coalesce(s.stored, 0) AS stored
+FROM github.issues i
+LEFT JOIN stored s ON s.number = i.number AND s.repo IS NOT DISTINCT FROM i.repo
+WHERE i.comments IS DISTINCT FROM coalesce(s.stored, 0)
+ORDER BY i.repo, i.number
+"""
+
+
+@dataclass(frozen=True)
+class Drift:
+    """An issue whose `comments` count differs from the comments stored for it."""
+
+    repo: str
+    number: int
+    id: int
+    comments: int | None
+    stored: int
+
+
+@dataclass
+class RepairResult:
+    checked: int = 0
+    drifted: list[Drift] = field(default_factory=list)
+    requests: int = 0
+    comments_merged: int = 0
+    comments_deleted: int = 0
+    issues_deleted: int = 0
+    # Issues that still differ after the repair, e.g. changed again while it ran.
+    remaining: list[Drift] = field(default_factory=list)
+
+
+def find_drift(db_path: Path, repos: Sequence[str] | None = None) -> tuple[int, list[Drift]]:
+    """Return how many issues were checked, and those whose comments have drifted."""
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        tables = {
+            row[0]
+            for row in conn.execute(
+                "SELECT table_name FROM information_schema.tables WHERE table_schema = 'github'"
+            ).fetchall()
+        }
+        if "issues" not in tables:
+            return 0, []
+        if "conversation_comments" not in tables:
+            raise RuntimeError(
+                "No conversation comments in the database to check. Pull them first with "
+                "`ghtriage pull --only conversation_comments`."
+            )
+        (checked,) = conn.execute(
+            "SELECT count(*) FROM github.issues"
+            + (" WHERE repo IN (SELECT unnest(?))" if repos else ""),
+            [list(repos)] if repos else [],
+        ).fetchone()
+        drifted = [Drift(*row) for row in conn.execute(DRIFT_SQL).fetchall()]
+    if repos:
+        drifted = [drift for drift in drifted if drift.repo in repos]
+    return checked, drifted
+
+
+def _stored_comment_ids(db_path: Path, drifted: Sequence[Drift]) -> dict[tuple[str, int], set]:
+    ids: dict[tuple[str, int], set] = {(drift.repo, drift.number): set() for drift in drifted}
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        rows = conn.execute(
+            f"""
+            SELECT repo, {COMMENT_ISSUE_NUMBER} AS number, id
+            FROM github.conversation_comments
+            WHERE number IN (SELECT unnest(?))
+            """,  # noqa: S608
+            [sorted({drift.number for drift in drifted})],
+        ).fetchall()
+    for repo, number, comment_id in rows:
+        if (repo, number) in ids:
+            ids[repo, number].add(comment_id)
+    return ids
+
+
+def repair(
+    token: str,
+    *,
+    repos: Sequence[str] | None = None,
+    dry_run: bool = False,
+    scheduler: RateLimitScheduler | TokenPool | None = None,
+    api_url: str = GITHUB_API_URL,
+    fields: Mapping[str, Projection] | None = DEFAULT_FIELDS,
+    cwd: str | Path | None = None,
+) -> RepairResult:
+    """Refetch the drifted issues of `repos`, or of every repository in the database, with
+    their comments, and bring the stored rows in line, keeping the `fields` a pull keeps.
+    `dry_run` only finds them."""
+    db_path = get_db_path(cwd=cwd, create=False)
+    if not db_path.exists():
+        raise RuntimeError(
+            f"Database not found at {db_path}. Run `ghtriage pull` to create it first."
+        )
+    result = RepairResult()
+    result.checked, result.drifted = find_drift(db_path, repos)
+    if dry_run or not result.drifted:
+        return result
+
+    stored = _stored_comment_ids(db_path, result.drifted)
+    client = github_client(token, scheduler=scheduler, api_url=api_url)
+    issues: list[dict] = []
+    comments: list[dict] = []
+    stale: list[int] = []
+    gone: list[int] = []
+    for drift in result.drifted:
+        stored_ids = stored[drift.repo, drift.number]
+        response = client.get(f"repos/{drift.repo}/issues/{drift.number}")
+        result.requests += 1 + len(response.history)
+        # Deleted, or transferred: GitHub redirects a transferred issue to its new home.
+        if response.status_code in (404, 410) or response.history:
+            gone.append(drift.id)
+            stale.extend(stored_ids)
+            continue
+        response.raise_for_status()
+        issues.append({**response.json(), "repo": drift.repo})
+        live = set()
+        for page in client.paginate(
+            f"repos/{drift.repo}/issues/{drift.number}/comments", params={"per_page": 100}
+        ):
+            result.requests += 1
+            comments.extend({**comment, "repo": drift.repo} for comment in page)
+            live.update(comment["id"] for comment in page)
+        stale.extend(stored_ids - live)
+
+    merged = merge_records(
+        {"issues": issues, "conversation_comments": comments}, cwd=cwd, fields=fields
+    )
+    result.comments_merged = merged.get("conversation_comments", 0)
+    deleted = delete_records({"conversation_comments": stale, "issues": gone}, cwd=cwd)
+    result.comments_deleted = deleted.get("conversation_comments", 0)
+    result.issues_deleted = deleted.get("issues", 0)
+    repaired = {(drift.repo, drift.number) for drift in result.drifted}
+    result.remaining = [
+        drift for drift in find_drift(db_path, repos)[1] if (drift.repo, drift.number) in repaired
+    ]
+    return result
@@ -0,0 +1,23 @@
+"""The kinds of record a pull fetches, and the endpoint each comes from."""
+
+from typing import Iterable
+
+# Endpoint of each resource, relative to the repository's API path. A pull of several
+# repositories has one resource of each kind per repository, all loading into the table
+# named after the kind.
+RESOURCE_PATHS = {
+    "issues": "issues",
+    "pull_requests": "pulls",
+    "conversation_comments": "issues/comments",
+    "review_comments": "pulls/comments",
+    "reviews": "pulls/{number}/reviews",
+}
+
+
+def validate_resources(kinds: Iterable[str]) -> None:
+    """Raise ValueError naming every one of `kinds` that is not a resource kind."""
+    unknown = [kind for kind in kinds if kind not in RESOURCE_PATHS]
+    if unknown:
+        raise ValueError(
+            f"Unknown resource: {', '.join(unknown)}. Choose from: {', '.join(RESOURCE_PATHS)}"
+        )
@@ -0,0 +1,74 @@
+"""Build each pull in a staging copy of the database, then publish it with one rename.
+
+Readers open the database read-only. A pull writing to it in place made them fail on
+DuckDB's file lock or see tables half merged, and a `--full` pull left nothing to open
+until it finished. Instead a pull writes to a staging file next to the database, which
+starts as a copy of it, or empty for a rebuild. The pull makes the views and annotations
+there too, and only then renames the file over the database. The rename is atomic. A
+reader opens either the old file or the new one, and both are complete. A reader that
+already has the old file open keeps reading it until it closes its connection.
+
+The copy costs one pass over the database file, plus as much free disk again while the
+pull runs, on every pull, incremental or not.
+
+A pull in batches publishes copies of the staging database as it goes, so the batches
+loaded so far can be queried before it finishes; the staging database stays where it is
+for the batches still to come.
+"""
+
+import os
+from pathlib import Path
+import shutil
+
+
+def _wal(path: Path) -> Path:
+    return path.with_name(f"{path.name}.wal")
+
+
+def _remove(path: Path) -> None:
+    for file in (path, _wal(path)):
+        file.unlink(missing_ok=True)
+
+
+def prepare_staging(db_path: Path, staging_path: Path, *, fresh: bool, stale: bool) -> None:
+    """Get `staging_path` ready for a pull to write to: empty when `fresh`, otherwise a
+    copy of `db_path`.
+
+    A staging database left by an interrupted pull is kept, unless it is `stale`: the
+    database has been written to in place since. The interrupted pull's loaded batches
+    are in it, and the pipeline's cursors, already past those batches, expect them there.
+    """
+    if fresh:
+        _remove(staging_path)
+        return
+    if staging_path.exists() and not stale:
+        return
+    _remove(staging_path)
+    if db_path.exists():
+        shutil.copyfile(db_path, staging_path)
+        # A write-ahead log is what a crashed writer left; DuckDB replays it on opening.
+        if _wal(db_path).exists():
+            shutil.copyfile(_wal(db_path), _wal(staging_path))
+
+
+def publish(staging_path: Path, db_path: Path) -> None:
+    """Replace `db_path` with the staging database, in one rename."""
+    try:
+        # Copied into the staging database with the database; stale once it is replaced.
+        _wal(db_path).unlink(missing_ok=True)
+        os.replace(staging_path, db_path)
+    except OSError as exc:
+        # Windows will not replace a file a reader has open. The staging database is
+        # kept, so the next pull picks it up and tries again.
+        raise RuntimeError(
+            f"Could not replace {db_path} with the pulled data in {staging_path}: {exc}. "
+            "Close any open connections to it and pull again."
+        ) from exc
+
+
+def publish_copy(staging_path: Path, db_path: Path) -> None:
+    """Replace `db_path` with a copy of the staging database, in one rename, and keep the
+    staging database, so a pull interrupted after it still resumes from there."""
+    copy_path = db_path.with_name(f"{db_path.name}.publishing")
+    shutil.copy2(staging_path, copy_path)
+    publish(copy_path, db_path)
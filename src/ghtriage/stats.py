@@ -0,0 +1,224 @@
+"""Measurements of a pull: per-phase timings, a live progress line, and the report
+`ghtriage pull --stats json` prints.
+
+Per-resource numbers (requests, pages, bytes, rows) are counted in `RequestStats` by the
+transport adapter and `run_pull`; `PullMonitor` adds the phases, as `run_pull`'s `phase`
+hook, and puts both together.
+"""
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+import re
+import sys
+import threading
+import time
+from typing import Callable, TextIO
+
+try:
+    import resource
+except ModuleNotFoundError:  # Windows
+    resource = None
+
+from ghtriage.client import RateLimitScheduler, RequestStats, TokenPool
+
+# Seconds between redraws of the live progress line.
+PROGRESS_INTERVAL = 0.5
+
+
+# Linux's account of the process, with its resident memory high-water mark, `VmHWM`.
+PROC_STATUS = Path("/proc/self/status")
+# Writing 5 here resets `VmHWM` to the current resident memory.
+PROC_CLEAR_REFS = Path("/proc/self/clear_refs")
+
+
+@dataclass
+class PhaseStats:
+    seconds: float = 0.0
+    requests: int = 0
+    bytes: int = 0
+    # The highest peak of the phase's runs, when the monitor measures each phase's.
+    peak_rss_mb: float | None = None
+
+
+def peak_rss_mb() -> float | None:
+    """Return this process's peak resident memory since it started, or since the last
+    `reset_peak_rss()`, where the platform reports it."""
+    try:
+        status = PROC_STATUS.read_text()
+    except OSError:
+        status = ""
+    if match := re.search(r"^VmHWM:\s+(\d+) kB", status, re.MULTILINE):
+        return int(match.group(1)) / 1024
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS.
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def reset_peak_rss() -> bool:
+    """Reset the high-water mark `peak_rss_mb()` reads; return whether it could, which
+    only Linux allows."""
+    try:
+        PROC_CLEAR_REFS.write_text("5")
+    except OSError:
+        return False
+    return True
+
+
+def format_bytes(size: int) -> str:
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:,.0f} {unit}" if unit == "B" else f"{size:,.1f} {unit}"
+        size /= 1024
+    return f"{size:,.1f} GB"
+
+
+class PullMonitor:
+    """The `phase` hook for `run_pull`: times each phase, counts the requests and bytes
+    received during it, and keeps a progress line on `stream` while the pull runs.
+
+    The line is drawn only when `stream` is a terminal, and erased on `close()` so the
+    summary printed afterwards starts on a clean line. A pull in batches runs extract,
+    normalize and load once per batch; each phase's numbers add up across batches.
+
+    With `phase_rss`, the memory high-water mark is reset as each phase starts, to record
+    the phase's own peak; where it cannot be reset, phases get no peak, since the
+    process's would be reported as theirs.
+    """
+
+    def __init__(
+        self,
+        stats: RequestStats,
+        *,
+        stream: TextIO | None = None,
+        live: bool | None = None,
+        clock: Callable[[], float] = time.perf_counter,
+        phase_rss: bool = False,
+    ) -> None:
+        self.stats = stats
+        self.phases: dict[str, PhaseStats] = {}
+        self.stream = stream if stream is not None else sys.stderr
+        self.live = self.stream.isatty() if live is None else live
+        self._clock = clock
+        self._started_at = clock()
+        self._phase: str | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._phase_rss = phase_rss and reset_peak_rss()
+        # The peak before the last reset, which `peak_rss_mb()` no longer sees.
+        self._earlier_peak_rss: float | None = None
+
+    def __enter__(self) -> "PullMonitor":
+        if self.live:
+            self._thread = threading.Thread(target=self._redraw, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @contextmanager
+    def __call__(self, name: str):
+        self._phase = name
+        requests, received = self.stats.requests, self.stats.bytes
+        if self._phase_rss:
+            self._earlier_peak_rss = self.peak_rss_mb
+            reset_peak_rss()
+        start = self._clock()
+        try:
+            yield
+        finally:
+            phase = self.phases.setdefault(name, PhaseStats())
+            phase.seconds += self._clock() - start
+            phase.requests += self.stats.requests - requests
+            phase.bytes += self.stats.bytes - received
+            if self._phase_rss and (peak := peak_rss_mb()) is not None:
+                phase.peak_rss_mb = max(phase.peak_rss_mb or 0.0, peak)
+            self._phase = None
+
+    @property
+    def seconds(self) -> float:
+        return self._clock() - self._started_at
+
+    @property
+    def peak_rss_mb(self) -> float | None:
+        """The process's peak resident memory so far, across any per-phase resets."""
+        peaks = [peak for peak in (self._earlier_peak_rss, peak_rss_mb()) if peak is not None]
+        return max(peaks) if peaks else None
+
+    def progress_line(self) -> str:
+        return (
+            f"{self._phase or 'pull'}: {self.stats.pages:,} pages, "
+            f"{format_bytes(self.stats.bytes)}, {self.stats.requests:,} requests, "
+            f"{self.seconds:,.0f}s"
+        )
+
+    def _redraw(self) -> None:
+        while not self._stop.wait(PROGRESS_INTERVAL):
+            self._draw(self.progress_line())
+
+    def _draw(self, line: str) -> None:
+        # Return to the start of the line and clear it, then draw without a newline.
+        self.stream.write("\r\x1b[K" + line)
+        self.stream.flush()
+
+    def close(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self._draw("")
+
+    def report(
+        self, repos: list[str], scheduler: RateLimitScheduler | TokenPool | None = None
+    ) -> dict:
+        """Return the pull's numbers as a JSON-serializable dict."""
+        reset_at = None
+        if scheduler is not None and scheduler.reset_at is not None:
+            reset_at = datetime.fromtimestamp(scheduler.reset_at, timezone.utc).isoformat()
+        return {
+            "repos": repos,
+            "seconds": round(self.seconds, 3),
+            "peak_rss_mb": self.peak_rss_mb,
+            "requests": self.stats.requests,
+            "not_modified": self.stats.not_modified,
+            "pages": self.stats.pages,
+            "bytes": self.stats.bytes,
+            "rows": self.stats.rows,
+            "rows_inserted": self.stats.rows_inserted,
+            "rows_updated": self.stats.rows_updated,
+            "rate_limit": {
+                "used": self.stats.budget_used,
+                "remaining": scheduler.remaining if scheduler is not None else None,
+                "limit": scheduler.limit if scheduler is not None else None,
+                "reset_at": reset_at,
+            },
+            "phases": {
+                name: {
+                    "seconds": round(phase.seconds, 3),
+                    "requests": phase.requests,
+                    "bytes": phase.bytes,
+                }
+                for name, phase in self.phases.items()
+            },
+            "resources": {
+                name: {
+                    "seconds": round(stats.seconds, 3),
+                    "requests": stats.requests,
+                    "not_modified": stats.not_modified,
+                    "rate_limited": stats.rate_limited,
+                    "replayed": stats.replayed,
+                    "pages": stats.pages,
+                    "bytes": stats.bytes,
+                    "budget_used": stats.budget_used,
+                    "rows": stats.rows,
+                    "rows_inserted": stats.rows_inserted,
+                    "rows_updated": stats.rows_updated,
+                }
+                for name, stats in self.stats.resources.items()
+            },
+        }
@@ -0,0 +1,11 @@
+"""Times as GitHub writes them, in UTC to the second: `2024-01-31T12:00:00Z`."""
+
+from datetime import datetime, timezone
+
+
+def utc_timestamp(seconds: float | None = None) -> str:
+    """Format `seconds` since the epoch, by default now, as GitHub and `_ghtriage_meta`
+    write times."""
+    if seconds is None:
+        seconds = datetime.now(timezone.utc).timestamp()
+    return datetime.fromtimestamp(seconds, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
@@ -8,6 +8,7 @@ shape `annotations.py` uses for the OpenAPI descriptions.
 
 from pathlib import Path
 import sys
+from typing import Iterable
 
 import duckdb
 
@@ -22,23 +23,42 @@ WITH issues_padded AS (
     SELECT * FROM github.issues
     UNION ALL BY NAME
     SELECT
+        NULL::VARCHAR AS repo,
         NULL::VARCHAR AS state_reason,
-        NULL::TIMESTAMP WITH TIME ZONE AS closed_at
+        NULL::TIMESTAMP WITH TIME ZONE AS closed_at,
+        NULL::BIGINT AS user__id,
+        NULL::VARCHAR AS user__type
+    WHERE false
+),
+issues_typed AS (
+    -- Pulls that keep every field put account types in the users table, keyed by id.
+    -- Other rows carry their own user__type, which stands in for a user it lacks.
+    SELECT i.* REPLACE (COALESCE(u.type, i.user__type) AS user__type)
+    FROM issues_padded i
+    LEFT JOIN {users} u ON u.id = i.user__id
+),
+comments_padded AS (
+    SELECT * FROM {conversation_comments}
+    UNION ALL BY NAME
+    SELECT NULL::VARCHAR AS repo, NULL::BIGINT AS user__id, NULL::VARCHAR AS user__type
     WHERE false
 ),
 comments_keyed AS (
     SELECT
+        c.repo,
         -- TRY_CAST, not CAST: a URL with no trailing number yields '', and a hard
         -- cast would raise at SELECT time -- after the view was created, where the
         -- creation guard cannot help.
-        TRY_CAST(regexp_extract(issue_url, '/(\d+)$', 1) AS BIGINT) AS issue_number,
-        user__login AS login,
-        user__type AS utype,
-        created_at
-    FROM {conversation_comments}
+        TRY_CAST(regexp_extract(c.issue_url, '/(\d+)$', 1) AS BIGINT) AS issue_number,
+        c.user__login AS login,
+        COALESCE(u.type, c.user__type) AS utype,
+        c.created_at
+    FROM comments_padded c
+    LEFT JOIN {users} u ON u.id = c.user__id
 ),
 comment_agg AS (
     SELECT
+        i.repo,
         i.number AS issue_number,
         -- Counts joined rows: c.issue_number is NULL exactly when the LEFT JOIN
         -- missed, so COUNT(*) would report 1 for an issue with no comments.
@@ -53,27 +73,31 @@ comment_agg AS (
         -- bucket, breaking the documented `bot count = total - non_bot`.
         COUNT(c.issue_number) FILTER (WHERE c.utype IS DISTINCT FROM 'Bot')
             AS non_bot_comment_count
-    FROM issues_padded i
-    LEFT JOIN comments_keyed c ON c.issue_number = i.number
-    GROUP BY i.number
+    FROM issues_typed i
+    -- Numbers repeat across repositories, so every join is on (repo, number). IS NOT
+    -- DISTINCT FROM keeps rows pulled before the repo column existed joining.
+    LEFT JOIN comments_keyed c
+        ON c.issue_number = i.number AND c.repo IS NOT DISTINCT FROM i.repo
+    GROUP BY i.repo, i.number
 ),
 participants AS (
     -- A set, not "distinct non-author commenters + 1": the non-bot count has to be
     -- drawn from the same set as the total for the subtraction to hold, including
     -- when the item was opened by a bot.
-    SELECT i.number AS issue_number, i.user__login AS login, i.user__type AS utype
-    FROM issues_padded i
+    SELECT i.repo, i.number AS issue_number, i.user__login AS login, i.user__type AS utype
+    FROM issues_typed i
     UNION
-    SELECT c.issue_number, c.login, c.utype FROM comments_keyed c
+    SELECT c.repo, c.issue_number, c.login, c.utype FROM comments_keyed c
 ),
 participant_agg AS (
     SELECT
+        repo,
         issue_number,
         COUNT(DISTINCT login) AS participant_count,
         COUNT(DISTINCT login) FILTER (WHERE utype IS DISTINCT FROM 'Bot')
             AS non_bot_participant_count
     FROM participants
-    GROUP BY issue_number
+    GROUP BY repo, issue_number
 ),
 label_agg AS (
     SELECT _dlt_parent_id, list(name ORDER BY name) AS labels
@@ -88,6 +112,7 @@ assignee_agg AS (
     GROUP BY _dlt_parent_id
 )
 SELECT
+    i.repo,
     i.number,
     i.title,
     i.state,
@@ -107,9 +132,10 @@ SELECT
     ca.last_non_author_comment_at,
     pa.participant_count,
     pa.non_bot_participant_count
-FROM issues_padded i
-LEFT JOIN comment_agg ca ON ca.issue_number = i.number
-LEFT JOIN participant_agg pa ON pa.issue_number = i.number
+FROM issues_typed i
+LEFT JOIN comment_agg ca ON ca.issue_number = i.number AND ca.repo IS NOT DISTINCT FROM i.repo
+LEFT JOIN participant_agg pa
+    ON pa.issue_number = i.number AND pa.repo IS NOT DISTINCT FROM i.repo
 LEFT JOIN label_agg lb ON lb._dlt_parent_id = i._dlt_id
 LEFT JOIN assignee_agg asg ON asg._dlt_parent_id = i._dlt_id
 """
@@ -120,67 +146,136 @@ WITH pulls_padded AS (
     SELECT * FROM github.pull_requests
     UNION ALL BY NAME
     SELECT
+        NULL::VARCHAR AS repo,
         NULL::BOOLEAN AS draft,
         NULL::TIMESTAMP WITH TIME ZONE AS closed_at,
-        NULL::TIMESTAMP WITH TIME ZONE AS merged_at
+        NULL::TIMESTAMP WITH TIME ZONE AS merged_at,
+        NULL::BIGINT AS user__id,
+        NULL::VARCHAR AS user__type
+    WHERE false
+),
+pulls_typed AS (
+    -- See the note on issues_typed: account types come from the users table.
+    SELECT p.* REPLACE (COALESCE(u.type, p.user__type) AS user__type)
+    FROM pulls_padded p
+    LEFT JOIN {users} u ON u.id = p.user__id
+),
+conversation_padded AS (
+    SELECT * FROM {conversation_comments}
+    UNION ALL BY NAME
+    SELECT NULL::VARCHAR AS repo, NULL::BIGINT AS user__id, NULL::VARCHAR AS user__type
+    WHERE false
+),
+review_padded AS (
+    SELECT * FROM {review_comments}
+    UNION ALL BY NAME
+    SELECT NULL::VARCHAR AS repo, NULL::BIGINT AS user__id, NULL::VARCHAR AS user__type
+    WHERE false
+),
+reviews_padded AS (
+    SELECT * FROM {reviews}
+    UNION ALL BY NAME
+    SELECT NULL::VARCHAR AS repo, NULL::BIGINT AS user__id, NULL::VARCHAR AS user__type
     WHERE false
 ),
 conversation_keyed AS (
     -- PR conversation comments live in conversation_comments, keyed by the PR number.
     SELECT
-        TRY_CAST(regexp_extract(issue_url, '/(\d+)$', 1) AS BIGINT) AS pull_number,
-        user__login AS login,
-        user__type AS utype,
-        created_at
-    FROM {conversation_comments}
+        c.repo,
+        TRY_CAST(regexp_extract(c.issue_url, '/(\d+)$', 1) AS BIGINT) AS pull_number,
+        c.user__login AS login,
+        COALESCE(u.type, c.user__type) AS utype,
+        c.created_at
+    FROM conversation_padded c
+    LEFT JOIN {users} u ON u.id = c.user__id
 ),
 review_keyed AS (
     SELECT
-        TRY_CAST(regexp_extract(pull_request_url, '/(\d+)$', 1) AS BIGINT) AS pull_number,
-        user__login AS login,
-        user__type AS utype,
-        created_at
-    FROM {review_comments}
+        r.repo,
+        TRY_CAST(regexp_extract(r.pull_request_url, '/(\d+)$', 1) AS BIGINT) AS pull_number,
+        r.user__login AS login,
+        COALESCE(u.type, r.user__type) AS utype,
+        r.created_at
+    FROM review_padded r
+    LEFT JOIN {users} u ON u.id = r.user__id
+),
+reviews_keyed AS (
+    -- Reviews themselves: an approval, a change request or a comment, each submitted
+    -- with or without inline review comments.
+    SELECT
+        v.repo,
+        TRY_CAST(regexp_extract(v.pull_request_url, '/(\d+)$', 1) AS BIGINT) AS pull_number,
+        v.user__login AS login,
+        COALESCE(u.type, v.user__type) AS utype,
+        v.state,
+        v.submitted_at
+    FROM reviews_padded v
+    LEFT JOIN {users} u ON u.id = v.user__id
+    -- A pending review is visible only to its author, and not submitted yet.
+    WHERE v.state IS DISTINCT FROM 'PENDING'
 ),
 conversation_agg AS (
     SELECT
+        repo,
         pull_number,
         COUNT(*) AS comment_count,
         COUNT(*) FILTER (WHERE utype IS DISTINCT FROM 'Bot') AS non_bot_comment_count,
         MIN(created_at) AS first_comment_at,
         MAX(created_at) AS last_comment_at
     FROM conversation_keyed
-    GROUP BY pull_number
+    GROUP BY repo, pull_number
 ),
 review_agg AS (
     SELECT
+        repo,
         pull_number,
         COUNT(*) AS review_comment_count,
         COUNT(*) FILTER (WHERE utype IS DISTINCT FROM 'Bot') AS non_bot_review_comment_count,
         MIN(created_at) AS first_review_comment_at,
         MAX(created_at) AS last_review_comment_at
     FROM review_keyed
-    GROUP BY pull_number
+    GROUP BY repo, pull_number
+),
+reviews_agg AS (
+    SELECT
+        p.repo,
+        p.number AS pull_number,
+        COUNT(*) AS review_count,
+        COUNT(*) FILTER (WHERE v.state = 'APPROVED') AS approval_count,
+        COUNT(*) FILTER (WHERE v.state = 'CHANGES_REQUESTED') AS changes_requested_count,
+        list(DISTINCT v.login ORDER BY v.login)
+            FILTER (WHERE v.login IS DISTINCT FROM p.user__login AND v.login IS NOT NULL)
+            AS reviewers,
+        MIN(v.submitted_at) FILTER (WHERE v.login IS DISTINCT FROM p.user__login)
+            AS first_review_at,
+        MAX(v.submitted_at) FILTER (WHERE v.login IS DISTINCT FROM p.user__login)
+            AS last_review_at
+    FROM pulls_typed p
+    JOIN reviews_keyed v ON v.pull_number = p.number AND v.repo IS NOT DISTINCT FROM p.repo
+    GROUP BY p.repo, p.number
 ),
 participants AS (
     -- A set, not "distinct non-author commenters + 1": the non-bot count has to be
     -- drawn from the same set as the total for the subtraction to hold, including
     -- when the item was opened by a bot.
-    SELECT p.number AS pull_number, p.user__login AS login, p.user__type AS utype
-    FROM pulls_padded p
+    SELECT p.repo, p.number AS pull_number, p.user__login AS login, p.user__type AS utype
+    FROM pulls_typed p
     UNION
-    SELECT c.pull_number, c.login, c.utype FROM conversation_keyed c
+    SELECT c.repo, c.pull_number, c.login, c.utype FROM conversation_keyed c
     UNION
-    SELECT r.pull_number, r.login, r.utype FROM review_keyed r
+    SELECT r.repo, r.pull_number, r.login, r.utype FROM review_keyed r
+    UNION
+    SELECT v.repo, v.pull_number, v.login, v.utype FROM reviews_keyed v
 ),
 participant_agg AS (
     SELECT
+        repo,
         pull_number,
         COUNT(DISTINCT login) AS participant_count,
         COUNT(DISTINCT login) FILTER (WHERE utype IS DISTINCT FROM 'Bot')
             AS non_bot_participant_count
     FROM participants
-    GROUP BY pull_number
+    GROUP BY repo, pull_number
 ),
 label_agg AS (
     SELECT _dlt_parent_id, list(name ORDER BY name) AS labels
@@ -200,6 +295,7 @@ reviewer_agg AS (
     GROUP BY _dlt_parent_id
 )
 SELECT
+    p.repo,
     p.number,
     p.title,
     p.state,
@@ -221,12 +317,21 @@ SELECT
     COALESCE(r.non_bot_review_comment_count, 0) AS non_bot_review_comment_count,
     r.first_review_comment_at,
     r.last_review_comment_at,
+    COALESCE(v.review_count, 0) AS review_count,
+    COALESCE(v.approval_count, 0) AS approval_count,
+    COALESCE(v.changes_requested_count, 0) AS changes_requested_count,
+    COALESCE(v.reviewers, CAST([] AS VARCHAR[])) AS reviewers,
+    v.first_review_at,
+    v.last_review_at,
     pa.participant_count,
     pa.non_bot_participant_count
-FROM pulls_padded p
-LEFT JOIN conversation_agg c ON c.pull_number = p.number
-LEFT JOIN review_agg r ON r.pull_number = p.number
-LEFT JOIN participant_agg pa ON pa.pull_number = p.number
+FROM pulls_typed p
+-- Keyed on (repo, number); see the note in issue_activity.
+LEFT JOIN conversation_agg c ON c.pull_number = p.number AND c.repo IS NOT DISTINCT FROM p.repo
+LEFT JOIN review_agg r ON r.pull_number = p.number AND r.repo IS NOT DISTINCT FROM p.repo
+LEFT JOIN reviews_agg v ON v.pull_number = p.number AND v.repo IS NOT DISTINCT FROM p.repo
+LEFT JOIN participant_agg pa
+    ON pa.pull_number = p.number AND pa.repo IS NOT DISTINCT FROM p.repo
 LEFT JOIN label_agg lb ON lb._dlt_parent_id = p._dlt_id
 LEFT JOIN assignee_agg asg ON asg._dlt_parent_id = p._dlt_id
 LEFT JOIN reviewer_agg rv ON rv._dlt_parent_id = p._dlt_id
@@ -238,7 +343,7 @@ LEFT JOIN reviewer_agg rv ON rv._dlt_parent_id = p._dlt_id
 EMPTY: dict[str, str] = {
     "conversation_comments": (
         "(SELECT NULL::VARCHAR AS issue_url, NULL::VARCHAR AS user__login, "
-        "NULL::VARCHAR AS user__type, NULL::TIMESTAMP WITH TIME ZONE AS created_at WHERE false)"
+        "NULL::BIGINT AS user__id, NULL::TIMESTAMP WITH TIME ZONE AS created_at WHERE false)"
     ),
     "issues__labels": (
         "(SELECT NULL::VARCHAR AS _dlt_parent_id, NULL::VARCHAR AS name WHERE false)"
@@ -248,7 +353,12 @@ EMPTY: dict[str, str] = {
     ),
     "review_comments": (
         "(SELECT NULL::VARCHAR AS pull_request_url, NULL::VARCHAR AS user__login, "
-        "NULL::VARCHAR AS user__type, NULL::TIMESTAMP WITH TIME ZONE AS created_at WHERE false)"
+        "NULL::BIGINT AS user__id, NULL::TIMESTAMP WITH TIME ZONE AS created_at WHERE false)"
+    ),
+    "reviews": (
+        "(SELECT NULL::VARCHAR AS pull_request_url, NULL::VARCHAR AS user__login, "
+        "NULL::BIGINT AS user__id, NULL::VARCHAR AS state, "
+        "NULL::TIMESTAMP WITH TIME ZONE AS submitted_at WHERE false)"
     ),
     "pull_requests__labels": (
         "(SELECT NULL::VARCHAR AS _dlt_parent_id, NULL::VARCHAR AS name WHERE false)"
@@ -259,6 +369,7 @@ EMPTY: dict[str, str] = {
     "pull_requests__requested_reviewers": (
         "(SELECT NULL::VARCHAR AS _dlt_parent_id, NULL::VARCHAR AS login WHERE false)"
     ),
+    "users": "(SELECT NULL::BIGINT AS id, NULL::VARCHAR AS type WHERE false)",
 }
 
 VIEWS: dict[str, str] = {
@@ -271,26 +382,46 @@ BASE_TABLES: dict[str, str] = {
     "pull_request_activity": "pull_requests",
 }
 
+# The resources each view reads, counting a child table such as issues__labels as its
+# parent's. A pull that touches only some resources recreates only the views reading them.
+VIEW_SOURCES: dict[str, tuple[str, ...]] = {
+    "issue_activity": ("issues", "conversation_comments", "users"),
+    "pull_request_activity": (
+        "pull_requests",
+        "conversation_comments",
+        "review_comments",
+        "reviews",
+        "users",
+    ),
+}
+
 VIEW_DOCS: dict[str, str] = {
     "issue_activity": (
-        "Derived view: one row per issue with pre-joined comment activity, labels, and assignees."
+        "Derived view: one row per issue with pre-joined comment activity, labels, and "
+        "assignees. Keyed by (repo, number)."
     ),
     "pull_request_activity": (
         "Derived view: one row per pull request with pre-joined conversation-comment, "
-        "review-comment, label, assignee, and review-request facts."
+        "review-comment, review, label, assignee, and review-request facts. Keyed by "
+        "(repo, number)."
     ),
 }
 
 VIEW_COLUMN_DOCS: dict[str, dict[str, str]] = {
     "issue_activity": {
+        "repo": (
+            "Repository of the issue, as OWNER/REPO. Pass-through of issues.repo, which "
+            "ghtriage adds to every pulled table. Issue numbers are unique only per repository."
+        ),
         "number": "Pass-through of issues.number.",
         "title": "Pass-through of issues.title.",
         "state": "Pass-through of issues.state.",
         "state_reason": "Pass-through of issues.state_reason.",
         "author": "Login of the issue opener. Pass-through of issues.user__login.",
         "author_type": (
-            "GitHub account type of the issue opener: User, Bot, or Organization. Pass-through "
-            "of issues.user__type. Machine accounts that are not GitHub Apps are typed User."
+            "GitHub account type of the issue opener: User, Bot, or Organization. users.type, "
+            "joined on issues.user__id, where pulls keep every field; otherwise "
+            "issues.user__type. Machine accounts that are not GitHub Apps are typed User."
         ),
         "labels": (
             "Sorted list of label names from issues__labels. Empty list when the issue has no "
@@ -308,9 +439,9 @@ VIEW_COLUMN_DOCS: dict[str, dict[str, str]] = {
         ),
         "closed_at": "Pass-through of issues.closed_at.",
         "comment_count": (
-            "Count of conversation_comments rows matching this issue number, including bot "
-            "comments. May differ from issues.comments if comments were deleted on GitHub "
-            "after being pulled."
+            "Count of conversation_comments rows matching this issue's repo and number, "
+            "including bot comments. May differ from issues.comments if comments were deleted "
+            "on GitHub after being pulled; `ghtriage repair` refetches such issues."
         ),
         "non_bot_comment_count": (
             "Of comment_count, how many were posted by an account GitHub does not type as Bot. "
@@ -345,6 +476,10 @@ VIEW_COLUMN_DOCS: dict[str, dict[str, str]] = {
         ),
     },
     "pull_request_activity": {
+        "repo": (
+            "Repository of the pull request, as OWNER/REPO. Pass-through of "
+            "pull_requests.repo. Pull request numbers are unique only per repository."
+        ),
         "number": "Pass-through of pull_requests.number.",
         "title": "Pass-through of pull_requests.title.",
         "state": (
@@ -355,8 +490,9 @@ VIEW_COLUMN_DOCS: dict[str, dict[str, str]] = {
         "author": "Login of the pull request opener. Pass-through of pull_requests.user__login.",
         "author_type": (
             "GitHub account type of the pull request opener: User, Bot, or Organization. "
-            "Pass-through of pull_requests.user__type. Machine accounts that are not GitHub "
-            "Apps are typed User."
+            "users.type, joined on pull_requests.user__id, where pulls keep every field; "
+            "otherwise pull_requests.user__type. Machine accounts that are not GitHub Apps are "
+            "typed User."
         ),
         "labels": (
             "Sorted list of label names from pull_requests__labels. Empty list when the pull "
@@ -415,10 +551,32 @@ VIEW_COLUMN_DOCS: dict[str, dict[str, str]] = {
             "Latest created_at among matching review comments, including bot comments. "
             "NULL when there are none."
         ),
+        "review_count": (
+            "Count of submitted reviews: reviews rows matching this pull request, including "
+            "bot reviews and the author's replies. Pending reviews are not counted. Reviews "
+            "are fetched only for pull requests a pull saw change."
+        ),
+        "approval_count": (
+            "Of review_count, how many have state APPROVED. A reviewer who approved twice "
+            "counts twice; a later dismissal changes the review's state and drops it here."
+        ),
+        "changes_requested_count": "Of review_count, how many have state CHANGES_REQUESTED.",
+        "reviewers": (
+            "Sorted list of distinct logins that submitted a review, excluding the pull "
+            "request author, including bots. Empty list when nobody has reviewed."
+        ),
+        "first_review_at": (
+            "Earliest submitted_at among reviews not by the pull request author, including "
+            "bot reviews. NULL when there are none."
+        ),
+        "last_review_at": (
+            "Latest submitted_at among reviews not by the pull request author, including "
+            "bot reviews. NULL when there are none."
+        ),
         "participant_count": (
             "Number of distinct logins in the set formed by the pull request author together "
-            "with all conversation- and review-comment authors, including bots. NULL logins are "
-            "not counted."
+            "with all conversation- and review-comment authors and reviewers, including bots. "
+            "NULL logins are not counted."
         ),
         "non_bot_participant_count": (
             "Of participant_count, how many are accounts GitHub does not type as Bot. Subtract "
@@ -451,8 +609,10 @@ def _render(sql: str, present: set[str]) -> str:
     )
 
 
-def create_views(db_path: Path) -> None:
-    """Create or replace every derived view in the `github` schema.
+def create_views(db_path: Path, resources: Iterable[str] | None = None) -> None:
+    """Create or replace the derived views in the `github` schema.
+
+    With `resources`, only the views reading at least one of them are recreated.
 
     Best-effort, and deliberately guarded at the outermost level: the connection and
     the schema probe are inside the try too, so a locked or unreadable database warns
@@ -461,13 +621,21 @@ def create_views(db_path: Path) -> None:
     """
     try:
         with duckdb.connect(str(db_path)) as con:
-            present = _present_tables(con)
-            for name, sql in VIEWS.items():
-                _create_one(con, name, sql, present)
+            replace_views(con, resources=resources)
     except Exception as exc:
         print(f"Warning: view creation failed: {exc}", file=sys.stderr)
 
 
+def replace_views(con: duckdb.DuckDBPyConnection, resources: Iterable[str] | None = None) -> None:
+    """Create or replace the derived views on `con`, in whatever transaction it has open,
+    as `create_views` does. A view that cannot be created warns; the connection's own
+    errors are raised."""
+    present = _present_tables(con)
+    for name, sql in VIEWS.items():
+        if resources is None or set(resources) & set(VIEW_SOURCES[name]):
+            _create_one(con, name, sql, present)
+
+
 def _create_one(con: duckdb.DuckDBPyConnection, name: str, sql: str, present: set[str]) -> None:
     base = BASE_TABLES[name]
     if base not in present:
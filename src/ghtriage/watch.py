@@ -0,0 +1,143 @@
+"""`ghtriage watch`: incremental pulls on a schedule, from one resident process.
+
+Compared with `ghtriage pull` run from cron, the process imports Python and dlt once,
+keeps one rate-limit scheduler across cycles, so it knows how much budget is left before
+starting a pull, and takes the same lock as a manual pull, so the two never write to the
+database at once. Each cycle records its outcome in `_ghtriage_meta` for `status`.
+"""
+
+from datetime import datetime, timezone
+from pathlib import Path
+import random
+import re
+import sys
+import time
+from typing import Callable
+
+from ghtriage.client import RateLimitScheduler, TokenPool
+from ghtriage.lock import PullLock, PullLockHeld
+from ghtriage.pipeline import write_meta_values
+from ghtriage.timestamps import utc_timestamp
+
+INTERVAL_PATTERN = re.compile(r"^(\d+(?:\.\d+)?)([smhd]?)$")
+INTERVAL_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+# Each wait is the interval give or take this fraction, so watchers started together,
+# or sharing a token, drift apart instead of pulling in lockstep.
+JITTER_FRACTION = 0.1
+# After a failed cycle the wait doubles from the interval, up to this.
+MAX_BACKOFF_SECONDS = 3600
+# With fewer requests than this left in the rate-limit window, wait for the window to
+# reset rather than start a cycle that would stall partway through.
+MIN_CYCLE_BUDGET = 100
+
+
+def parse_interval(value: str) -> float:
+    """Parse an interval such as `90`, `30s`, `5m`, `1h` or `1d` into seconds."""
+    match = INTERVAL_PATTERN.fullmatch(value.strip().lower())
+    if match is None or float(match.group(1)) <= 0:
+        raise ValueError(f"Invalid interval: {value}. Use seconds or a unit, e.g. 30s, 5m, 1h.")
+    return float(match.group(1)) * INTERVAL_UNITS[match.group(2)]
+
+
+def next_delay(
+    interval: float,
+    failures: int,
+    scheduler: RateLimitScheduler | TokenPool,
+    *,
+    now: float,
+    rng: random.Random,
+) -> float:
+    """Seconds to wait before the next cycle, after `failures` failed cycles in a row."""
+    delay = interval
+    if failures:
+        delay = min(interval * 2**failures, max(MAX_BACKOFF_SECONDS, interval))
+    delay *= 1 + rng.uniform(-JITTER_FRACTION, JITTER_FRACTION)
+    if (
+        scheduler.remaining is not None
+        and scheduler.reset_at is not None
+        and scheduler.remaining < MIN_CYCLE_BUDGET
+        and scheduler.reset_at > now
+    ):
+        delay = max(delay, scheduler.reset_at - now + 1)
+    return delay
+
+
+def _display(seconds: float) -> str:
+    return datetime.fromtimestamp(seconds, timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+
+
+def _record_cycle(
+    db_path: Path, *, started_at: float, error: str | None, next_pull_at: float, interval: float
+) -> None:
+    try:
+        write_meta_values(
+            db_path,
+            {
+                "watch_last_cycle_at": utc_timestamp(started_at),
+                "watch_last_error": error or "",
+                "watch_next_pull_at": utc_timestamp(next_pull_at),
+                "watch_interval_seconds": f"{interval:g}",
+            },
+        )
+    except Exception as exc:
+        print(f"Warning: could not record the watch cycle: {exc}", file=sys.stderr)
+
+
+def watch(
+    pull: Callable[[], str],
+    *,
+    interval: float,
+    lock_path: Path,
+    db_path: Path,
+    scheduler: RateLimitScheduler | TokenPool,
+    max_cycles: int | None = None,
+    clock: Callable[[], float] = time.time,
+    sleep: Callable[[float], None] = time.sleep,
+    rng: random.Random | None = None,
+) -> None:
+    """Run `pull` every `interval` seconds until interrupted, or for `max_cycles` cycles.
+
+    `pull` runs one incremental pull and returns a one-line summary of it. It runs under
+    the pull lock; while a manual pull holds the lock, the cycle is skipped. A failed
+    cycle is reported and retried after a backoff instead of ending the watch.
+    """
+    rng = rng if rng is not None else random.Random()
+    failures = 0
+    cycle = 0
+    while True:
+        cycle += 1
+        started_at = clock()
+        try:
+            with PullLock(lock_path):
+                summary, error = None, None
+                try:
+                    summary = pull()
+                except Exception as exc:
+                    failures += 1
+                    error = f"{type(exc).__name__}: {exc}"
+                else:
+                    failures = 0
+                delay = next_delay(interval, failures, scheduler, now=clock(), rng=rng)
+                _record_cycle(
+                    db_path,
+                    started_at=started_at,
+                    error=error,
+                    next_pull_at=clock() + delay,
+                    interval=interval,
+                )
+        except PullLockHeld as exc:
+            delay = next_delay(interval, failures, scheduler, now=clock(), rng=rng)
+            print(f"Note: {exc}; skipping this cycle.", file=sys.stderr)
+        else:
+            next_pull = _display(clock() + delay)
+            if error is None:
+                print(f"{_display(started_at)}  Pulled {summary}. Next pull at {next_pull}.")
+            else:
+                print(
+                    f"Warning: pull failed ({error}); retrying at {next_pull}.",
+                    file=sys.stderr,
+                )
+            sys.stdout.flush()
+        if max_cycles is not None and cycle >= max_cycles:
+            break
+        sleep(delay)
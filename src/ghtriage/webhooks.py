@@ -0,0 +1,282 @@
+"""`ghtriage webhook-serve`: apply GitHub webhook deliveries to the database as they come.
+
+Each delivery's signature is checked against the shared secret, and the object it carries
+(an issue, a pull request or a comment) becomes a change to the row with its id in the
+table a pull writes. Deliveries only queue their changes; one writer applies what has
+queued every `FLUSH_INTERVAL` seconds, as one merge load, so a burst of deliveries costs
+one write to the database rather than one each. The writer takes the pull lock for each
+batch, so it never writes while a pull does; a batch that finds the lock taken waits for
+the next one.
+"""
+
+from dataclasses import dataclass
+import hashlib
+import hmac
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+from pathlib import Path
+import sys
+import threading
+from typing import Callable, Mapping
+from urllib.parse import parse_qs
+
+from ghtriage.config import get_db_path, get_lock_path
+from ghtriage.fields import DEFAULT_FIELDS, Projection
+from ghtriage.lock import PullLock, PullLockHeld
+from ghtriage.pipeline import (
+    delete_records,
+    is_issue,
+    merge_records,
+    write_meta_values,
+)
+from ghtriage.timestamps import utc_timestamp
+
+SIGNATURE_HEADER = "X-Hub-Signature-256"
+EVENT_HEADER = "X-GitHub-Event"
+# The table each event's object is merged into, and the payload key holding the object.
+EVENT_TABLES = {
+    "issues": ("issues", "issue"),
+    "issue_comment": ("conversation_comments", "comment"),
+    "pull_request": ("pull_requests", "pull_request"),
+    "pull_request_review_comment": ("review_comments", "comment"),
+}
+# Actions after which the object is no longer in the repository.
+DELETE_ACTIONS = {"deleted", "transferred"}
+# Seconds between batches: how long a delivery waits, at most, to show in queries.
+FLUSH_INTERVAL = 2.0
+# A batch is written early once this many changes have queued.
+MAX_BATCH = 1000
+
+
+@dataclass(frozen=True)
+class Change:
+    """A row to merge into the `kind` table, or, with no `record`, to delete from it."""
+
+    kind: str
+    id: int
+    record: dict | None = None
+
+    @property
+    def updated_at(self) -> str:
+        return (self.record or {}).get("updated_at") or ""
+
+
+def verify_signature(secret: str, body: bytes, signature: str | None) -> bool:
+    """Check a delivery's `X-Hub-Signature-256` header against the shared secret."""
+    if not signature or not signature.startswith("sha256="):
+        return False
+    expected = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(f"sha256={expected}", signature)
+
+
+def changes_from_event(event: str, payload: dict) -> list[Change]:
+    """Return the changes a delivery of `event` makes; other events make none.
+
+    Objects get the repository's `repo` column, as a pull adds it. `issues` events also
+    come for pull requests, which the issues table leaves out, as a pull does. A comment
+    event also carries its issue, with the new comment count, which is merged too.
+    """
+    if event not in EVENT_TABLES or not isinstance(payload.get("repository"), dict):
+        return []
+    kind, key = EVENT_TABLES[event]
+    item = payload.get(key)
+    if not isinstance(item, dict) or "id" not in item:
+        return []
+    repo = payload["repository"]["full_name"]
+    changes = []
+    if event == "issue_comment" and is_issue(payload.get("issue")):
+        changes.append(
+            Change("issues", payload["issue"]["id"], {**payload["issue"], "repo": repo})
+        )
+    if kind == "issues" and not is_issue(item):
+        return changes
+    if payload.get("action") in DELETE_ACTIONS:
+        changes.append(Change(kind, item["id"]))
+    else:
+        changes.append(Change(kind, item["id"], {**item, "repo": repo}))
+    return changes
+
+
+def _later(current: Change | None, change: Change) -> Change:
+    """Of two changes to the same row, the one to apply. A deletion is final, since the
+    object cannot come back; otherwise the newer version wins, and on a tie, the later
+    delivery."""
+    if current is None or change.record is None:
+        return change
+    if current.record is None or change.updated_at < current.updated_at:
+        return current
+    return change
+
+
+def apply_changes(
+    changes: list[Change],
+    cwd: str | Path | None = None,
+    fields: Mapping[str, Projection] | None = DEFAULT_FIELDS,
+) -> dict[str, int]:
+    """Merge and delete the rows `changes` name, keeping the `fields` a pull keeps, and
+    return the rows changed, by kind."""
+    upserts: dict[str, list[dict]] = {}
+    deletes: dict[str, list[int]] = {}
+    for change in changes:
+        if change.record is None:
+            deletes.setdefault(change.kind, []).append(change.id)
+        else:
+            upserts.setdefault(change.kind, []).append(change.record)
+    counts = merge_records(upserts, cwd=cwd, fields=fields) if upserts else {}
+    for kind, deleted in (delete_records(deletes, cwd=cwd) if deletes else {}).items():
+        counts[kind] = counts.get(kind, 0) + deleted
+    write_meta_values(get_db_path(cwd=cwd), {"webhook_last_applied_at": utc_timestamp()})
+    return counts
+
+
+class WebhookWriter:
+    """Queues changes from any thread and applies them in batches from its own.
+
+    Within a batch each row changes once, to its latest version. A batch that fails is
+    reported and dropped: the rows it would have changed are updated on GitHub since the
+    last pull, so the next pull fetches them.
+    """
+
+    def __init__(
+        self,
+        *,
+        cwd: str | Path | None = None,
+        flush_interval: float = FLUSH_INTERVAL,
+        fields: Mapping[str, Projection] | None = DEFAULT_FIELDS,
+        apply: Callable[[list[Change]], dict[str, int]] | None = None,
+    ) -> None:
+        self.cwd = cwd
+        self.flush_interval = flush_interval
+        self._apply = (
+            apply if apply is not None else (lambda batch: apply_changes(batch, cwd, fields))
+        )
+        self._pending: dict[tuple[str, int], Change] = {}
+        self._mutex = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self) -> "WebhookWriter":
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def pending(self) -> int:
+        with self._mutex:
+            return len(self._pending)
+
+    def add(self, changes: list[Change]) -> None:
+        with self._mutex:
+            for change in changes:
+                key = (change.kind, change.id)
+                self._pending[key] = _later(self._pending.get(key), change)
+            full = len(self._pending) >= MAX_BATCH
+        if full:
+            self._wake.set()
+
+    def _requeue(self, batch: dict[tuple[str, int], Change]) -> None:
+        with self._mutex:
+            for key, change in batch.items():
+                self._pending[key] = (
+                    _later(change, self._pending[key]) if key in self._pending else change
+                )
+
+    def flush(self) -> dict[str, int]:
+        """Apply the queued changes now; return the rows changed, by kind."""
+        with self._mutex:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return {}
+        try:
+            with PullLock(get_lock_path(cwd=self.cwd)):
+                counts = self._apply(list(batch.values()))
+        except PullLockHeld:
+            self._requeue(batch)
+            return {}
+        except Exception as exc:
+            print(
+                f"Warning: could not apply {len(batch)} webhook changes ({exc}); "
+                "the next pull fetches them.",
+                file=sys.stderr,
+            )
+            return {}
+        summary = ", ".join(f"{kind}: {count:,}" for kind, count in counts.items())
+        print(f"{utc_timestamp()}  Applied {len(batch):,} changes ({summary or 'none newer'}).")
+        sys.stdout.flush()
+        return counts
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def close(self) -> None:
+        """Stop the writer thread, applying whatever is still queued."""
+        if self._thread is not None:
+            self._stop.set()
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "WebhookServer"
+
+    def log_message(self, format, *args) -> None:  # noqa: A002
+        pass
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if not verify_signature(self.server.secret, body, self.headers.get(SIGNATURE_HEADER)):
+            self._reply(401, "Invalid signature")
+            return
+        event = self.headers.get(EVENT_HEADER, "")
+        try:
+            if self.headers.get("Content-Type", "").startswith("application/x-www-form"):
+                # Hooks set to deliver form data send the JSON in a `payload` field.
+                body = parse_qs(body.decode("utf-8")).get("payload", [""])[0].encode("utf-8")
+            payload = json.loads(body)
+        except ValueError:
+            self._reply(400, "Invalid JSON payload")
+            return
+        if event == "ping":
+            self._reply(200, "pong")
+            return
+        if event not in EVENT_TABLES:
+            self._reply(202, f"Ignored {event or 'unnamed'} event")
+            return
+        changes = changes_from_event(event, payload)
+        self.server.writer.add(changes)
+        self._reply(202, f"Queued {len(changes)} changes")
+
+    def _reply(self, status: int, message: str) -> None:
+        body = f"{message}\n".encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class WebhookServer(ThreadingHTTPServer):
+    """Receives deliveries on any path, and queues their changes on `writer`."""
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], secret: str, writer: WebhookWriter) -> None:
+        if not secret:
+            raise ValueError("A webhook secret is required to verify deliveries")
+        super().__init__(address, _Handler)
+        self.secret = secret
+        self.writer = writer
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/"
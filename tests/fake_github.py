@@ -0,0 +1,714 @@
+"""A local stand-in for the parts of the GitHub REST API that `ghtriage pull` reads.
+
+Serves the repository endpoints the pull uses (issues, pulls, issue comments, review
+comments and each pull request's reviews), for one repository or several, plus an
+organization's repository list,
+a single issue and its comments, as `ghtriage repair` reads them, and an OpenAPI spec for
+annotation, from synthetic data generated on demand. Records are
+pure functions of their index, so a million comments cost no memory and a larger dataset
+is the smaller one with newer records appended: start a server, pull, restart it with
+more records, and an incremental pull sees only the new ones.
+
+Pagination, `since` filtering, `direction`, ETags and the rate-limit headers behave as
+GitHub documents them. Used by the end-to-end pull tests and by `benchmarks/pull.py`; run
+directly to serve a dataset for manual testing:
+
+    python tests/fake_github.py --comments 100000 --port 8765
+"""
+
+import argparse
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import math
+import re
+import threading
+import time
+from typing import Sequence
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+REPO = "fake-owner/fake-repo"
+SPEC_PATH = "/openapi.json"
+
+DEFAULT_PER_PAGE = 30
+MAX_PER_PAGE = 100
+
+EPOCH = datetime(2020, 1, 1, tzinfo=timezone.utc)
+# Seconds between consecutive records of each kind. Growing a dataset appends records,
+# and these keep every new record newer than all the old ones.
+ITEM_STEP = 600
+COMMENT_STEP = 60
+USER_COUNT = 200
+LABELS = ["bug", "documentation", "enhancement", "good first issue", "question"]
+# A pull request's reviews, in order; pull request n has the first n % 4 of them.
+REVIEW_STATES = ["COMMENTED", "CHANGES_REQUESTED", "APPROVED"]
+
+
+def _timestamp(seconds: int) -> str:
+    return (EPOCH + timedelta(seconds=seconds)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _seconds(timestamp: str) -> float:
+    parsed = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return (parsed - EPOCH).total_seconds()
+
+
+# The URL fields GitHub sends on every user and repository object, which a pull has no
+# use for but which make up much of each payload.
+USER_URLS = [
+    "followers",
+    "following{/other_user}",
+    "gists{/gist_id}",
+    "starred{/owner}{/repo}",
+    "subscriptions",
+    "organizations",
+    "repos",
+    "events{/privacy}",
+    "received_events",
+]
+REPO_URLS = [
+    "forks",
+    "keys{/key_id}",
+    "collaborators{/collaborator}",
+    "teams",
+    "hooks",
+    "issues/events{/number}",
+    "events",
+    "assignees{/user}",
+    "branches{/branch}",
+    "tags",
+    "blobs{/sha}",
+    "git/tags{/sha}",
+    "git/refs{/sha}",
+    "git/trees{/sha}",
+    "statuses/{sha}",
+    "languages",
+    "stargazers",
+    "contributors",
+    "subscribers",
+    "subscription",
+    "commits{/sha}",
+    "git/commits{/sha}",
+    "comments{/number}",
+    "issues/comments{/number}",
+    "contents/{+path}",
+    "compare/{base}...{head}",
+    "merges",
+    "{archive_format}{/ref}",
+    "downloads",
+    "issues{/number}",
+    "pulls{/number}",
+    "milestones{/number}",
+    "notifications{?since,all,participating}",
+    "labels{/name}",
+    "releases{/id}",
+    "deployments",
+]
+
+
+def _url_key(path: str) -> str:
+    return path.split("{")[0].strip("/").replace("/", "_") or "archive"
+
+
+def _user(k: int) -> dict:
+    k %= USER_COUNT
+    bot = k % 25 == 0
+    login = f"bot-{k}[bot]" if bot else f"user-{k}"
+    api = f"https://api.github.com/users/{login}"
+    return {
+        "login": login,
+        "id": 10_000 + k,
+        "node_id": f"U_{k}",
+        "avatar_url": f"https://avatars.example.com/u/{10_000 + k}",
+        "gravatar_id": "",
+        "url": api,
+        "html_url": f"https://github.com/{login}",
+        **{f"{_url_key(path)}_url": f"{api}/{path}" for path in USER_URLS},
+        "type": "Bot" if bot else "User",
+        "user_view_type": "public",
+        "site_admin": False,
+    }
+
+
+def _body(seed: int, words: int) -> str:
+    vocabulary = ["triage", "pull", "cursor", "page", "merge", "review", "flaky", "fix"]
+    return " ".join(vocabulary[(seed * 31 + i * 7) % len(vocabulary)] for i in range(words))
+
+
+@dataclass
+class Dataset:
+    """Sizes of a synthetic repository. Every `pr_every`-th item is a pull request.
+
+    Serving several repositories, give each its own `id_offset`: ids are unique across
+    GitHub, and the pull merges on them.
+    """
+
+    items: int = 1_000
+    comments: int = 10_000
+    review_comments: int = 2_500
+    pr_every: int = 3
+    repo: str = REPO
+    id_offset: int = 0
+    archived: bool = False
+
+    @classmethod
+    def for_comments(cls, comments: int) -> "Dataset":
+        """A dataset shaped like an active repository: ten comments per item."""
+        return cls(items=max(comments // 10, 1), comments=comments, review_comments=comments // 4)
+
+    @property
+    def pulls(self) -> int:
+        return self.items // self.pr_every
+
+    def is_pull(self, number: int) -> bool:
+        return number % self.pr_every == 0
+
+    def comment_count(self, number: int) -> int:
+        # Comment j belongs to item (j - 1) % items + 1.
+        full, rest = divmod(self.comments, self.items)
+        return full + (1 if number <= rest else 0)
+
+    def review_count(self, number: int) -> int:
+        return number % (len(REVIEW_STATES) + 1) if self.is_pull(number) else 0
+
+    def is_closed(self, number: int) -> bool:
+        return number % 4 == 0
+
+    def item_updated(self, number: int) -> int:
+        return number * ITEM_STEP + ITEM_STEP // 2
+
+    def comment_updated(self, j: int) -> int:
+        return j * COMMENT_STEP
+
+    def review_comment_updated(self, j: int) -> int:
+        return j * COMMENT_STEP + COMMENT_STEP // 2
+
+    def summary(self, api_url: str) -> dict:
+        """The repository as `/orgs/{org}/repos` lists it."""
+        owner, name = self.repo.split("/")
+        return {
+            "id": 100 + self.id_offset,
+            "name": name,
+            "full_name": self.repo,
+            "owner": {"login": owner},
+            "url": f"{api_url}/repos/{owner}/{name}",
+            "archived": self.archived,
+        }
+
+    def repository(self, api_url: str) -> dict:
+        """The repository as GitHub embeds it, e.g. in a pull request's head and base."""
+        owner, name = self.repo.split("/")
+        repo_url = f"{api_url}/repos/{owner}/{name}"
+        return {
+            **self.summary(api_url),
+            "node_id": f"R_{100 + self.id_offset}",
+            "private": False,
+            "owner": _user(0),
+            "html_url": f"https://github.com/{self.repo}",
+            "description": _body(self.id_offset, 12),
+            "fork": False,
+            **{f"{_url_key(path)}_url": f"{repo_url}/{path}" for path in REPO_URLS},
+            "git_url": f"git://github.com/{self.repo}.git",
+            "ssh_url": f"git@github.com:{self.repo}.git",
+            "clone_url": f"https://github.com/{self.repo}.git",
+            "created_at": _timestamp(0),
+            "updated_at": _timestamp(0),
+            "pushed_at": _timestamp(0),
+            "size": 1024,
+            "stargazers_count": 10,
+            "watchers_count": 10,
+            "language": "Python",
+            "forks_count": 2,
+            "open_issues_count": self.items // 2,
+            "default_branch": "main",
+            "topics": ["triage", "github"],
+            "visibility": "public",
+        }
+
+    def issue(self, number: int, api_url: str) -> dict:
+        owner, name = self.repo.split("/")
+        repo_url = f"{api_url}/repos/{owner}/{name}"
+        created = number * ITEM_STEP
+        closed = self.is_closed(number)
+        record = {
+            "url": f"{repo_url}/issues/{number}",
+            "repository_url": repo_url,
+            "labels_url": f"{repo_url}/issues/{number}/labels{{/name}}",
+            "comments_url": f"{repo_url}/issues/{number}/comments",
+            "events_url": f"{repo_url}/issues/{number}/events",
+            "timeline_url": f"{repo_url}/issues/{number}/timeline",
+            "html_url": f"https://github.com/{self.repo}/issues/{number}",
+            "id": 1_000_000 + self.id_offset + number,
+            "node_id": f"I_{number}",
+            "number": number,
+            "title": f"Synthetic item {number}",
+            "user": _user(number),
+            "labels": [
+                {"id": 500 + i, "name": LABELS[i], "color": "ededed", "default": False}
+                for i in range(number % 3)
+            ],
+            "state": "closed" if closed else "open",
+            "state_reason": "completed" if closed else None,
+            "locked": False,
+            "assignees": [_user(number + 7)] if number % 5 == 0 else [],
+            "comments": self.comment_count(number),
+            "created_at": _timestamp(created),
+            "updated_at": _timestamp(self.item_updated(number)),
+            "closed_at": _timestamp(created + ITEM_STEP // 4) if closed else None,
+            "author_association": "CONTRIBUTOR",
+            "body": _body(number, 60),
+            "reactions": {"total_count": number % 4, "+1": number % 4, "-1": 0},
+        }
+        if self.is_pull(number):
+            record["pull_request"] = {
+                "url": f"{repo_url}/pulls/{number}",
+                "html_url": f"https://github.com/{self.repo}/pull/{number}",
+                "merged_at": record["closed_at"],
+            }
+        return record
+
+    def pull(self, number: int, api_url: str) -> dict:
+        issue = self.issue(number, api_url)
+        owner, name = self.repo.split("/")
+        repo_url = f"{api_url}/repos/{owner}/{name}"
+        sha = hashlib.sha1(str(number).encode()).hexdigest()
+        return {
+            "url": f"{repo_url}/pulls/{number}",
+            "id": 2_000_000 + self.id_offset + number,
+            "node_id": f"PR_{number}",
+            "html_url": issue["pull_request"]["html_url"],
+            "diff_url": f"{issue['pull_request']['html_url']}.diff",
+            "patch_url": f"{issue['pull_request']['html_url']}.patch",
+            "issue_url": issue["url"],
+            "commits_url": f"{repo_url}/pulls/{number}/commits",
+            "review_comments_url": f"{repo_url}/pulls/{number}/comments",
+            "review_comment_url": f"{repo_url}/pulls/comments{{/number}}",
+            "comments_url": issue["comments_url"],
+            "statuses_url": f"{repo_url}/statuses/{sha}",
+            "number": number,
+            "state": issue["state"],
+            "locked": False,
+            "title": issue["title"],
+            "user": issue["user"],
+            "body": issue["body"],
+            "labels": issue["labels"],
+            "assignees": issue["assignees"],
+            "requested_reviewers": [_user(number + 11)] if number % 2 == 0 else [],
+            "created_at": issue["created_at"],
+            "updated_at": issue["updated_at"],
+            "closed_at": issue["closed_at"],
+            "merged_at": issue["closed_at"],
+            "merge_commit_sha": sha if issue["closed_at"] else None,
+            "draft": number % 7 == 0,
+            "head": {
+                "label": f"user:branch-{number}",
+                "ref": f"branch-{number}",
+                "sha": sha,
+                "user": issue["user"],
+                "repo": self.repository(api_url),
+            },
+            "base": {
+                "label": "main",
+                "ref": "main",
+                "sha": sha[::-1],
+                "user": _user(0),
+                "repo": self.repository(api_url),
+            },
+            "author_association": "CONTRIBUTOR",
+        }
+
+    def comment(self, j: int, api_url: str) -> dict:
+        owner, name = self.repo.split("/")
+        repo_url = f"{api_url}/repos/{owner}/{name}"
+        number = (j - 1) % self.items + 1
+        timestamp = _timestamp(self.comment_updated(j))
+        return {
+            "url": f"{repo_url}/issues/comments/{3_000_000 + self.id_offset + j}",
+            "html_url": f"https://github.com/{self.repo}/issues/{number}#issuecomment-{j}",
+            "issue_url": f"{repo_url}/issues/{number}",
+            "id": 3_000_000 + self.id_offset + j,
+            "node_id": f"IC_{j}",
+            "user": _user(j * 3),
+            "created_at": timestamp,
+            "updated_at": timestamp,
+            "author_association": "CONTRIBUTOR",
+            "body": _body(j, 40),
+            "reactions": {"total_count": 0, "+1": 0, "-1": 0},
+        }
+
+    def review_comment(self, j: int, api_url: str) -> dict:
+        owner, name = self.repo.split("/")
+        repo_url = f"{api_url}/repos/{owner}/{name}"
+        number = ((j - 1) % max(self.pulls, 1) + 1) * self.pr_every
+        timestamp = _timestamp(self.review_comment_updated(j))
+        return {
+            "url": f"{repo_url}/pulls/comments/{4_000_000 + self.id_offset + j}",
+            "pull_request_review_id": 5_000_000 + self.id_offset + j // 3,
+            "id": 4_000_000 + self.id_offset + j,
+            "node_id": f"PRRC_{j}",
+            "diff_hunk": "@@ -1,3 +1,4 @@\n line\n+added",
+            "path": f"src/module_{j % 20}.py",
+            "position": j % 40,
+            "line": j % 40,
+            "side": "RIGHT",
+            "commit_id": hashlib.sha1(str(j).encode()).hexdigest(),
+            "user": _user(j * 5),
+            "body": _body(j, 25),
+            "created_at": timestamp,
+            "updated_at": timestamp,
+            "html_url": f"https://github.com/{self.repo}/pull/{number}#discussion_r{j}",
+            "pull_request_url": f"{repo_url}/pulls/{number}",
+            "author_association": "CONTRIBUTOR",
+        }
+
+    def review(self, number: int, k: int, api_url: str) -> dict:
+        owner, name = self.repo.split("/")
+        repo_url = f"{api_url}/repos/{owner}/{name}"
+        review_id = 6_000_000 + self.id_offset + number * len(REVIEW_STATES) + k
+        return {
+            "id": review_id,
+            "node_id": f"PRR_{review_id}",
+            "user": _user(number + 13 + k),
+            "body": _body(number + k, 10),
+            "state": REVIEW_STATES[k],
+            "html_url": f"https://github.com/{self.repo}/pull/{number}#pullrequestreview-{k}",
+            "pull_request_url": f"{repo_url}/pulls/{number}",
+            "submitted_at": _timestamp(number * ITEM_STEP + (k + 1) * COMMENT_STEP),
+            "commit_id": hashlib.sha1(str(number).encode()).hexdigest(),
+            "author_association": "CONTRIBUTOR",
+        }
+
+
+def _first_at_or_after(since: float, offset: int, step: int) -> int:
+    """Smallest index i with `i * step + offset >= since`."""
+    return max(math.ceil((since - offset) / step), 1)
+
+
+def spec() -> dict:
+    """A minimal OpenAPI document covering the schemas `ghtriage` annotates."""
+
+    def schema(description: str, **properties: str) -> dict:
+        return {
+            "type": "object",
+            "description": description,
+            "properties": {
+                name: {"type": "string", "description": text} for name, text in properties.items()
+            },
+        }
+
+    return {
+        "openapi": "3.0.3",
+        "components": {
+            "schemas": {
+                "issue": schema(
+                    "Issues are a great way to keep track of tasks.",
+                    title="Title of the issue",
+                    state="State of the issue; either 'open' or 'closed'",
+                    body="Contents of the issue",
+                ),
+                "pull-request-simple": schema(
+                    "Pull Request Simple",
+                    title="The title of the pull request.",
+                    state="State of this Pull Request. Either `open` or `closed`.",
+                ),
+                "issue-comment": schema(
+                    "Comments provide a way for people to collaborate on an issue.",
+                    body="Contents of the issue comment",
+                ),
+                "pull-request-review": schema(
+                    "Pull Request Reviews are reviews on pull requests.",
+                    state="The state of the review.",
+                    body="The text of the review.",
+                ),
+                "pull-request-review-comment": schema(
+                    "Pull Request Review Comments are comments on a portion of the diff.",
+                    path="The relative path of the file to which the comment applies.",
+                    body="The text of the comment.",
+                ),
+                "simple-user": schema("A GitHub user.", login="The user's login."),
+            }
+        },
+    }
+
+
+@dataclass
+class FakeGitHub:
+    """Server options, and counters the handler fills in as it answers."""
+
+    dataset: Dataset = field(default_factory=Dataset)
+    # Further repositories served alongside `dataset`, e.g. the rest of an organization.
+    more_datasets: list[Dataset] = field(default_factory=list)
+    # Seconds to sleep before answering each request.
+    latency: float = 0.0
+    # Primary rate limit per window; None sends no rate-limit headers.
+    rate_limit: int | None = None
+    rate_limit_window: float = 3600.0
+    requests: int = 0
+    not_modified: int = 0
+    rate_limited: int = 0
+    _used: int = 0
+    _reset_at: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def charge(self) -> tuple[dict[str, str] | None, bool]:
+        """Count a request against the rate limit.
+
+        Return the rate-limit headers (None when limits are off) and whether the request
+        is over the limit.
+        """
+        if self.rate_limit is None:
+            return None, False
+        with self._lock:
+            now = time.time()
+            if now >= self._reset_at:
+                self._used = 0
+                self._reset_at = now + self.rate_limit_window
+            self._used += 1
+            exceeded = self._used > self.rate_limit
+            headers = {
+                "X-RateLimit-Limit": str(self.rate_limit),
+                "X-RateLimit-Remaining": str(max(self.rate_limit - self._used, 0)),
+                "X-RateLimit-Used": str(min(self._used, self.rate_limit)),
+                "X-RateLimit-Reset": str(math.ceil(self._reset_at)),
+                "X-RateLimit-Resource": "core",
+            }
+            return headers, exceeded
+
+    def refund(self) -> None:
+        """Give back a charged request; GitHub does not count 304 answers."""
+        if self.rate_limit is not None:
+            with self._lock:
+                self._used = max(self._used - 1, 0)
+
+    @property
+    def datasets(self) -> list[Dataset]:
+        return [self.dataset, *self.more_datasets]
+
+    def record(self, path: str, api_url: str) -> dict | None:
+        """Return the object a single-object endpoint serves, or None if there is none."""
+        for data in self.datasets:
+            match = re.fullmatch(rf"/repos/{re.escape(data.repo)}/issues/(\d+)", path.rstrip("/"))
+            if match and 1 <= int(match.group(1)) <= data.items:
+                return data.issue(int(match.group(1)), api_url)
+        return None
+
+    def page(self, path: str, query: dict[str, str], api_url: str) -> list[dict] | None:
+        """Return every record a list endpoint matches, lazily, or None for an unknown path."""
+        parts = path.strip("/").split("/")
+        if len(parts) == 3 and parts[0] == "orgs" and parts[2] == "repos":
+            repos = [data for data in self.datasets if data.repo.split("/")[0] == parts[1]]
+            if not repos:
+                return None
+            return _LazyRecords(range(len(repos)), lambda i: repos[i].summary(api_url))
+        data = next(
+            (data for data in self.datasets if path.startswith(f"/repos/{data.repo}/")), None
+        )
+        if data is None:
+            return None
+        endpoint = path[len(f"/repos/{data.repo}/") :].strip("/")
+        since = _seconds(query["since"]) if "since" in query else None
+
+        number = None
+        if endpoint == "issues":
+            count, offset, step = data.items, ITEM_STEP // 2, ITEM_STEP
+            make = data.issue
+            number = lambda i: i  # noqa: E731
+        elif endpoint == "pulls":
+            # /pulls has no `since`; it is ignored, as on GitHub.
+            since = None
+            count, offset, step = data.pulls, ITEM_STEP // 2, ITEM_STEP * data.pr_every
+            make = lambda k, url: data.pull(k * data.pr_every, url)  # noqa: E731
+            number = lambda k: k * data.pr_every  # noqa: E731
+        elif endpoint == "issues/comments":
+            count, offset, step = data.comments, 0, COMMENT_STEP
+            make = data.comment
+        elif endpoint == "pulls/comments":
+            count, offset, step = data.review_comments, COMMENT_STEP // 2, COMMENT_STEP
+            make = data.review_comment
+        elif re.fullmatch(r"issues/\d+/comments", endpoint):
+            # One item's comments, oldest first: every `items`-th from its number.
+            number = int(endpoint.split("/")[1])
+            if not 1 <= number <= data.items:
+                return None
+            indices = range(number, data.comments + 1, data.items)
+            return _LazyRecords(indices, lambda j: data.comment(j, api_url))
+        elif re.fullmatch(r"pulls/\d+/reviews", endpoint):
+            number = int(endpoint.split("/")[1])
+            if not 1 <= number <= data.items or not data.is_pull(number):
+                return None
+            indices = range(data.review_count(number))
+            return _LazyRecords(indices, lambda k: data.review(number, k, api_url))
+        else:
+            return None
+
+        first = 1 if since is None else _first_at_or_after(since, offset, step)
+        indices = range(first, count + 1)
+        # Every list is ordered by index, which orders by both created and updated time.
+        if query.get("direction", "desc") == "desc":
+            indices = indices[::-1]
+        # Both lists default to open items only, as on GitHub.
+        if number is not None and query.get("state", "open") == "open":
+            indices = [i for i in indices if not data.is_closed(number(i))]
+        return _LazyRecords(indices, lambda i: make(i, api_url))
+
+
+class _LazyRecords:
+    def __init__(self, indices: Sequence[int], make) -> None:
+        self.indices = indices
+        self.make = make
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def slice(self, start: int, stop: int) -> list[dict]:
+        return [self.make(i) for i in self.indices[start:stop]]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "FakeGitHubServer"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args) -> None:  # noqa: A002
+        pass
+
+    def do_GET(self) -> None:
+        fake = self.server.fake
+        with fake._lock:
+            fake.requests += 1
+        if fake.latency:
+            time.sleep(fake.latency)
+
+        url = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if url.path == SPEC_PATH:
+            body = json.dumps(spec()).encode()
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            if self.headers.get("If-None-Match") == etag:
+                with fake._lock:
+                    fake.not_modified += 1
+                self._send(304, b"", {"ETag": etag})
+                return
+            self._send(200, body, {"ETag": etag})
+            return
+
+        rate_headers, exceeded = fake.charge()
+        if exceeded:
+            with fake._lock:
+                fake.rate_limited += 1
+            self._send_json(
+                403, {"message": "API rate limit exceeded for user."}, headers=rate_headers
+            )
+            return
+
+        api_url = f"http://{self.headers['Host']}"
+        record = fake.record(url.path, api_url)
+        if record is not None:
+            self._send_json(200, record, headers=rate_headers)
+            return
+        records = fake.page(url.path, query, api_url)
+        if records is None:
+            self._send_json(404, {"message": "Not Found"}, headers=rate_headers)
+            return
+
+        per_page = min(int(query.get("per_page", DEFAULT_PER_PAGE)), MAX_PER_PAGE)
+        page = max(int(query.get("page", 1)), 1)
+        last_page = max(math.ceil(len(records) / per_page), 1)
+        body = json.dumps(records.slice((page - 1) * per_page, page * per_page)).encode()
+
+        headers = dict(rate_headers or {})
+        links = []
+        if page < last_page:
+            links.append(self._link(api_url, url.path, query, page + 1, "next"))
+            links.append(self._link(api_url, url.path, query, last_page, "last"))
+        if page > 1:
+            links.append(self._link(api_url, url.path, query, page - 1, "prev"))
+            links.append(self._link(api_url, url.path, query, 1, "first"))
+        if links:
+            headers["Link"] = ", ".join(links)
+
+        etag = f'W/"{hashlib.sha1(body).hexdigest()}"'
+        headers["ETag"] = etag
+        if self.headers.get("If-None-Match") == etag:
+            fake.refund()
+            with fake._lock:
+                fake.not_modified += 1
+            self._send(304, b"", headers)
+            return
+        self._send(200, body, headers)
+
+    @staticmethod
+    def _link(api_url: str, path: str, query: dict[str, str], page: int, rel: str) -> str:
+        return f'<{api_url}{path}?{urlencode({**query, "page": page})}>; rel="{rel}"'
+
+    def _send_json(self, status: int, payload, headers: dict[str, str] | None = None) -> None:
+        self._send(status, json.dumps(payload).encode(), headers or {})
+
+    def _send(self, status: int, body: bytes, headers: dict[str, str]) -> None:
+        self.send_response(status)
+        if status != 304:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(body)
+
+
+class FakeGitHubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, fake: FakeGitHub, port: int = 0) -> None:
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.fake = fake
+
+    def handle_error(self, request, client_address) -> None:
+        # A client giving up mid-response (an interrupted pull) is expected, not an error.
+        pass
+
+    @property
+    def api_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def spec_url(self) -> str:
+        return f"{self.api_url}{SPEC_PATH}"
+
+    def __enter__(self) -> "FakeGitHubServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--comments", type=int, default=10_000)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per request")
+    parser.add_argument("--rate-limit", type=int, default=None, help="Requests per window")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    fake = FakeGitHub(
+        dataset=Dataset.for_comments(args.comments),
+        latency=args.latency,
+        rate_limit=args.rate_limit,
+    )
+    server = FakeGitHubServer(fake, port=args.port)
+    print(f"Serving {REPO} at {server.api_url} (spec at {server.spec_url})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -4,17 +4,21 @@ from unittest.mock import MagicMock, patch
 import urllib.error
 
 import duckdb
+from fake_github import FakeGitHub, FakeGitHubServer
 import pytest
 
 from ghtriage.annotations import (
     OPENAPI_FETCH_TIMEOUT_SECONDS,
     _extract_descriptions,
     _resolve_ref,
-    annotate_database,
+    apply_descriptions,
     build_column_descriptions,
     build_table_descriptions,
-    fetch_and_annotate,
+    fetch_descriptions,
     fetch_spec,
+    local_descriptions,
+    read_catalog,
+    write_catalog,
 )
 
 # ---------------------------------------------------------------------------
@@ -49,6 +53,12 @@ def minimal_spec() -> dict:
                         "body": {"description": "Contents of the issue comment"},
                     },
                 },
+                "pull-request-review": {
+                    "description": "A review of a pull request.",
+                    "properties": {
+                        "state": {"description": "The state of the review."},
+                    },
+                },
                 "pull-request-review-comment": {
                     "description": "A review comment on a pull request.",
                     "properties": {
@@ -94,10 +104,10 @@ def test_fetch_spec_success() -> None:
         result = fetch_spec("https://example.com/spec.json")
 
     assert result == payload
-    mock_urlopen.assert_called_once_with(
-        "https://example.com/spec.json",
-        timeout=OPENAPI_FETCH_TIMEOUT_SECONDS,
-    )
+    (request,) = mock_urlopen.call_args.args
+    assert request.full_url == "https://example.com/spec.json"
+    assert not request.has_header("If-none-match")
+    assert mock_urlopen.call_args.kwargs == {"timeout": OPENAPI_FETCH_TIMEOUT_SECONDS}
 
 
 def test_fetch_spec_http_error() -> None:
@@ -207,6 +217,8 @@ def test_build_column_descriptions_structure(minimal_spec: dict) -> None:
         "pull_requests",
         "conversation_comments",
         "review_comments",
+        "reviews",
+        "users",
     }
     assert "number" in result["issues"]
     assert "draft" in result["pull_requests"]
@@ -236,6 +248,13 @@ def test_build_column_descriptions_flattens_inline_nested_object() -> None:
     assert result["issues"]["user__login"] == "The GitHub username."
 
 
+def test_build_descriptions_skip_tables_the_spec_does_not_describe(minimal_spec: dict) -> None:
+    del minimal_spec["components"]["schemas"]["pull-request-review"]
+
+    assert "reviews" not in build_column_descriptions(minimal_spec)
+    assert "reviews" not in build_table_descriptions(minimal_spec)
+
+
 def test_build_table_descriptions_structure(minimal_spec: dict) -> None:
     result = build_table_descriptions(minimal_spec)
     assert set(result.keys()) == {
@@ -243,19 +262,25 @@ def test_build_table_descriptions_structure(minimal_spec: dict) -> None:
         "pull_requests",
         "conversation_comments",
         "review_comments",
+        "reviews",
     }
     assert "issue" in result["issues"].lower()
     assert "pull request" in result["pull_requests"].lower()
 
 
 # ---------------------------------------------------------------------------
-# annotate_database
+# apply_descriptions
 # ---------------------------------------------------------------------------
 
 
-def test_annotate_database_applies_column_comments(annotated_db: Path) -> None:
+def _apply(db_path: Path, table_descs: dict, column_descs: dict) -> None:
+    with duckdb.connect(str(db_path)) as conn:
+        apply_descriptions(conn, table_descs, column_descs)
+
+
+def test_apply_descriptions_applies_column_comments(annotated_db: Path) -> None:
     column_descs = {"issues": {"title": "Title of the issue.", "state": "open or closed"}}
-    annotate_database(annotated_db, {}, column_descs)
+    _apply(annotated_db, {}, column_descs)
 
     with duckdb.connect(str(annotated_db)) as conn:
         comments = dict(
@@ -270,9 +295,9 @@ def test_annotate_database_applies_column_comments(annotated_db: Path) -> None:
     assert comments["id"] is None
 
 
-def test_annotate_database_applies_table_comments(annotated_db: Path) -> None:
+def test_apply_descriptions_applies_table_comments(annotated_db: Path) -> None:
     table_descs = {"issues": "Issues are a great way to track tasks."}
-    annotate_database(annotated_db, table_descs, {})
+    _apply(annotated_db, table_descs, {})
 
     with duckdb.connect(str(annotated_db)) as conn:
         row = conn.execute(
@@ -283,9 +308,9 @@ def test_annotate_database_applies_table_comments(annotated_db: Path) -> None:
     assert row[0] == "Issues are a great way to track tasks."
 
 
-def test_annotate_database_escapes_single_quotes(annotated_db: Path) -> None:
+def test_apply_descriptions_escapes_single_quotes(annotated_db: Path) -> None:
     column_descs = {"issues": {"state": "Either 'open' or 'closed'."}}
-    annotate_database(annotated_db, {}, column_descs)
+    _apply(annotated_db, {}, column_descs)
 
     with duckdb.connect(str(annotated_db)) as conn:
         row = conn.execute(
@@ -296,26 +321,26 @@ def test_annotate_database_escapes_single_quotes(annotated_db: Path) -> None:
     assert row[0] == "Either 'open' or 'closed'."
 
 
-def test_annotate_database_skips_missing_table(annotated_db: Path) -> None:
+def test_apply_descriptions_skips_missing_table(annotated_db: Path) -> None:
     """Tables absent from the database are silently skipped."""
     column_descs = {"pull_requests": {"title": "PR title"}}
     table_descs = {"pull_requests": "Pull requests."}
     # Should not raise even though 'pulls' table does not exist
-    annotate_database(annotated_db, table_descs, column_descs)
+    _apply(annotated_db, table_descs, column_descs)
 
 
-def test_annotate_database_skips_missing_column(annotated_db: Path) -> None:
+def test_apply_descriptions_skips_missing_column(annotated_db: Path) -> None:
     """Columns absent from the table are silently skipped."""
     column_descs = {"issues": {"nonexistent_column": "Some description"}}
-    annotate_database(annotated_db, {}, column_descs)  # should not raise
+    _apply(annotated_db, {}, column_descs)  # should not raise
 
 
 # ---------------------------------------------------------------------------
-# fetch_and_annotate
+# fetch_descriptions
 # ---------------------------------------------------------------------------
 
 
-def test_fetch_and_annotate_applies_comments_from_spec(annotated_db: Path) -> None:
+def test_fetch_descriptions_annotate_from_spec(annotated_db: Path) -> None:
     spec = {
         "components": {
             "schemas": {
@@ -335,8 +360,10 @@ def test_fetch_and_annotate_applies_comments_from_spec(annotated_db: Path) -> No
             }
         }
     }
-    with patch("ghtriage.annotations.fetch_spec", return_value=spec):
-        fetch_and_annotate(annotated_db)
+    with patch("ghtriage.annotations.fetch_spec_if_changed", return_value=(spec, {})):
+        descriptions = fetch_descriptions()
+    assert descriptions is not None
+    _apply(annotated_db, *descriptions)
 
     with duckdb.connect(str(annotated_db)) as conn:
         table_comment = conn.execute(
@@ -356,12 +383,66 @@ def test_fetch_and_annotate_applies_comments_from_spec(annotated_db: Path) -> No
     assert column_comments["state"] == "Either 'open' or 'closed'."
 
 
-def test_fetch_and_annotate_swallows_errors(
-    annotated_db: Path, capsys: pytest.CaptureFixture
-) -> None:
-    """If fetch_spec raises, fetch_and_annotate prints a warning but does not propagate."""
-    with patch("ghtriage.annotations.fetch_spec", side_effect=RuntimeError("network error")):
-        fetch_and_annotate(annotated_db)
+def test_fetch_descriptions_swallows_errors(capsys: pytest.CaptureFixture) -> None:
+    """If the fetch raises, fetch_descriptions prints a warning but does not propagate."""
+    with patch(
+        "ghtriage.annotations.fetch_spec_if_changed", side_effect=RuntimeError("network error")
+    ):
+        assert fetch_descriptions() is None
 
     captured = capsys.readouterr()
     assert "schema annotation failed" in captured.err
+
+
+def test_fetch_descriptions_revalidates_the_cached_copy(tmp_path: Path) -> None:
+    cache_path = tmp_path / ".ghtriage" / "descriptions.json"
+    fake = FakeGitHub()
+    with FakeGitHubServer(fake) as server:
+        fetched = fetch_descriptions(server.spec_url, cache_path=cache_path)
+        revalidated = fetch_descriptions(server.spec_url, cache_path=cache_path)
+
+    assert fetched is not None
+    assert fetched[0]["issues"]
+    assert revalidated == fetched
+    assert (fake.requests, fake.not_modified) == (2, 1)
+    assert json.loads(cache_path.read_text())["validators"]["etag"]
+
+
+def test_fetch_descriptions_falls_back_to_the_cache_offline(
+    tmp_path: Path, capsys: pytest.CaptureFixture
+) -> None:
+    cache_path = tmp_path / ".ghtriage" / "descriptions.json"
+    with FakeGitHubServer(FakeGitHub()) as server:
+        spec_url = server.spec_url
+        fetched = fetch_descriptions(spec_url, cache_path=cache_path)
+
+    assert fetch_descriptions(spec_url, cache_path=cache_path) == fetched
+    assert "Note: annotating from the cached API descriptions" in capsys.readouterr().err
+    # The cache holds one spec URL's descriptions; another's are fetched afresh.
+    assert fetch_descriptions(spec_url + "?other", cache_path=cache_path) is None
+
+
+def test_catalog_holds_the_descriptions_of_a_spec(tmp_path: Path, minimal_spec: dict) -> None:
+    catalog_path = tmp_path / "descriptions.json"
+    assert read_catalog(catalog_path) is None
+
+    write_catalog(minimal_spec, "https://example.com/spec.json", path=catalog_path)
+
+    assert read_catalog(catalog_path) == (
+        build_table_descriptions(minimal_spec),
+        build_column_descriptions(minimal_spec),
+    )
+
+
+def test_local_descriptions_prefer_the_cache_to_the_catalog(
+    tmp_path: Path, monkeypatch, minimal_spec: dict
+) -> None:
+    catalog_path = tmp_path / "catalog.json"
+    write_catalog(minimal_spec, "https://example.com/spec.json", path=catalog_path)
+    monkeypatch.setattr("ghtriage.annotations.CATALOG_PATH", catalog_path)
+    cache_path = tmp_path / ".ghtriage" / "descriptions.json"
+
+    assert local_descriptions("https://example.com/spec.json", cache_path) == read_catalog()
+    with FakeGitHubServer(FakeGitHub()) as server:
+        fetched = fetch_descriptions(server.spec_url, cache_path=cache_path)
+    assert local_descriptions(server.spec_url, cache_path) == fetched != read_catalog()
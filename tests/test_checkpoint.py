@@ -0,0 +1,114 @@
+import json
+from pathlib import Path
+
+import requests
+from requests import Response
+
+from ghtriage.checkpoint import PageCheckpoint, read_checkpoint
+
+URL = "https://api.github.com/repos/owner/repo/issues?per_page=100"
+NEXT_URL = URL + "&page=2"
+
+
+def _response(records: list, **headers) -> Response:
+    response = Response()
+    response.status_code = 200
+    response._content = json.dumps(records).encode()
+    response.headers.update(headers)
+    return response
+
+
+def _request(url: str) -> requests.PreparedRequest:
+    return requests.Request("GET", url).prepare()
+
+
+def test_staged_page_replays_with_its_body_and_link(tmp_path: Path) -> None:
+    checkpoint = PageCheckpoint(tmp_path / "checkpoint")
+    checkpoint.start("owner/repo", full=True)
+    link = f'<{NEXT_URL}>; rel="next"'
+    checkpoint.stage("issues", URL, _response([{"id": 1}, {"id": 2}], Link=link, Date="x"))
+
+    replayed = PageCheckpoint(tmp_path / "checkpoint").replay("issues", _request(URL))
+
+    assert replayed.status_code == 200
+    assert replayed.json() == [{"id": 1}, {"id": 2}]
+    assert replayed.headers["Link"] == link
+    assert "Date" not in replayed.headers
+    assert replayed.url == URL
+
+
+def test_resource_named_after_a_repo_is_staged_and_replayed(tmp_path: Path) -> None:
+    checkpoint = PageCheckpoint(tmp_path / "checkpoint")
+    checkpoint.start("owner/repo, owner/other", full=True)
+    checkpoint.stage("issues@owner/repo", URL, _response([{"id": 1}]))
+
+    resumed = PageCheckpoint(tmp_path / "checkpoint")
+
+    assert set(resumed.summary.resources) == {"issues@owner/repo"}
+    assert resumed.replay("issues@owner/repo", _request(URL)).json() == [{"id": 1}]
+
+
+def test_unstaged_page_is_not_replayed(tmp_path: Path) -> None:
+    checkpoint = PageCheckpoint(tmp_path / "checkpoint")
+    checkpoint.start("owner/repo", full=True)
+    checkpoint.stage("issues", URL, _response([{"id": 1}]))
+
+    assert checkpoint.replay("issues", _request(NEXT_URL)) is None
+    assert checkpoint.replay("review_comments", _request(URL)) is None
+
+
+def test_summary_reports_pages_records_and_last_url(tmp_path: Path) -> None:
+    checkpoint = PageCheckpoint(tmp_path / "checkpoint")
+    checkpoint.start("owner/repo", full=True)
+    checkpoint.stage("issues", URL, _response([{"id": 1}, {"id": 2}]))
+    checkpoint.stage("issues", NEXT_URL, _response([{"id": 3}]))
+
+    summary = read_checkpoint(tmp_path / "checkpoint")
+
+    assert summary.repo == "owner/repo"
+    assert summary.full is True
+    assert summary.pages == 2
+    assert summary.records == 3
+    assert summary.resources["issues"].last_url == NEXT_URL
+
+
+def test_log_line_cut_short_by_a_crash_is_ignored(tmp_path: Path) -> None:
+    checkpoint = PageCheckpoint(tmp_path / "checkpoint")
+    checkpoint.start("owner/repo", full=False)
+    checkpoint.stage("issues", URL, _response([{"id": 1}]))
+    with (tmp_path / "checkpoint" / "issues.jsonl").open("a", encoding="utf-8") as log:
+        log.write('{"url": "https://api.github.com/repos/own')
+
+    resumed = PageCheckpoint(tmp_path / "checkpoint")
+
+    assert resumed.summary.pages == 1
+    assert resumed.replay("issues", _request(URL)) is not None
+
+
+def test_start_keeps_pages_for_the_same_repo_only(tmp_path: Path) -> None:
+    checkpoint = PageCheckpoint(tmp_path / "checkpoint")
+    checkpoint.start("owner/repo", full=True)
+    checkpoint.stage("issues", URL, _response([{"id": 1}]))
+
+    same = PageCheckpoint(tmp_path / "checkpoint")
+    assert same.resumes("owner/repo")
+    same.start("owner/repo", full=True)
+    assert same.replay("issues", _request(URL)) is not None
+
+    other = PageCheckpoint(tmp_path / "checkpoint")
+    assert not other.resumes("owner/other")
+    other.start("owner/other", full=False)
+    assert other.replay("issues", _request(URL)) is None
+    assert read_checkpoint(tmp_path / "checkpoint").repo == "owner/other"
+
+
+def test_clear_removes_staged_pages(tmp_path: Path) -> None:
+    checkpoint = PageCheckpoint(tmp_path / "checkpoint")
+    checkpoint.start("owner/repo", full=True)
+    checkpoint.stage("issues", URL, _response([{"id": 1}]))
+
+    checkpoint.clear()
+
+    assert not (tmp_path / "checkpoint").exists()
+    assert read_checkpoint(tmp_path / "checkpoint") is None
+    assert checkpoint.summary is None
@@ -1,12 +1,18 @@
 import csv
+from datetime import datetime, timedelta, timezone
 import io
 import json
 from pathlib import Path
 
 import duckdb
 import pytest
+from requests import Response
 
+from ghtriage.checkpoint import PageCheckpoint
 from ghtriage.cli import run
+from ghtriage.lock import PullLock
+from ghtriage.pipeline import PULL_PROFILES
+from ghtriage.repair import Drift, RepairResult
 
 
 @pytest.fixture
@@ -209,7 +215,7 @@ def status_cwd(tmp_path: Path) -> Path:
 def test_status_shows_db_info(status_cwd: Path, monkeypatch, capsys) -> None:
     monkeypatch.chdir(status_cwd)
     monkeypatch.setenv("GITHUB_TOKEN", "tok")
-    monkeypatch.setattr("ghtriage.cli.resolve_repo", lambda: "owner/repo")
+    monkeypatch.setattr("ghtriage.cli.resolve_repos", lambda: ["owner/repo"])
 
     rc = run(["status"])
 
@@ -224,7 +230,7 @@ def test_status_shows_db_info(status_cwd: Path, monkeypatch, capsys) -> None:
 def test_status_not_yet_pulled_without_db(tmp_path: Path, monkeypatch, capsys) -> None:
     monkeypatch.chdir(tmp_path)
     monkeypatch.setenv("GITHUB_TOKEN", "tok")
-    monkeypatch.setattr("ghtriage.cli.resolve_repo", lambda: "owner/repo")
+    monkeypatch.setattr("ghtriage.cli.resolve_repos", lambda: ["owner/repo"])
 
     rc = run(["status"])
 
@@ -237,7 +243,7 @@ def test_status_not_yet_pulled_without_db(tmp_path: Path, monkeypatch, capsys) -
 def test_status_shows_mismatch_warning(status_cwd: Path, monkeypatch, capsys) -> None:
     monkeypatch.chdir(status_cwd)
     monkeypatch.setenv("GITHUB_TOKEN", "tok")
-    monkeypatch.setattr("ghtriage.cli.resolve_repo", lambda: "owner/other-repo")
+    monkeypatch.setattr("ghtriage.cli.resolve_repos", lambda: ["owner/other-repo"])
 
     rc = run(["status"])
 
@@ -252,7 +258,7 @@ def test_status_handles_missing_config_repo(status_cwd: Path, monkeypatch, capsy
     monkeypatch.chdir(status_cwd)
     monkeypatch.setenv("GITHUB_TOKEN", "tok")
     monkeypatch.setattr(
-        "ghtriage.cli.resolve_repo", lambda: (_ for _ in ()).throw(RuntimeError("no remote"))
+        "ghtriage.cli.resolve_repos", lambda: (_ for _ in ()).throw(RuntimeError("no remote"))
     )
 
     rc = run(["status"])
@@ -292,3 +298,478 @@ def test_schema_table_details_works_on_a_view(cwd_with_view: Path, monkeypatch,
     out = capsys.readouterr().out
     assert rc == 0
     assert "Pass-through of issues.id." in out
+
+
+def test_pull_passes_workers_to_run_pull(tmp_path: Path, monkeypatch, capsys) -> None:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GITHUB_TOKEN", "tok")
+    calls = []
+
+    def fake_run_pull(**kwargs):
+        calls.append(kwargs)
+        return "load info", None
+
+    monkeypatch.setattr("ghtriage.cli.run_pull", fake_run_pull)
+
+    rc = run(["pull", "--repo", "owner/repo", "--workers", "4"])
+
+    assert rc == 0
+    assert calls[0]["workers"] == 4
+    assert calls[0]["profile"] == PULL_PROFILES["default"]
+    assert "Pull completed for owner/repo" in capsys.readouterr().out
+
+
+def test_pull_rejects_non_positive_workers(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+
+    with pytest.raises(SystemExit) as exc_info:
+        run(["pull", "--repo", "owner/repo", "--workers", "0"])
+
+    assert exc_info.value.code == 2
+
+
+@pytest.mark.parametrize("command", ["pull", "watch"])
+def test_fast_profile_without_pyarrow_exits_with_a_message(
+    command: str, tmp_path: Path, monkeypatch, capsys
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("ghtriage.pipeline.importlib.util.find_spec", lambda name: None)
+
+    with pytest.raises(SystemExit) as exc_info:
+        run([command, "--repo", "owner/repo", "--profile", "fast"])
+
+    assert exc_info.value.code == 2
+    assert "pip install 'ghtriage[fast]'" in capsys.readouterr().err
+
+
+def test_status_shows_a_resumable_partial_pull(tmp_path: Path, monkeypatch, capsys) -> None:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GITHUB_TOKEN", "tok")
+    monkeypatch.setattr("ghtriage.cli.resolve_repos", lambda: ["owner/repo"])
+    checkpoint = PageCheckpoint(tmp_path / ".ghtriage" / "pipelines" / "checkpoint")
+    checkpoint.start("owner/repo", full=True)
+    response = Response()
+    response.status_code = 200
+    response._content = b'[{"id": 1}, {"id": 2}]'
+    checkpoint.stage("issues", "https://api.github.com/repos/owner/repo/issues", response)
+
+    rc = run(["status"])
+
+    out = capsys.readouterr().out
+    assert rc == 0
+    assert "not yet pulled" in out
+    assert "Partial pull: full pull of owner/repo" in out
+    assert "1 pages (2 records) fetched" in out
+
+
+def test_pull_notes_when_it_resumes(tmp_path: Path, monkeypatch, capsys) -> None:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GITHUB_TOKEN", "tok")
+    PageCheckpoint(tmp_path / ".ghtriage" / "pipelines" / "checkpoint").start(
+        "owner/repo", full=True
+    )
+    monkeypatch.setattr("ghtriage.cli.run_pull", lambda **kwargs: ("load info", None))
+
+    rc = run(["pull", "--repo", "owner/repo"])
+
+    assert rc == 0
+    assert "Note: resuming the pull started" in capsys.readouterr().err
+
+
+def test_pull_passes_only_and_reset_to_run_pull(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GITHUB_TOKEN", "tok")
+    calls = []
+
+    def fake_run_pull(**kwargs):
+        calls.append(kwargs)
+        return "load info", None
+
+    monkeypatch.setattr("ghtriage.cli.run_pull", fake_run_pull)
+
+    rc = run(
+        [
+            "pull",
+            "--repo",
+            "owner/repo",
+            "--only",
+            "issues,conversation_comments",
+            "--reset",
+            "review_comments",
+        ]
+    )
+
+    assert rc == 0
+    assert calls[0]["only"] == ["issues", "conversation_comments"]
+    assert calls[0]["reset"] == ["review_comments"]
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [
+        ["pull", "--only", "comments"],
+        ["pull", "--reset", ""],
+        ["pull", "--full", "--reset", "issues"],
+    ],
+)
+def test_pull_rejects_bad_resource_selection(tmp_path: Path, monkeypatch, argv) -> None:
+    monkeypatch.chdir(tmp_path)
+
+    with pytest.raises(SystemExit) as exc_info:
+        run(argv)
+
+    assert exc_info.value.code == 2
+
+
+def test_pull_org_pulls_every_listed_repo(tmp_path: Path, monkeypatch, capsys) -> None:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GITHUB_TOKEN", "tok")
+    calls = []
+
+    def fake_run_pull(**kwargs):
+        calls.append(kwargs)
+        return "load info", None
+
+    monkeypatch.setattr("ghtriage.cli.run_pull", fake_run_pull)
+    monkeypatch.setattr(
+        "ghtriage.cli.list_org_repos", lambda org, token, scheduler: [f"{org}/a", f"{org}/b"]
+    )
+
+    rc = run(["pull", "--org", "someorg"])
+
+    assert rc == 0
+    assert calls[0]["repo"] == ["someorg/a", "someorg/b"]
+    assert "Pull completed for someorg/a, someorg/b" in capsys.readouterr().out
+
+
+def test_pull_rejects_repo_together_with_org(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+
+    with pytest.raises(SystemExit) as exc_info:
+        run(["pull", "--repo", "owner/repo", "--org", "owner"])
+
+    assert exc_info.value.code == 2
+
+
+def test_status_shows_each_repos_last_pull(status_cwd: Path, monkeypatch, capsys) -> None:
+    db_path = status_cwd / ".ghtriage" / "ghtriage.duckdb"
+    with duckdb.connect(str(db_path)) as con:
+        con.execute(
+            "UPDATE github._ghtriage_meta SET value = 'owner/a,owner/b' WHERE key = 'repo'"
+        )
+        con.execute(
+            "INSERT INTO github._ghtriage_meta VALUES "
+            "('last_pull_at:owner/a', '2026-02-27T09:00:00Z'), "
+            "('last_pull_at:owner/b', '2026-02-28T14:22:57Z')"
+        )
+    monkeypatch.chdir(status_cwd)
+    monkeypatch.setenv("GITHUB_TOKEN", "tok")
+    monkeypatch.setattr("ghtriage.cli.resolve_repos", lambda: ["owner/b", "owner/a"])
+
+    rc = run(["status"])
+
+    out = capsys.readouterr().out
+    assert rc == 0
+    assert "DB repo:      owner/a, owner/b" in out
+    assert "owner/a  2026-02-27 09:00:00 UTC" in out
+    assert "WARNING" not in out
+
+
+def test_pull_passes_profile_to_run_pull(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GITHUB_TOKEN", "tok")
+    calls = []
+
+    def fake_run_pull(**kwargs):
+        calls.append(kwargs)
+        return "load info", None
+
+    monkeypatch.setattr("ghtriage.cli.run_pull", fake_run_pull)
+
+    rc = run(["pull", "--repo", "owner/repo", "--profile", "fast"])
+
+    assert rc == 0
+    assert calls[0]["profile"] == PULL_PROFILES["fast"]
+
+
+def test_pull_in_batches_reports_peak_memory(tmp_path: Path, monkeypatch, capsys) -> None:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GITHUB_TOKEN", "tok")
+    calls = []
+
+    def fake_run_pull(**kwargs):
+        calls.append(kwargs)
+        return "load info", None
+
+    monkeypatch.setattr("ghtriage.cli.run_pull", fake_run_pull)
+    monkeypatch.setattr("ghtriage.cli.peak_rss_mb", lambda: 123.4)
+
+    rc = run(["pull", "--repo", "owner/repo", "--batch-pages", "10"])
+
+    assert rc == 0
+    assert calls[0]["batch_pages"] == 10
+    assert "Peak memory: 123 MB" in capsys.readouterr().out
+
+
+def test_pull_since_passes_the_start_of_the_window(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GITHUB_TOKEN", "tok")
+    calls = []
+
+    def fake_run_pull(**kwargs):
+        calls.append(kwargs)
+        return "load info", None
+
+    monkeypatch.setattr("ghtriage.cli.run_pull", fake_run_pull)
+
+    assert run(["pull", "--repo", "owner/repo", "--since", "90d"]) == 0
+    assert run(["pull", "--repo", "owner/repo", "--backfill"]) == 0
+
+    since = datetime.strptime(calls[0]["since"], "%Y-%m-%dT%H:%M:%SZ")
+    age = datetime.now(timezone.utc) - since.replace(tzinfo=timezone.utc)
+    assert abs(age - timedelta(days=90)) < timedelta(minutes=1)
+    assert (calls[0]["backfill"], calls[1]["since"], calls[1]["backfill"]) == (False, None, True)
+    with pytest.raises(SystemExit) as exc_info:
+        run(["pull", "--repo", "owner/repo", "--since", "90d", "--batch-pages", "5"])
+    assert exc_info.value.code == 2
+
+
+def test_pull_refresh_descriptions_asks_for_a_download(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GITHUB_TOKEN", "tok")
+    calls = []
+
+    def fake_run_pull(**kwargs):
+        calls.append(kwargs)
+        return "load info", None
+
+    monkeypatch.setattr("ghtriage.cli.run_pull", fake_run_pull)
+
+    assert run(["pull", "--repo", "owner/repo"]) == 0
+    assert run(["pull", "--repo", "owner/repo", "--refresh-descriptions"]) == 0
+
+    assert [call["refresh_descriptions"] for call in calls] == [False, True]
+
+
+def test_pull_stats_json_prints_one_json_report(tmp_path: Path, monkeypatch, capsys) -> None:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GITHUB_TOKEN", "tok")
+
+    def fake_run_pull(**kwargs):
+        with kwargs["phase"]("extract"):
+            kwargs["stats"].for_resource("issues").requests += 2
+        return "load info", None
+
+    monkeypatch.setattr("ghtriage.cli.run_pull", fake_run_pull)
+
+    rc = run(["pull", "--repo", "owner/repo", "--stats", "json"])
+
+    report = json.loads(capsys.readouterr().out)
+    assert rc == 0
+    assert report["repos"] == ["owner/repo"]
+    assert report["phases"]["extract"]["requests"] == 2
+    assert report["resources"]["issues"]["requests"] == 2
+
+
+def test_pull_refuses_while_another_pull_holds_the_lock(
+    tmp_path: Path, monkeypatch, capsys
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GITHUB_TOKEN", "tok")
+    calls = []
+    monkeypatch.setattr("ghtriage.cli.run_pull", lambda **kwargs: calls.append(kwargs))
+
+    with PullLock(tmp_path / ".ghtriage" / "pull.lock"):
+        rc = run(["pull", "--repo", "owner/repo"])
+
+    assert rc == 1
+    assert calls == []
+    assert "Another pull is running" in capsys.readouterr().err
+
+
+def test_watch_pulls_on_the_given_interval(tmp_path: Path, monkeypatch, capsys) -> None:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GITHUB_TOKEN", "tok")
+    pulls = []
+
+    def fake_run_pull(**kwargs):
+        pulls.append(kwargs)
+        return "load info", None
+
+    def fake_watch(pull, *, interval, **kwargs):
+        assert interval == 120
+        print(pull())
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr("ghtriage.cli.run_pull", fake_run_pull)
+    monkeypatch.setattr("ghtriage.cli.watch", fake_watch)
+
+    rc = run(["watch", "--repo", "owner/repo", "--interval", "2m", "--workers", "2"])
+
+    out = capsys.readouterr().out
+    assert rc == 0
+    assert pulls[0]["repo"] == ["owner/repo"]
+    assert pulls[0]["workers"] == 2
+    assert "owner/repo: 0 requests" in out
+    assert "Stopped watching." in out
+
+
+def test_watch_rejects_a_malformed_interval(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+
+    with pytest.raises(SystemExit) as exc_info:
+        run(["watch", "--repo", "owner/repo", "--interval", "soon"])
+
+    assert exc_info.value.code == 2
+
+
+def test_status_shows_the_last_watch_cycle(status_cwd: Path, monkeypatch, capsys) -> None:
+    db_path = status_cwd / ".ghtriage" / "ghtriage.duckdb"
+    with duckdb.connect(str(db_path)) as con:
+        con.execute(
+            "INSERT INTO github._ghtriage_meta VALUES "
+            "('watch_last_cycle_at', '2026-02-28T14:20:00Z'), "
+            "('watch_last_error', 'RuntimeError: GitHub is down'), "
+            "('watch_next_pull_at', '2026-02-28T14:30:00Z')"
+        )
+    monkeypatch.chdir(status_cwd)
+    monkeypatch.setenv("GITHUB_TOKEN", "tok")
+
+    rc = run(["status"])
+
+    out = capsys.readouterr().out
+    assert rc == 0
+    assert "Last watch:   2026-02-28 14:20:00 UTC (failed: RuntimeError: GitHub is down)" in out
+    assert "Next watch:   2026-02-28 14:30:00 UTC" in out
+
+
+def test_webhook_serve_needs_a_secret(tmp_path: Path, monkeypatch, capsys) -> None:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("GHTRIAGE_WEBHOOK_SECRET", raising=False)
+
+    rc = run(["webhook-serve"])
+
+    assert rc == 1
+    assert "Missing webhook secret" in capsys.readouterr().err
+
+
+def test_webhook_serve_listens_until_interrupted(tmp_path: Path, monkeypatch, capsys) -> None:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GHTRIAGE_WEBHOOK_SECRET", "s3cret")
+
+    def fake_serve_forever(self) -> None:
+        assert self.secret == "s3cret"
+        assert self.writer.flush_interval == 0.5
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr("ghtriage.cli.WebhookServer.serve_forever", fake_serve_forever)
+
+    rc = run(["webhook-serve", "--port", "0", "--flush-interval", "0.5s"])
+
+    out = capsys.readouterr().out
+    assert rc == 0
+    assert "Listening for GitHub webhooks on http://127.0.0.1:" in out
+    assert "Stopped listening." in out
+
+
+def test_status_shows_the_last_webhook_batch(status_cwd: Path, monkeypatch, capsys) -> None:
+    db_path = status_cwd / ".ghtriage" / "ghtriage.duckdb"
+    with duckdb.connect(str(db_path)) as con:
+        con.execute(
+            "INSERT INTO github._ghtriage_meta VALUES "
+            "('webhook_last_applied_at', '2026-02-28T14:21:05Z')"
+        )
+    monkeypatch.chdir(status_cwd)
+    monkeypatch.setenv("GITHUB_TOKEN", "tok")
+
+    rc = run(["status"])
+
+    assert rc == 0
+    assert "Last webhook: 2026-02-28 14:21:05 UTC" in capsys.readouterr().out
+
+
+def test_status_shows_each_tokens_budget(status_cwd: Path, monkeypatch, capsys) -> None:
+    db_path = status_cwd / ".ghtriage" / "ghtriage.duckdb"
+    with duckdb.connect(str(db_path)) as con:
+        con.execute(
+            "INSERT INTO github._ghtriage_meta VALUES "
+            """('token_budget:#10 …wxyz', '{"remaining": null, "limit": null, """
+            """"reset_at": null, "revoked": true}'), """
+            """('token_budget:#2 …abcd', '{"remaining": 4210, "limit": 5000, """
+            """"reset_at": "2026-02-28T15:00:00Z", "revoked": false}')"""
+        )
+    monkeypatch.chdir(status_cwd)
+    monkeypatch.setenv("GITHUB_TOKEN", "one,two")
+
+    rc = run(["status"])
+
+    out = capsys.readouterr().out
+    assert rc == 0
+    assert "Token:        GITHUB_TOKEN (env, 2 tokens)" in out
+    abcd = "  #2 …abcd  4,210 of 5,000 left, resets 2026-02-28 15:00:00 UTC"
+    wxyz = "  #10 …wxyz  revoked; remove it from the token list"
+    # Listed in the tokens' order, not the labels' alphabetical order.
+    assert out.index(abcd) < out.index(wxyz)
+
+
+def test_status_shows_where_history_starts(status_cwd: Path, monkeypatch, capsys) -> None:
+    db_path = status_cwd / ".ghtriage" / "ghtriage.duckdb"
+    with duckdb.connect(str(db_path)) as con:
+        con.execute(
+            "INSERT INTO github._ghtriage_meta VALUES "
+            "('history_since:issues@owner/repo', '2026-01-01T00:00:00Z')"
+        )
+    monkeypatch.chdir(status_cwd)
+
+    rc = run(["status"])
+
+    out = capsys.readouterr().out
+    assert rc == 0
+    assert "History:      open items, and all updated since" in out
+    assert "  issues@owner/repo  2026-01-01 00:00:00 UTC" in out
+    assert "`ghtriage pull --backfill` fetches the rest" in out
+
+
+def test_repair_reports_what_it_fixed(tmp_path: Path, monkeypatch, capsys) -> None:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GITHUB_TOKEN", "tok")
+    calls = []
+
+    def fake_repair(token, **kwargs):
+        calls.append(kwargs)
+        drifted = [Drift("owner/repo", n, 100 + n, 3, 2) for n in range(1, 23)]
+        return RepairResult(
+            checked=500, drifted=drifted, requests=44, comments_merged=66, comments_deleted=1
+        )
+
+    monkeypatch.setattr("ghtriage.cli.repair", fake_repair)
+
+    rc = run(["repair", "--repo", "owner/repo"])
+
+    out = capsys.readouterr().out
+    assert rc == 0
+    assert calls[0]["repos"] == ["owner/repo"]
+    assert "Checked 500 issues; 22 have drifted." in out
+    assert "  owner/repo#1: 3 comments on GitHub, 2 stored" in out
+    assert "  ... and 2 more" in out
+    assert "Repaired 22 issues in 44 requests: 66 comments merged, 1 deleted." in out
+
+
+def test_repair_dry_run_needs_no_token(tmp_path: Path, monkeypatch, capsys) -> None:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+    calls = []
+
+    def fake_repair(token, **kwargs):
+        calls.append(kwargs)
+        return RepairResult(checked=10, drifted=[Drift("owner/repo", 4, 104, 1, 0)])
+
+    monkeypatch.setattr("ghtriage.cli.repair", fake_repair)
+
+    rc = run(["repair", "--dry-run"])
+
+    out = capsys.readouterr().out
+    assert rc == 0
+    assert calls == [{"repos": None, "dry_run": True}]
+    assert "owner/repo#4" in out
+    assert "Repaired" not in out
@@ -0,0 +1,543 @@
+import io
+import json
+from pathlib import Path
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+from requests import PreparedRequest, Response
+from requests.adapters import HTTPAdapter
+
+from ghtriage.checkpoint import PageCheckpoint
+from ghtriage.client import (
+    FETCH_AHEAD_PAGES,
+    SECONDARY_LIMIT_BACKOFF_SECONDS,
+    ConditionalRequests,
+    GitHubAdapter,
+    RateLimitScheduler,
+    RequestStats,
+    TokenPool,
+    build_session,
+)
+
+BASE_URL = "https://api.github.com/repos/owner/repo/"
+RESOURCE_PATHS = {"issues": "issues", "review_comments": "pulls/comments"}
+FIRST_PAGE = BASE_URL + "issues?per_page=100&since=2026-03-01T00%3A00%3A00Z"
+
+
+def _request(url: str) -> PreparedRequest:
+    request = PreparedRequest()
+    request.prepare(method="GET", url=url)
+    return request
+
+
+def _response(status_code: int, body: bytes = b"", **headers: str) -> Response:
+    response = Response()
+    response.status_code = status_code
+    response._content = body
+    response.raw = io.BytesIO(body)
+    response.headers.update(headers)
+    return response
+
+
+def _budget(remaining: int, reset: int, limit: int = 5000) -> dict[str, str]:
+    return {
+        "X-RateLimit-Limit": str(limit),
+        "X-RateLimit-Remaining": str(remaining),
+        "X-RateLimit-Reset": str(reset),
+    }
+
+
+class _FakeTime:
+    def __init__(self, now: float = 1_000.0) -> None:
+        self.now = now
+        self.sleeps: list[float] = []
+
+    def clock(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _scheduler(fake_time: _FakeTime) -> RateLimitScheduler:
+    return RateLimitScheduler(clock=fake_time.clock, sleep=fake_time.sleep)
+
+
+class _FakeTransport:
+    """Stands in for HTTPAdapter.send: answers from a queue, records what was sent."""
+
+    def __init__(self, *responses: Response) -> None:
+        self.responses = list(responses)
+        self.sent: list[PreparedRequest] = []
+
+    def __call__(self, request, *args, **kwargs) -> Response:
+        self.sent.append(request.copy())
+        return self.responses.pop(0)
+
+
+def test_adapter_attributes_requests_to_resources(monkeypatch) -> None:
+    transport = _FakeTransport(_response(200), _response(200), _response(200))
+    monkeypatch.setattr(HTTPAdapter, "send", transport)
+    stats = RequestStats()
+    adapter = GitHubAdapter(BASE_URL, RESOURCE_PATHS, stats=stats)
+
+    adapter.send(_request(BASE_URL + "issues?per_page=100"))
+    adapter.send(_request(BASE_URL + "pulls/comments?page=2"))
+    adapter.send(_request("https://api.github.com/rate_limit"))
+
+    assert stats.for_resource("issues").requests == 1
+    assert stats.for_resource("review_comments").requests == 1
+    assert stats.requests == 2
+
+
+def test_adapter_counts_pages_and_whether_another_follows(monkeypatch) -> None:
+    next_link = f'<{BASE_URL}issues?page=2>; rel="next"'
+    transport = _FakeTransport(
+        _response(200, b"[]", Link=next_link),
+        _response(200, b"[]"),
+        _response(304),
+    )
+    monkeypatch.setattr(HTTPAdapter, "send", transport)
+    stats = RequestStats()
+    adapter = GitHubAdapter(BASE_URL, RESOURCE_PATHS, stats=stats)
+
+    adapter.send(_request(BASE_URL + "issues"))
+    assert stats.for_resource("issues").has_next
+    adapter.send(_request(BASE_URL + "issues?page=2"))
+    assert not stats.for_resource("issues").has_next
+    adapter.send(_request(BASE_URL + "issues"))
+
+    assert stats.for_resource("issues").pages == 2
+    assert stats.for_resource("issues").requests == 3
+
+
+def test_adapter_sends_stored_validators_on_matching_first_page(
+    tmp_path: Path, monkeypatch
+) -> None:
+    path = tmp_path / "conditional_requests.json"
+    path.write_text(
+        json.dumps({"issues": {"url": FIRST_PAGE, "etag": '"abc"', "last_modified": "Sun"}}),
+        encoding="utf-8",
+    )
+    transport = _FakeTransport(_response(304), _response(200))
+    monkeypatch.setattr(HTTPAdapter, "send", transport)
+    stats = RequestStats()
+    adapter = GitHubAdapter(
+        BASE_URL, RESOURCE_PATHS, stats=stats, conditional=ConditionalRequests(path)
+    )
+
+    adapter.send(_request(FIRST_PAGE))
+    adapter.send(_request(BASE_URL + "issues?per_page=100&since=2026-04-01T00%3A00%3A00Z"))
+
+    assert transport.sent[0].headers["If-None-Match"] == '"abc"'
+    assert transport.sent[0].headers["If-Modified-Since"] == "Sun"
+    # A moved cursor is a different first page: no stale validator is sent.
+    assert "If-None-Match" not in transport.sent[1].headers
+    assert stats.not_modified == 1
+
+
+def test_adapter_never_makes_later_pages_conditional(tmp_path: Path, monkeypatch) -> None:
+    page_two = BASE_URL + "issues?per_page=100&page=2"
+    path = tmp_path / "conditional_requests.json"
+    path.write_text(json.dumps({"issues": {"url": page_two, "etag": '"abc"'}}), encoding="utf-8")
+    transport = _FakeTransport(_response(200, ETag='"def"'))
+    monkeypatch.setattr(HTTPAdapter, "send", transport)
+    conditional = ConditionalRequests(path)
+    adapter = GitHubAdapter(BASE_URL, RESOURCE_PATHS, conditional=conditional)
+
+    adapter.send(_request(page_two))
+    conditional.save()
+
+    assert "If-None-Match" not in transport.sent[0].headers
+    assert json.loads(path.read_text(encoding="utf-8"))["issues"]["etag"] == '"abc"'
+
+
+def test_conditional_requests_hold_new_validators_until_saved(tmp_path: Path, monkeypatch) -> None:
+    path = tmp_path / "conditional_requests.json"
+    transport = _FakeTransport(_response(200, ETag='"abc"', **{"Last-Modified": "Sun"}))
+    monkeypatch.setattr(HTTPAdapter, "send", transport)
+    conditional = ConditionalRequests(path)
+    adapter = GitHubAdapter(BASE_URL, RESOURCE_PATHS, conditional=conditional)
+
+    adapter.send(_request(FIRST_PAGE))
+
+    assert not path.exists()
+    conditional.save()
+    stored = json.loads(path.read_text(encoding="utf-8"))
+    assert stored["issues"] == {"url": FIRST_PAGE, "etag": '"abc"', "last_modified": "Sun"}
+    assert ConditionalRequests(path).headers_for("issues", FIRST_PAGE) == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Sun",
+    }
+
+
+def test_conditional_requests_tolerate_corrupt_file(tmp_path: Path) -> None:
+    path = tmp_path / "conditional_requests.json"
+    path.write_text("{not json", encoding="utf-8")
+
+    assert ConditionalRequests(path).headers_for("issues", FIRST_PAGE) == {}
+
+
+def test_build_session_mounts_adapter() -> None:
+    adapter = GitHubAdapter(BASE_URL, RESOURCE_PATHS)
+
+    session = build_session(adapter)
+
+    assert session.get_adapter(FIRST_PAGE) is adapter
+
+
+def test_scheduler_does_not_wait_while_budget_is_plentiful() -> None:
+    fake_time = _FakeTime()
+    scheduler = _scheduler(fake_time)
+    scheduler.observe(_response(200, **_budget(remaining=4000, reset=4_600)))
+
+    for _ in range(3):
+        scheduler.acquire()
+        scheduler.release()
+
+    assert fake_time.sleeps == []
+    assert scheduler.remaining == 3997
+
+
+def test_scheduler_spreads_a_scarce_budget_over_the_window() -> None:
+    fake_time = _FakeTime()
+    scheduler = _scheduler(fake_time)
+    scheduler.observe(_response(200, **_budget(remaining=105, reset=2_000)))
+
+    for _ in range(3):
+        scheduler.acquire()
+        scheduler.release()
+
+    # 1,000 seconds left for ~100 usable requests: roughly one every ten seconds.
+    assert len(fake_time.sleeps) == 2
+    assert all(9 < seconds < 11 for seconds in fake_time.sleeps)
+
+
+def test_scheduler_holds_requests_until_reset_when_exhausted() -> None:
+    fake_time = _FakeTime()
+    scheduler = _scheduler(fake_time)
+    scheduler.observe(_response(200, **_budget(remaining=2, reset=1_300)))
+
+    scheduler.acquire()
+    scheduler.release()
+
+    assert fake_time.now >= 1_300
+
+
+def test_adapter_retries_after_retry_after_and_keeps_going(monkeypatch) -> None:
+    fake_time = _FakeTime()
+    transport = _FakeTransport(
+        _response(429, **{"Retry-After": "30"}),
+        _response(200, **_budget(remaining=4999, reset=4_600)),
+    )
+    monkeypatch.setattr(HTTPAdapter, "send", transport)
+    stats = RequestStats()
+    adapter = GitHubAdapter(BASE_URL, RESOURCE_PATHS, stats=stats, scheduler=_scheduler(fake_time))
+
+    response = adapter.send(_request(BASE_URL + "issues?page=7"))
+
+    assert response.status_code == 200
+    assert len(transport.sent) == 2
+    assert fake_time.sleeps == [30]
+    assert stats.for_resource("issues").rate_limited == 1
+    assert stats.for_resource("issues").budget_used == 2
+
+
+def test_adapter_waits_for_reset_on_exhausted_primary_limit(monkeypatch) -> None:
+    fake_time = _FakeTime()
+    transport = _FakeTransport(
+        _response(403, b"API rate limit exceeded", **_budget(remaining=0, reset=1_500)),
+        _response(200, **_budget(remaining=5000, reset=5_000)),
+    )
+    monkeypatch.setattr(HTTPAdapter, "send", transport)
+    adapter = GitHubAdapter(BASE_URL, RESOURCE_PATHS, scheduler=_scheduler(fake_time))
+
+    response = adapter.send(_request(BASE_URL + "issues"))
+
+    assert response.status_code == 200
+    assert fake_time.now >= 1_500
+
+
+def test_adapter_backs_off_on_secondary_limit_without_retry_after(monkeypatch) -> None:
+    fake_time = _FakeTime()
+    transport = _FakeTransport(
+        _response(403, b"You have exceeded a secondary rate limit"),
+        _response(200),
+    )
+    monkeypatch.setattr(HTTPAdapter, "send", transport)
+    adapter = GitHubAdapter(BASE_URL, RESOURCE_PATHS, scheduler=_scheduler(fake_time))
+
+    adapter.send(_request(BASE_URL + "issues"))
+
+    assert fake_time.sleeps == [SECONDARY_LIMIT_BACKOFF_SECONDS]
+
+
+def test_adapter_does_not_retry_a_permission_error(monkeypatch) -> None:
+    fake_time = _FakeTime()
+    transport = _FakeTransport(_response(403, b"Resource not accessible by integration"))
+    monkeypatch.setattr(HTTPAdapter, "send", transport)
+    adapter = GitHubAdapter(BASE_URL, RESOURCE_PATHS, scheduler=_scheduler(fake_time))
+
+    response = adapter.send(_request(BASE_URL + "issues"))
+
+    assert response.status_code == 403
+    assert len(transport.sent) == 1
+    assert fake_time.sleeps == []
+
+
+def test_adapters_sharing_a_scheduler_share_the_budget(monkeypatch) -> None:
+    fake_time = _FakeTime()
+    scheduler = _scheduler(fake_time)
+    transport = _FakeTransport(
+        _response(200, **_budget(remaining=3, reset=2_000)), _response(200), _response(200)
+    )
+    monkeypatch.setattr(HTTPAdapter, "send", transport)
+    first = GitHubAdapter(BASE_URL, RESOURCE_PATHS, scheduler=scheduler)
+    other_repo = "https://api.github.com/repos/owner/other/"
+    second = GitHubAdapter(other_repo, RESOURCE_PATHS, scheduler=scheduler)
+
+    first.send(_request(BASE_URL + "issues"))
+    second.send(_request(other_repo + "issues"))
+
+    # The first repository's response exhausted the token for both.
+    assert fake_time.now >= 2_000
+
+
+def _pool(fake_time: _FakeTime, *tokens: str) -> TokenPool:
+    return TokenPool(tokens, clock=fake_time.clock, sleep=fake_time.sleep)
+
+
+def test_pool_sends_each_request_on_the_token_with_the_most_budget(monkeypatch) -> None:
+    fake_time = _FakeTime()
+    transport = _FakeTransport(
+        _response(200, **_budget(remaining=4000, reset=4_600)),
+        _response(200, **_budget(remaining=2000, reset=4_600)),
+        _response(200, **_budget(remaining=3999, reset=4_600)),
+        _response(200, **_budget(remaining=3998, reset=4_600)),
+    )
+    monkeypatch.setattr(HTTPAdapter, "send", transport)
+    pool = _pool(fake_time, "first", "second")
+    adapter = GitHubAdapter(BASE_URL, RESOURCE_PATHS, scheduler=pool)
+
+    for _ in range(4):
+        adapter.send(_request(BASE_URL + "issues"))
+
+    # A token not used yet counts as having its whole budget.
+    assert [request.headers["Authorization"] for request in transport.sent] == [
+        "Bearer first",
+        "Bearer second",
+        "Bearer first",
+        "Bearer first",
+    ]
+    assert (pool.remaining, pool.limit) == (5998, 10000)
+
+
+def test_pool_passes_over_an_exhausted_token_until_it_resets(monkeypatch) -> None:
+    fake_time = _FakeTime()
+    transport = _FakeTransport(
+        _response(403, b"API rate limit exceeded", **_budget(remaining=0, reset=4_600)),
+        _response(200, **_budget(remaining=10, reset=4_000)),
+        _response(200, **_budget(remaining=9, reset=4_000)),
+    )
+    monkeypatch.setattr(HTTPAdapter, "send", transport)
+    adapter = GitHubAdapter(BASE_URL, RESOURCE_PATHS, scheduler=_pool(fake_time, "a", "b"))
+
+    response = adapter.send(_request(BASE_URL + "issues"))
+    adapter.send(_request(BASE_URL + "issues"))
+
+    assert response.status_code == 200
+    assert [request.headers["Authorization"] for request in transport.sent] == [
+        "Bearer a",
+        "Bearer b",
+        "Bearer b",
+    ]
+    # The rate-limited answer was retried at once, on the other token.
+    assert fake_time.sleeps == []
+
+
+def test_pool_drops_a_revoked_token(monkeypatch, capsys) -> None:
+    fake_time = _FakeTime()
+    transport = _FakeTransport(
+        _response(401, b"Bad credentials"),
+        _response(200, **_budget(remaining=4999, reset=4_600)),
+        _response(200, **_budget(remaining=4998, reset=4_600)),
+    )
+    monkeypatch.setattr(HTTPAdapter, "send", transport)
+    pool = _pool(fake_time, "revoked-1234", "good-5678")
+    adapter = GitHubAdapter(BASE_URL, RESOURCE_PATHS, scheduler=pool)
+
+    assert adapter.send(_request(BASE_URL + "issues")).status_code == 200
+    adapter.send(_request(BASE_URL + "issues"))
+
+    assert [request.headers["Authorization"] for request in transport.sent] == [
+        "Bearer revoked-1234",
+        "Bearer good-5678",
+        "Bearer good-5678",
+    ]
+    assert "GitHub rejected token #1 …1234" in capsys.readouterr().err
+    assert pool.budgets() == {
+        "#1 …1234": {"remaining": None, "limit": None, "reset_at": None, "revoked": True},
+        "#2 …5678": {
+            "remaining": 4998,
+            "limit": 5000,
+            "reset_at": "1970-01-01T01:16:40Z",
+            "revoked": False,
+        },
+    }
+
+
+def test_pool_keeps_tokens_that_share_their_last_characters_apart() -> None:
+    pool = TokenPool(["alpha-1234", "beta-1234"])
+
+    assert list(pool.budgets()) == ["#1 …1234", "#2 …1234"]
+
+
+def test_pool_returns_the_rejection_once_every_token_is_revoked(monkeypatch) -> None:
+    fake_time = _FakeTime()
+    transport = _FakeTransport(_response(401, b"Bad credentials"))
+    monkeypatch.setattr(HTTPAdapter, "send", transport)
+    pool = _pool(fake_time, "only")
+    adapter = GitHubAdapter(BASE_URL, RESOURCE_PATHS, scheduler=pool)
+
+    assert adapter.send(_request(BASE_URL + "issues")).status_code == 401
+    assert pool.live == []
+
+
+class _PagedTransport:
+    """Stands in for HTTPAdapter.send: answers each page of the issues list by its URL,
+    from any thread."""
+
+    def __init__(self, pages: int, *, numbered: bool = True) -> None:
+        self.pages = pages
+        self.numbered = numbered
+        self.sent: list[str] = []
+        self._lock = threading.Lock()
+
+    def url(self, page: int) -> str:
+        return BASE_URL + f"issues?per_page=100&page={page}"
+
+    def __call__(self, request, *args, **kwargs) -> Response:
+        with self._lock:
+            self.sent.append(request.url)
+        page = int(parse_qs(urlsplit(request.url).query).get("page", ["1"])[0])
+        links = []
+        if page < self.pages:
+            links.append(f'<{self.url(page + 1)}>; rel="next"')
+            if self.numbered:
+                links.append(f'<{self.url(self.pages)}>; rel="last"')
+        return _response(200, json.dumps([{"id": page}]).encode(), Link=", ".join(links))
+
+
+def _walk(adapter: GitHubAdapter, url: str) -> list[int]:
+    """Follow the next links from `url`, as the paginator does; return the ids read."""
+    ids = []
+    while url:
+        response = adapter.send(_request(url))
+        ids.extend(record["id"] for record in response.json())
+        url = response.links.get("next", {}).get("url")
+    return ids
+
+
+def test_adapter_fetches_numbered_pages_ahead_of_the_paginator(monkeypatch) -> None:
+    transport = _PagedTransport(pages=20)
+    monkeypatch.setattr(HTTPAdapter, "send", transport)
+    stats = RequestStats()
+    adapter = GitHubAdapter(BASE_URL, RESOURCE_PATHS, stats=stats, fetch_ahead={"issues"})
+
+    first = adapter.send(_request(BASE_URL + "issues?per_page=100"))
+    # The window is in flight before the paginator asks for the second page.
+    deadline = time.monotonic() + 5
+    while len(transport.sent) < 1 + FETCH_AHEAD_PAGES and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(transport.sent) == 1 + FETCH_AHEAD_PAGES
+
+    ids = _walk(adapter, first.links["next"]["url"])
+    adapter.close()
+
+    assert ids == list(range(2, 21))
+    # Each page was requested once, and counted once it was handed over.
+    assert sorted(transport.sent) == sorted(
+        [BASE_URL + "issues?per_page=100", *map(transport.url, range(2, 21))]
+    )
+    assert (stats.requests, stats.pages) == (20, 20)
+    assert not stats.for_resource("issues").has_next
+
+
+def test_adapter_follows_pages_one_by_one_without_a_last_link(monkeypatch) -> None:
+    transport = _PagedTransport(pages=5, numbered=False)
+    monkeypatch.setattr(HTTPAdapter, "send", transport)
+    adapter = GitHubAdapter(BASE_URL, RESOURCE_PATHS, fetch_ahead={"issues"})
+
+    assert _walk(adapter, BASE_URL + "issues?per_page=100") == [1, 2, 3, 4, 5]
+    assert transport.sent == [BASE_URL + "issues?per_page=100", *map(transport.url, range(2, 6))]
+
+
+def test_adapter_fetches_ahead_only_for_the_resources_named(monkeypatch) -> None:
+    transport = _PagedTransport(pages=5)
+    monkeypatch.setattr(HTTPAdapter, "send", transport)
+    adapter = GitHubAdapter(BASE_URL, RESOURCE_PATHS)
+
+    assert _walk(adapter, BASE_URL + "issues?per_page=100") == [1, 2, 3, 4, 5]
+    assert transport.sent == [BASE_URL + "issues?per_page=100", *map(transport.url, range(2, 6))]
+
+
+def test_adapter_replays_staged_pages_without_sending(tmp_path: Path, monkeypatch) -> None:
+    page_two = BASE_URL + "issues?per_page=100&page=2"
+    transport = _FakeTransport(
+        _response(200, b'[{"id": 1}]', Link=f'<{page_two}>; rel="next"'),
+        _response(200, b'[{"id": 2}]'),
+    )
+    monkeypatch.setattr(HTTPAdapter, "send", transport)
+    checkpoint = PageCheckpoint(tmp_path / "checkpoint")
+    checkpoint.start("owner/repo", full=True)
+    first = GitHubAdapter(BASE_URL, RESOURCE_PATHS, checkpoint=checkpoint)
+    first.send(_request(BASE_URL + "issues?per_page=100"))
+
+    stats = RequestStats()
+    resumed = GitHubAdapter(
+        BASE_URL, RESOURCE_PATHS, stats=stats, checkpoint=PageCheckpoint(tmp_path / "checkpoint")
+    )
+    replayed = resumed.send(_request(BASE_URL + "issues?per_page=100"))
+    fetched = resumed.send(_request(page_two))
+
+    assert replayed.json() == [{"id": 1}]
+    assert replayed.headers["Link"] == f'<{page_two}>; rel="next"'
+    assert fetched.json() == [{"id": 2}]
+    assert [request.url for request in transport.sent] == [
+        BASE_URL + "issues?per_page=100",
+        page_two,
+    ]
+    assert stats.replayed == 1
+    assert stats.requests == 1
+
+
+def test_adapter_attributes_dependent_requests_without_making_them_conditional(
+    tmp_path: Path, monkeypatch
+) -> None:
+    reviews = BASE_URL + "pulls/12/reviews?per_page=100"
+    path = tmp_path / "conditional_requests.json"
+    transport = _FakeTransport(_response(200, b"[]", ETag='"abc"'), _response(200, b"[]"))
+    monkeypatch.setattr(HTTPAdapter, "send", transport)
+    stats = RequestStats()
+    conditional = ConditionalRequests(path)
+    checkpoint = PageCheckpoint(tmp_path / "checkpoint")
+    checkpoint.start("owner/repo", full=True)
+    adapter = GitHubAdapter(
+        BASE_URL,
+        {**RESOURCE_PATHS, "reviews": "pulls/{number}/reviews"},
+        stats=stats,
+        conditional=conditional,
+        checkpoint=checkpoint,
+    )
+
+    adapter.send(_request(reviews))
+    adapter.send(_request(reviews))
+    conditional.save()
+
+    assert stats.for_resource("reviews").requests == 2
+    assert adapter.resource_for(BASE_URL + "pulls/comments") == "review_comments"
+    assert adapter.resource_for(BASE_URL + "pulls/12/reviews/3") is None
+    assert "If-None-Match" not in transport.sent[1].headers
+    assert stats.replayed == 0
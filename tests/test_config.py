@@ -5,9 +5,15 @@ import pytest
 from ghtriage.config import (
     get_ghtriage_dir,
     parse_git_remote,
+    resolve_fields,
     resolve_repo,
+    resolve_repos,
     resolve_token,
+    resolve_tokens,
+    resolve_webhook_secret,
+    validate_org,
 )
+from ghtriage.fields import DEFAULT_FIELDS
 
 
 @pytest.mark.parametrize(
@@ -76,6 +82,33 @@ def test_resolve_token_returns_not_configured_when_missing(tmp_path: Path) -> No
     assert source == "not configured"
 
 
+def test_resolve_tokens_reads_several_tokens(tmp_path: Path) -> None:
+    ghtriage_dir = get_ghtriage_dir(cwd=tmp_path)
+    (ghtriage_dir / "token").write_text("first\nsecond, third\n\nfirst\n", encoding="utf-8")
+
+    assert resolve_tokens(cwd=tmp_path, env={}) == (
+        ["first", "second", "third"],
+        ".ghtriage/token (file, 3 tokens)",
+    )
+    assert resolve_token(cwd=tmp_path, env={})[0] == "first"
+    assert resolve_tokens(cwd=tmp_path, env={"GITHUB_TOKEN": "a,b"}) == (
+        ["a", "b"],
+        "GITHUB_TOKEN (env, 2 tokens)",
+    )
+
+
+def test_resolve_webhook_secret_prefers_environment_then_file(tmp_path: Path) -> None:
+    assert resolve_webhook_secret(cwd=tmp_path, env={}) == (None, "not configured")
+    ghtriage_dir = get_ghtriage_dir(cwd=tmp_path)
+    (ghtriage_dir / "webhook_secret").write_text("file-secret\n", encoding="utf-8")
+
+    assert resolve_webhook_secret(cwd=tmp_path, env={})[0] == "file-secret"
+    secret, source = resolve_webhook_secret(
+        cwd=tmp_path, env={"GHTRIAGE_WEBHOOK_SECRET": "env-secret"}
+    )
+    assert (secret, source) == ("env-secret", "GHTRIAGE_WEBHOOK_SECRET (env)")
+
+
 def test_resolve_repo_precedence_cli_over_config_over_git(
     tmp_path: Path, monkeypatch: pytest.MonkeyPatch
 ) -> None:
@@ -109,3 +142,79 @@ def test_resolve_repo_raises_on_invalid_config_toml(tmp_path: Path) -> None:
 
     with pytest.raises(RuntimeError):
         resolve_repo(cwd=tmp_path)
+
+
+def test_resolve_repos_reads_repo_list_from_config(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    ghtriage_dir = get_ghtriage_dir(cwd=tmp_path)
+    (ghtriage_dir / "config.toml").write_text(
+        '[repo]\ndefault = "owner/a"\nrepos = ["owner/b", " owner/c ", "owner/b"]\n',
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(
+        "ghtriage.config.get_git_remote_origin",
+        lambda cwd=None: "git@github.com:owner/from-git.git",
+    )
+
+    assert resolve_repos(cwd=tmp_path) == ["owner/b", "owner/c"]
+    assert resolve_repos(cli_repo="owner/from-cli", cwd=tmp_path) == ["owner/from-cli"]
+
+
+def test_resolve_repos_falls_back_to_a_single_repo(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(
+        "ghtriage.config.get_git_remote_origin",
+        lambda cwd=None: "https://github.com/owner/from-git.git",
+    )
+    assert resolve_repos(cwd=tmp_path) == ["owner/from-git"]
+
+
+@pytest.mark.parametrize("repos", ['"owner/a"', '["owner/a", 3]', '["not-a-slug"]'])
+def test_resolve_repos_rejects_invalid_repo_list(tmp_path: Path, repos: str) -> None:
+    ghtriage_dir = get_ghtriage_dir(cwd=tmp_path)
+    (ghtriage_dir / "config.toml").write_text(f"[repo]\nrepos = {repos}\n", encoding="utf-8")
+
+    with pytest.raises((RuntimeError, ValueError)):
+        resolve_repos(cwd=tmp_path)
+
+
+def test_resolve_fields_reads_the_field_set_from_config(tmp_path: Path) -> None:
+    assert resolve_fields(cwd=tmp_path) is DEFAULT_FIELDS
+
+    config_path = get_ghtriage_dir(cwd=tmp_path) / "config.toml"
+    config_path.write_text('[pull]\nfields = "all"\n', encoding="utf-8")
+    assert resolve_fields(cwd=tmp_path) is None
+
+    config_path.write_text('[pull]\nfields = "some"\n', encoding="utf-8")
+    with pytest.raises(RuntimeError, match=r"Invalid \[pull\]\.fields"):
+        resolve_fields(cwd=tmp_path)
+
+
+def test_resolve_fields_adds_extra_fields_to_the_default(tmp_path: Path) -> None:
+    config_path = get_ghtriage_dir(cwd=tmp_path) / "config.toml"
+    config_path.write_text(
+        '[pull.extra_fields]\nissues = ["active_lock_reason", "closed_by.login"]\n',
+        encoding="utf-8",
+    )
+
+    fields = resolve_fields(cwd=tmp_path)
+
+    assert fields["issues"]["active_lock_reason"] is None
+    assert fields["issues"]["closed_by"] == {"login": None}
+    assert fields["pull_requests"] == DEFAULT_FIELDS["pull_requests"]
+
+    config_path.write_text('[pull.extra_fields]\ndiscussions = ["id"]\n', encoding="utf-8")
+    with pytest.raises(RuntimeError, match=r"Invalid \[pull\.extra_fields\].*discussions"):
+        resolve_fields(cwd=tmp_path)
+
+    config_path.write_text('[pull.extra_fields]\nissues = "title"\n', encoding="utf-8")
+    with pytest.raises(RuntimeError, match=r"Invalid \[pull\.extra_fields\]"):
+        resolve_fields(cwd=tmp_path)
+
+
+def test_validate_org() -> None:
+    assert validate_org(" some-org ") == "some-org"
+    with pytest.raises(ValueError):
+        validate_org("some/org")
@@ -0,0 +1,87 @@
+import pytest
+
+from ghtriage.fields import (
+    DEFAULT_FIELDS,
+    USER,
+    project,
+    split_users,
+    with_extra_fields,
+    with_fields,
+)
+
+
+def test_project_keeps_only_the_named_fields_at_every_level() -> None:
+    record = {
+        "id": 1,
+        "node_id": "I_1",
+        "user": {"login": "octocat", "avatar_url": "https://avatars.example/1"},
+        "labels": [{"name": "bug", "url": "https://api.example/labels/bug"}, {"name": "docs"}],
+        "milestone": None,
+        "body": {"kept": "whole"},
+    }
+    projection = {
+        "id": None,
+        "user": {"login": None},
+        "labels": {"name": None},
+        "milestone": {"title": None},
+        "body": None,
+        "closed_at": None,
+    }
+
+    assert project(record, projection) == {
+        "id": 1,
+        "user": {"login": "octocat"},
+        "labels": [{"name": "bug"}, {"name": "docs"}],
+        "milestone": None,
+        "body": {"kept": "whole"},
+    }
+
+
+def test_default_fields_keep_what_records_are_keyed_and_merged_on() -> None:
+    for kind, projection in DEFAULT_FIELDS.items():
+        assert {"id", "repo", "user"} <= set(projection), kind
+    for kind in ("issues", "pull_requests", "conversation_comments", "review_comments"):
+        assert "updated_at" in DEFAULT_FIELDS[kind], kind
+
+
+def test_split_users_leaves_the_id_and_login_of_each_user() -> None:
+    alice = {"id": 1, "login": "alice", "type": "User", "site_admin": False}
+    bot = {"id": 2, "login": "ci[bot]", "type": "Bot"}
+    record = {"id": 10, "user": bot, "assignee": None, "assignees": [alice, bot], "title": "t"}
+
+    split, users = split_users(record)
+
+    assert split == {
+        "id": 10,
+        "user": {"id": 2, "login": "ci[bot]"},
+        "assignee": None,
+        "assignees": [{"id": 1, "login": "alice"}, {"id": 2, "login": "ci[bot]"}],
+        "title": "t",
+    }
+    assert users == [bot, alice, bot]
+    assert record["user"] is bot
+
+
+def test_with_fields_adds_fields_and_nested_paths_without_changing_the_original() -> None:
+    projection = {"id": None, "user": USER, "body": None}
+
+    extended = with_fields(projection, ["closed_by.login", "user.site_admin", "body.text"])
+
+    assert extended == {
+        "id": None,
+        "user": {**USER, "site_admin": None},
+        "body": None,
+        "closed_by": {"login": None},
+    }
+    assert "site_admin" not in USER
+
+
+def test_with_extra_fields_extends_the_default_for_known_resources() -> None:
+    fields = with_extra_fields({"issues": ["active_lock_reason"]})
+
+    assert fields["issues"] == {**DEFAULT_FIELDS["issues"], "active_lock_reason": None}
+    assert fields["reviews"] == DEFAULT_FIELDS["reviews"]
+    with pytest.raises(ValueError, match="Unknown resource: discussions"):
+        with_extra_fields({"discussions": ["id"]})
+    with pytest.raises(ValueError, match="Invalid field"):
+        with_extra_fields({"issues": ["closed_by."]})
@@ -0,0 +1,29 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from ghtriage.lock import PullLock, PullLockHeld
+
+
+def test_lock_is_exclusive_and_names_its_holder(tmp_path: Path) -> None:
+    path = tmp_path / ".ghtriage" / "pull.lock"
+
+    with PullLock(path):
+        with pytest.raises(PullLockHeld, match="Another pull is running") as exc_info:
+            with PullLock(path):
+                pass
+
+    assert exc_info.value.pid == os.getpid()
+
+
+def test_lock_is_released_on_exit_even_after_an_error(tmp_path: Path) -> None:
+    path = tmp_path / "pull.lock"
+
+    with pytest.raises(ValueError):
+        with PullLock(path):
+            raise ValueError("pull failed")
+    with PullLock(path):
+        pass
+
+    assert path.read_text() == ""
@@ -0,0 +1,79 @@
+from requests import Response
+
+from ghtriage.paginators import UpdatedBeforePaginator, UpdatedSincePaginator
+
+
+def _response(next_url: str | None) -> Response:
+    response = Response()
+    if next_url is not None:
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return response
+
+
+def _page(*updated_at: str) -> list[dict]:
+    return [{"id": index, "updated_at": value} for index, value in enumerate(updated_at)]
+
+
+def test_updated_since_paginator_follows_links_without_a_cursor() -> None:
+    paginator = UpdatedSincePaginator(since=None)
+
+    paginator.update_state(_response("https://example.com/pulls?page=2"), _page("2020-01-01"))
+
+    assert paginator.has_next_page
+
+
+def test_updated_since_paginator_continues_while_page_is_newer_than_cursor() -> None:
+    paginator = UpdatedSincePaginator(since="2026-03-01T00:00:00Z")
+
+    paginator.update_state(
+        _response("https://example.com/pulls?page=2"),
+        _page("2026-03-05T00:00:00Z", "2026-03-01T00:00:00Z"),
+    )
+
+    assert paginator.has_next_page
+
+
+def test_updated_since_paginator_stops_at_first_page_crossing_cursor() -> None:
+    paginator = UpdatedSincePaginator(since="2026-03-01T00:00:00Z")
+
+    paginator.update_state(
+        _response("https://example.com/pulls?page=2"),
+        _page("2026-03-05T00:00:00Z", "2026-02-28T23:59:59Z"),
+    )
+
+    assert not paginator.has_next_page
+
+
+def test_updated_since_paginator_stops_on_last_page() -> None:
+    paginator = UpdatedSincePaginator(since="2026-03-01T00:00:00Z")
+
+    paginator.update_state(_response(None), _page("2026-03-05T00:00:00Z"))
+
+    assert not paginator.has_next_page
+
+
+def test_updated_since_paginator_ignores_rows_without_cursor() -> None:
+    paginator = UpdatedSincePaginator(since="2026-03-01T00:00:00Z")
+
+    paginator.update_state(
+        _response("https://example.com/pulls?page=2"),
+        [{"id": 1}, {"id": 2, "updated_at": None}],
+    )
+
+    assert paginator.has_next_page
+
+
+def test_updated_before_paginator_stops_at_first_page_reaching_until() -> None:
+    paginator = UpdatedBeforePaginator(until="2026-03-01T00:00:00Z")
+
+    paginator.update_state(
+        _response("https://example.com/issues?page=2"),
+        _page("2020-01-01T00:00:00Z", "2026-02-28T23:59:59Z"),
+    )
+    assert paginator.has_next_page
+
+    paginator.update_state(
+        _response("https://example.com/issues?page=3"),
+        _page("2026-02-28T23:59:59Z", "2026-03-01T00:00:00Z"),
+    )
+    assert not paginator.has_next_page
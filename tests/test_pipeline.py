@@ -1,34 +1,61 @@
+from contextlib import contextmanager
+import json
 from pathlib import Path
-from unittest.mock import Mock
+import threading
+from unittest.mock import MagicMock, Mock
 
 import duckdb
+from fake_github import REPO as FAKE_REPO
+from fake_github import Dataset, FakeGitHub, FakeGitHubServer
+from fake_github import spec as fake_spec
+import pytest
 
-from ghtriage.pipeline import _write_meta, run_pull
+from ghtriage.annotations import OPENAPI_SPEC_URL, read_catalog
+from ghtriage.checkpoint import PageCheckpoint, read_checkpoint
+from ghtriage.client import RequestStats, TokenPool
+from ghtriage.paginators import UpdatedSincePaginator
+from ghtriage.pipeline import (
+    PULL_PHASES,
+    PULL_PROFILES,
+    _finalize,
+    _stored_cursor,
+    _write_meta,
+    create_pipeline,
+    delete_records,
+    get_conditional_requests_path,
+    list_org_repos,
+    merge_records,
+    resource_names,
+    run_pull,
+)
 
 
 def _install_pipeline_mocks(monkeypatch):
     sentinel_destination = object()
-    sentinel_source = object()
+    sentinel_source = MagicMock()
     sentinel_run_result = object()
 
     mock_duckdb_factory = Mock(return_value=sentinel_destination)
     mock_pipeline_obj = Mock()
     mock_pipeline_obj.run = Mock(return_value=sentinel_run_result)
+    mock_pipeline_obj.load = Mock(return_value=sentinel_run_result)
+    mock_pipeline_obj.extract.return_value.metrics = {}
+    mock_pipeline_obj.state = {}
     mock_pipeline_factory = Mock(return_value=mock_pipeline_obj)
     mock_rest_api_source = Mock(return_value=sentinel_source)
 
     monkeypatch.setattr("ghtriage.pipeline.dlt.destinations.duckdb", mock_duckdb_factory)
     monkeypatch.setattr("ghtriage.pipeline.dlt.pipeline", mock_pipeline_factory)
     monkeypatch.setattr("ghtriage.pipeline.rest_api_source", mock_rest_api_source)
-    mock_write_meta = Mock()
-    monkeypatch.setattr("ghtriage.pipeline._write_meta", mock_write_meta)
+    monkeypatch.setattr("ghtriage.pipeline._dependent_resource", Mock())
     call_order: list[str] = []
-    mock_create_views = Mock(side_effect=lambda *_a, **_k: call_order.append("create_views"))
-    monkeypatch.setattr("ghtriage.pipeline.create_views", mock_create_views)
-    mock_fetch_and_annotate = Mock(
-        side_effect=lambda *_a, **_k: call_order.append("fetch_and_annotate")
+    mock_finalize = Mock(side_effect=lambda *_a, **_k: call_order.append("finalize"))
+    monkeypatch.setattr("ghtriage.pipeline._finalize", mock_finalize)
+    mock_fetch_descriptions = Mock(
+        side_effect=lambda *_a, **_k: call_order.append("fetch_descriptions")
     )
-    monkeypatch.setattr("ghtriage.pipeline.fetch_and_annotate", mock_fetch_and_annotate)
+    monkeypatch.setattr("ghtriage.pipeline.fetch_descriptions", mock_fetch_descriptions)
+    monkeypatch.setattr("ghtriage.pipeline.local_descriptions", Mock(return_value=None))
 
     return (
         sentinel_destination,
@@ -38,14 +65,13 @@ def _install_pipeline_mocks(monkeypatch):
         mock_pipeline_obj,
         mock_pipeline_factory,
         mock_rest_api_source,
-        mock_write_meta,
-        mock_fetch_and_annotate,
-        mock_create_views,
+        mock_finalize,
+        mock_fetch_descriptions,
         call_order,
     )
 
 
-def test_run_pull_smoke_full_false_calls_pipeline_run_once(tmp_path: Path, monkeypatch) -> None:
+def test_run_pull_smoke_full_false_runs_pipeline_steps_once(tmp_path: Path, monkeypatch) -> None:
     (
         sentinel_destination,
         sentinel_source,
@@ -54,9 +80,8 @@ def test_run_pull_smoke_full_false_calls_pipeline_run_once(tmp_path: Path, monke
         mock_pipeline_obj,
         mock_pipeline_factory,
         mock_rest_api_source,
-        mock_write_meta,
-        mock_fetch_and_annotate,
-        mock_create_views,
+        mock_finalize,
+        mock_fetch_descriptions,
         call_order,
     ) = _install_pipeline_mocks(monkeypatch)
 
@@ -64,9 +89,14 @@ def test_run_pull_smoke_full_false_calls_pipeline_run_once(tmp_path: Path, monke
 
     assert load_info is sentinel_run_result
     assert meta_error is None
-    mock_pipeline_obj.run.assert_called_once_with(sentinel_source)
+    mock_pipeline_obj.extract.assert_called_once_with(
+        sentinel_source, workers=1, loader_file_format=None
+    )
+    mock_pipeline_obj.normalize.assert_called_once_with(workers=1)
+    mock_pipeline_obj.load.assert_called_once_with(workers=20)
 
-    db_path = tmp_path / ".ghtriage" / "ghtriage.duckdb"
+    # Built in the staging database, which is published over the database at the end.
+    db_path = tmp_path / ".ghtriage" / "ghtriage.staging.duckdb"
     pipelines_dir = tmp_path / ".ghtriage" / "pipelines"
 
     mock_duckdb_factory.assert_called_once_with(str(db_path))
@@ -81,14 +111,24 @@ def test_run_pull_smoke_full_false_calls_pipeline_run_once(tmp_path: Path, monke
     config = mock_rest_api_source.call_args.args[0]
     resource_names = [resource["name"] for resource in config["resources"]]
     assert resource_names == [
-        "issues",
-        "pull_requests",
-        "conversation_comments",
-        "review_comments",
+        "issues@owner/repo",
+        "pull_requests@owner/repo",
+        "conversation_comments@owner/repo",
+        "review_comments@owner/repo",
     ]
 
-    mock_write_meta.assert_called_once_with(db_path=db_path, repo="owner/repo", full=False)
-    mock_fetch_and_annotate.assert_called_once_with(db_path)
+    mock_fetch_descriptions.assert_called_once_with(
+        OPENAPI_SPEC_URL, cache_path=tmp_path / ".ghtriage" / "descriptions.json"
+    )
+    mock_finalize.assert_called_once_with(
+        db_path,
+        view_resources=None,
+        descriptions=None,
+        repos=["owner/repo"],
+        full=False,
+        token_budgets=None,
+        history_since={},
+    )
 
 
 def test_run_pull_full_true_removes_existing_state_then_runs(tmp_path: Path, monkeypatch) -> None:
@@ -100,9 +140,8 @@ def test_run_pull_full_true_removes_existing_state_then_runs(tmp_path: Path, mon
         mock_pipeline_obj,
         _mock_pipeline_factory,
         _mock_rest_api_source,
-        _mock_write_meta,
-        _mock_fetch_and_annotate,
-        _mock_create_views,
+        _mock_finalize,
+        _mock_fetch_descriptions,
         _call_order,
     ) = _install_pipeline_mocks(monkeypatch)
 
@@ -121,7 +160,9 @@ def test_run_pull_full_true_removes_existing_state_then_runs(tmp_path: Path, mon
     assert meta_error is None
     assert not old_db_path.exists()
     assert not old_pipeline_file.exists()
-    mock_pipeline_obj.run.assert_called_once_with(sentinel_source)
+    mock_pipeline_obj.extract.assert_called_once_with(
+        sentinel_source, workers=1, loader_file_format=None
+    )
 
 
 def test_run_pull_full_true_handles_missing_state(tmp_path: Path, monkeypatch) -> None:
@@ -133,9 +174,8 @@ def test_run_pull_full_true_handles_missing_state(tmp_path: Path, monkeypatch) -
         mock_pipeline_obj,
         _mock_pipeline_factory,
         _mock_rest_api_source,
-        _mock_write_meta,
-        _mock_fetch_and_annotate,
-        _mock_create_views,
+        _mock_finalize,
+        _mock_fetch_descriptions,
         _call_order,
     ) = _install_pipeline_mocks(monkeypatch)
 
@@ -143,7 +183,9 @@ def test_run_pull_full_true_handles_missing_state(tmp_path: Path, monkeypatch) -
 
     assert load_info is sentinel_run_result
     assert meta_error is None
-    mock_pipeline_obj.run.assert_called_once_with(sentinel_source)
+    mock_pipeline_obj.extract.assert_called_once_with(
+        sentinel_source, workers=1, loader_file_format=None
+    )
 
 
 def test_run_pull_builds_source_with_repo_and_token(tmp_path: Path, monkeypatch) -> None:
@@ -155,22 +197,32 @@ def test_run_pull_builds_source_with_repo_and_token(tmp_path: Path, monkeypatch)
         _mock_pipeline_obj,
         _mock_pipeline_factory,
         mock_rest_api_source,
-        _mock_write_meta,
-        _mock_fetch_and_annotate,
-        _mock_create_views,
+        _mock_finalize,
+        _mock_fetch_descriptions,
         _call_order,
     ) = _install_pipeline_mocks(monkeypatch)
 
     run_pull(repo="abc/def", token="secret", full=False, cwd=tmp_path)
 
     config = mock_rest_api_source.call_args.args[0]
-    assert config["client"]["base_url"] == "https://api.github.com/repos/abc/def/"
+    assert config["client"]["base_url"] == "https://api.github.com/"
+    assert [r["endpoint"]["path"] for r in config["resources"]] == [
+        "repos/abc/def/issues",
+        "repos/abc/def/pulls",
+        "repos/abc/def/issues/comments",
+        "repos/abc/def/pulls/comments",
+    ]
     assert config["client"]["auth"]["token"] == "secret"
 
 
+def _write_meta_to(db_path: Path, **meta) -> None:
+    with duckdb.connect(str(db_path)) as conn:
+        _write_meta(conn, **meta)
+
+
 def test_write_meta_upserts_expected_keys(tmp_path: Path) -> None:
     db_path = tmp_path / "test.duckdb"
-    _write_meta(db_path=db_path, repo="owner/repo", full=False)
+    _write_meta_to(db_path, repos=["owner/repo"], full=False)
 
     with duckdb.connect(str(db_path)) as conn:
         meta = dict(conn.execute("SELECT key, value FROM github._ghtriage_meta").fetchall())
@@ -180,9 +232,34 @@ def test_write_meta_upserts_expected_keys(tmp_path: Path) -> None:
     assert "T" in meta["last_pull_at"] and meta["last_pull_at"].endswith("Z")
 
 
+def test_write_meta_scopes_a_repositorys_history_start_to_its_resources(
+    tmp_path: Path,
+) -> None:
+    db_path = tmp_path / "test.duckdb"
+    _write_meta_to(db_path, repos=["owner/repo"], full=False)
+    with duckdb.connect(str(db_path)) as conn:
+        # As recent-first pulls recorded it before each resource had its own.
+        conn.execute(
+            "INSERT INTO github._ghtriage_meta VALUES "
+            "('history_since:owner/repo', '2026-01-01T00:00:00Z')"
+        )
+
+    _write_meta_to(
+        db_path, repos=["owner/repo"], full=False, history_since={"issues@owner/repo": None}
+    )
+
+    with duckdb.connect(str(db_path)) as conn:
+        meta = dict(conn.execute("SELECT key, value FROM github._ghtriage_meta").fetchall())
+    assert {key: value for key, value in meta.items() if key.startswith("history_since:")} == {
+        f"history_since:{name}": "2026-01-01T00:00:00Z"
+        for name in resource_names(["owner/repo"])
+        if name != "issues@owner/repo"
+    }
+
+
 def test_write_meta_records_full_flag(tmp_path: Path) -> None:
     db_path = tmp_path / "test.duckdb"
-    _write_meta(db_path=db_path, repo="owner/repo", full=True)
+    _write_meta_to(db_path, repos=["owner/repo"], full=True)
 
     with duckdb.connect(str(db_path)) as conn:
         meta = dict(conn.execute("SELECT key, value FROM github._ghtriage_meta").fetchall())
@@ -192,8 +269,8 @@ def test_write_meta_records_full_flag(tmp_path: Path) -> None:
 
 def test_write_meta_is_idempotent(tmp_path: Path) -> None:
     db_path = tmp_path / "test.duckdb"
-    _write_meta(db_path=db_path, repo="owner/repo-a", full=False)
-    _write_meta(db_path=db_path, repo="owner/repo-b", full=True)
+    _write_meta_to(db_path, repos=["owner/repo-a"], full=False)
+    _write_meta_to(db_path, repos=["owner/repo-b"], full=True)
 
     with duckdb.connect(str(db_path)) as conn:
         meta = dict(conn.execute("SELECT key, value FROM github._ghtriage_meta").fetchall())
@@ -202,7 +279,95 @@ def test_write_meta_is_idempotent(tmp_path: Path) -> None:
     assert meta["last_full_pull"] == "true"
 
 
-def test_run_pull_creates_views_before_annotating(tmp_path: Path, monkeypatch) -> None:
+def test_write_meta_records_each_repos_freshness(tmp_path: Path) -> None:
+    db_path = tmp_path / "test.duckdb"
+    _write_meta_to(db_path, repos=["owner/repo-a"], full=False)
+    _write_meta_to(db_path, repos=["owner/repo-b", "owner/repo-c"], full=False)
+
+    with duckdb.connect(str(db_path)) as conn:
+        meta = dict(conn.execute("SELECT key, value FROM github._ghtriage_meta").fetchall())
+
+    assert meta["repo"] == "owner/repo-b,owner/repo-c"
+    assert {key for key in meta if key.startswith("last_pull_at:")} == {
+        "last_pull_at:owner/repo-a",
+        "last_pull_at:owner/repo-b",
+        "last_pull_at:owner/repo-c",
+    }
+    assert meta["last_pull_at:owner/repo-b"] == meta["last_pull_at"]
+
+
+def test_write_meta_replaces_the_token_budgets(tmp_path: Path) -> None:
+    db_path = tmp_path / "test.duckdb"
+    old = {"remaining": 10, "limit": 5000, "reset_at": None, "revoked": False}
+    _write_meta_to(db_path, repos=["owner/repo"], full=False, token_budgets={"…old1": old})
+    _write_meta_to(db_path, repos=["owner/repo"], full=False, token_budgets={"…new1": old})
+    _write_meta_to(db_path, repos=["owner/repo"], full=False)
+
+    with duckdb.connect(str(db_path)) as conn:
+        meta = dict(conn.execute("SELECT key, value FROM github._ghtriage_meta").fetchall())
+
+    assert [key for key in meta if key.startswith("token_budget:")] == ["token_budget:…new1"]
+
+
+def test_write_meta_backfills_repo_on_rows_pulled_before_the_column(tmp_path: Path) -> None:
+    db_path = tmp_path / "test.duckdb"
+    _write_meta_to(db_path, repos=["owner/repo"], full=False)
+    with duckdb.connect(str(db_path)) as conn:
+        conn.execute("CREATE TABLE github.issues (id BIGINT, repo VARCHAR)")
+        conn.execute("INSERT INTO github.issues VALUES (1, NULL), (2, 'owner/repo')")
+
+    _write_meta_to(db_path, repos=["owner/repo"], full=False)
+
+    with duckdb.connect(str(db_path)) as conn:
+        repos = conn.execute("SELECT DISTINCT repo FROM github.issues").fetchall()
+    assert repos == [("owner/repo",)]
+
+
+def test_finalize_writes_meta_views_and_descriptions_together(tmp_path: Path, monkeypatch) -> None:
+    db_path = tmp_path / "test.duckdb"
+    with duckdb.connect(str(db_path)) as conn:
+        conn.execute("CREATE SCHEMA github")
+        conn.execute("""
+            CREATE TABLE github.issues (
+                number BIGINT, title VARCHAR, state VARCHAR, state_reason VARCHAR,
+                user__login VARCHAR, user__type VARCHAR,
+                created_at TIMESTAMP WITH TIME ZONE, updated_at TIMESTAMP WITH TIME ZONE,
+                closed_at TIMESTAMP WITH TIME ZONE, _dlt_id VARCHAR
+            )
+        """)
+    descriptions = ({"issues": "Issues."}, {"issues": {"title": "The title."}})
+
+    def fail(*_args) -> None:
+        raise duckdb.IOException("disk full")
+
+    monkeypatch.setattr("ghtriage.pipeline.apply_descriptions", fail)
+    with pytest.raises(duckdb.IOException):
+        _finalize(
+            db_path, view_resources=None, descriptions=descriptions, repos=["o/r"], full=False
+        )
+    with duckdb.connect(str(db_path)) as conn:
+        assert conn.execute(
+            "SELECT count(*) FROM duckdb_tables() WHERE table_name = '_ghtriage_meta'"
+        ).fetchone() == (0,)
+        assert conn.execute(
+            "SELECT count(*) FROM duckdb_views() WHERE NOT internal"
+        ).fetchone() == (0,)
+
+    monkeypatch.undo()
+    _finalize(db_path, view_resources=None, descriptions=descriptions, repos=["o/r"], full=False)
+    with duckdb.connect(str(db_path)) as conn:
+        assert conn.execute(
+            "SELECT value FROM github._ghtriage_meta WHERE key = 'repo'"
+        ).fetchone() == ("o/r",)
+        assert conn.execute(
+            "SELECT comment FROM duckdb_tables() WHERE table_name = 'issues'"
+        ).fetchone() == ("Issues.",)
+        assert conn.execute(
+            "SELECT count(*) FROM duckdb_views() WHERE view_name = 'issue_activity'"
+        ).fetchone() == (1,)
+
+
+def test_run_pull_fetches_descriptions_before_finalizing(tmp_path: Path, monkeypatch) -> None:
     (
         _sentinel_destination,
         _sentinel_source,
@@ -211,21 +376,52 @@ def test_run_pull_creates_views_before_annotating(tmp_path: Path, monkeypatch) -
         _mock_pipeline_obj,
         _mock_pipeline_factory,
         _mock_rest_api_source,
-        _mock_write_meta,
-        _mock_fetch_and_annotate,
-        mock_create_views,
+        mock_finalize,
+        _mock_fetch_descriptions,
         call_order,
     ) = _install_pipeline_mocks(monkeypatch)
     monkeypatch.chdir(tmp_path)
 
     run_pull(repo="owner/repo", token="t", full=False)
 
-    db_path = tmp_path / ".ghtriage" / "ghtriage.duckdb"
-    mock_create_views.assert_called_once_with(db_path)
-    assert call_order == ["create_views", "fetch_and_annotate"]
+    db_path = tmp_path / ".ghtriage" / "ghtriage.staging.duckdb"
+    assert mock_finalize.call_args.args == (db_path,)
+    assert call_order == ["fetch_descriptions", "finalize"]
 
 
-def test_run_pull_creates_views_on_full_rebuild(tmp_path: Path, monkeypatch) -> None:
+def test_run_pull_fetches_the_spec_while_it_extracts(tmp_path: Path, monkeypatch) -> None:
+    (
+        _sentinel_destination,
+        _sentinel_source,
+        _sentinel_run_result,
+        _mock_duckdb_factory,
+        mock_pipeline_obj,
+        _mock_pipeline_factory,
+        _mock_rest_api_source,
+        mock_finalize,
+        mock_fetch_descriptions,
+        _call_order,
+    ) = _install_pipeline_mocks(monkeypatch)
+    fetched = threading.Event()
+    fetched_during_extract: list[bool] = []
+    mock_fetch_descriptions.side_effect = lambda *_a, **_k: fetched.set() or "descriptions"
+    extracted = mock_pipeline_obj.extract.return_value
+
+    def extract(*_args, **_kwargs):
+        fetched_during_extract.append(fetched.wait(5))
+        return extracted
+
+    mock_pipeline_obj.extract.side_effect = extract
+
+    run_pull(repo="owner/repo", token="t", cwd=tmp_path)
+
+    assert fetched_during_extract == [True]
+    assert mock_finalize.call_args.kwargs["descriptions"] == "descriptions"
+
+
+def test_run_pull_recreates_the_views_of_the_resources_it_pulled(
+    tmp_path: Path, monkeypatch
+) -> None:
     (
         _sentinel_destination,
         _sentinel_source,
@@ -234,14 +430,1041 @@ def test_run_pull_creates_views_on_full_rebuild(tmp_path: Path, monkeypatch) ->
         _mock_pipeline_obj,
         _mock_pipeline_factory,
         _mock_rest_api_source,
-        _mock_write_meta,
-        _mock_fetch_and_annotate,
-        mock_create_views,
-        call_order,
+        mock_finalize,
+        _mock_fetch_descriptions,
+        _call_order,
     ) = _install_pipeline_mocks(monkeypatch)
     monkeypatch.chdir(tmp_path)
 
     run_pull(repo="owner/repo", token="t", full=True)
+    run_pull(repo="owner/repo", token="t", only=["issues"])
+    run_pull(repo="owner/repo", token="t", only=["issues"], fields=None)
+
+    full, only, only_all_fields = mock_finalize.call_args_list
+    assert full.kwargs["view_resources"] is None
+    assert only.kwargs["view_resources"] == ["issues"]
+    # Pulls keeping every field load the users table along with any resource.
+    assert only_all_fields.kwargs["view_resources"] == ["issues", "users"]
+
+
+def test_run_pull_sequential_by_default(tmp_path: Path, monkeypatch) -> None:
+    (
+        _sentinel_destination,
+        sentinel_source,
+        _sentinel_run_result,
+        _mock_duckdb_factory,
+        mock_pipeline_obj,
+        _mock_pipeline_factory,
+        mock_rest_api_source,
+        _mock_finalize,
+        _mock_fetch_descriptions,
+        _call_order,
+    ) = _install_pipeline_mocks(monkeypatch)
+
+    run_pull(repo="owner/repo", token="t", cwd=tmp_path)
+
+    assert mock_rest_api_source.call_args.kwargs["parallelized"] is False
+    mock_pipeline_obj.extract.assert_called_once_with(
+        sentinel_source, workers=1, loader_file_format=None
+    )
+
+
+def test_run_pull_with_workers_extracts_resources_concurrently(
+    tmp_path: Path, monkeypatch
+) -> None:
+    (
+        _sentinel_destination,
+        sentinel_source,
+        sentinel_run_result,
+        _mock_duckdb_factory,
+        mock_pipeline_obj,
+        _mock_pipeline_factory,
+        mock_rest_api_source,
+        _mock_finalize,
+        _mock_fetch_descriptions,
+        _call_order,
+    ) = _install_pipeline_mocks(monkeypatch)
+
+    load_info, _ = run_pull(repo="owner/repo", token="t", workers=4, cwd=tmp_path)
+
+    assert load_info is sentinel_run_result
+    assert mock_rest_api_source.call_args.kwargs["parallelized"] is True
+    mock_pipeline_obj.sync_destination.assert_called_once_with()
+    mock_pipeline_obj.extract.assert_called_once_with(
+        sentinel_source, workers=4, loader_file_format=None
+    )
+    mock_pipeline_obj.normalize.assert_called_once_with(workers=1)
+    mock_pipeline_obj.load.assert_called_once_with(workers=20)
+    mock_pipeline_obj.run.assert_not_called()
+
+
+def test_run_pull_rejects_non_positive_workers(tmp_path: Path, monkeypatch) -> None:
+    _install_pipeline_mocks(monkeypatch)
+
+    with pytest.raises(ValueError, match="workers"):
+        run_pull(repo="owner/repo", token="t", workers=0, cwd=tmp_path)
+
+
+def test_run_pull_stops_pull_requests_at_the_stored_cursor(tmp_path: Path, monkeypatch) -> None:
+    (
+        _sentinel_destination,
+        _sentinel_source,
+        _sentinel_run_result,
+        _mock_duckdb_factory,
+        mock_pipeline_obj,
+        _mock_pipeline_factory,
+        mock_rest_api_source,
+        _mock_finalize,
+        _mock_fetch_descriptions,
+        _call_order,
+    ) = _install_pipeline_mocks(monkeypatch)
+    cursor = {"updated_at": {"last_value": "2026-03-01T00:00:00Z"}}
+    mock_pipeline_obj.state = {
+        "sources": {
+            "rest_api": {"resources": {"pull_requests@owner/repo": {"incremental": cursor}}}
+        }
+    }
+
+    run_pull(repo="owner/repo", token="t", cwd=tmp_path)
+
+    config = mock_rest_api_source.call_args.args[0]
+    resources = {resource["name"]: resource for resource in config["resources"]}
+    paginator = resources["pull_requests@owner/repo"]["endpoint"]["paginator"]
+    assert isinstance(paginator, UpdatedSincePaginator)
+    assert paginator.since == "2026-03-01T00:00:00Z"
+    # Endpoints that take `since` filter server-side and keep the default paginator.
+    assert "paginator" not in resources["issues@owner/repo"]["endpoint"]
+
+
+def test_stored_cursor_is_none_without_state() -> None:
+    pipeline = Mock(state={})
+    assert _stored_cursor(pipeline, "pull_requests") is None
+
+
+def test_run_pull_saves_conditional_validators_only_after_a_load(
+    tmp_path: Path, monkeypatch
+) -> None:
+    (
+        _sentinel_destination,
+        _sentinel_source,
+        _sentinel_run_result,
+        _mock_duckdb_factory,
+        mock_pipeline_obj,
+        _mock_pipeline_factory,
+        mock_rest_api_source,
+        _mock_finalize,
+        _mock_fetch_descriptions,
+        _call_order,
+    ) = _install_pipeline_mocks(monkeypatch)
+    validators_path = tmp_path / ".ghtriage" / "pipelines" / "conditional_requests.json"
+    mock_pipeline_obj.load.side_effect = RuntimeError("load failed")
+
+    with pytest.raises(RuntimeError):
+        run_pull(repo="owner/repo", token="t", cwd=tmp_path)
+    assert not validators_path.exists()
+
+    mock_pipeline_obj.load.side_effect = None
+    run_pull(repo="owner/repo", token="t", cwd=tmp_path)
+    assert validators_path.exists()
+
+    config = mock_rest_api_source.call_args.args[0]
+    assert config["client"]["session"].get_adapter("https://api.github.com/") is not None
+
+
+def test_run_pull_reports_each_phase_in_order(tmp_path: Path, monkeypatch) -> None:
+    _install_pipeline_mocks(monkeypatch)
+    phases: list[str] = []
+
+    @contextmanager
+    def record(name: str):
+        phases.append(name)
+        yield
+
+    run_pull(repo="owner/repo", token="t", phase=record, cwd=tmp_path)
+
+    assert phases == list(PULL_PHASES)
+
+
+def test_run_pull_targets_the_given_api_url(tmp_path: Path, monkeypatch) -> None:
+    (
+        _sentinel_destination,
+        _sentinel_source,
+        _sentinel_run_result,
+        _mock_duckdb_factory,
+        _mock_pipeline_obj,
+        _mock_pipeline_factory,
+        mock_rest_api_source,
+        _mock_finalize,
+        mock_fetch_descriptions,
+        _call_order,
+    ) = _install_pipeline_mocks(monkeypatch)
+
+    run_pull(
+        repo="owner/repo",
+        token="t",
+        api_url="http://127.0.0.1:8765/",
+        spec_url="http://127.0.0.1:8765/openapi.json",
+        cwd=tmp_path,
+    )
+
+    config = mock_rest_api_source.call_args.args[0]
+    assert config["client"]["base_url"] == "http://127.0.0.1:8765/"
+    assert config["resources"][0]["endpoint"]["path"] == "repos/owner/repo/issues"
+    assert mock_fetch_descriptions.call_args.args[0] == "http://127.0.0.1:8765/openapi.json"
+
+
+# ---------------------------------------------------------------------------
+# End to end, against the fake GitHub server
+# ---------------------------------------------------------------------------
+
+FAKE_DATASET = Dataset(items=30, comments=250, review_comments=120)
+
+
+def _pull_from(server: FakeGitHubServer, cwd: Path, repo=FAKE_REPO, **kwargs):
+    return run_pull(
+        repo=repo,
+        token="t",
+        api_url=server.api_url,
+        spec_url=server.spec_url,
+        cwd=cwd,
+        **kwargs,
+    )
+
+
+def _table_rows(db_path: Path, table: str) -> list[tuple]:
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        return conn.execute(f"SELECT id, updated_at FROM github.{table} ORDER BY id").fetchall()
+
+
+def _table_rows_by_id(db_path: Path, table: str) -> list[tuple]:
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        return conn.execute(f"SELECT id FROM github.{table} ORDER BY id").fetchall()
+
+
+def test_run_pull_against_fake_github_loads_every_resource(tmp_path: Path) -> None:
+    with FakeGitHubServer(FakeGitHub(dataset=FAKE_DATASET)) as server:
+        _pull_from(server, tmp_path)
+
+    db_path = tmp_path / ".ghtriage" / "ghtriage.duckdb"
+    assert len(_table_rows(db_path, "issues")) == FAKE_DATASET.items - FAKE_DATASET.pulls
+    assert len(_table_rows(db_path, "pull_requests")) == FAKE_DATASET.pulls
+    assert len(_table_rows(db_path, "conversation_comments")) == FAKE_DATASET.comments
+    assert len(_table_rows(db_path, "review_comments")) == FAKE_DATASET.review_comments
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        (comment,) = conn.execute(
+            "SELECT comment FROM duckdb_tables() WHERE table_name = 'issues'"
+        ).fetchone()
+    assert comment  # annotated from the catalog shipped with the package
+
+
+def test_run_pull_annotates_from_the_packaged_catalog_without_the_network(
+    tmp_path: Path, capsys
+) -> None:
+    tables, columns = read_catalog()
+    cache_path = tmp_path / ".ghtriage" / "descriptions.json"
+    with FakeGitHubServer(FakeGitHub(dataset=FAKE_DATASET)) as server:
+        # Nothing listens on the discard port: a download would fail, and warn.
+        run_pull(
+            FAKE_REPO, "t", api_url=server.api_url, spec_url="http://127.0.0.1:9/", cwd=tmp_path
+        )
+        assert "annotation failed" not in capsys.readouterr().err
+        assert not cache_path.exists()
+        db_path = tmp_path / ".ghtriage" / "ghtriage.duckdb"
+        with duckdb.connect(str(db_path), read_only=True) as conn:
+            (table_comment,) = conn.execute(
+                "SELECT comment FROM duckdb_tables() WHERE table_name = 'issues'"
+            ).fetchone()
+            (column_comment,) = conn.execute(
+                "SELECT comment FROM duckdb_columns() "
+                "WHERE table_name = 'issues' AND column_name = 'number'"
+            ).fetchone()
+        assert table_comment == tables["issues"]
+        assert column_comment == columns["issues"]["number"]
+
+        _pull_from(server, tmp_path, refresh_descriptions=True)
+
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        (comment,) = conn.execute(
+            "SELECT comment FROM duckdb_tables() WHERE table_name = 'issues'"
+        ).fetchone()
+    assert comment == fake_spec()["components"]["schemas"]["issue"]["description"]
+    assert cache_path.exists()
+
+
+def test_run_pull_refreshing_descriptions_falls_back_to_the_catalog(tmp_path: Path) -> None:
+    tables, _ = read_catalog()
+    with FakeGitHubServer(FakeGitHub(dataset=FAKE_DATASET)) as server:
+        # Nothing is cached, and nothing listens on the discard port.
+        run_pull(
+            FAKE_REPO,
+            "t",
+            api_url=server.api_url,
+            spec_url="http://127.0.0.1:9/",
+            cwd=tmp_path,
+            refresh_descriptions=True,
+        )
+
+    assert not (tmp_path / ".ghtriage" / "descriptions.json").exists()
+    db_path = tmp_path / ".ghtriage" / "ghtriage.duckdb"
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        (comment,) = conn.execute(
+            "SELECT comment FROM duckdb_tables() WHERE table_name = 'issues'"
+        ).fetchone()
+    assert comment == tables["issues"]
+
+
+def test_run_pull_fetches_reviews_for_each_pull_request(tmp_path: Path) -> None:
+    stats = RequestStats()
+    with FakeGitHubServer(FakeGitHub(dataset=FAKE_DATASET)) as server:
+        _pull_from(server, tmp_path, stats=stats)
+
+    pulls = [n for n in range(1, FAKE_DATASET.items + 1) if FAKE_DATASET.is_pull(n)]
+    expected = {n: FAKE_DATASET.review_count(n) for n in pulls}
+    db_path = tmp_path / ".ghtriage" / "ghtriage.duckdb"
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        counts = dict(
+            conn.execute(
+                "SELECT number, review_count FROM github.pull_request_activity"
+            ).fetchall()
+        )
+        repos = conn.execute("SELECT DISTINCT repo FROM github.reviews").fetchall()
+    assert counts == expected
+    assert repos == [(FAKE_REPO,)]
+    # One request per pull request, each pull request's reviews fitting on one page.
+    assert stats.for_resource(f"reviews@{FAKE_REPO}").requests == len(pulls)
+
+
+def _columns(db_path: Path) -> dict[str, set[str]]:
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        rows = conn.execute(
+            "SELECT table_name, column_name FROM information_schema.columns "
+            "WHERE table_schema = 'github'"
+        ).fetchall()
+    columns: dict[str, set[str]] = {}
+    for table, column in rows:
+        columns.setdefault(table, set()).add(column)
+    return columns
+
+
+def test_run_pull_keeps_only_the_projected_fields(tmp_path: Path) -> None:
+    projected, everything = tmp_path / "projected", tmp_path / "everything"
+    with FakeGitHubServer(FakeGitHub(dataset=FAKE_DATASET)) as server:
+        _pull_from(server, projected)
+        _pull_from(server, everything, fields=None)
+
+    db_path = projected / ".ghtriage" / "ghtriage.duckdb"
+    columns = _columns(db_path)
+    all_columns = _columns(everything / ".ghtriage" / "ghtriage.duckdb")
+    for dropped in ("node_id", "head__repo__full_name", "diff_url"):
+        assert dropped in all_columns["pull_requests"]
+        assert dropped not in columns["pull_requests"]
+    assert "avatar_url" in all_columns["users"]
+    # A projection keeps users' few fields on the rows: no users table to spread them to.
+    assert "users" not in columns
+    assert {"user__id", "user__login", "user__type"} <= columns["issues"]
+    assert {"user__login", "head__ref", "merged_at", "repo"} <= columns["pull_requests"]
+    assert len(columns["pull_requests"]) < len(all_columns["pull_requests"]) / 2
+    # The views read only kept fields, so they come out the same.
+    with (
+        duckdb.connect(str(db_path), read_only=True) as conn,
+        duckdb.connect(str(everything / ".ghtriage" / "ghtriage.duckdb"), read_only=True) as full,
+    ):
+        for view in ("issue_activity", "pull_request_activity"):
+            query = f"SELECT * FROM github.{view} ORDER BY repo, number"
+            assert conn.execute(query).fetchall() == full.execute(query).fetchall()
+
+
+def test_run_pull_keeping_every_field_moves_users_into_their_own_table(tmp_path: Path) -> None:
+    with FakeGitHubServer(FakeGitHub(dataset=FAKE_DATASET)) as server:
+        _pull_from(server, tmp_path, fields=None)
+
+    db_path = tmp_path / ".ghtriage" / "ghtriage.duckdb"
+    columns = _columns(db_path)
+    for table in ("issues", "pull_requests", "conversation_comments", "reviews"):
+        assert {"user__id", "user__login"} <= columns[table]
+        assert "user__type" not in columns[table]
+    assert "type" not in columns["pull_requests__requested_reviewers"]
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        (users, distinct) = conn.execute(
+            "SELECT count(*), count(DISTINCT id) FROM github.users"
+        ).fetchone()
+        authors = conn.execute(
+            "SELECT author, author_type FROM github.issue_activity UNION "
+            "SELECT author, author_type FROM github.pull_request_activity"
+        ).fetchall()
+    assert users == distinct > 0
+    assert {kind for _, kind in authors} == {"User", "Bot"}
+    assert all((kind == "Bot") == author.startswith("bot-") for author, kind in authors)
+
+
+def test_merge_records_keeps_only_the_projected_fields(tmp_path: Path) -> None:
+    with FakeGitHubServer(FakeGitHub(dataset=FAKE_DATASET)) as server:
+        _pull_from(server, tmp_path)
+        issue = {**FAKE_DATASET.issue(1, server.api_url), "repo": FAKE_REPO, "extra": "x"}
+    issue["updated_at"] = "2031-01-01T00:00:00Z"
+
+    merge_records({"issues": [issue]}, cwd=tmp_path)
+
+    assert "extra" not in _columns(tmp_path / ".ghtriage" / "ghtriage.duckdb")["issues"]
+
+
+def test_run_pull_resets_reviews_with_their_pull_requests(tmp_path: Path) -> None:
+    db_path = tmp_path / ".ghtriage" / "ghtriage.duckdb"
+    with FakeGitHubServer(FakeGitHub(dataset=FAKE_DATASET)) as server:
+        _pull_from(server, tmp_path)
+    with duckdb.connect(str(db_path)) as conn:
+        conn.execute("DELETE FROM github.reviews")
+
+    stats = RequestStats()
+    with FakeGitHubServer(FakeGitHub(dataset=FAKE_DATASET)) as server:
+        # Reviews are fetched only for the pull requests a pull yields; refetching them all
+        # means refetching the pull requests from scratch too.
+        _pull_from(server, tmp_path, reset=["reviews"], stats=stats)
+
+    assert set(stats.resources) == {f"pull_requests@{FAKE_REPO}", f"reviews@{FAKE_REPO}"}
+    assert len(_table_rows_by_id(db_path, "reviews")) == sum(
+        FAKE_DATASET.review_count(n) for n in range(1, FAKE_DATASET.items + 1)
+    )
+
+
+def test_run_pull_with_workers_loads_the_same_tables_as_a_sequential_pull(
+    tmp_path: Path,
+) -> None:
+    with FakeGitHubServer(FakeGitHub(dataset=FAKE_DATASET)) as server:
+        _pull_from(server, tmp_path / "sequential")
+        _pull_from(server, tmp_path / "concurrent", workers=4)
+
+    for table in ["issues", "pull_requests", "conversation_comments", "review_comments"]:
+        assert _table_rows(tmp_path / "concurrent" / ".ghtriage" / "ghtriage.duckdb", table) == (
+            _table_rows(tmp_path / "sequential" / ".ghtriage" / "ghtriage.duckdb", table)
+        )
+    assert _table_rows_by_id(
+        tmp_path / "concurrent" / ".ghtriage" / "ghtriage.duckdb", "reviews"
+    ) == (_table_rows_by_id(tmp_path / "sequential" / ".ghtriage" / "ghtriage.duckdb", "reviews"))
+
+
+def test_run_pull_fast_profile_loads_the_same_tables_as_the_default(tmp_path: Path) -> None:
+    with FakeGitHubServer(FakeGitHub(dataset=FAKE_DATASET)) as server:
+        _pull_from(server, tmp_path / "default")
+        _pull_from(server, tmp_path / "fast", profile=PULL_PROFILES["fast"])
+
+    def columns(cwd: Path) -> list[tuple]:
+        with duckdb.connect(str(cwd / ".ghtriage" / "ghtriage.duckdb"), read_only=True) as conn:
+            return conn.execute(
+                "SELECT table_name, column_name, data_type FROM information_schema.columns "
+                "WHERE table_schema = 'github' ORDER BY ALL"
+            ).fetchall()
+
+    assert columns(tmp_path / "fast") == columns(tmp_path / "default")
+    for table in ["issues", "pull_requests", "conversation_comments", "review_comments"]:
+        assert _table_rows(tmp_path / "fast" / ".ghtriage" / "ghtriage.duckdb", table) == (
+            _table_rows(tmp_path / "default" / ".ghtriage" / "ghtriage.duckdb", table)
+        )
+
+
+def test_run_pull_parquet_profile_needs_pyarrow(tmp_path: Path, monkeypatch) -> None:
+    _install_pipeline_mocks(monkeypatch)
+    monkeypatch.setattr("ghtriage.pipeline.importlib.util.find_spec", lambda name: None)
+
+    with pytest.raises(RuntimeError, match="pyarrow"):
+        run_pull(repo="owner/repo", token="t", profile=PULL_PROFILES["fast"], cwd=tmp_path)
+
+
+def test_run_pull_incremental_fetches_only_new_records(tmp_path: Path) -> None:
+    with FakeGitHubServer(FakeGitHub(dataset=FAKE_DATASET)) as server:
+        _pull_from(server, tmp_path)
+
+    grown = Dataset(items=33, comments=260, review_comments=125)
+    fake = FakeGitHub(dataset=grown)
+    stats = RequestStats()
+    with FakeGitHubServer(fake) as server:
+        _pull_from(server, tmp_path, stats=stats)
+
+    db_path = tmp_path / ".ghtriage" / "ghtriage.duckdb"
+    assert len(_table_rows(db_path, "conversation_comments")) == grown.comments
+    assert len(_table_rows(db_path, "review_comments")) == grown.review_comments
+    assert len(_table_rows(db_path, "pull_requests")) == grown.pulls
+    # One page per resource: every new record fits on the first page. Reviews are fetched
+    # for the one new pull request alone.
+    assert stats.requests == 5
+    assert stats.for_resource(f"reviews@{FAKE_REPO}").requests == 1
+    comments = stats.for_resource(f"conversation_comments@{FAKE_REPO}")
+    assert (comments.rows, comments.rows_inserted, comments.rows_updated) == (10, 10, 0)
+    assert comments.bytes > 0
+
+
+def test_run_pull_in_batches_loads_the_same_tables_as_one_load(tmp_path: Path) -> None:
+    # Over a hundred pull requests, so /pulls is walked across two pages.
+    dataset = Dataset(items=330, comments=250, review_comments=120)
+    with FakeGitHubServer(FakeGitHub(dataset=dataset)) as server:
+        _pull_from(server, tmp_path / "one_load")
+        _pull_from(server, tmp_path / "batched", batch_pages=1)
+
+    for table in ["issues", "pull_requests", "conversation_comments", "review_comments"]:
+        assert _table_rows(tmp_path / "batched" / ".ghtriage" / "ghtriage.duckdb", table) == (
+            _table_rows(tmp_path / "one_load" / ".ghtriage" / "ghtriage.duckdb", table)
+        )
+    assert _table_rows_by_id(
+        tmp_path / "batched" / ".ghtriage" / "ghtriage.duckdb", "reviews"
+    ) == (_table_rows_by_id(tmp_path / "one_load" / ".ghtriage" / "ghtriage.duckdb", "reviews"))
+    # Each batch's package is dropped once loaded.
+    assert not list((tmp_path / "batched" / ".ghtriage").rglob("loaded/*"))
+
+
+def test_run_pull_in_batches_commits_each_batch_before_the_next(
+    tmp_path: Path, monkeypatch
+) -> None:
+    monkeypatch.setattr("ghtriage.pipeline.BATCH_PUBLISH_INTERVAL_SECONDS", 0)
+    db_path = tmp_path / ".ghtriage" / "ghtriage.duckdb"
+    phases: list[str] = []
+    seen: list[int] = []
+
+    @contextmanager
+    def phase(name: str):
+        # The first extract after each load; the batch's users follow in one of their own.
+        if name == "extract" and phases and phases[-1] == "load":
+            # Readers query the batches loaded so far, published after each.
+            with duckdb.connect(str(db_path), read_only=True) as conn:
+                (count,) = conn.execute(
+                    "SELECT count(*) FROM github.conversation_comments"
+                ).fetchone()
+            seen.append(count)
+        phases.append(name)
+        yield
+
+    with FakeGitHubServer(FakeGitHub(dataset=FAKE_DATASET)) as server:
+        _pull_from(server, tmp_path, batch_pages=1, phase=phase)
+
+    # 250 comments, 100 a page, each batch committed before the next. `since` is inclusive,
+    # so the second batch starts again at the first batch's newest comment.
+    assert seen == [100, 199]
+    assert len(_table_rows(db_path, "conversation_comments")) == FAKE_DATASET.comments
+
+
+def test_run_pull_in_batches_resumes_from_the_cursor(tmp_path: Path) -> None:
+    with FakeGitHubServer(FakeGitHub(dataset=FAKE_DATASET)) as server:
+        _pull_from(server, tmp_path, batch_pages=2)
+
+    grown = Dataset(items=33, comments=260, review_comments=125)
+    stats = RequestStats()
+    with FakeGitHubServer(FakeGitHub(dataset=grown)) as server:
+        _pull_from(server, tmp_path, batch_pages=2, stats=stats)
+
+    db_path = tmp_path / ".ghtriage" / "ghtriage.duckdb"
+    assert len(_table_rows(db_path, "conversation_comments")) == grown.comments
+    assert len(_table_rows(db_path, "pull_requests")) == grown.pulls
+    assert stats.requests == 5
+    assert stats.for_resource(f"reviews@{FAKE_REPO}").requests == 1
+
+
+def test_run_pull_that_fails_stops_its_page_fetches(tmp_path: Path) -> None:
+    @contextmanager
+    def failing(name: str):
+        if name == "normalize":
+            raise RuntimeError("boom")
+        yield
+
+    # Several pages of comments, so their pages are fetched ahead.
+    with FakeGitHubServer(FakeGitHub(dataset=FAKE_DATASET)) as server:
+        with pytest.raises(RuntimeError, match="boom"):
+            _pull_from(server, tmp_path, phase=failing)
+        # Requests still in flight finish; the threads then exit rather than wait for more.
+        fetchers = [t for t in threading.enumerate() if t.name.startswith("ghtriage-page")]
+        for thread in fetchers:
+            thread.join(timeout=5)
+
+    assert not [thread for thread in fetchers if thread.is_alive()]
+
+
+def test_run_pull_rejects_non_positive_batch_pages(tmp_path: Path, monkeypatch) -> None:
+    _install_pipeline_mocks(monkeypatch)
+
+    with pytest.raises(ValueError, match="batch_pages"):
+        run_pull(repo="owner/repo", token="t", batch_pages=0, cwd=tmp_path)
+
+
+def test_run_pull_resumes_an_interrupted_full_pull_from_its_checkpoint(
+    tmp_path: Path, monkeypatch
+) -> None:
+    stage = PageCheckpoint.stage
+    staged: list[str] = []
+
+    def stage_then_fail(self, resource, url, response):
+        if len(staged) == 5:
+            raise ConnectionError("network went away")
+        staged.append(url)
+        stage(self, resource, url, response)
+
+    monkeypatch.setattr(PageCheckpoint, "stage", stage_then_fail)
+    fake = FakeGitHub(dataset=FAKE_DATASET)
+    with FakeGitHubServer(fake) as server:
+        with pytest.raises(Exception):
+            _pull_from(server, tmp_path, full=True)
+        summary = read_checkpoint(tmp_path / ".ghtriage" / "pipelines" / "checkpoint")
+        assert summary is not None and summary.full and summary.pages == 5
+
+        monkeypatch.setattr(PageCheckpoint, "stage", stage)
+        stats = RequestStats()
+        _pull_from(server, tmp_path, full=True, stats=stats)
+        _pull_from(server, tmp_path / "uninterrupted")
+
+    assert stats.replayed == 5
+    db_path = tmp_path / ".ghtriage" / "ghtriage.duckdb"
+    for table in ["issues", "pull_requests", "conversation_comments", "review_comments"]:
+        assert _table_rows(db_path, table) == _table_rows(
+            tmp_path / "uninterrupted" / ".ghtriage" / "ghtriage.duckdb", table
+        )
+    assert not (tmp_path / ".ghtriage" / "pipelines" / "checkpoint").exists()
+
+
+def test_run_pull_resumes_an_interrupted_since_pull_from_its_window(
+    tmp_path: Path, monkeypatch
+) -> None:
+    api_url = "https://api.github.com"
+    since = FAKE_DATASET.issue(21, api_url)["updated_at"]
+    stage = PageCheckpoint.stage
+    staged: list[str] = []
+
+    def stage_then_fail(self, resource, url, response):
+        if len(staged) == 2:
+            raise ConnectionError("network went away")
+        staged.append(url)
+        stage(self, resource, url, response)
+
+    monkeypatch.setattr(PageCheckpoint, "stage", stage_then_fail)
+    with FakeGitHubServer(FakeGitHub(dataset=FAKE_DATASET)) as server:
+        with pytest.raises(Exception):
+            _pull_from(server, tmp_path, since=since)
+        summary = read_checkpoint(tmp_path / ".ghtriage" / "pipelines" / "checkpoint")
+        assert summary is not None and summary.since == since
+
+        monkeypatch.setattr(PageCheckpoint, "stage", stage)
+        stats = RequestStats()
+        # The retry resolves its window later, as a rerun of `--since 30d` would.
+        later = FAKE_DATASET.issue(25, api_url)["updated_at"]
+        _pull_from(server, tmp_path, since=later, stats=stats)
+
+    assert stats.replayed == 2
+    with duckdb.connect(str(tmp_path / ".ghtriage" / "ghtriage.duckdb"), read_only=True) as conn:
+        assert conn.execute(
+            "SELECT value FROM github._ghtriage_meta WHERE key = ?",
+            [f"history_since:issues@{FAKE_REPO}"],
+        ).fetchone() == (since,)
+
+
+def test_run_pull_does_not_checkpoint_an_incremental_pull(tmp_path: Path, monkeypatch) -> None:
+    with FakeGitHubServer(FakeGitHub(dataset=FAKE_DATASET)) as server:
+        _pull_from(server, tmp_path)
+        stage = Mock()
+        monkeypatch.setattr(PageCheckpoint, "stage", stage)
+        _pull_from(server, tmp_path)
+
+    stage.assert_not_called()
+
+
+def test_run_pull_rejects_unknown_resources(tmp_path: Path, monkeypatch) -> None:
+    _install_pipeline_mocks(monkeypatch)
+
+    with pytest.raises(ValueError, match="Unknown resource: comments"):
+        run_pull(repo="owner/repo", token="t", only=["comments"], cwd=tmp_path)
+    with pytest.raises(ValueError, match="full"):
+        run_pull(repo="owner/repo", token="t", full=True, reset=["issues"], cwd=tmp_path)
+
+
+def test_run_pull_only_pulls_the_named_resources(tmp_path: Path) -> None:
+    fake = FakeGitHub(dataset=FAKE_DATASET)
+    with FakeGitHubServer(fake) as server:
+        _pull_from(server, tmp_path, only=["issues"])
+
+    with duckdb.connect(str(tmp_path / ".ghtriage" / "ghtriage.duckdb"), read_only=True) as conn:
+        tables = {row[0] for row in conn.execute("SHOW TABLES FROM github").fetchall()}
+    assert "issues" in tables
+    assert "issue_activity" in tables
+    assert not {"pull_requests", "conversation_comments", "review_comments"} & tables
+
+
+def test_run_pull_reset_refetches_one_resource_and_leaves_the_others(tmp_path: Path) -> None:
+    db_path = tmp_path / ".ghtriage" / "ghtriage.duckdb"
+    with FakeGitHubServer(FakeGitHub(dataset=FAKE_DATASET)) as server:
+        _pull_from(server, tmp_path)
+    with duckdb.connect(str(db_path)) as conn:
+        conn.execute("DELETE FROM github.review_comments WHERE id % 2 = 0")
+        conn.execute("UPDATE github.issues SET title = 'edited locally'")
+
+    fake = FakeGitHub(dataset=FAKE_DATASET)
+    stats = RequestStats()
+    with FakeGitHubServer(fake) as server:
+        _pull_from(server, tmp_path, reset=["review_comments"], stats=stats)
+
+    assert len(_table_rows(db_path, "review_comments")) == FAKE_DATASET.review_comments
+    assert set(stats.resources) == {f"review_comments@{FAKE_REPO}"}
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        titles = conn.execute("SELECT DISTINCT title FROM github.issues").fetchall()
+        pulls = conn.execute("SELECT count(*) FROM github.pull_request_activity").fetchone()
+    assert titles == [("edited locally",)]
+    assert pulls == (FAKE_DATASET.pulls,)
+
+    # The reset cursor is stored again: the next pull is incremental.
+    stats = RequestStats()
+    with FakeGitHubServer(FakeGitHub(dataset=FAKE_DATASET)) as server:
+        _pull_from(server, tmp_path, only=["review_comments"], stats=stats)
+    assert stats.requests == 1
+
+
+def test_run_pull_spreads_requests_over_a_token_pool(tmp_path: Path) -> None:
+    db_path = tmp_path / ".ghtriage" / "ghtriage.duckdb"
+    pool = TokenPool(["token-1", "token-2"])
+    with FakeGitHubServer(FakeGitHub(dataset=FAKE_DATASET, rate_limit=5000)) as server:
+        _pull_from(server, tmp_path, scheduler=pool)
+
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        meta = dict(conn.execute("SELECT key, value FROM github._ghtriage_meta").fetchall())
+    assert {key for key in meta if key.startswith("token_budget:")} == {
+        "token_budget:#1 …en-1",
+        "token_budget:#2 …en-2",
+    }
+    assert all(scheduler.remaining is not None for scheduler in pool.schedulers)
+
+
+def test_run_pull_since_loads_recent_and_open_items_then_backfills_the_rest(
+    tmp_path: Path,
+) -> None:
+    db_path = tmp_path / ".ghtriage" / "ghtriage.duckdb"
+    api_url = "https://api.github.com"
+    since = FAKE_DATASET.issue(21, api_url)["updated_at"]
+    items = [FAKE_DATASET.issue(n, api_url) for n in range(1, FAKE_DATASET.items + 1)]
+    comments = [FAKE_DATASET.comment(j, api_url) for j in range(1, FAKE_DATASET.comments + 1)]
+
+    with FakeGitHubServer(FakeGitHub(dataset=FAKE_DATASET)) as server:
+        _pull_from(server, tmp_path, since=since)
+        recent = {
+            item["number"]
+            for item in items
+            if item["updated_at"] >= since or item["state"] == "open"
+        }
+        with duckdb.connect(str(db_path), read_only=True) as conn:
+            numbers = {
+                row[0]
+                for table in ("issues", "pull_requests")
+                for row in conn.execute(f"SELECT number FROM github.{table}").fetchall()
+            }
+            meta = dict(conn.execute("SELECT key, value FROM github._ghtriage_meta").fetchall())
+        assert numbers == recent < set(range(1, FAKE_DATASET.items + 1))
+        assert {row[0] for row in _table_rows_by_id(db_path, "conversation_comments")} == {
+            comment["id"] for comment in comments if comment["updated_at"] >= since
+        }
+        assert {key: value for key, value in meta.items() if key.startswith("history_since:")} == {
+            f"history_since:{name}": since for name in resource_names([FAKE_REPO])
+        }
+
+        _pull_from(server, tmp_path, backfill=True)
+        _pull_from(server, tmp_path / "whole")
+
+    whole_path = tmp_path / "whole" / ".ghtriage" / "ghtriage.duckdb"
+    for table in ["issues", "pull_requests", "conversation_comments", "review_comments"]:
+        assert _table_rows(db_path, table) == _table_rows(whole_path, table)
+    assert _table_rows_by_id(db_path, "reviews") == _table_rows_by_id(whole_path, "reviews")
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        assert conn.execute(
+            "SELECT count(*) FROM github._ghtriage_meta WHERE key LIKE 'history_since:%'"
+        ).fetchone() == (0,)
+
+
+def _data_tables(db_path: Path) -> set[str]:
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        rows = conn.execute(
+            "SELECT table_name FROM information_schema.tables "
+            "WHERE table_schema = 'github' AND table_type = 'BASE TABLE'"
+        ).fetchall()
+    # Not dlt's own tables, nor the child tables of nested lists.
+    return {table for (table,) in rows if not table.startswith("_") and "__" not in table}
+
+
+def test_run_pull_since_with_only_pulls_just_those_resources(tmp_path: Path) -> None:
+    db_path = tmp_path / ".ghtriage" / "ghtriage.duckdb"
+    since = FAKE_DATASET.issue(21, "https://api.github.com")["updated_at"]
+    stats = RequestStats()
+    with FakeGitHubServer(FakeGitHub(dataset=FAKE_DATASET)) as server:
+        _pull_from(server, tmp_path, since=since, only=["issues"], stats=stats)
+
+    assert set(stats.resources) == {f"issues@{FAKE_REPO}", f"open_issues@{FAKE_REPO}"}
+    assert _data_tables(db_path) == {"issues"}
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        assert conn.execute(
+            "SELECT key, value FROM github._ghtriage_meta WHERE key LIKE 'history_since:%'"
+        ).fetchall() == [(f"history_since:issues@{FAKE_REPO}", since)]
+
+
+def test_run_pull_backfill_with_only_backfills_just_those_resources(tmp_path: Path) -> None:
+    db_path = tmp_path / ".ghtriage" / "ghtriage.duckdb"
+    since = FAKE_DATASET.issue(21, "https://api.github.com")["updated_at"]
+    stats = RequestStats()
+    with FakeGitHubServer(FakeGitHub(dataset=FAKE_DATASET)) as server:
+        _pull_from(server, tmp_path, since=since, only=["issues", "pull_requests"])
+        _pull_from(server, tmp_path, only=["issues"], backfill=True, stats=stats)
+
+    assert {name for name in stats.resources if name.startswith("history_")} == {
+        f"history_issues@{FAKE_REPO}"
+    }
+    assert _data_tables(db_path) == {"issues", "pull_requests", "reviews"}
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        history_since = conn.execute(
+            "SELECT key, value FROM github._ghtriage_meta WHERE key LIKE 'history_since:%'"
+        ).fetchall()
+    # Pull requests, and their reviews, still start at the window.
+    assert sorted(history_since) == [
+        (f"history_since:pull_requests@{FAKE_REPO}", since),
+        (f"history_since:reviews@{FAKE_REPO}", since),
+    ]
+
+
+def test_run_pull_backfill_requests_only_the_pages_it_loads(tmp_path: Path, capfd) -> None:
+    # Several pages of history for each resource, older than the window.
+    dataset = Dataset(items=330, comments=600, review_comments=250)
+    since = dataset.issue(300, "https://api.github.com")["updated_at"]
+    stats = RequestStats()
+    with FakeGitHubServer(FakeGitHub(dataset=dataset)) as server:
+        _pull_from(server, tmp_path, since=since)
+        _pull_from(server, tmp_path, backfill=True, stats=stats)
+
+    history = {name: s for name, s in stats.resources.items() if name.startswith("history_")}
+    # The history pass stops at the window, so no page past it is requested ahead.
+    assert max(resource_stats.pages for resource_stats in history.values()) > 1
+    for name, resource_stats in history.items():
+        assert resource_stats.requests == resource_stats.pages, name
+    # Each pass is normalized on its own, against the schema the one before left.
+    assert "schema hash" not in capfd.readouterr().err
+
+
+def test_run_pull_rejects_since_in_batches(tmp_path: Path, monkeypatch) -> None:
+    _install_pipeline_mocks(monkeypatch)
+    with pytest.raises(ValueError, match="batch_pages cannot be combined"):
+        run_pull(
+            repo="owner/repo", token="t", batch_pages=5, since="2024-01-01T00:00:00Z", cwd=tmp_path
+        )
+
+
+OTHER_REPO = "fake-owner/other-repo"
+OTHER_DATASET = Dataset(
+    items=12, comments=90, review_comments=40, repo=OTHER_REPO, id_offset=50_000
+)
+
+
+def test_run_pull_pulls_several_repos_into_one_database(tmp_path: Path) -> None:
+    db_path = tmp_path / ".ghtriage" / "ghtriage.duckdb"
+    fake = FakeGitHub(dataset=FAKE_DATASET, more_datasets=[OTHER_DATASET])
+    with FakeGitHubServer(fake) as server:
+        _pull_from(server, tmp_path, workers=4, repo=[FAKE_REPO, OTHER_REPO])
+
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        counts = conn.execute(
+            "SELECT repo, count(*) FROM github.conversation_comments GROUP BY repo ORDER BY repo"
+        ).fetchall()
+        activity = conn.execute(
+            "SELECT repo, count(*), sum(comment_count) FROM github.issue_activity "
+            "GROUP BY repo ORDER BY repo"
+        ).fetchall()
+        meta = dict(conn.execute("SELECT key, value FROM github._ghtriage_meta").fetchall())
+    assert counts == [(FAKE_REPO, FAKE_DATASET.comments), (OTHER_REPO, OTHER_DATASET.comments)]
+    issues = {data.repo: data.items - data.pulls for data in (FAKE_DATASET, OTHER_DATASET)}
+    assert [(repo, count) for repo, count, _ in activity] == sorted(issues.items())
+    assert meta["repo"] == f"{FAKE_REPO},{OTHER_REPO}"
+    assert f"last_pull_at:{OTHER_REPO}" in meta
+
+    # Each repository keeps its own cursors: the next pull is one page per resource.
+    stats = RequestStats()
+    with FakeGitHubServer(
+        FakeGitHub(dataset=FAKE_DATASET, more_datasets=[OTHER_DATASET])
+    ) as server:
+        _pull_from(server, tmp_path, repo=[FAKE_REPO, OTHER_REPO], stats=stats)
+    assert stats.requests == 8
+
+
+def _pull_stats_by_repo(stats: RequestStats, repo: str) -> dict[str, tuple[int, int]]:
+    return {
+        name.split("@")[0]: (resource.requests, resource.not_modified)
+        for name, resource in stats.resources.items()
+        if name.endswith(f"@{repo}")
+    }
+
+
+@pytest.mark.parametrize("bare_names", [False, True])
+def test_run_pull_keeps_a_repos_state_when_another_repo_joins(
+    tmp_path: Path, bare_names: bool
+) -> None:
+    stats = RequestStats()
+    fake = FakeGitHub(dataset=FAKE_DATASET, more_datasets=[OTHER_DATASET])
+    with FakeGitHubServer(fake) as server:
+        # The second pull records validators for the first pages its cursors lead to.
+        _pull_from(server, tmp_path)
+        _pull_from(server, tmp_path)
+        if bare_names:
+            # As a pull of one repository left its state, before every resource name
+            # carried its repository.
+            pipeline = create_pipeline(cwd=tmp_path)
+            pipeline.sync_destination()
+            with pipeline.managed_state() as state:
+                resources = state["sources"]["rest_api"]["resources"]
+                for name in list(resources):
+                    resources[name.removesuffix(f"@{FAKE_REPO}")] = resources.pop(name)
+            validators_path = get_conditional_requests_path(cwd=tmp_path)
+            validators = json.loads(validators_path.read_text(encoding="utf-8"))
+            validators_path.write_text(
+                json.dumps({name.split("@")[0]: entry for name, entry in validators.items()}),
+                encoding="utf-8",
+            )
+
+        _pull_from(server, tmp_path, repo=[FAKE_REPO, OTHER_REPO], stats=stats)
+
+    # The first repository carries on from its cursors, its first pages unchanged.
+    assert _pull_stats_by_repo(stats, FAKE_REPO) == {
+        "issues": (1, 1),
+        "pull_requests": (1, 1),
+        "conversation_comments": (1, 1),
+        "review_comments": (1, 1),
+        "reviews": (0, 0),
+    }
+    with duckdb.connect(str(tmp_path / ".ghtriage" / "ghtriage.duckdb"), read_only=True) as conn:
+        counts = conn.execute(
+            "SELECT repo, count(*) FROM github.conversation_comments GROUP BY repo ORDER BY repo"
+        ).fetchall()
+    assert counts == [(FAKE_REPO, FAKE_DATASET.comments), (OTHER_REPO, OTHER_DATASET.comments)]
+
+
+def test_list_org_repos_skips_archived_repos(tmp_path: Path) -> None:
+    archived = Dataset(
+        items=1, comments=1, review_comments=1, repo="fake-owner/old", archived=True
+    )
+    elsewhere = Dataset(items=1, comments=1, review_comments=1, repo="someone-else/repo")
+    fake = FakeGitHub(dataset=FAKE_DATASET, more_datasets=[OTHER_DATASET, archived, elsewhere])
+    with FakeGitHubServer(fake) as server:
+        repos = list_org_repos("fake-owner", "t", api_url=server.api_url)
+
+    assert repos == [FAKE_REPO, OTHER_REPO]
+
+
+def test_merge_records_skips_records_older_than_the_stored_row(tmp_path: Path) -> None:
+    with FakeGitHubServer(FakeGitHub(dataset=FAKE_DATASET)) as server:
+        _pull_from(server, tmp_path)
+        newer = {**FAKE_DATASET.issue(1, server.api_url), "repo": FAKE_REPO, "title": "Newer"}
+        older = {**FAKE_DATASET.issue(2, server.api_url), "repo": FAKE_REPO, "title": "Older"}
+    newer["updated_at"] = "2031-01-01T00:00:00Z"
+    older["updated_at"] = "2019-01-01T00:00:00Z"
+
+    merged = merge_records({"issues": [newer, older]}, cwd=tmp_path)
+
+    assert merged == {"issues": 1}
+    db_path = tmp_path / ".ghtriage" / "ghtriage.duckdb"
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        titles = dict(conn.execute("SELECT number, title FROM github.issues").fetchall())
+        (schemas,) = conn.execute(
+            "SELECT count(DISTINCT schema_name) FROM github._dlt_version"
+        ).fetchone()
+    assert (titles[1], titles[2]) == ("Newer", "Synthetic item 2")
+    assert len(titles) == FAKE_DATASET.items - FAKE_DATASET.pulls
+    # Merged through the pull's own schema, which the next pull keeps using.
+    assert schemas == 1
+
+
+def test_delete_records_removes_child_table_rows(tmp_path: Path) -> None:
+    with FakeGitHubServer(FakeGitHub(dataset=FAKE_DATASET)) as server:
+        _pull_from(server, tmp_path)
+        issue = FAKE_DATASET.issue(2, server.api_url)
+    db_path = tmp_path / ".ghtriage" / "ghtriage.duckdb"
+    labels = "SELECT count(*) FROM github.issues__labels"
+
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        (labels_before,) = conn.execute(labels).fetchone()
+    deleted = delete_records({"issues": [issue["id"]], "review_comments": []}, cwd=tmp_path)
+
+    assert deleted == {"issues": 1}
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        assert conn.execute(labels).fetchone() == (labels_before - len(issue["labels"]),)
+        assert conn.execute(
+            "SELECT count(*) FROM github.issues WHERE id = ?", [issue["id"]]
+        ).fetchone() == (0,)
+
+
+def test_merge_and_delete_records_reject_unknown_resources(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="Unknown resource: comments"):
+        merge_records({"comments": [{"id": 1}]}, cwd=tmp_path)
+    with pytest.raises(ValueError, match="Unknown resource: comments"):
+        delete_records({"comments": [1]}, cwd=tmp_path)
+
+
+def test_run_pull_publishes_a_new_snapshot_under_open_readers(tmp_path: Path) -> None:
+    db_path = tmp_path / ".ghtriage" / "ghtriage.duckdb"
+    with FakeGitHubServer(FakeGitHub(dataset=FAKE_DATASET)) as server:
+        _pull_from(server, tmp_path)
+    more = Dataset(
+        items=FAKE_DATASET.items + 10,
+        comments=FAKE_DATASET.comments + 50,
+        review_comments=FAKE_DATASET.review_comments,
+    )
+    comments = "SELECT count(*) FROM github.conversation_comments"
+
+    reader = duckdb.connect(str(db_path), read_only=True)
+    try:
+        with FakeGitHubServer(FakeGitHub(dataset=more)) as server:
+            _pull_from(server, tmp_path)
+        # The open connection keeps reading the snapshot it opened.
+        assert reader.execute(comments).fetchone() == (FAKE_DATASET.comments,)
+    finally:
+        reader.close()
+
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        assert conn.execute(comments).fetchone() == (more.comments,)
+    assert not (tmp_path / ".ghtriage" / "ghtriage.staging.duckdb").exists()
+
+
+@pytest.mark.parametrize("batch_pages", [None, 1])
+def test_run_pull_full_keeps_the_old_database_until_it_publishes(
+    tmp_path: Path, monkeypatch, batch_pages: int | None
+) -> None:
+    # Even a pull in batches, which would otherwise publish each one.
+    monkeypatch.setattr("ghtriage.pipeline.BATCH_PUBLISH_INTERVAL_SECONDS", 0)
+    db_path = tmp_path / ".ghtriage" / "ghtriage.duckdb"
+    with FakeGitHubServer(FakeGitHub(dataset=FAKE_DATASET)) as server:
+        _pull_from(server, tmp_path)
+    seen: list[int] = []
+
+    @contextmanager
+    def phase(name: str):
+        if name == "finalize":
+            with duckdb.connect(str(db_path), read_only=True) as conn:
+                (count,) = conn.execute("SELECT count(*) FROM github.issues").fetchone()
+            seen.append(count)
+        yield
+
+    small = Dataset(items=6, comments=10, review_comments=5)
+    with FakeGitHubServer(FakeGitHub(dataset=small)) as server:
+        _pull_from(server, tmp_path, full=True, batch_pages=batch_pages, phase=phase)
+
+    assert seen == [FAKE_DATASET.items - FAKE_DATASET.pulls]
+    assert len(_table_rows(db_path, "issues")) == small.items - small.pulls
+
+
+def test_run_pull_that_fails_leaves_the_database_as_it_was(tmp_path: Path) -> None:
+    db_path = tmp_path / ".ghtriage" / "ghtriage.duckdb"
+    with FakeGitHubServer(FakeGitHub(dataset=FAKE_DATASET)) as server:
+        _pull_from(server, tmp_path)
+    more = Dataset(
+        items=FAKE_DATASET.items,
+        comments=FAKE_DATASET.comments + 50,
+        review_comments=FAKE_DATASET.review_comments,
+    )
+
+    @contextmanager
+    def failing(name: str):
+        if name == "finalize":
+            raise KeyboardInterrupt
+        yield
+
+    with FakeGitHubServer(FakeGitHub(dataset=more)) as server:
+        with pytest.raises(KeyboardInterrupt):
+            _pull_from(server, tmp_path, phase=failing)
+        assert len(_table_rows(db_path, "conversation_comments")) == FAKE_DATASET.comments
 
-    mock_create_views.assert_called_once()
-    assert call_order == ["create_views", "fetch_and_annotate"]
+        # The next pull carries on from the interrupted pull's staging database.
+        _pull_from(server, tmp_path)
+    assert len(_table_rows(db_path, "conversation_comments")) == more.comments
@@ -0,0 +1,111 @@
+from pathlib import Path
+
+import duckdb
+from fake_github import REPO, Dataset, FakeGitHub, FakeGitHubServer
+import pytest
+
+from ghtriage.config import get_db_path
+from ghtriage.pipeline import run_pull
+from ghtriage.repair import find_drift, repair
+
+DATASET = Dataset(items=30, comments=90, review_comments=10)
+
+
+def _pulled(tmp_path: Path, server: FakeGitHubServer) -> Path:
+    run_pull(REPO, "token", api_url=server.api_url, spec_url=server.spec_url, cwd=tmp_path)
+    return get_db_path(cwd=tmp_path)
+
+
+def _damage(db_path: Path) -> None:
+    """Lose one of issue 1's comments, as a skipped page would, and keep one for issue 2
+    that GitHub no longer has, as a deleted comment does."""
+    with duckdb.connect(str(db_path)) as conn:
+        conn.execute(
+            "DELETE FROM github.conversation_comments WHERE id = (SELECT min(id) "
+            "FROM github.conversation_comments WHERE issue_url LIKE '%/issues/1')"
+        )
+        conn.execute(
+            "INSERT INTO github.conversation_comments SELECT * REPLACE "
+            "(8888888 AS id, 'deleted' AS _dlt_id) FROM github.conversation_comments "
+            "WHERE issue_url LIKE '%/issues/2' LIMIT 1"
+        )
+
+
+def _comment_ids(db_path: Path, number: int) -> set[int]:
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        rows = conn.execute(
+            "SELECT id FROM github.conversation_comments WHERE issue_url LIKE ?",
+            [f"%/issues/{number}"],
+        ).fetchall()
+    return {row[0] for row in rows}
+
+
+def test_find_drift_finds_missing_and_stale_comments(tmp_path: Path) -> None:
+    with FakeGitHubServer(FakeGitHub(dataset=DATASET)) as server:
+        db_path = _pulled(tmp_path, server)
+    assert find_drift(db_path) == (DATASET.items - DATASET.pulls, [])
+
+    _damage(db_path)
+    checked, drifted = find_drift(db_path)
+
+    assert checked == DATASET.items - DATASET.pulls
+    assert [(d.repo, d.number, d.comments, d.stored) for d in drifted] == [
+        (REPO, 1, 3, 2),
+        (REPO, 2, 3, 4),
+    ]
+    assert find_drift(db_path, ["someone/else"])[1] == []
+
+
+def test_repair_refetches_only_the_drifted_issues(tmp_path: Path) -> None:
+    fake = FakeGitHub(dataset=DATASET)
+    with FakeGitHubServer(fake) as server:
+        db_path = _pulled(tmp_path, server)
+        expected = {number: _comment_ids(db_path, number) for number in (1, 2)}
+        _damage(db_path)
+        requests_before = fake.requests
+
+        result = repair("token", api_url=server.api_url, cwd=tmp_path)
+
+    # The issue and one page of its comments, for each of the two issues.
+    assert fake.requests - requests_before == result.requests == 4
+    assert (result.comments_merged, result.comments_deleted) == (6, 1)
+    assert result.remaining == []
+    assert {number: _comment_ids(db_path, number) for number in (1, 2)} == expected
+    assert find_drift(db_path)[1] == []
+
+
+def test_repair_dry_run_fetches_nothing(tmp_path: Path) -> None:
+    fake = FakeGitHub(dataset=DATASET)
+    with FakeGitHubServer(fake) as server:
+        db_path = _pulled(tmp_path, server)
+        _damage(db_path)
+        requests_before = fake.requests
+
+        result = repair("token", dry_run=True, api_url=server.api_url, cwd=tmp_path)
+
+    assert fake.requests == requests_before
+    assert len(result.drifted) == 2
+    assert len(find_drift(db_path)[1]) == 2
+
+
+def test_repair_removes_an_issue_deleted_on_github(tmp_path: Path) -> None:
+    with FakeGitHubServer(FakeGitHub(dataset=DATASET)) as server:
+        db_path = _pulled(tmp_path, server)
+        with duckdb.connect(str(db_path)) as conn:
+            conn.execute(
+                "INSERT INTO github.issues SELECT * REPLACE "
+                "(999 AS number, 42 AS id, 5 AS comments, 'gone' AS _dlt_id) "
+                "FROM github.issues WHERE number = 1"
+            )
+
+        result = repair("token", api_url=server.api_url, cwd=tmp_path)
+
+    assert result.issues_deleted == 1
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        assert conn.execute("SELECT count(*) FROM github.issues WHERE id = 42").fetchone() == (0,)
+    assert find_drift(db_path)[1] == []
+
+
+def test_repair_needs_a_database(tmp_path: Path) -> None:
+    with pytest.raises(RuntimeError, match="Run `ghtriage pull`"):
+        repair("token", cwd=tmp_path)
@@ -0,0 +1,9 @@
+import pytest
+
+from ghtriage.resources import validate_resources
+
+
+def test_validate_resources_names_every_unknown_kind() -> None:
+    validate_resources(["issues", "reviews"])
+    with pytest.raises(ValueError, match="Unknown resource: comments, discussions. Choose from: "):
+        validate_resources(["comments", "issues", "discussions"])
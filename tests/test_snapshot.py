@@ -0,0 +1,83 @@
+from pathlib import Path
+
+import pytest
+
+from ghtriage.snapshot import prepare_staging, publish, publish_copy
+
+
+@pytest.fixture
+def paths(tmp_path: Path) -> tuple[Path, Path]:
+    db_path = tmp_path / "ghtriage.duckdb"
+    db_path.write_text("published", encoding="utf-8")
+    return db_path, tmp_path / "ghtriage.staging.duckdb"
+
+
+def test_prepare_staging_copies_the_database(paths) -> None:
+    db_path, staging_path = paths
+
+    prepare_staging(db_path, staging_path, fresh=False, stale=False)
+
+    assert staging_path.read_text(encoding="utf-8") == "published"
+    assert db_path.read_text(encoding="utf-8") == "published"
+
+
+def test_prepare_staging_fresh_starts_empty(paths) -> None:
+    db_path, staging_path = paths
+    staging_path.write_text("left over", encoding="utf-8")
+
+    prepare_staging(db_path, staging_path, fresh=True, stale=False)
+
+    assert not staging_path.exists()
+    assert db_path.exists()
+
+
+def test_prepare_staging_keeps_an_interrupted_pulls_staging_database(paths) -> None:
+    db_path, staging_path = paths
+    staging_path.write_text("interrupted", encoding="utf-8")
+
+    prepare_staging(db_path, staging_path, fresh=False, stale=False)
+
+    assert staging_path.read_text(encoding="utf-8") == "interrupted"
+
+
+def test_prepare_staging_recopies_a_database_written_since(paths) -> None:
+    db_path, staging_path = paths
+    staging_path.write_text("interrupted", encoding="utf-8")
+
+    prepare_staging(db_path, staging_path, fresh=False, stale=True)
+
+    assert staging_path.read_text(encoding="utf-8") == "published"
+
+
+def test_prepare_staging_copies_a_write_ahead_log(paths) -> None:
+    db_path, staging_path = paths
+    (db_path.parent / "ghtriage.duckdb.wal").write_text("log", encoding="utf-8")
+
+    prepare_staging(db_path, staging_path, fresh=False, stale=False)
+
+    assert (staging_path.parent / "ghtriage.staging.duckdb.wal").read_text(
+        encoding="utf-8"
+    ) == "log"
+
+
+def test_publish_replaces_the_database_and_drops_its_log(paths) -> None:
+    db_path, staging_path = paths
+    (db_path.parent / "ghtriage.duckdb.wal").write_text("log", encoding="utf-8")
+    staging_path.write_text("pulled", encoding="utf-8")
+
+    publish(staging_path, db_path)
+
+    assert db_path.read_text(encoding="utf-8") == "pulled"
+    assert not staging_path.exists()
+    assert not (db_path.parent / "ghtriage.duckdb.wal").exists()
+
+
+def test_publish_copy_keeps_the_staging_database_to_resume_from(paths) -> None:
+    db_path, staging_path = paths
+    staging_path.write_text("first batch", encoding="utf-8")
+
+    publish_copy(staging_path, db_path)
+
+    assert db_path.read_text(encoding="utf-8") == "first batch"
+    assert staging_path.read_text(encoding="utf-8") == "first batch"
+    assert not (db_path.parent / "ghtriage.duckdb.publishing").exists()
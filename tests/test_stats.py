@@ -0,0 +1,152 @@
+import io
+import json
+from pathlib import Path
+import time
+
+from ghtriage.client import RateLimitScheduler, RequestStats, ResourceStats
+from ghtriage.stats import PullMonitor, format_bytes, peak_rss_mb
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_monitor_times_each_phase_and_counts_its_requests() -> None:
+    clock = _FakeClock()
+    stats = RequestStats()
+    monitor = PullMonitor(stats, live=False, clock=clock)
+
+    with monitor("extract"):
+        clock.now += 2.5
+        stats.for_resource("issues").requests += 3
+        stats.for_resource("issues").bytes += 4096
+    with monitor("load"):
+        clock.now += 1.0
+
+    assert monitor.phases["extract"].seconds == 2.5
+    assert monitor.phases["extract"].requests == 3
+    assert monitor.phases["extract"].bytes == 4096
+    assert monitor.phases["load"].requests == 0
+    assert monitor.seconds == 3.5
+
+
+def test_monitor_adds_up_a_phase_run_once_per_batch() -> None:
+    clock = _FakeClock()
+    monitor = PullMonitor(RequestStats(), live=False, clock=clock)
+
+    for _ in range(3):
+        with monitor("extract"):
+            clock.now += 1.0
+
+    assert list(monitor.phases) == ["extract"]
+    assert monitor.phases["extract"].seconds == 3.0
+
+
+def test_report_has_per_resource_and_per_phase_numbers() -> None:
+    stats = RequestStats()
+    stats.resources["issues"] = ResourceStats(
+        requests=4, not_modified=1, pages=3, bytes=3000, rows=250, rows_inserted=200
+    )
+    scheduler = RateLimitScheduler()
+    scheduler.limit, scheduler.remaining, scheduler.reset_at = 5000, 4990, 1_800_000_000.0
+    monitor = PullMonitor(stats, live=False)
+    with monitor("extract"):
+        pass
+
+    report = monitor.report(["owner/repo"], scheduler)
+
+    json.dumps(report)
+    assert report["repos"] == ["owner/repo"]
+    assert report["rows_inserted"] == 200
+    assert report["rows_updated"] == 50
+    assert report["rate_limit"] == {
+        "used": 3,
+        "remaining": 4990,
+        "limit": 5000,
+        "reset_at": "2027-01-15T08:00:00+00:00",
+    }
+    assert set(report["phases"]["extract"]) == {"seconds", "requests", "bytes"}
+    issues = report["resources"]["issues"]
+    assert (issues["requests"], issues["pages"], issues["bytes"]) == (4, 3, 3000)
+    assert (issues["rows_inserted"], issues["rows_updated"]) == (200, 50)
+
+
+def test_live_progress_line_is_drawn_and_erased(monkeypatch) -> None:
+    monkeypatch.setattr("ghtriage.stats.PROGRESS_INTERVAL", 0.01)
+    stream = io.StringIO()
+    stats = RequestStats()
+    stats.for_resource("issues").pages = 7
+
+    with PullMonitor(stats, stream=stream, live=True) as monitor:
+        with monitor("extract"):
+            deadline = time.monotonic() + 5
+            while "7 pages" not in stream.getvalue() and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+    output = stream.getvalue()
+    assert "\r\x1b[Kextract: 7 pages" in output
+    assert output.endswith("\r\x1b[K")
+
+
+def test_progress_line_is_not_drawn_when_not_a_terminal() -> None:
+    stream = io.StringIO()
+
+    with PullMonitor(RequestStats(), stream=stream) as monitor:
+        with monitor("extract"):
+            pass
+
+    assert stream.getvalue() == ""
+
+
+def test_format_bytes() -> None:
+    assert format_bytes(512) == "512 B"
+    assert format_bytes(2048) == "2.0 KB"
+    assert format_bytes(5 * 1024 * 1024) == "5.0 MB"
+
+
+def _fake_proc(tmp_path: Path, monkeypatch, clear_refs: bool = True) -> Path:
+    status = tmp_path / "status"
+    monkeypatch.setattr("ghtriage.stats.PROC_STATUS", status)
+    monkeypatch.setattr(
+        "ghtriage.stats.PROC_CLEAR_REFS",
+        tmp_path / "clear_refs" if clear_refs else tmp_path / "missing" / "clear_refs",
+    )
+    return status
+
+
+def test_peak_rss_reads_the_high_water_mark(tmp_path: Path, monkeypatch) -> None:
+    status = _fake_proc(tmp_path, monkeypatch)
+    status.write_text("VmPeak:\t 999999 kB\nVmHWM:\t  204800 kB\n")
+
+    assert peak_rss_mb() == 200.0
+
+
+def test_monitor_measures_each_phases_own_peak(tmp_path: Path, monkeypatch) -> None:
+    status = _fake_proc(tmp_path, monkeypatch)
+    status.write_text("VmHWM:\t 512000 kB\n")
+    monitor = PullMonitor(RequestStats(), live=False, phase_rss=True)
+
+    for peak_kb in (102400, 307200, 204800):
+        with monitor("extract" if peak_kb != 307200 else "load"):
+            status.write_text(f"VmHWM:\t {peak_kb} kB\n")
+
+    assert monitor.phases["extract"].peak_rss_mb == 200.0
+    assert monitor.phases["load"].peak_rss_mb == 300.0
+    # The peak before the first phase is still the process's.
+    assert monitor.peak_rss_mb == 500.0
+
+
+def test_monitor_reports_no_phase_peak_where_it_cannot_reset(tmp_path: Path, monkeypatch) -> None:
+    status = _fake_proc(tmp_path, monkeypatch, clear_refs=False)
+    status.write_text("VmHWM:\t 102400 kB\n")
+    monitor = PullMonitor(RequestStats(), live=False, phase_rss=True)
+
+    with monitor("extract"):
+        pass
+
+    assert monitor.phases["extract"].peak_rss_mb is None
+    assert monitor.peak_rss_mb == 100.0
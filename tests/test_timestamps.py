@@ -0,0 +1,6 @@
+from ghtriage.timestamps import utc_timestamp
+
+
+def test_utc_timestamp_formats_times_as_github_does() -> None:
+    assert utc_timestamp(0) == "1970-01-01T00:00:00Z"
+    assert utc_timestamp().endswith("Z")
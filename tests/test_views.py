@@ -6,7 +6,14 @@ import duckdb
 import pytest
 
 import ghtriage.views as views_module
-from ghtriage.views import EMPTY, VIEW_COLUMN_DOCS, VIEW_DOCS, VIEWS, create_views
+from ghtriage.views import (
+    EMPTY,
+    VIEW_COLUMN_DOCS,
+    VIEW_DOCS,
+    VIEW_SOURCES,
+    VIEWS,
+    create_views,
+)
 
 # ---------------------------------------------------------------------------
 # Fixtures
@@ -24,7 +31,8 @@ from ghtriage.views import EMPTY, VIEW_COLUMN_DOCS, VIEW_DOCS, VIEWS, create_vie
 #   128  alice (User)   open    multi-digit number, guards the regexp join key
 #   pull_requests
 #     10 erin (User)    open    conversation comments only, no review comments
-#     11 erin (User)    open    review comments from a human and from a bot
+#     11 erin (User)    open    review comments from a human and from a bot; reviews from
+#                               hank (changes requested, then approved), Copilot, erin
 #     12 frank (User)   open    labels + assignees + pending reviewers all populated
 #     13 frank (User)   open    nothing at all
 #
@@ -68,6 +76,12 @@ def _create_schema(con: duckdb.DuckDBPyConnection) -> None:
             created_at TIMESTAMP WITH TIME ZONE, updated_at TIMESTAMP WITH TIME ZONE
         )
     """)
+    con.execute("""
+        CREATE TABLE github.reviews (
+            id BIGINT, pull_request_url VARCHAR, user__login VARCHAR, user__type VARCHAR,
+            state VARCHAR, submitted_at TIMESTAMP WITH TIME ZONE
+        )
+    """)
     for child in ("issues__labels", "pull_requests__labels"):
         con.execute(f"CREATE TABLE github.{child} (name VARCHAR, _dlt_parent_id VARCHAR)")
     for child in (
@@ -200,6 +214,16 @@ def _populate(con: duckdb.DuckDBPyConnection) -> None:
             (202, _api("pulls", 11), "Copilot", "Bot", _d(6, 2), _d(6, 2)),
         ],
     )
+    con.executemany(
+        "INSERT INTO github.reviews VALUES (?,?,?,?,?,?)",
+        [
+            (301, _api("pulls", 11), "Copilot", "Bot", "COMMENTED", _d(4, 2)),
+            (302, _api("pulls", 11), "hank", "User", "CHANGES_REQUESTED", _d(5, 2)),
+            (303, _api("pulls", 11), "erin", "User", "COMMENTED", _d(5, 2)),
+            (304, _api("pulls", 11), "hank", "User", "APPROVED", _d(6, 2)),
+            (305, _api("pulls", 11), "ivy", "User", "PENDING", None),
+        ],
+    )
     # Inserted unsorted on purpose: the views must sort these.
     con.execute("INSERT INTO github.issues__labels VALUES ('ui','i1'), ('bug','i1'), ('bug','i3')")
     con.execute("INSERT INTO github.issues__assignees VALUES ('zoe','i1'), ('adam','i1')")
@@ -264,7 +288,8 @@ def test_create_views_creates_issue_activity(db: Path) -> None:
 
     # Identity columns lead the projection; full column order is pinned by
     # test_view_columns_match_spec.
-    assert columns(db, "issue_activity")[:6] == [
+    assert columns(db, "issue_activity")[:7] == [
+        "repo",
         "number",
         "title",
         "state",
@@ -300,6 +325,30 @@ def test_create_views_author_type_passes_through(db: Path) -> None:
     ]
 
 
+def test_create_views_reads_account_types_from_users(db: Path) -> None:
+    """Pulled rows keep only user__id and user__login; the type is in the users table.
+    A row pulled before keeps its own user__type, for a user the table lacks."""
+    query = (
+        "SELECT number, author_type, non_bot_comment_count, non_bot_participant_count "
+        "FROM github.issue_activity ORDER BY number"
+    )
+    create_views(db)
+    expected = rows(db, query)
+    with duckdb.connect(str(db)) as con:
+        for table in ("issues", "conversation_comments"):
+            con.execute(f"ALTER TABLE github.{table} ADD COLUMN user__id BIGINT")
+            con.execute(
+                f"UPDATE github.{table} SET user__id = 1, user__type = NULL "  # noqa: S608
+                "WHERE user__login = 'ci[bot]'"
+            )
+        con.execute("CREATE TABLE github.users (id BIGINT, login VARCHAR, type VARCHAR)")
+        con.execute("INSERT INTO github.users VALUES (1, 'ci[bot]', 'Bot')")
+
+    create_views(db)
+
+    assert rows(db, query) == expected
+
+
 # ---------------------------------------------------------------------------
 # Step 2 — documentation machinery and the drift guard
 # ---------------------------------------------------------------------------
@@ -680,6 +729,28 @@ def test_every_format_slot_has_an_empty_relation() -> None:
             assert slot in EMPTY, slot
 
 
+def test_view_sources_cover_every_table_a_view_reads() -> None:
+    """A view missing a source here would not be rebuilt when that resource is reset."""
+    import re
+
+    for name, sql in VIEWS.items():
+        tables = set(re.findall(r"\{(\w+)\}", sql)) | set(re.findall(r"github\.(\w+)", sql))
+        assert {table.split("__")[0] for table in tables} == set(VIEW_SOURCES[name]), name
+
+
+def test_create_views_recreates_only_views_reading_the_given_resources(db: Path) -> None:
+    create_views(db)
+    with duckdb.connect(str(db)) as con:
+        con.execute("DROP VIEW github.issue_activity")
+        con.execute("DROP VIEW github.pull_request_activity")
+
+    create_views(db, resources=["review_comments"])
+
+    assert rows(
+        db, "SELECT view_name FROM duckdb_views() WHERE schema_name='github' ORDER BY 1"
+    ) == [("pull_request_activity",)]
+
+
 def test_create_views_swallows_errors(db: Path, capsys: pytest.CaptureFixture) -> None:
     """A broken view definition warns and does not stop the others."""
     broken = dict(VIEWS)
@@ -862,6 +933,23 @@ def test_create_views_pull_participant_count_spans_both_comment_tables(db: Path)
     ]
 
 
+def test_create_views_pull_request_review_facts(db: Path) -> None:
+    """The author's own reply counts as a review but not as a reviewer, and a pending
+    review, visible only to its author, counts as neither."""
+    create_views(db)
+
+    assert rows(
+        db,
+        "SELECT number, review_count, approval_count, changes_requested_count, reviewers, "
+        "first_review_at, last_review_at FROM github.pull_request_activity ORDER BY number",
+    ) == [
+        (10, 0, 0, 0, [], None, None),
+        (11, 4, 1, 1, ["Copilot", "hank"], _ts("2026-02-04"), _ts("2026-02-06")),
+        (12, 0, 0, 0, [], None, None),
+        (13, 0, 0, 0, [], None, None),
+    ]
+
+
 def test_create_views_pending_reviewers_sorted_and_empty_list_when_none(db: Path) -> None:
     create_views(db)
 
@@ -901,9 +989,9 @@ def test_create_views_pull_request_activity_degrades(sparse_db: Path, db: Path)
     assert rows(
         sparse_db,
         "SELECT comment_count, non_bot_comment_count, review_comment_count, "
-        "non_bot_review_comment_count, labels, assignees, pending_reviewers, "
-        "participant_count FROM github.pull_request_activity",
-    ) == [(0, 0, 0, 0, [], [], [], 1)]
+        "non_bot_review_comment_count, review_count, reviewers, labels, assignees, "
+        "pending_reviewers, participant_count FROM github.pull_request_activity",
+    ) == [(0, 0, 0, 0, 0, [], [], [], [], 1)]
 
 
 # ---------------------------------------------------------------------------
@@ -913,6 +1001,7 @@ def test_create_views_pull_request_activity_degrades(sparse_db: Path, db: Path)
 TS = "TIMESTAMP WITH TIME ZONE"
 
 ISSUE_ACTIVITY_SPEC = [
+    ("repo", "VARCHAR"),
     ("number", "BIGINT"),
     ("title", "VARCHAR"),
     ("state", "VARCHAR"),
@@ -935,6 +1024,7 @@ ISSUE_ACTIVITY_SPEC = [
 ]
 
 PULL_ACTIVITY_SPEC = [
+    ("repo", "VARCHAR"),
     ("number", "BIGINT"),
     ("title", "VARCHAR"),
     ("state", "VARCHAR"),
@@ -956,6 +1046,12 @@ PULL_ACTIVITY_SPEC = [
     ("non_bot_review_comment_count", "BIGINT"),
     ("first_review_comment_at", TS),
     ("last_review_comment_at", TS),
+    ("review_count", "BIGINT"),
+    ("approval_count", "BIGINT"),
+    ("changes_requested_count", "BIGINT"),
+    ("reviewers", "VARCHAR[]"),
+    ("first_review_at", TS),
+    ("last_review_at", TS),
     ("participant_count", "BIGINT"),
     ("non_bot_participant_count", "BIGINT"),
 ]
@@ -1132,8 +1228,8 @@ def test_create_views_warns_and_survives_an_unusable_database(
 ) -> None:
     """A pull must not fail because the view step could not open the database.
 
-    create_views runs before fetch_and_annotate, so raising here would also skip
-    annotation -- a regression against the behaviour without views.
+    Raising here would also fail the writers of the database that call it, such as
+    merge_records, over views they do not depend on.
     """
     path = tmp_path / "corrupt.duckdb"
     path.write_bytes(b"this is not a duckdb file" * 100)
@@ -1209,6 +1305,59 @@ def test_create_views_join_key_ignores_digits_in_the_repo_name(tmp_path: Path) -
     assert rows(path, "SELECT number, comment_count FROM github.issue_activity") == [(7, 1)]
 
 
+def test_create_views_key_items_by_repo_and_number(tmp_path: Path) -> None:
+    """Two repositories pulled into one database both have an issue #1 and a PR #2.
+
+    Comments must join to the item in their own repository, and each item gets its own
+    row, rather than the two repositories' activity being merged by number.
+    """
+    path = tmp_path / "multirepo.duckdb"
+    con = duckdb.connect(str(path))
+    _create_schema(con)
+    for table in ("issues", "pull_requests", "conversation_comments", "review_comments"):
+        con.execute(f"ALTER TABLE github.{table} ADD COLUMN repo VARCHAR")
+    for repo, login, dlt_id in (("someorg/a", "alice", "a"), ("someorg/b", "bob", "b")):
+        con.execute(
+            "INSERT INTO github.issues BY NAME SELECT 1 AS number, ? AS repo, "
+            "? AS user__login, 'User' AS user__type, ? AS _dlt_id",
+            [repo, login, f"i{dlt_id}"],
+        )
+        con.execute(
+            "INSERT INTO github.pull_requests BY NAME SELECT 2 AS number, ? AS repo, "
+            "? AS user__login, 'User' AS user__type, ? AS _dlt_id",
+            [repo, login, f"p{dlt_id}"],
+        )
+    base = "https://api.github.com/repos/someorg"
+    con.executemany(
+        "INSERT INTO github.conversation_comments BY NAME "
+        "SELECT ? AS id, ? AS repo, ? AS issue_url, ? AS user__login, 'User' AS user__type",
+        [
+            (1, "someorg/a", f"{base}/a/issues/1", "carol"),
+            (2, "someorg/b", f"{base}/b/issues/1", "dave"),
+            (3, "someorg/b", f"{base}/b/issues/1", "erin"),
+            (4, "someorg/b", f"{base}/b/issues/2", "erin"),
+        ],
+    )
+    con.execute(
+        "INSERT INTO github.review_comments BY NAME SELECT 5 AS id, 'someorg/a' AS repo, "
+        f"'{base}/a/pulls/2' AS pull_request_url, 'frank' AS user__login"
+    )
+    con.close()
+
+    create_views(path)
+
+    assert rows(
+        path,
+        "SELECT repo, number, comment_count, participant_count "
+        "FROM github.issue_activity ORDER BY repo",
+    ) == [("someorg/a", 1, 1, 2), ("someorg/b", 1, 2, 3)]
+    assert rows(
+        path,
+        "SELECT repo, number, comment_count, review_comment_count, participant_count "
+        "FROM github.pull_request_activity ORDER BY repo",
+    ) == [("someorg/a", 2, 0, 1, 2), ("someorg/b", 2, 1, 0, 2)]
+
+
 def test_create_views_pull_request_review_timestamps(db: Path) -> None:
     """The PR view's own timestamp columns, which nothing else asserts on."""
     create_views(db)
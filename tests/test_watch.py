@@ -0,0 +1,156 @@
+from pathlib import Path
+import random
+
+import duckdb
+import pytest
+
+from ghtriage.client import RateLimitScheduler
+from ghtriage.lock import PullLock
+from ghtriage.watch import (
+    JITTER_FRACTION,
+    MAX_BACKOFF_SECONDS,
+    next_delay,
+    parse_interval,
+    watch,
+)
+
+
+class _FakeTime:
+    def __init__(self, now: float = 1_800_000_000.0) -> None:
+        self.now = now
+        self.sleeps: list[float] = []
+
+    def clock(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class _NoJitter(random.Random):
+    def uniform(self, a: float, b: float) -> float:
+        return 0.0
+
+
+def _meta(db_path: Path) -> dict[str, str]:
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        return dict(conn.execute("SELECT key, value FROM github._ghtriage_meta").fetchall())
+
+
+@pytest.mark.parametrize(
+    ("value", "seconds"),
+    [("90", 90), ("30s", 30), ("5m", 300), ("1.5h", 5400), ("1d", 86400), (" 10M ", 600)],
+)
+def test_parse_interval(value: str, seconds: float) -> None:
+    assert parse_interval(value) == seconds
+
+
+@pytest.mark.parametrize("value", ["", "0", "5 minutes", "-5m", "m"])
+def test_parse_interval_rejects_malformed_values(value: str) -> None:
+    with pytest.raises(ValueError, match="Invalid interval"):
+        parse_interval(value)
+
+
+def test_next_delay_jitters_around_the_interval() -> None:
+    rng = random.Random(0)
+    delays = [next_delay(300, 0, RateLimitScheduler(), now=0, rng=rng) for _ in range(100)]
+
+    assert all(
+        300 * (1 - JITTER_FRACTION) <= delay <= 300 * (1 + JITTER_FRACTION) for delay in delays
+    )
+    assert len(set(delays)) > 1
+
+
+def test_next_delay_backs_off_after_failures_up_to_a_cap() -> None:
+    rng = _NoJitter()
+    scheduler = RateLimitScheduler()
+
+    assert next_delay(300, 1, scheduler, now=0, rng=rng) == 600
+    assert next_delay(300, 2, scheduler, now=0, rng=rng) == 1200
+    assert next_delay(300, 10, scheduler, now=0, rng=rng) == MAX_BACKOFF_SECONDS
+
+
+def test_next_delay_waits_for_the_rate_limit_reset_when_budget_is_low() -> None:
+    scheduler = RateLimitScheduler()
+    scheduler.limit, scheduler.remaining, scheduler.reset_at = 5000, 20, 2_000.0
+
+    assert next_delay(300, 0, scheduler, now=1_000.0, rng=_NoJitter()) == 1_001.0
+
+
+def test_watch_pulls_each_interval_and_backs_off_after_a_failure(tmp_path: Path, capsys) -> None:
+    fake_time = _FakeTime()
+    db_path = tmp_path / "ghtriage.duckdb"
+    outcomes = iter(["ok", RuntimeError("GitHub is down"), "ok"])
+
+    def pull() -> str:
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return "owner/repo: 4 requests"
+
+    watch(
+        pull,
+        interval=300,
+        lock_path=tmp_path / "pull.lock",
+        db_path=db_path,
+        scheduler=RateLimitScheduler(),
+        max_cycles=3,
+        clock=fake_time.clock,
+        sleep=fake_time.sleep,
+        rng=_NoJitter(),
+    )
+
+    assert fake_time.sleeps == [300, 600]
+    captured = capsys.readouterr()
+    assert captured.out.count("Pulled owner/repo: 4 requests") == 2
+    assert "pull failed (RuntimeError: GitHub is down)" in captured.err
+    meta = _meta(db_path)
+    assert meta["watch_last_error"] == ""
+    assert meta["watch_last_cycle_at"] == "2027-01-15T08:15:00Z"
+    assert meta["watch_next_pull_at"] == "2027-01-15T08:20:00Z"
+    assert meta["watch_interval_seconds"] == "300"
+
+
+def test_watch_records_a_failed_cycle(tmp_path: Path) -> None:
+    fake_time = _FakeTime()
+    db_path = tmp_path / "ghtriage.duckdb"
+
+    def pull() -> str:
+        raise RuntimeError("GitHub is down")
+
+    watch(
+        pull,
+        interval=300,
+        lock_path=tmp_path / "pull.lock",
+        db_path=db_path,
+        scheduler=RateLimitScheduler(),
+        max_cycles=1,
+        clock=fake_time.clock,
+        sleep=fake_time.sleep,
+        rng=_NoJitter(),
+    )
+
+    assert _meta(db_path)["watch_last_error"] == "RuntimeError: GitHub is down"
+
+
+def test_watch_skips_a_cycle_while_another_pull_holds_the_lock(tmp_path: Path, capsys) -> None:
+    fake_time = _FakeTime()
+    lock_path = tmp_path / "pull.lock"
+    pulls = []
+
+    with PullLock(lock_path):
+        watch(
+            lambda: pulls.append(1) or "owner/repo",
+            interval=300,
+            lock_path=lock_path,
+            db_path=tmp_path / "ghtriage.duckdb",
+            scheduler=RateLimitScheduler(),
+            max_cycles=1,
+            clock=fake_time.clock,
+            sleep=fake_time.sleep,
+            rng=_NoJitter(),
+        )
+
+    assert pulls == []
+    assert "skipping this cycle" in capsys.readouterr().err
@@ -0,0 +1,270 @@
+import hashlib
+import hmac
+import json
+import os
+from pathlib import Path
+import threading
+from unittest.mock import Mock
+import urllib.error
+import urllib.request
+
+import dlt
+import duckdb
+from fake_github import REPO, Dataset, FakeGitHub, FakeGitHubServer
+import pytest
+
+from ghtriage.config import get_db_path, get_lock_path
+from ghtriage.lock import PullLock
+from ghtriage.pipeline import run_pull
+from ghtriage.webhooks import (
+    Change,
+    WebhookServer,
+    WebhookWriter,
+    apply_changes,
+    changes_from_event,
+    verify_signature,
+)
+
+SECRET = "It's a Secret to Everybody"
+API_URL = "https://api.github.com"
+DATASET = Dataset(items=30, comments=60, review_comments=20)
+
+
+def _sign(body: bytes, secret: str = SECRET) -> str:
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def _payload(action: str, **objects: dict) -> dict:
+    return {"action": action, "repository": {"full_name": REPO}, **objects}
+
+
+def _deliver(url: str, event: str, payload: dict, signature: str | None = None) -> int:
+    body = json.dumps(payload).encode()
+    request = urllib.request.Request(
+        url,
+        data=body,
+        method="POST",
+        headers={
+            "Content-Type": "application/json",
+            "X-GitHub-Event": event,
+            "X-Hub-Signature-256": signature if signature is not None else _sign(body),
+        },
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status
+    except urllib.error.HTTPError as exc:
+        return exc.code
+
+
+class _Recorder:
+    def __init__(self) -> None:
+        self.batches: list[list[Change]] = []
+
+    def __call__(self, batch: list[Change]) -> dict[str, int]:
+        self.batches.append(batch)
+        return {"issues": len(batch)}
+
+
+def test_verify_signature() -> None:
+    # The example from GitHub's documentation on validating deliveries.
+    body = b"Hello, World!"
+    signature = "sha256=757107ea0eb2509fc211221cce984b8a37570b6d7586c22c46f4379c8b043e17"
+
+    assert verify_signature(SECRET, body, signature)
+    assert not verify_signature(SECRET, body + b" ", signature)
+    assert not verify_signature("another secret", body, signature)
+    assert not verify_signature(SECRET, body, None)
+    assert not verify_signature(SECRET, body, signature.replace("sha256=", "sha1="))
+
+
+def test_changes_from_event_maps_each_event_to_its_table() -> None:
+    issue = DATASET.issue(1, API_URL)
+    pull = DATASET.pull(3, API_URL)
+    comment = DATASET.comment(1, API_URL)
+    review_comment = DATASET.review_comment(1, API_URL)
+
+    (change,) = changes_from_event("issues", _payload("edited", issue=issue))
+    assert (change.kind, change.id, change.record["repo"]) == ("issues", issue["id"], REPO)
+    (change,) = changes_from_event("pull_request", _payload("closed", pull_request=pull))
+    assert (change.kind, change.id) == ("pull_requests", pull["id"])
+    changes = changes_from_event(
+        "issue_comment", _payload("created", issue=issue, comment=comment)
+    )
+    assert [(c.kind, c.id) for c in changes] == [
+        ("issues", issue["id"]),
+        ("conversation_comments", comment["id"]),
+    ]
+    (change,) = changes_from_event(
+        "pull_request_review_comment", _payload("deleted", comment=review_comment)
+    )
+    assert (change.kind, change.id, change.record) == (
+        "review_comments",
+        review_comment["id"],
+        None,
+    )
+
+
+def test_changes_from_event_leaves_out_pull_requests_as_issues_and_other_events() -> None:
+    pull_as_issue = DATASET.issue(3, API_URL)
+    comment = DATASET.comment(3, API_URL)
+
+    assert changes_from_event("issues", _payload("edited", issue=pull_as_issue)) == []
+    changes = changes_from_event(
+        "issue_comment", _payload("created", issue=pull_as_issue, comment=comment)
+    )
+    assert [c.kind for c in changes] == ["conversation_comments"]
+    assert changes_from_event("star", _payload("created")) == []
+    assert changes_from_event("issues", {"action": "edited"}) == []
+
+
+def test_writer_applies_each_row_once_per_batch_at_its_latest_version(tmp_path: Path) -> None:
+    recorder = _Recorder()
+    writer = WebhookWriter(cwd=tmp_path, apply=recorder)
+    older = {"id": 1, "updated_at": "2024-01-01T00:00:00Z", "title": "older"}
+    newer = {"id": 1, "updated_at": "2024-01-02T00:00:00Z", "title": "newer"}
+
+    writer.add([Change("issues", 1, newer), Change("issues", 2, {"id": 2})])
+    writer.add([Change("issues", 1, older)])
+    writer.add([Change("conversation_comments", 5), Change("conversation_comments", 5, {"id": 5})])
+    writer.flush()
+
+    (batch,) = recorder.batches
+    assert [change.record["title"] for change in batch if change.id == 1] == ["newer"]
+    # A deletion is final, whatever arrives after it.
+    assert [change.record for change in batch if change.id == 5] == [None]
+    assert len(batch) == 3
+    assert writer.pending == 0
+
+
+def test_writer_waits_while_a_pull_holds_the_lock(tmp_path: Path) -> None:
+    recorder = _Recorder()
+    writer = WebhookWriter(cwd=tmp_path, apply=recorder)
+    writer.add([Change("issues", 1, {"id": 1})])
+
+    with PullLock(get_lock_path(cwd=tmp_path)):
+        assert writer.flush() == {}
+    assert writer.pending == 1
+    assert writer.flush() == {"issues": 1}
+    assert len(recorder.batches) == 1
+
+
+def test_writer_drops_a_batch_that_fails(tmp_path: Path, capsys) -> None:
+    def fail(batch: list[Change]) -> dict[str, int]:
+        raise RuntimeError("database is locked")
+
+    writer = WebhookWriter(cwd=tmp_path, apply=fail)
+    writer.add([Change("issues", 1, {"id": 1})])
+
+    assert writer.flush() == {}
+    assert writer.pending == 0
+    assert "could not apply 1 webhook changes (database is locked)" in capsys.readouterr().err
+
+
+def test_server_rejects_bad_signatures_and_queues_supported_events(tmp_path: Path) -> None:
+    recorder = _Recorder()
+    writer = WebhookWriter(cwd=tmp_path, apply=recorder)
+    server = WebhookServer(("127.0.0.1", 0), SECRET, writer)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        issue = DATASET.issue(1, API_URL)
+        assert _deliver(server.url, "issues", _payload("edited", issue=issue), "sha256=0") == 401
+        assert writer.pending == 0
+        assert _deliver(server.url, "ping", {"zen": "Keep it logically awesome."}) == 200
+        assert _deliver(server.url, "star", _payload("created")) == 202
+        assert _deliver(server.url, "issues", _payload("edited", issue=issue)) == 202
+        assert writer.pending == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_server_requires_a_secret(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="secret"):
+        WebhookServer(("127.0.0.1", 0), "", WebhookWriter(cwd=tmp_path))
+
+
+def test_replayed_deliveries_update_tables_and_views(tmp_path: Path) -> None:
+    with FakeGitHubServer(FakeGitHub(dataset=DATASET)) as github:
+        run_pull(REPO, "token", api_url=github.api_url, spec_url=github.spec_url, cwd=tmp_path)
+    db_path = get_db_path(cwd=tmp_path)
+    with duckdb.connect(str(db_path)) as conn:
+        (comments_before,) = conn.execute(
+            "SELECT comment_count FROM github.issue_activity WHERE number = 1"
+        ).fetchone()
+
+    edited = {**DATASET.issue(1, API_URL), "title": "Edited", "updated_at": "2031-01-01T00:00:00Z"}
+    stale = {**DATASET.issue(2, API_URL), "title": "Stale", "updated_at": "2019-01-01T00:00:00Z"}
+    new_comment = {
+        **DATASET.comment(1, API_URL),
+        "id": 9_999_999,
+        "created_at": "2031-01-01T00:00:00Z",
+        "updated_at": "2031-01-01T00:00:00Z",
+    }
+    deleted = DATASET.review_comment(1, API_URL)
+    writer = WebhookWriter(cwd=tmp_path, flush_interval=0.05)
+    server = WebhookServer(("127.0.0.1", 0), SECRET, writer)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    with writer:
+        thread.start()
+        try:
+            deliveries = [
+                ("issues", _payload("edited", issue=edited)),
+                ("issues", _payload("edited", issue=stale)),
+                ("issue_comment", _payload("created", issue=edited, comment=new_comment)),
+                ("pull_request_review_comment", _payload("deleted", comment=deleted)),
+            ]
+            for event, payload in deliveries:
+                assert _deliver(server.url, event, payload) == 202
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    with duckdb.connect(str(db_path)) as conn:
+        titles = dict(conn.execute("SELECT number, title FROM github.issues").fetchall())
+        assert (titles[1], titles[2]) == ("Edited", "Synthetic item 2")
+        (comments_after,) = conn.execute(
+            "SELECT comment_count FROM github.issue_activity WHERE number = 1"
+        ).fetchone()
+        assert comments_after == comments_before + 1
+        assert conn.execute(
+            "SELECT repo FROM github.conversation_comments WHERE id = 9999999"
+        ).fetchone() == (REPO,)
+        assert conn.execute(
+            "SELECT count(*) FROM github.review_comments WHERE id = ?", [deleted["id"]]
+        ).fetchone() == (0,)
+        (applied_at,) = conn.execute(
+            "SELECT value FROM github._ghtriage_meta WHERE key = 'webhook_last_applied_at'"
+        ).fetchone()
+        assert applied_at.endswith("Z")
+
+
+def test_a_pull_retried_after_a_webhook_batch_keeps_the_batch(tmp_path: Path, monkeypatch) -> None:
+    edited = {**DATASET.issue(1, API_URL), "title": "Edited", "updated_at": "2031-01-01T00:00:00Z"}
+    with FakeGitHubServer(FakeGitHub(dataset=DATASET)) as github:
+
+        def pull() -> None:
+            run_pull(REPO, "token", api_url=github.api_url, spec_url=github.spec_url, cwd=tmp_path)
+
+        pull()
+        with monkeypatch.context() as patch:
+            patch.setattr(dlt.Pipeline, "load", Mock(side_effect=RuntimeError("load failed")))
+            with pytest.raises(RuntimeError):
+                pull()
+        # Its staging database is left behind, holding the database as it was before.
+        staging_path = tmp_path / ".ghtriage" / "ghtriage.staging.duckdb"
+        assert staging_path.exists()
+        apply_changes([Change("issues", 1, edited)], cwd=tmp_path)
+        # Timestamps do not tell: a coarse clock may give both files the same one.
+        mtime = get_db_path(cwd=tmp_path).stat().st_mtime
+        os.utime(staging_path, (mtime, mtime))
+        pull()
+
+    with duckdb.connect(str(get_db_path(cwd=tmp_path)), read_only=True) as conn:
+        assert conn.execute("SELECT title FROM github.issues WHERE number = 1").fetchone() == (
+            "Edited",
+        )
+        assert conn.execute(
+            "SELECT count(*) FROM github._ghtriage_meta WHERE key = 'webhook_last_applied_at'"
+        ).fetchone() == (1,)